@@ -287,6 +287,14 @@ def main(argv):
         '--fletcher32',
         action="store_true",
         help='Adds a checksum to each chunk to detect data corruption.')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Number of processes used to decode and compress the images '
+             'of a file series (see --file-pattern). The GZIP compression '
+             'and the shuffle filter are applied by the workers, and the '
+             'compressed chunks are written by the main process. By default '
+             'the images are processed by the main process.')
     parser.add_argument(
         '--debug',
         action="store_true",
@@ -430,6 +438,10 @@ def main(argv):
         _logger.error("Aborting.")
         return -1
 
+    if options.workers is not None and options.workers < 1:
+        _logger.error("--workers must be a strictly positive integer")
+        return -1
+
     # create_dataset special args
     create_dataset_args = {}
     if options.chunks is not None:
@@ -482,7 +494,9 @@ def main(argv):
                 # unexpected problem in silx.io.fabioh5
                 raise
             return -1
-        input_group = fabioh5.File(file_series=options.input_files)
+        prefetch = 0 if options.workers is None else options.workers
+        input_group = fabioh5.File(file_series=options.input_files,
+                                   prefetch=prefetch)
         if hdf5_path != "/":
             # we want to append only data and headers to an existing file
             input_group = input_group["/scan_0/instrument/detector_0"]
@@ -491,7 +505,8 @@ def main(argv):
                         h5path=hdf5_path,
                         overwrite_data=options.overwrite_data,
                         create_dataset_args=create_dataset_args,
-                        min_size=options.min_size)
+                        min_size=options.min_size,
+                        workers=options.workers)
 
     elif len(options.input_files) == 1 or \
             are_all_specfile(options.input_files) or\
@@ -35,12 +35,20 @@ import tempfile
 import unittest
 import io
 import gc
+import shutil
+
+import numpy
 
 try:
     import h5py
 except ImportError:
     h5py = None
 
+try:
+    import fabio
+except ImportError:
+    fabio = None
+
 import silx
 from .. import convert
 from silx.utils import testutils
@@ -169,6 +177,41 @@ class TestConvertCommand(unittest.TestCase):
         os.unlink(h5name)
         os.rmdir(tempdir)
 
+    def _convertFileSeries(self, *options):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        stack = numpy.random.randint(0, 1000, (7, 9, 5)).astype(numpy.uint16)
+        for index, image in enumerate(stack):
+            filename = os.path.join(tempdir, "image_%04d.edf" % index)
+            fabio.edfimage.edfimage(data=image).write(filename)
+
+        h5name = os.path.join(tempdir, "output.h5")
+        command_list = ["convert", "-m", "w", "-o", h5name,
+                        "--file-pattern",
+                        os.path.join(tempdir, "image_%04d.edf")]
+        result = convert.main(command_list + list(options))
+        self.assertEqual(result, 0)
+        with h5py.File(h5name, "r") as h5f:
+            dataset = h5f["/scan_0/instrument/detector_0/data"]
+            numpy.testing.assert_array_equal(dataset[()], stack)
+            return dataset.chunks, dataset.compression
+
+    @unittest.skipIf(h5py is None, "h5py is required to test convert")
+    @unittest.skipIf(fabio is None, "fabio is required to test convert")
+    def testFileSeriesWorkers(self):
+        chunks, compression = self._convertFileSeries(
+            "--workers", "2", "--chunks", "(2, 4, 5)",
+            "--compression", "--shuffle")
+        self.assertEqual(chunks, (2, 4, 5))
+        self.assertEqual(compression, "gzip")
+
+    @unittest.skipIf(h5py is None, "h5py is required to test convert")
+    @unittest.skipIf(fabio is None, "fabio is required to test convert")
+    def testFileSeriesWorkersWithoutCompression(self):
+        chunks, compression = self._convertFileSeries("--workers", "2")
+        self.assertIsNone(chunks)
+        self.assertIsNone(compression)
+
 
 def suite():
     test_suite = unittest.TestSuite()
@@ -427,8 +427,10 @@ class Colormap(qt.QObject):
         if vmin is None or vmax is None:  # Handle autoscale
             # Get min/max from data
             if data is not None:
-                data = numpy.array(data, copy=False)
-                if data.size == 0:  # Fallback an array but no data
+                if not hasattr(data, 'shape') or not hasattr(data, 'dtype'):
+                    data = numpy.array(data, copy=False)
+                # h5py-like datasets are not loaded, min_max reads them by blocks
+                if numpy.prod(data.shape) == 0:  # Fallback an array but no data
                     min_, max_ = self._getDefaultMin(), self._getDefaultMax()
                 else:
                     if self.getNormalization() == self.LOGARITHM:
@@ -565,10 +567,12 @@ class Colormap(qt.QObject):
                         vmax=self._vmax,
                         normalization=self._normalization)
 
-    def applyToData(self, data):
+    def applyToData(self, data, output=None):
         """Apply the colormap to the data
 
         :param numpy.ndarray data: The data to convert.
+        :param numpy.ndarray output: Array where to store the result
+            (see :func:`silx.math.colormap.cmap`). Default: a new array.
         """
         name = self.getName()
         if name is not None:  # Get colormap definition from matplotlib
@@ -584,7 +588,7 @@ class Colormap(qt.QObject):
         vmin, vmax = self.getColormapRange(data)
         normalization = self.getNormalization()
 
-        return _cmap(data, colors, vmin, vmax, normalization)
+        return _cmap(data, colors, vmin, vmax, normalization, output=output)
 
     @staticmethod
     def getSupportedColormaps():
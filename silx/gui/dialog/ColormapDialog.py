@@ -78,7 +78,7 @@ import weakref
 from silx.math.combo import min_max
 from silx.third_party import enum
 from silx.gui import icons
-from silx.math.histogram import Histogramnd
+from silx.math.histogram import histogram1d
 
 _logger = logging.getLogger(__name__)
 
@@ -588,20 +588,12 @@ class ColormapDialog(qt.QDialog):
         if len(_data) == 0:
             return None, None
 
-        xmin, xmax = min_max(_data, min_positive=False, finite=True)
-        nbins = min(256, int(numpy.sqrt(_data.size)))
-        data_range = xmin, xmax
-
-        # bad hack: get 256 bins in the case we have a B&W
-        if numpy.issubdtype(_data.dtype, numpy.integer):
-            if nbins > xmax - xmin:
-                nbins = xmax - xmin
-
-        nbins = max(2, nbins)
-        _data = _data.ravel().astype(numpy.float32)
-
-        histogram = Histogramnd(_data, n_bins=nbins, histo_range=data_range)
-        return histogram.histo, histogram.edges[0]
+        nbins = max(2, min(256, int(numpy.sqrt(_data.size))))
+        try:
+            # Integer data gets one bin per value if its range is narrow
+            return histogram1d(_data, n_bins=nbins)
+        except ValueError:  # No finite value
+            return None, None
 
     def _getData(self):
         if self._data is None:
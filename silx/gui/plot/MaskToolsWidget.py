@@ -149,10 +149,10 @@ class ImageMask(BaseMask):
         :param vertices: Nx2 array of polygon corners as (row, col)
         :param bool mask: True to mask (default), False to unmask.
         """
-        fill = shapes.polygon_fill_mask(vertices, self._mask.shape)
         if mask:
-            self._mask[fill != 0] = level
+            shapes.fill_polygon(self._mask, vertices, level)
         else:
+            fill = shapes.polygon_fill_mask(vertices, self._mask.shape)
             self._mask[numpy.logical_and(fill != 0,
                                          self._mask == level)] = 0
         self._notify()
@@ -189,8 +189,12 @@ class ImageMask(BaseMask):
         :param float radius: Radius of the disk in mask array unit
         :param bool mask: True to mask (default), False to unmask.
         """
-        rows, cols = shapes.circle_fill(crow, ccol, radius)
-        self.updatePoints(level, rows, cols, mask)
+        if mask:
+            shapes.fill_disk(self._mask, crow, ccol, radius, level)
+            self._notify()
+        else:
+            rows, cols = shapes.circle_fill(crow, ccol, radius)
+            self.updatePoints(level, rows, cols, mask)
 
     def updateLine(self, level, row0, col0, row1, col1, width, mask=True):
         """Mask/Unmask a line of the given mask level.
@@ -203,8 +207,12 @@ class ImageMask(BaseMask):
         :param int width: Width of the line in mask array unit.
         :param bool mask: True to mask (default), False to unmask.
         """
-        rows, cols = shapes.draw_line(row0, col0, row1, col1, width)
-        self.updatePoints(level, rows, cols, mask)
+        if mask:
+            shapes.fill_line(self._mask, row0, col0, row1, col1, width, level)
+            self._notify()
+        else:
+            rows, cols = shapes.draw_line(row0, col0, row1, col1, width)
+            self.updatePoints(level, rows, cols, mask)
 
 
 class MaskToolsWidget(BaseMaskToolsWidget):
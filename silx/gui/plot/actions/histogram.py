@@ -38,8 +38,7 @@ __date__ = "30/04/2018"
 __license__ = "MIT"
 
 from . import PlotAction
-from silx.math.histogram import Histogramnd
-from silx.math.combo import min_max
+from silx.math.histogram import histogram1d
 import numpy
 import logging
 from silx.gui import qt
@@ -108,22 +107,9 @@ class PixelIntensitiesHistoAction(PlotAction):
                          image[:, :, 1] * 0.587 +
                          image[:, :, 2] * 0.114)
 
-            xmin, xmax = min_max(image, min_positive=False, finite=True)
-            nbins = min(1024, int(numpy.sqrt(image.size)))
-            data_range = xmin, xmax
-
-            # bad hack: get 256 bins in the case we have a B&W
-            if numpy.issubdtype(image.dtype, numpy.integer):
-                if nbins > xmax - xmin:
-                    nbins = xmax - xmin
-
-            nbins = max(2, nbins)
-
-            data = image.ravel().astype(numpy.float32)
-            histogram = Histogramnd(data, n_bins=nbins, histo_range=data_range)
-            assert len(histogram.edges) == 1
-            self._histo = histogram.histo
-            edges = histogram.edges[0]
+            nbins = max(2, min(1024, int(numpy.sqrt(image.size))))
+            # Integer data gets one bin per value if its range is narrow
+            self._histo, edges = histogram1d(image, n_bins=nbins)
             plot = self.getHistogramPlotWidget()
             plot.addHistogram(histogram=self._histo,
                               edges=edges,
@@ -33,13 +33,16 @@ __date__ = "24/04/2018"
 
 import logging
 import time
+import weakref
 import numpy
 
 from silx.math.combo import min_max
 from silx.math.marchingcubes import MarchingCubes
+from silx.third_party import concurrent_futures
 
 from ... import qt
 from ...colors import rgba
+from ...utils.concurrent import submitToQtMainThread
 
 from ..scene import cutplane, primitives, transform
 
@@ -50,6 +53,37 @@ from .mixins import ColormapMixIn, InterpolationMixIn, PlaneMixIn
 _logger = logging.getLogger(__name__)
 
 
+_executor = None
+"""Executor computing full resolution iso-surfaces in a background thread"""
+
+
+def _getExecutor():
+    """Returns the executor used to compute iso-surfaces (lazy-loading)
+
+    :rtype: concurrent.futures.ThreadPoolExecutor
+    """
+    global _executor
+    if _executor is None:
+        _executor = concurrent_futures.ThreadPoolExecutor(max_workers=1)
+    return _executor
+
+
+def _computeIsosurface(data, level):
+    """Compute an iso-surface, using multiple threads.
+
+    :param numpy.ndarray data: The 3D data set
+    :param float level: The value at which to build the iso-surface
+    :return: vertices, normals, indices
+    """
+    st = time.time()
+    marchingCubes = MarchingCubes(isolevel=level)
+    marchingCubes.process_slabs(data)
+    _logger.info('Computed iso-surface in %f s.', time.time() - st)
+    return (marchingCubes.get_vertices(),
+            marchingCubes.get_normals(),
+            marchingCubes.get_indices())
+
+
 class CutPlane(Item3D, ColormapMixIn, InterpolationMixIn, PlaneMixIn):
     """Class representing a cutting plane in a :class:`ScalarField3D` item.
 
@@ -117,15 +151,28 @@ class CutPlane(Item3D, ColormapMixIn, InterpolationMixIn, PlaneMixIn):
 class Isosurface(Item3D):
     """Class representing an iso-surface in a :class:`ScalarField3D` item.
 
+    For large data sets, a coarse iso-surface is computed from a sub-sampling
+    of the data and displayed immediately, while the full resolution
+    iso-surface is computed in a background thread and displayed once
+    available.
+
     :param parent: The DataItem3D this iso-surface belongs to
     """
 
+    _SYNC_MAX_SIZE = 128 ** 3
+    """Largest data size for which the iso-surface is computed synchronously"""
+
+    _PREVIEW_SIZE = 64 ** 3
+    """Size of the sub-sampled data used to compute the coarse iso-surface"""
+
     def __init__(self, parent):
         Item3D.__init__(self, parent=parent)
         self._level = float('nan')
         self._autoLevelFunction = None
         self._color = rgba('#FFD700FF')
         self._data = None
+        self._computeId = 0
+        self._future = None
 
     # TODO register to ScalarField3D signal instead?
     def _setData(self, data, copy=True):
@@ -199,8 +246,54 @@ class Isosurface(Item3D):
                 primitive.children[0].setAttribute('color', self._color)
             self._updated(ItemChangedType.COLOR)
 
+    def _cancelComputation(self):
+        """Cancel the pending computation of the iso-surface, if any.
+
+        If the computation has already started, its result is discarded.
+        """
+        self._computeId += 1
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def _setMesh(self, vertices, normals, indices):
+        """Set the mesh displaying the iso-surface
+
+        :param numpy.ndarray vertices: Vertices of the iso-surface
+        :param numpy.ndarray normals: Normals at the vertices
+        :param numpy.ndarray indices: Triangle indices
+        """
+        if len(vertices) == 0:
+            self._getScenePrimitive().children = []
+        else:
+            mesh = primitives.Mesh3D(vertices,
+                                     colors=self._color,
+                                     normals=normals,
+                                     mode='triangles',
+                                     indices=indices)
+            self._getScenePrimitive().children = [mesh]
+
+    def _computationDone(self, computeId, future):
+        """Handle the end of the computation of the full resolution mesh.
+
+        Called in the main thread.
+
+        :param int computeId: The identifier of the computation
+        :param concurrent.futures.Future future: The finished computation
+        """
+        if computeId != self._computeId:
+            return  # Stale computation
+        self._future = None
+        try:
+            vertices, normals, indices = future.result()
+        except Exception:
+            _logger.error("Error while computing iso-surface", exc_info=True)
+            return
+        self._setMesh(vertices, normals, indices)
+
     def _updateScenePrimitive(self):
         """Update underlying mesh"""
+        self._cancelComputation()
         self._getScenePrimitive().children = []
 
         if self._data is None:
@@ -234,21 +327,43 @@ class Isosurface(Item3D):
             if not numpy.isfinite(self._level):
                 return
 
+            if self._data.size <= self._SYNC_MAX_SIZE:
+                st = time.time()
+                vertices, normals, indices = MarchingCubes(
+                    self._data,
+                    isolevel=self._level)
+                _logger.info('Computed iso-surface in %f s.', time.time() - st)
+                self._setMesh(vertices, normals, indices)
+                return
+
+            # Display a coarse iso-surface computed from sub-sampled data
+            step = int(numpy.ceil(
+                (self._data.size / self._PREVIEW_SIZE) ** (1. / 3.)))
+            step = min(step, min(self._data.shape) - 1)
             st = time.time()
             vertices, normals, indices = MarchingCubes(
                 self._data,
-                isolevel=self._level)
-            _logger.info('Computed iso-surface in %f s.', time.time() - st)
+                isolevel=self._level,
+                sampling=(step, step, step))
+            _logger.info('Computed coarse iso-surface in %f s.',
+                         time.time() - st)
+            self._setMesh(vertices, normals, indices)
 
-            if len(vertices) == 0:
-                return
-            else:
-                mesh = primitives.Mesh3D(vertices,
-                                         colors=self._color,
-                                         normals=normals,
-                                         mode='triangles',
-                                         indices=indices)
-                self._getScenePrimitive().children = [mesh]
+            # Compute full resolution iso-surface in background
+            computeId = self._computeId
+            selfRef = weakref.ref(self)
+
+            def computationDone(future):
+                if future.cancelled():
+                    return
+                isosurface = selfRef()
+                if isosurface is not None:
+                    submitToQtMainThread(
+                        isosurface._computationDone, computeId, future)
+
+            self._future = _getExecutor().submit(
+                _computeIsosurface, self._data, self._level)
+            self._future.add_done_callback(computationDone)
 
 
 class ScalarField3D(DataItem3D):
@@ -427,6 +542,7 @@ class ScalarField3D(DataItem3D):
                 str(isosurface))
         else:
             isosurface.sigItemChanged.disconnect(self._isosurfaceItemChanged)
+            isosurface._cancelComputation()
             self._isosurfaces.remove(isosurface)
             self._updateIsosurfaces()
             self.sigIsosurfaceRemoved.emit(isosurface)
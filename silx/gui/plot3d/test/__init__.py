@@ -57,10 +57,12 @@ def suite():
 
     from ..scene import test as test_scene
     from .testGL import suite as testGLSuite
+    from .testIsosurface import suite as testIsosurfaceSuite
     from .testScalarFieldView import suite as testScalarFieldViewSuite
 
     test_suite = unittest.TestSuite()
     test_suite.addTest(testGLSuite())
     test_suite.addTest(test_scene.suite())
     test_suite.addTest(testScalarFieldViewSuite())
+    test_suite.addTest(testIsosurfaceSuite())
     return test_suite
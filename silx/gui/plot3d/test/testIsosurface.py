@@ -0,0 +1,157 @@
+# coding: utf-8
+# /*##########################################################################
+#
+# Copyright (c) 2018 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+# ###########################################################################*/
+"""Test Isosurface item background computation"""
+
+__authors__ = ["T. Vincent"]
+__license__ = "MIT"
+__date__ = "18/10/2018"
+
+
+import time
+import unittest
+
+import numpy
+
+from silx.gui.test.utils import TestCaseQt
+from silx.math.marchingcubes import MarchingCubes
+
+from silx.gui.plot3d.items import volume
+
+
+class TestIsosurface(TestCaseQt):
+    """Tests of the coarse then full resolution Isosurface computation"""
+
+    def setUp(self):
+        super(TestIsosurface, self).setUp()
+        # Use small sizes to trigger the background computation
+        self._sizes = (volume.Isosurface._SYNC_MAX_SIZE,
+                       volume.Isosurface._PREVIEW_SIZE)
+        volume.Isosurface._SYNC_MAX_SIZE = 16 ** 3
+        volume.Isosurface._PREVIEW_SIZE = 8 ** 3
+
+        coords = numpy.linspace(-1., 1., 40)
+        z = coords.reshape(-1, 1, 1)
+        y = coords.reshape(1, -1, 1)
+        x = coords.reshape(1, 1, -1)
+        self.data = numpy.array(x ** 2 + y ** 2 + z ** 2, dtype=numpy.float32)
+
+        self.item = volume.ScalarField3D()
+        self.item.setData(self.data)
+
+    def tearDown(self):
+        self.item.clearIsosurfaces()
+        self._waitExecutor()
+        del self.item
+        (volume.Isosurface._SYNC_MAX_SIZE,
+         volume.Isosurface._PREVIEW_SIZE) = self._sizes
+        super(TestIsosurface, self).tearDown()
+
+    def _waitExecutor(self):
+        """Wait for the background computations to finish and be handled"""
+        volume._getExecutor().submit(lambda: None).result()
+        self.qWait(50)
+
+    def _waitComputation(self, isosurface, timeout=10.):
+        """Wait for the full resolution iso-surface to be displayed"""
+        start = time.time()
+        while isosurface._future is not None:
+            if time.time() - start > timeout:
+                self.fail("Iso-surface computation timed out")
+            self.qWait(10)
+
+    @staticmethod
+    def _getVertices(isosurface):
+        """Returns the vertices displayed by the iso-surface"""
+        children = isosurface._getScenePrimitive().children
+        if len(children) == 0:
+            return numpy.zeros((0, 3), dtype=numpy.float32)
+        return children[0].getAttribute('position')
+
+    def _getFullResolutionVertices(self, level):
+        """Returns the vertices of the full resolution iso-surface"""
+        vertices, normals, indices = MarchingCubes(self.data, isolevel=level)
+        return vertices
+
+    def testCoarseThenFullResolution(self):
+        """Test the coarse iso-surface is replaced by the full resolution one"""
+        isosurface = self.item.addIsosurface(0.5, 'red')
+        coarse = self._getVertices(isosurface)
+        full = self._getFullResolutionVertices(0.5)
+        self.assertGreater(len(coarse), 0)
+        self.assertLess(len(coarse), len(full))
+
+        self._waitComputation(isosurface)
+        self.assertTrue(numpy.array_equal(self._getVertices(isosurface), full))
+
+    def testLevelChanged(self):
+        """Test stale computations are discarded when the level changes"""
+        isosurface = self.item.addIsosurface(0.5, 'red')
+        isosurface.setLevel(0.8)
+        self._waitComputation(isosurface)
+        self._waitExecutor()
+        self.assertTrue(numpy.array_equal(
+            self._getVertices(isosurface),
+            self._getFullResolutionVertices(0.8)))
+
+    def testDataChanged(self):
+        """Test stale computations are discarded when the data changes"""
+        isosurface = self.item.addIsosurface(0.5, 'red')
+        self.data = numpy.array(self.data[::-1, 5:], copy=True)
+        self.item.setData(self.data)
+        self._waitComputation(isosurface)
+        self._waitExecutor()
+        self.assertTrue(numpy.array_equal(
+            self._getVertices(isosurface),
+            self._getFullResolutionVertices(0.5)))
+
+    def testRemoved(self):
+        """Test computation result is discarded when removed"""
+        isosurface = self.item.addIsosurface(0.5, 'red')
+        coarse = self._getVertices(isosurface)
+        self.item.removeIsosurface(isosurface)
+        self.assertIsNone(isosurface._future)
+        self._waitExecutor()
+        self.assertTrue(numpy.array_equal(self._getVertices(isosurface),
+                                          coarse))
+
+    def testSmallData(self):
+        """Test iso-surface of small data is computed synchronously"""
+        self.data = self.data[:10, :10, :10]
+        self.item.setData(self.data)
+        isosurface = self.item.addIsosurface(0.5, 'red')
+        self.assertIsNone(isosurface._future)
+        self.assertTrue(numpy.array_equal(
+            self._getVertices(isosurface),
+            self._getFullResolutionVertices(0.5)))
+
+
+def suite():
+    test_suite = unittest.TestSuite()
+    loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
+    test_suite.addTest(loadTests(TestIsosurface))
+    return test_suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
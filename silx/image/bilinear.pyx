@@ -29,6 +29,7 @@ __date__ = "15/09/2016"
 __doc__ = "Bilinear interpolator, peak finder, line-profile for images"
 
 import cython
+from cython.parallel import prange
 from cython.view cimport array as cvarray
 import numpy
 from libc.math cimport floor, ceil, sin, cos, sqrt, atan2
@@ -47,6 +48,9 @@ cdef class BilinearImage:
     cpdef size_t coarse_local_maxi(self, size_t)
     cdef size_t c_local_maxi(self, size_t) nogil
     cdef float c_funct(self, float, float) nogil
+    cdef int c_profile_length(self, float, float, float, float) nogil
+    cdef void c_profile(self, float, float, float, float, int, bint,
+                        float *) nogil
 
     def __cinit__(self, data not None):
         """Constructor
@@ -254,19 +258,108 @@ cdef class BilinearImage:
         :return: array of values at given coordinates
         """
         cdef:
-            float[:] d0, d1, res
-            size_t size, i
+            float[::1] d0, d1, res
+            Py_ssize_t size, i
         shape = coordinates[0].shape
         size = coordinates[0].size
         d0 = numpy.ascontiguousarray(coordinates[0].ravel(), dtype=numpy.float32)
         d1 = numpy.ascontiguousarray(coordinates[1].ravel(), dtype=numpy.float32)
         assert size == d1.size
         res = numpy.empty(size, dtype=numpy.float32)
-        with nogil:
-            for i in range(size):
-                res[i] = self.c_funct(d1[i], d0[i])
+        for i in prange(size, nogil=True, schedule='static'):
+            res[i] = self.c_funct(d1[i], d0[i])
         return numpy.asarray(res).reshape(shape)
 
+    @cython.cdivision(True)
+    cdef int c_profile_length(self,
+                              float src_row, float src_col,
+                              float dst_row, float dst_col) nogil:
+        """Returns the number of points of the profile along a scan line.
+
+        :param float src_row: Row of the start point
+        :param float src_col: Column of the start point
+        :param float dst_row: Row of the end point
+        :param float dst_col: Column of the end point
+        :return: Length of the profile
+
+        Cython only function due to NOGIL
+        """
+        cdef:
+            float d_row, d_col, length
+        if (src_row == dst_row) and (src_col == dst_col):
+            return 1
+        d_row = dst_row - src_row
+        d_col = dst_col - src_col
+        length = sqrt(d_row * d_row + d_col * d_col)
+        return <int> ceil(length + 1)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cdef void c_profile(self,
+                        float src_row, float src_col,
+                        float dst_row, float dst_col,
+                        int linewidth, bint compute_mean,
+                        float *result) nogil:
+        """Compute the intensity profile of the image along a scan line.
+
+        :param float src_row: Row of the start point
+        :param float src_col: Column of the start point
+        :param float dst_row: Row of the end point
+        :param float dst_col: Column of the end point
+        :param int linewidth: Width of the scanline (unit image pixel).
+        :param bool compute_mean: True for mean, False for sum
+        :param result: Buffer where to store the profile,
+            of size :meth:`c_profile_length`
+
+        Cython only function due to NOGIL
+        """
+        cdef:
+            float d_row, d_col
+            float length, col_width, row_width, sum, row, col, new_row, new_col
+            int lengt, i, j, cnt
+
+        if (src_row == dst_row) and (src_col == dst_col):
+            result[0] = self.c_funct(src_col, src_row)
+            return
+
+        d_row = dst_row - src_row
+        d_col = dst_col - src_col
+
+        # Offsets to deal with linewidth
+        length = sqrt(d_row * d_row + d_col * d_col)
+        row_width = d_col / length
+        col_width = - d_row / length
+
+        lengt = <int> ceil(length + 1)
+        d_row /= <float> (lengt -1)
+        d_col /= <float> (lengt -1)
+
+        # Offset position to the center of the bottom pixels of the profile
+        src_row -= row_width * (linewidth - 1) / 2.
+        src_col -= col_width * (linewidth - 1) / 2.
+
+        for i in range(lengt):
+            sum = 0
+            cnt = 0
+            result[i] = 0
+
+            row = src_row + i * d_row
+            col = src_col + i * d_col
+
+            for j in range(linewidth):
+                new_row = row + j * row_width
+                new_col = col + j * col_width
+                if ((new_col >= 0) and (new_col < self.width) and
+                        (new_row >= 0) and (new_row < self.height)):
+                    cnt = cnt + 1
+                    sum = sum + self.c_funct(new_col, new_row)
+            if cnt:
+                if compute_mean:
+                    result[i] = sum / cnt
+                else:
+                    result[i] = sum
+
     @cython.boundscheck(False)
     def profile_line(self, src, dst, int linewidth=1, method='mean'):
         """Return the mean or sum of intensity profile of an image measured
@@ -289,54 +382,76 @@ cdef class BilinearImage:
         Inspired from skimage
         """
         cdef:
-            float src_row, src_col, dst_row, dst_col, d_row, d_col
-            float length, col_width, row_width, sum, row, col, new_row, new_col
-            int lengt, i, j, cnt
+            float src_row, src_col, dst_row, dst_col
             float[::1] result
         src_row, src_col = src
         dst_row, dst_col = dst
         if (src_row == dst_row) and (src_col == dst_col):
             logger.warning("Source and destination points are the same")
-            return numpy.array([self.c_funct(src_col, src_row)])
-        d_row = dst_row - src_row
-        d_col = dst_col - src_col
-
-        # Offsets to deal with linewidth
-        length = sqrt(d_row * d_row + d_col * d_col)
-        row_width = d_col / length
-        col_width = - d_row / length
 
-        lengt = <int> ceil(length + 1)
-        d_row /= <float> (lengt -1)
-        d_col /= <float> (lengt -1)
-
-        result = numpy.zeros(lengt, dtype=numpy.float32)
-
-        # Offset position to the center of the bottom pixels of the profile
-        src_row -= row_width * (linewidth - 1) / 2.
-        src_col -= col_width * (linewidth - 1) / 2.
-
-        compute_mean = (method == 'mean')
-        with nogil:
-            for i in range(lengt):
-                sum = 0
-                cnt = 0
-
-                row = src_row + i * d_row
-                col = src_col + i * d_col
-
-                for j in range(linewidth):
-                    new_row = row + j * row_width
-                    new_col = col + j * col_width
-                    if ((new_col >= 0) and (new_col < self.width) and
-                            (new_row >= 0) and (new_row < self.height)):
-                        cnt = cnt + 1
-                        sum = sum + self.c_funct(new_col, new_row)
-                if cnt:
-                    if compute_mean is True:
-                        result[i] += sum / cnt
-                    else:
-                        result[i] += sum
+        result = numpy.zeros(
+            self.c_profile_length(src_row, src_col, dst_row, dst_col),
+            dtype=numpy.float32)
+        self.c_profile(src_row, src_col, dst_row, dst_col,
+                       linewidth, method == 'mean', &result[0])
 
         # Ensures the result is exported as numpy array and not memory view.
         return numpy.asarray(result)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def profile_lines(self, src, dst, linewidth=1, method='mean'):
+        """Return the mean or sum of intensity profiles of an image measured
+        along many scan lines.
+
+        Profiles are computed in parallel and are returned concatenated in
+        a single array, the profile of the i-th scan line being
+        ``values[offsets[i]:offsets[i+1]]``.
+        Each profile is the same as the one returned by :meth:`profile_line`.
+
+        :param src: The start points of the scan lines.
+        :type src: 2D array-like of shape (N, 2) of (row, column)
+        :param dst: The end points of the scan lines.
+        :type dst: 2D array-like of shape (N, 2) of (row, column)
+        :param linewidth: Width of the scanlines (unit image pixel),
+            either a single value or one per scan line.
+        :type linewidth: int or 1D array-like of int
+        :param str method: 'mean' or 'sum' depending if we want to compute the
+            mean intensity along the lines or the sum.
+        :return: (values, offsets): The concatenated profiles and
+            the N+1 start offsets of each profile in values.
+        :rtype: 2-tuple of 1d array
+        """
+        cdef:
+            float[:, ::1] c_src, c_dst
+            int[::1] c_linewidth
+            float[::1] values
+            Py_ssize_t[::1] offsets
+            Py_ssize_t nlines, index
+            bint compute_mean = (method == 'mean')
+
+        c_src = numpy.ascontiguousarray(src, dtype=numpy.float32).reshape(-1, 2)
+        c_dst = numpy.ascontiguousarray(dst, dtype=numpy.float32).reshape(-1, 2)
+        nlines = c_src.shape[0]
+        if c_dst.shape[0] != nlines:
+            raise ValueError("src and dst must have the same number of points")
+        linewidths = numpy.empty(nlines, dtype=numpy.intc)
+        linewidths[:] = linewidth
+        c_linewidth = linewidths
+
+        offsets = numpy.zeros(nlines + 1, dtype=numpy.intp)
+        with nogil:
+            for index in range(nlines):
+                offsets[index + 1] = offsets[index] + self.c_profile_length(
+                    c_src[index, 0], c_src[index, 1],
+                    c_dst[index, 0], c_dst[index, 1])
+
+        values = numpy.empty(offsets[nlines], dtype=numpy.float32)
+        if nlines > 0 and offsets[nlines] > 0:
+            for index in prange(nlines, nogil=True, schedule='dynamic'):
+                self.c_profile(c_src[index, 0], c_src[index, 1],
+                               c_dst[index, 0], c_dst[index, 1],
+                               c_linewidth[index], compute_mean,
+                               &values[offsets[index]])
+
+        return numpy.asarray(values), numpy.asarray(offsets)
@@ -28,6 +28,8 @@ The main implementation is done by :class:`MarchingSquaresMergeImpl`. It was
 designed to speed up the computation of iso surface using Cython and OpenMP.
 It also provides features like support of mask, and cache of min/max per tiles
 which is very efficient to find many iso contours from image gradient.
+Many levels can also be processed at once using
+:meth:`MarchingSquaresMergeImpl.find_contours_multiple`.
 
 Utilitary functions are provided as facade for simple use.
 :meth:`find_contours` to find iso contours from an image and using the same
@@ -58,6 +58,9 @@ from libc.float cimport DBL_MAX
 cdef double INFINITY = DBL_MAX + DBL_MAX
 # from libc.math cimport INFINITY
 
+cdef int MINMAX_BLOCK_SIZE = 32
+"""Size of the blocks of the finest level of the min/max cache"""
+
 cdef extern from "include/patterns.h":
     cdef unsigned char EDGE_TO_POINT[][2]
     cdef unsigned char CELL_TO_EDGE[][5]
@@ -127,9 +130,16 @@ cdef class _MarchingSquaresAlgorithm(object):
     cdef cnumpy.float32_t *_min_cache
     cdef cnumpy.float32_t *_max_cache
 
+    cdef int _block_size
+    cdef int _block_dim_x
+    cdef cnumpy.float32_t *_block_min_cache
+    cdef cnumpy.float32_t *_block_max_cache
+
     def __cinit__(self):
         self._use_minmax_cache = False
         self._force_sequencial_reduction = False
+        self._block_min_cache = NULL
+        self._block_max_cache = NULL
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
@@ -140,52 +150,100 @@ cdef class _MarchingSquaresAlgorithm(object):
 
         :param level: The level expected.
         """
+        self.marching_squares_levels(&level, 1, &self._final_context)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cdef void marching_squares_levels(self,
+                                      cnumpy.float64_t *levels,
+                                      int nb_levels,
+                                      TileContext **final_contexts) nogil:
+        """
+        Execute the marching squares for many levels at once.
+
+        The tiles of all the levels are processed together by the OpenMP
+        threads, then the tiles of each level are reduced.
+
+        :param levels: The levels expected.
+        :param nb_levels: Number of levels
+        :param final_contexts: Array of `nb_levels` contexts receiving the
+            result of each level.
+        """
         cdef:
             TileContext** contexts
             TileContext** valid_contexts
-            int nb_contexts, nb_valid_contexts
-            int i, j
-            TileContext* context
+            cnumpy.float64_t *valid_levels
+            int context_size, nb_valid_contexts
+            int i, j, ilevel
             int dim_x, dim_y
 
-        contexts = self.create_contexts(level, &dim_x, &dim_y, &nb_valid_contexts)
-        nb_contexts = dim_x * dim_y
+        dim_x = self._dim_x // self._group_size + (self._dim_x % self._group_size > 0)
+        dim_y = self._dim_y // self._group_size + (self._dim_y % self._group_size > 0)
+        context_size = dim_x * dim_y
+        contexts = <TileContext **>libc.stdlib.malloc(nb_levels * context_size * sizeof(TileContext*))
+        libc.string.memset(contexts, 0, nb_levels * context_size * sizeof(TileContext*))
 
-        if nb_valid_contexts == 0:
-            # shortcut
-            self._final_context = new TileContext()
-            libc.stdlib.free(contexts)
-            return
+        nb_valid_contexts = 0
+        for ilevel in range(nb_levels):
+            nb_valid_contexts += self.create_contexts(levels[ilevel], contexts + ilevel * context_size)
 
+        valid_contexts = <TileContext **>libc.stdlib.malloc((nb_valid_contexts + 1) * sizeof(TileContext*))
+        valid_levels = <cnumpy.float64_t *>libc.stdlib.malloc((nb_valid_contexts + 1) * sizeof(cnumpy.float64_t))
         j = 0
-        valid_contexts = <TileContext **>libc.stdlib.malloc(nb_valid_contexts * sizeof(TileContext*))
-        for i in xrange(nb_contexts):
+        for i in range(nb_levels * context_size):
             if contexts[i] != NULL:
                 valid_contexts[j] = contexts[i]
+                valid_levels[j] = levels[i // context_size]
                 j += 1
 
         # openmp
-        for i in prange(nb_valid_contexts, nogil=True):
-            self.marching_squares_mp(valid_contexts[i], level)
+        for i in prange(nb_valid_contexts, nogil=True, schedule='dynamic'):
+            self.marching_squares_mp(valid_contexts[i], valid_levels[i])
 
-        if nb_valid_contexts == 1:
-            # shortcut
-            self._final_context = valid_contexts[0]
-            libc.stdlib.free(valid_contexts)
-            libc.stdlib.free(contexts)
-            return
+        for ilevel in range(nb_levels):
+            self.reduction(dim_x, dim_y, contexts + ilevel * context_size)
+            final_contexts[ilevel] = self._final_context
 
-        if self._force_sequencial_reduction:
-            self.sequencial_reduction(nb_valid_contexts, valid_contexts)
+        libc.stdlib.free(valid_levels)
+        libc.stdlib.free(valid_contexts)
+        libc.stdlib.free(contexts)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cdef void reduction(self, int dim_x, int dim_y, TileContext **contexts) nogil:
+        """
+        Reduce the contexts of a level into a single final context.
+
+        :param dim_x: Number of contexts in the x dimension
+        :param dim_y: Number of contexts in the y dimension
+        :param contexts: Array of contexts, containing `NULL` for skipped tiles
+        """
+        cdef:
+            int i
+            int nb_valid_contexts = 0
+            TileContext* context = NULL
+
+        for i in range(dim_x * dim_y):
+            if contexts[i] != NULL:
+                context = contexts[i]
+                nb_valid_contexts += 1
+
+        if nb_valid_contexts == 0:
+            # shortcut
+            self._final_context = new TileContext()
+        elif nb_valid_contexts == 1:
+            # shortcut
+            self._final_context = context
+        elif self._force_sequencial_reduction:
+            self.sequencial_reduction(dim_x * dim_y, contexts)
         # FIXME can only be used if compiled with openmp
         # elif copenmp.omp_get_num_threads() <= 1:
         #     self._sequencial_reduction(nb_valid_contexts, valid_contexts)
         else:
             self.reduction_2d(dim_x, dim_y, contexts)
 
-        libc.stdlib.free(valid_contexts)
-        libc.stdlib.free(contexts)
-
     @cython.boundscheck(False)
     @cython.wraparound(False)
     @cython.cdivision(True)
@@ -291,74 +349,112 @@ cdef class _MarchingSquaresAlgorithm(object):
         """
         Main entry of the marching squares algorithm for each threads.
 
+        If the minmax cache is used, blocks of the tile with a minmax range
+        excluding the level are skipped.
+
         :param context: Context used by the thread to store data
         :param level: The requested level
         """
         cdef:
-            int x, y, pattern
+            int x, y, next_x, end_x
+            int block_index
+            bool use_blocks
+
+        use_blocks = self._use_minmax_cache and self._block_min_cache != NULL
+        end_x = context.pos_x + context.dim_x
+        for y in range(context.pos_y, context.pos_y + context.dim_y):
+            if not use_blocks:
+                self.marching_squares_row(context, context.pos_x, end_x, y, level)
+                continue
+            x = context.pos_x
+            while x < end_x:
+                block_index = (y // self._block_size) * self._block_dim_x + x // self._block_size
+                next_x = (x // self._block_size + 1) * self._block_size
+                if next_x > end_x:
+                    next_x = end_x
+                if (level >= self._block_min_cache[block_index] and
+                        level <= self._block_max_cache[block_index]):
+                    self.marching_squares_row(context, x, next_x, y, level)
+                x = next_x
+
+        self.after_marching_squares(context)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cdef void marching_squares_row(self,
+                                   TileContext *context,
+                                   int start_x,
+                                   int end_x,
+                                   int y,
+                                   cnumpy.float64_t level) nogil:
+        """
+        Process a range of cells from a row of the image.
+
+        :param context: Context used by the thread to store data
+        :param start_x: First cell to process
+        :param end_x: Cell after the last one to process
+        :param y: Row of the cells
+        :param level: The requested level
+        """
+        cdef:
+            int x, pattern
             cnumpy.float64_t tmpf
             cnumpy.float32_t *image_ptr
             cnumpy.int8_t *mask_ptr
 
-        image_ptr = self._image_ptr + (context.pos_y * self._dim_x + context.pos_x)
+        image_ptr = self._image_ptr + (y * self._dim_x + start_x)
         if self._mask_ptr != NULL:
-            mask_ptr = self._mask_ptr + (context.pos_y * self._dim_x + context.pos_x)
+            mask_ptr = self._mask_ptr + (y * self._dim_x + start_x)
         else:
             mask_ptr = NULL
 
-        for y in range(context.pos_y, context.pos_y + context.dim_y):
-            for x in range(context.pos_x, context.pos_x + context.dim_x):
-                # Calculate index.
-                pattern = 0
-                if image_ptr[0] > level:
-                    pattern += 1
-                if image_ptr[1] > level:
-                    pattern += 2
-                if image_ptr[self._dim_x] > level:
-                    pattern += 8
-                if image_ptr[self._dim_x + 1] > level:
-                    pattern += 4
-
-                # Resolve ambiguity
-                if pattern == 5 or pattern == 10:
-                    # Calculate value of cell center (i.e. average of corners)
-                    tmpf = 0.25 * (image_ptr[0] +
-                                   image_ptr[1] +
-                                   image_ptr[self._dim_x] +
-                                   image_ptr[self._dim_x + 1])
-                    # If below level, swap
-                    if tmpf <= level:
-                        if pattern == 5:
-                            pattern = 10
-                        else:
-                            pattern = 5
-
-                # Cache mask information
-                if mask_ptr != NULL:
-                    # Note: Store the mask in the index. It could be usefull to
-                    #     generate accurate segments in some cases, but yet it
-                    #     is not used
-                    if mask_ptr[0] > 0:
-                        pattern += 16
-                    if mask_ptr[1] > 0:
-                        pattern += 32
-                    if mask_ptr[self._dim_x] > 0:
-                        pattern += 128
-                    if mask_ptr[self._dim_x + 1] > 0:
-                        pattern += 64
-                    mask_ptr += 1
+        for x in range(start_x, end_x):
+            # Calculate index.
+            pattern = 0
+            if image_ptr[0] > level:
+                pattern += 1
+            if image_ptr[1] > level:
+                pattern += 2
+            if image_ptr[self._dim_x] > level:
+                pattern += 8
+            if image_ptr[self._dim_x + 1] > level:
+                pattern += 4
+
+            # Resolve ambiguity
+            if pattern == 5 or pattern == 10:
+                # Calculate value of cell center (i.e. average of corners)
+                tmpf = 0.25 * (image_ptr[0] +
+                               image_ptr[1] +
+                               image_ptr[self._dim_x] +
+                               image_ptr[self._dim_x + 1])
+                # If below level, swap
+                if tmpf <= level:
+                    if pattern == 5:
+                        pattern = 10
+                    else:
+                        pattern = 5
 
-                if pattern < 16 and pattern != 0 and pattern != 15:
-                    self.insert_pattern(context, x, y, pattern, level)
+            # Cache mask information
+            if mask_ptr != NULL:
+                # Note: Store the mask in the index. It could be usefull to
+                #     generate accurate segments in some cases, but yet it
+                #     is not used
+                if mask_ptr[0] > 0:
+                    pattern += 16
+                if mask_ptr[1] > 0:
+                    pattern += 32
+                if mask_ptr[self._dim_x] > 0:
+                    pattern += 128
+                if mask_ptr[self._dim_x + 1] > 0:
+                    pattern += 64
+                mask_ptr += 1
 
-                image_ptr += 1
+            if pattern < 16 and pattern != 0 and pattern != 15:
+                self.insert_pattern(context, x, y, pattern, level)
 
-            # There is a missing pixel at the end of each rows
-            image_ptr += self._dim_x - context.dim_x
-            if mask_ptr != NULL:
-                mask_ptr += self._dim_x - context.dim_x
+            image_ptr += 1
 
-        self.after_marching_squares(context)
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
@@ -410,11 +506,9 @@ cdef class _MarchingSquaresAlgorithm(object):
     @cython.boundscheck(False)
     @cython.wraparound(False)
     @cython.cdivision(True)
-    cdef TileContext** create_contexts(self,
-                                       cnumpy.float64_t level,
-                                       int* dim_x,
-                                       int* dim_y,
-                                       int* nb_valid_contexts) nogil:
+    cdef int create_contexts(self,
+                             cnumpy.float64_t level,
+                             TileContext** contexts) nogil:
         """
         Create and initialize a 2d-array of contexts.
 
@@ -423,49 +517,35 @@ cdef class _MarchingSquaresAlgorithm(object):
         will have a `NULL` reference in the context array.
 
         :param level: The requested level
-        :param dim_x: Resulting X dimension of context array
-        :param dim_x: Resulting Y dimension of context array
-        :param nb_valid_contexts: Resulting number of created contexts
-        :return: The context array
+        :param contexts: The context array to fill, initialized with `NULL`
+        :return: Number of created contexts
         """
         cdef:
-            int context_dim_x, context_dim_y
-            int context_size, valid_contexts
+            int context_dim_x
+            int valid_contexts
             int x, y
             int icontext
             TileContext* context
-            TileContext** contexts
 
         context_dim_x = self._dim_x // self._group_size + (self._dim_x % self._group_size > 0)
-        context_dim_y = self._dim_y // self._group_size + (self._dim_y % self._group_size > 0)
-        context_size = context_dim_x * context_dim_y
-        contexts = <TileContext **>libc.stdlib.malloc(context_size * sizeof(TileContext*))
-        libc.string.memset(contexts, 0, context_size * sizeof(TileContext*))
-
         valid_contexts = 0
-        icontext = 0
         y = 0
         while y < self._dim_y - 1:
             x = 0
             while x < self._dim_x - 1:
+                icontext = (y // self._group_size) * context_dim_x + x // self._group_size
                 if self._use_minmax_cache:
                     if level < self._min_cache[icontext] or level > self._max_cache[icontext]:
-                        icontext += 1
                         x += self._group_size
                         continue
                 context = self.create_context(x, y, self._group_size, self._group_size)
-                contexts[icontext] = context
-                icontext += 1
-                valid_contexts += 1
+                if context != NULL:
+                    contexts[icontext] = context
+                    valid_contexts += 1
                 x += self._group_size
             y += self._group_size
 
-        # dereference is not working here... then we uses array index but
-        # it is not the proper way
-        dim_x[0] = context_dim_x
-        dim_y[0] = context_dim_y
-        nb_valid_contexts[0] = valid_contexts
-        return contexts
+        return valid_contexts
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
@@ -1092,6 +1172,15 @@ cdef class MarchingSquaresMergeImpl(object):
         for level in levels:
             polygons = ms.find_contours(level=level)
 
+    .. code-block:: python
+
+        # Many levels processed at once, sharing the min/max cache
+        shape = 1000, 1000
+        image = numpy.random.random(shape)
+        ms = MarchingSquaresMergeImpl(image)
+        levels = numpy.arange(0, 1, 0.05)
+        polygons_per_level = ms.find_contours_multiple(levels)
+
     :param numpy.ndarray image: Image to process.
         If the image is not a continuous array of native float 32bits, the data
         will be first normalized. This can reduce efficiency.
@@ -1101,7 +1190,8 @@ cdef class MarchingSquaresMergeImpl(object):
         data will be first normalized. This can reduce efficiency.
     :param int group_size: Specify the size of the tile to split the
         computation with OpenMP. It is also used as tile size to compute the
-        min/max cache
+        min/max cache. If it is a multiple of 32, the min/max cache is also
+        computed on blocks of 32x32 pixels to skip parts of the tiles.
     :param bool use_minmax_cache: If true the min/max cache is enabled.
     """
 
@@ -1118,6 +1208,11 @@ cdef class MarchingSquaresMergeImpl(object):
     cdef cnumpy.float32_t *_min_cache
     cdef cnumpy.float32_t *_max_cache
 
+    cdef int _block_size
+    cdef int _block_dim_x
+    cdef cnumpy.float32_t *_block_min_cache
+    cdef cnumpy.float32_t *_block_max_cache
+
     cdef _MarchingSquaresContours _contours_algo
     cdef _MarchingSquaresPixels _pixels_algo
 
@@ -1147,6 +1242,8 @@ cdef class MarchingSquaresMergeImpl(object):
         self._use_minmax_cache = use_minmax_cache
         self._min_cache = NULL
         self._max_cache = NULL
+        self._block_min_cache = NULL
+        self._block_max_cache = NULL
         with nogil:
             self._dim_y = self._image.shape[0]
             self._dim_x = self._image.shape[1]
@@ -1158,17 +1255,23 @@ cdef class MarchingSquaresMergeImpl(object):
             libc.stdlib.free(self._min_cache)
         if self._max_cache != NULL:
             libc.stdlib.free(self._max_cache)
+        if self._block_min_cache != NULL:
+            libc.stdlib.free(self._block_min_cache)
+        if self._block_max_cache != NULL:
+            libc.stdlib.free(self._block_max_cache)
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
     @cython.cdivision(True)
-    cdef void _compute_minmax_on_block(self, int block_x, int block_y, int block_index) nogil:
+    cdef void _compute_minmax_on_block(self,
+                                       int block_x,
+                                       int block_y,
+                                       int block_size,
+                                       cnumpy.float32_t *min_cache,
+                                       cnumpy.float32_t *max_cache,
+                                       int block_index) nogil:
         """
-        Initialize the minmax cache.
-
-        The cache is computed for each tiles of the image. It reuses the OpenMP
-        group size for the size of the tile, which allow to skip a full OpenMP
-        context in case the requested level do not match the cache.
+        Initialize the minmax cache of a block.
 
         The minmax is compuded with an overlap of 1 pixel, in order to match
         the marching squares algorithm.
@@ -1176,8 +1279,14 @@ cdef class MarchingSquaresMergeImpl(object):
         The mask is taking into accound. As result if a tile is fully masked,
         the minmax cache result for this tile will have infinit values.
 
+        NaN values are never above a level, so they are accounted as a
+        minimum of minus infinity.
+
         :param block_x: X location of tile in block unit
         :param block_y: Y location of tile in block unit
+        :param block_size: Size of the block in pixels
+        :param min_cache: The minimum cache to fill
+        :param max_cache: The maximum cache to fill
         :param block_index: Index of the tile in the minmax cache structure
         """
         cdef:
@@ -1187,12 +1296,12 @@ cdef class MarchingSquaresMergeImpl(object):
             cnumpy.float32_t *image_ptr
             cnumpy.int8_t *mask_ptr
 
-        pos_x = block_x * self._group_size
-        end_x = pos_x + self._group_size + 1
+        pos_x = block_x * block_size
+        end_x = pos_x + block_size + 1
         if end_x > self._dim_x:
             end_x = self._dim_x
-        pos_y = block_y * self._group_size
-        end_y = pos_y + self._group_size + 1
+        pos_y = block_y * block_size
+        end_y = pos_y + block_size + 1
         if end_y > self._dim_y:
             end_y = self._dim_y
 
@@ -1212,6 +1321,8 @@ cdef class MarchingSquaresMergeImpl(object):
                         mask_ptr += 1
                         continue
                 value = image_ptr[0]
+                if value != value:
+                    minimum = -INFINITY
                 if value < minimum:
                     minimum = value
                 if value > maximum:
@@ -1223,8 +1334,48 @@ cdef class MarchingSquaresMergeImpl(object):
             if mask_ptr != NULL:
                 mask_ptr += self._dim_x + pos_x - end_x
 
-        self._min_cache[block_index] = minimum
-        self._max_cache[block_index] = maximum
+        min_cache[block_index] = minimum
+        max_cache[block_index] = maximum
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cdef void _reduce_minmax_on_tile(self, int tile_x, int tile_y, int tile_index) nogil:
+        """
+        Initialize the minmax cache of a tile from the minmax cache of its
+        blocks.
+
+        :param tile_x: X location of tile in tile unit
+        :param tile_y: Y location of tile in tile unit
+        :param tile_index: Index of the tile in the minmax cache structure
+        """
+        cdef:
+            int x, y, ratio, block_dim_y
+            int pos_x, end_x, pos_y, end_y
+            cnumpy.float32_t minimum, maximum
+
+        ratio = self._group_size // self._block_size
+        block_dim_y = self._dim_y // self._block_size + (self._dim_y % self._block_size > 0)
+        pos_x = tile_x * ratio
+        end_x = pos_x + ratio
+        if end_x > self._block_dim_x:
+            end_x = self._block_dim_x
+        pos_y = tile_y * ratio
+        end_y = pos_y + ratio
+        if end_y > block_dim_y:
+            end_y = block_dim_y
+
+        minimum = INFINITY
+        maximum = -INFINITY
+        for y in range(pos_y, end_y):
+            for x in range(pos_x, end_x):
+                if self._block_min_cache[y * self._block_dim_x + x] < minimum:
+                    minimum = self._block_min_cache[y * self._block_dim_x + x]
+                if self._block_max_cache[y * self._block_dim_x + x] > maximum:
+                    maximum = self._block_max_cache[y * self._block_dim_x + x]
+
+        self._min_cache[tile_index] = minimum
+        self._max_cache[tile_index] = maximum
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
@@ -1232,10 +1383,20 @@ cdef class MarchingSquaresMergeImpl(object):
     cdef void _create_minmax_cache(self) nogil:
         """
         Create and initialize minmax cache.
+
+        The cache is computed for each tiles of the image. It reuses the OpenMP
+        group size for the size of the tile, which allow to skip a full OpenMP
+        context in case the requested level do not match the cache.
+
+        If the group size is a multiple of `MINMAX_BLOCK_SIZE`, the minmax is
+        first computed on smaller blocks, which allow to skip the parts of
+        a tile not matching the requested level. The minmax of the tiles is
+        then reduced from the minmax of their blocks.
         """
         cdef:
             int icontext, context_x, context_y
             int context_dim_x, context_dim_y, context_size
+            int block_dim_y, block_count
 
         context_dim_x = self._dim_x // self._group_size + (self._dim_x % self._group_size > 0)
         context_dim_y = self._dim_y // self._group_size + (self._dim_y % self._group_size > 0)
@@ -1244,10 +1405,69 @@ cdef class MarchingSquaresMergeImpl(object):
         self._min_cache = <cnumpy.float32_t *>libc.stdlib.malloc(context_size * sizeof(cnumpy.float32_t))
         self._max_cache = <cnumpy.float32_t *>libc.stdlib.malloc(context_size * sizeof(cnumpy.float32_t))
 
+        if self._group_size <= MINMAX_BLOCK_SIZE or self._group_size % MINMAX_BLOCK_SIZE != 0:
+            # No hierarchy, tiles are the smallest blocks
+            for icontext in prange(context_size, nogil=True):
+                context_x = icontext % context_dim_x
+                context_y = icontext // context_dim_x
+                self._compute_minmax_on_block(context_x, context_y, self._group_size,
+                                              self._min_cache, self._max_cache, icontext)
+            return
+
+        self._block_size = MINMAX_BLOCK_SIZE
+        self._block_dim_x = self._dim_x // self._block_size + (self._dim_x % self._block_size > 0)
+        block_dim_y = self._dim_y // self._block_size + (self._dim_y % self._block_size > 0)
+        block_count = self._block_dim_x * block_dim_y
+        self._block_min_cache = <cnumpy.float32_t *>libc.stdlib.malloc(block_count * sizeof(cnumpy.float32_t))
+        self._block_max_cache = <cnumpy.float32_t *>libc.stdlib.malloc(block_count * sizeof(cnumpy.float32_t))
+
+        for icontext in prange(block_count, nogil=True):
+            context_x = icontext % self._block_dim_x
+            context_y = icontext // self._block_dim_x
+            self._compute_minmax_on_block(context_x, context_y, self._block_size,
+                                          self._block_min_cache, self._block_max_cache, icontext)
+
         for icontext in prange(context_size, nogil=True):
             context_x = icontext % context_dim_x
             context_y = icontext // context_dim_x
-            self._compute_minmax_on_block(context_x, context_y, icontext)
+            self._reduce_minmax_on_tile(context_x, context_y, icontext)
+
+    cdef _configure(self, _MarchingSquaresAlgorithm algo, bool use_minmax_cache):
+        """
+        Share the image and the minmax cache with an algorithm.
+
+        :param algo: The algorithm to configure
+        :param use_minmax_cache: If true, the minmax cache is created if
+            needed and used by the algorithm
+        """
+        if use_minmax_cache and self._min_cache == NULL:
+            self._create_minmax_cache()
+        algo._image_ptr = self._image_ptr
+        algo._mask_ptr = self._mask_ptr
+        algo._dim_x = self._dim_x
+        algo._dim_y = self._dim_y
+        algo._group_size = self._group_size
+        algo._use_minmax_cache = use_minmax_cache
+        algo._force_sequencial_reduction = COMPILED_WITH_OPENMP == 0
+        if use_minmax_cache:
+            algo._min_cache = self._min_cache
+            algo._max_cache = self._max_cache
+            algo._block_size = self._block_size
+            algo._block_dim_x = self._block_dim_x
+            algo._block_min_cache = self._block_min_cache
+            algo._block_max_cache = self._block_max_cache
+
+    cdef _MarchingSquaresPixels _get_pixels_algo(self, bool use_minmax_cache):
+        if self._pixels_algo is None:
+            self._pixels_algo = _MarchingSquaresPixels()
+        self._configure(self._pixels_algo, use_minmax_cache)
+        return self._pixels_algo
+
+    cdef _MarchingSquaresContours _get_contours_algo(self, bool use_minmax_cache):
+        if self._contours_algo is None:
+            self._contours_algo = _MarchingSquaresContours()
+        self._configure(self._contours_algo, use_minmax_cache)
+        return self._contours_algo
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
@@ -1261,25 +1481,10 @@ cdef class MarchingSquaresMergeImpl(object):
         :returns: An array of y-x coordinates.
         :rtype: numpy.ndarray
         """
-        if self._use_minmax_cache and self._min_cache == NULL:
-            self._create_minmax_cache()
-
-        if self._pixels_algo is None:
-            algo = _MarchingSquaresPixels()
-            algo._image_ptr = self._image_ptr
-            algo._mask_ptr = self._mask_ptr
-            algo._dim_x = self._dim_x
-            algo._dim_y = self._dim_y
-            algo._group_size = self._group_size
-            algo._use_minmax_cache = self._use_minmax_cache
-            algo._force_sequencial_reduction = COMPILED_WITH_OPENMP == 0
-            if self._use_minmax_cache:
-                algo._min_cache = self._min_cache
-                algo._max_cache = self._max_cache
-            self._pixels_algo = algo
-        else:
-            algo = self._pixels_algo
+        cdef:
+            _MarchingSquaresPixels algo
 
+        algo = self._get_pixels_algo(self._use_minmax_cache)
         algo.marching_squares(level)
         pixels = algo.extract_pixels()
         return pixels
@@ -1295,25 +1500,85 @@ cdef class MarchingSquaresMergeImpl(object):
         :returns: A list of array containg y-x coordinates of points
         :rtype: List[numpy.ndarray]
         """
-        if self._use_minmax_cache and self._min_cache == NULL:
-            self._create_minmax_cache()
-
-        if self._contours_algo is None:
-            algo = _MarchingSquaresContours()
-            algo._image_ptr = self._image_ptr
-            algo._mask_ptr = self._mask_ptr
-            algo._dim_x = self._dim_x
-            algo._dim_y = self._dim_y
-            algo._group_size = self._group_size
-            algo._use_minmax_cache = self._use_minmax_cache
-            algo._force_sequencial_reduction = COMPILED_WITH_OPENMP == 0
-            if self._use_minmax_cache:
-                algo._min_cache = self._min_cache
-                algo._max_cache = self._max_cache
-            self._contours_algo = algo
-        else:
-            algo = self._contours_algo
+        cdef:
+            _MarchingSquaresContours algo
 
+        algo = self._get_contours_algo(self._use_minmax_cache)
         algo.marching_squares(level)
         polygons = algo.extract_polygons()
         return polygons
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    cdef TileContext **_marching_squares_levels(self, _MarchingSquaresAlgorithm algo, levels):
+        """
+        Execute the marching squares on many levels and returns the resulting
+        contexts as an array which have to be released by the caller.
+        """
+        cdef:
+            cnumpy.float64_t[::1] c_levels
+            TileContext **contexts
+            int nb_levels
+
+        c_levels = numpy.ascontiguousarray(levels, dtype=numpy.float64).reshape(-1)
+        nb_levels = c_levels.shape[0]
+        contexts = <TileContext **>libc.stdlib.malloc(nb_levels * sizeof(TileContext*))
+        algo.marching_squares_levels(&c_levels[0], nb_levels, contexts)
+        return contexts
+
+    def find_pixels_multiple(self, levels):
+        """
+        Compute the pixels from the image over the iso contours of many
+        `levels`.
+
+        The levels are processed together in parallel, and always use the
+        minmax cache, which is computed only once per image.
+
+        :param levels: Sequence of levels of the requested iso contours.
+        :returns: A list containing an array of y-x coordinates for each level
+        :rtype: List[numpy.ndarray]
+        """
+        cdef:
+            _MarchingSquaresPixels algo
+            TileContext **contexts
+            int i
+
+        if len(levels) == 0:
+            return []
+        algo = self._get_pixels_algo(True)
+        contexts = self._marching_squares_levels(algo, levels)
+        result = []
+        for i in range(len(levels)):
+            algo._final_context = contexts[i]
+            result.append(algo.extract_pixels())
+        libc.stdlib.free(contexts)
+        return result
+
+    def find_contours_multiple(self, levels):
+        """
+        Compute the list of polygons of the iso contours of many `levels`.
+
+        The levels are processed together in parallel, and always use the
+        minmax cache, which is computed only once per image.
+
+        :param levels: Sequence of levels of the requested iso contours.
+        :returns: A list containing the list of polygons of each level.
+            Each polygon is an array containg y-x coordinates of points.
+        :rtype: List[List[numpy.ndarray]]
+        """
+        cdef:
+            _MarchingSquaresContours algo
+            TileContext **contexts
+            int i
+
+        if len(levels) == 0:
+            return []
+        algo = self._get_contours_algo(True)
+        contexts = self._marching_squares_levels(algo, levels)
+        result = []
+        for i in range(len(levels)):
+            algo._final_context = contexts[i]
+            result.append(algo.extract_polygons())
+        libc.stdlib.free(contexts)
+        return result
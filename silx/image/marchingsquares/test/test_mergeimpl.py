@@ -263,10 +263,67 @@ class TestMergeImplContours(unittest.TestCase):
         self.assertEqual(len(polygons), 11)
         self.assertEqual(self.count_closed_polygons(polygons), 3)
 
+    def test_image_tiled_minmax_blocks(self):
+        # example from skimage
+        x, y = numpy.ogrid[-numpy.pi:numpy.pi:100j, -numpy.pi:numpy.pi:100j]
+        image = numpy.sin(numpy.exp((numpy.sin(x)**3 + numpy.cos(y)**2)))
+        mask = None
+        ms = MarchingSquaresMergeImpl(image, mask, group_size=64, use_minmax_cache=True)
+        polygons = ms.find_contours(0.5)
+        self.assertEqual(len(polygons), 11)
+        self.assertEqual(self.count_closed_polygons(polygons), 3)
+
+
+class TestMergeImplMultipleLevels(unittest.TestCase):
+
+    def setUp(self):
+        x, y = numpy.ogrid[-numpy.pi:numpy.pi:150j, -numpy.pi:numpy.pi:130j]
+        self.image = numpy.sin(numpy.exp((numpy.sin(x)**3 + numpy.cos(y)**2)))
+        self.image[10:14, 20:24] = numpy.nan
+        self.mask = numpy.zeros(self.image.shape, dtype=numpy.int8)
+        self.mask[50:60, 70:75] = 1
+        self.levels = numpy.linspace(-0.8, 0.8, 9)
+
+    def points(self, polygons):
+        if len(polygons) == 0:
+            return []
+        points = numpy.nan_to_num(numpy.concatenate(polygons))
+        return sorted(map(tuple, points))
+
+    def test_empty_levels(self):
+        ms = MarchingSquaresMergeImpl(self.image)
+        self.assertEqual(ms.find_contours_multiple([]), [])
+        self.assertEqual(ms.find_pixels_multiple([]), [])
+
+    def test_find_contours(self):
+        for group_size in [16, 64, 256]:
+            for mask in [None, self.mask]:
+                ms = MarchingSquaresMergeImpl(self.image, mask, group_size=group_size)
+                result = ms.find_contours_multiple(self.levels)
+                self.assertEqual(len(result), len(self.levels))
+                for level, polygons in zip(self.levels, result):
+                    ms = MarchingSquaresMergeImpl(self.image, mask, group_size=group_size)
+                    expected = ms.find_contours(level)
+                    self.assertEqual(len(polygons), len(expected))
+                    self.assertEqual(self.points(polygons), self.points(expected))
+
+    def test_find_pixels(self):
+        for group_size in [16, 64, 256]:
+            for mask in [None, self.mask]:
+                ms = MarchingSquaresMergeImpl(self.image, mask, group_size=group_size)
+                result = ms.find_pixels_multiple(self.levels)
+                self.assertEqual(len(result), len(self.levels))
+                for level, pixels in zip(self.levels, result):
+                    ms = MarchingSquaresMergeImpl(self.image, mask, group_size=group_size)
+                    expected = ms.find_pixels(level)
+                    self.assertEqual(sorted(map(tuple, pixels)),
+                                     sorted(map(tuple, expected)))
+
 
 def suite():
     test_suite = unittest.TestSuite()
     loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
     test_suite.addTest(loadTests(TestMergeImplApi))
     test_suite.addTest(loadTests(TestMergeImplContours))
+    test_suite.addTest(loadTests(TestMergeImplMultipleLevels))
     return test_suite
@@ -34,10 +34,14 @@ def configuration(parent_package='', top_path=None):
     config.add_subpackage('test')
     config.add_extension('bilinear',
                          sources=["bilinear.pyx"],
-                         language='c')
+                         language='c',
+                         extra_link_args=['-fopenmp'],
+                         extra_compile_args=['-fopenmp'])
     config.add_extension('shapes',
                          sources=["shapes.pyx"],
-                         language='c')
+                         language='c',
+                         extra_link_args=['-fopenmp'],
+                         extra_compile_args=['-fopenmp'])
     config.add_subpackage('marchingsquares')
     return config
 
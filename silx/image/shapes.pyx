@@ -31,6 +31,9 @@
 
 The :class:`Polygon` class provides checking if a point is inside a polygon.
 
+The :func:`fill_polygon`, :func:`fill_disk` and :func:`fill_line` functions
+rasterize shapes directly into a provided mask array.
+
 The whole module uses the (row, col) (i.e., (y, x))) convention
 for 2D coordinates.
 """
@@ -42,8 +45,94 @@ __status__ = "dev"
 
 
 cimport cython
+from cython.parallel import prange
+from libc.math cimport ceil, fabs, sqrt
+from libc.stdlib cimport malloc, free
 import numpy
-from libc.math cimport ceil, fabs
+
+
+cdef int _ROWS_PER_CHUNK = 64
+"""Number of consecutive rows of a polygon filled by a single thread"""
+
+
+@cython.cdivision(True)
+@cython.wraparound(False)
+@cython.boundscheck(False)
+cdef int _fill_polygon_rows(float[:, ::1] edges,
+                            int row_start,
+                            int row_stop,
+                            unsigned char[:, ::1] mask,
+                            unsigned char value) nogil:
+    """Fill rows of a polygon in a mask with a scanline algorithm.
+
+    It maintains the table of edges crossing the current row sorted by
+    intersection column.
+
+    :param edges: Non-horizontal edges of the polygon sorted by min row as
+        (row min, row max, pt1 col, pt1 row, pt2 col, pt2 row)
+    :param int row_start: First row to fill
+    :param int row_stop: Row after the last row to fill
+    :param mask: The mask to update
+    :param value: The value to set in the mask
+    :return: 0 on success, -1 if memory allocation failed
+    """
+    cdef:
+        int nedges = edges.shape[0]
+        int width = mask.shape[1]
+        int *active_edges
+        int *crossings
+        int nactive = 0
+        int next_edge = 0
+        int row, col, index, nkept, edge, crossing
+        float pt1x, pt1y, pt2x, pt2y
+
+    active_edges = <int *> malloc(nedges * sizeof(int))
+    crossings = <int *> malloc(nedges * sizeof(int))
+    if active_edges == NULL or crossings == NULL:
+        free(active_edges)
+        free(crossings)
+        return -1
+
+    for row in range(row_start, row_stop):
+        # Add edges starting at this row
+        while next_edge < nedges and edges[next_edge, 0] <= row:
+            active_edges[nactive] = next_edge
+            nactive += 1
+            next_edge += 1
+
+        # Remove edges ending before this row and update crossings
+        nkept = 0
+        for index in range(nactive):
+            edge = active_edges[index]
+            if row < edges[edge, 1]:
+                pt1x = edges[edge, 2]
+                pt1y = edges[edge, 3]
+                pt2x = edges[edge, 4]
+                pt2y = edges[edge, 5]
+                # First column on the right of the intersection
+                crossing = <int>ceil(pt1x + (row - pt1y) *
+                                     (pt2x - pt1x) / (pt2y - pt1y))
+
+                # Insertion sort: nearly sorted from one row to the next
+                col = nkept
+                while col > 0 and crossings[col - 1] > crossing:
+                    crossings[col] = crossings[col - 1]
+                    active_edges[col] = active_edges[col - 1]
+                    col -= 1
+                crossings[col] = crossing
+                active_edges[col] = edge
+                nkept += 1
+        nactive = nkept
+
+        # Fill between pairs of crossings
+        for index in range(0, nactive - 1, 2):
+            for col in range(max(crossings[index], 0),
+                             min(crossings[index + 1], width)):
+                mask[row, col] = value
+
+    free(active_edges)
+    free(crossings)
+    return 0
 
 
 cdef class Polygon(object):
@@ -100,9 +189,55 @@ cdef class Polygon(object):
             pt1x, pt1y = pt2x, pt2y
         return is_inside
 
-    @cython.cdivision(True)
-    @cython.wraparound(False)
-    @cython.boundscheck(False)
+    def fill_mask(self, mask, value=1):
+        """Set the pixels of a mask inside the polygon to a value.
+
+        Only rows of the mask within the bounding box of the polygon are
+        processed, in parallel.
+
+        :param mask: The mask to update in-place
+        :type mask: 2D C-contiguous numpy.ndarray of uint8
+        :param int value: The value to set in the mask
+        """
+        cdef unsigned char[:, ::1] c_mask = mask
+        cdef unsigned char c_value = value
+        cdef float[:, ::1] edges
+        cdef int row_min, row_max, nchunks, chunk, row_start
+        cdef int failed = 0
+
+        vertices = numpy.asarray(self.vertices)
+        previous = numpy.roll(vertices, 1, axis=0)
+
+        edges_array = numpy.empty((self.nvert, 6), dtype=numpy.float32)
+        edges_array[:, 0] = numpy.minimum(previous[:, 0], vertices[:, 0])
+        edges_array[:, 1] = numpy.maximum(previous[:, 0], vertices[:, 0])
+        edges_array[:, 2] = previous[:, 1]
+        edges_array[:, 3] = previous[:, 0]
+        edges_array[:, 4] = vertices[:, 1]
+        edges_array[:, 5] = vertices[:, 0]
+        # Horizontal edges are never crossed
+        edges_array = edges_array[edges_array[:, 0] < edges_array[:, 1]]
+        if len(edges_array) == 0:
+            return
+        edges = edges_array[numpy.argsort(edges_array[:, 0], kind='mergesort')]
+
+        row_min = max(int(ceil(edges_array[:, 0].min())), 0)
+        row_max = min(int(ceil(edges_array[:, 1].max())), c_mask.shape[0])
+        if row_min >= row_max:
+            return
+
+        nchunks = (row_max - row_min + _ROWS_PER_CHUNK - 1) // _ROWS_PER_CHUNK
+        for chunk in prange(nchunks, nogil=True, schedule='dynamic'):
+            row_start = row_min + chunk * _ROWS_PER_CHUNK
+            failed += _fill_polygon_rows(
+                edges,
+                row_start,
+                min(row_start + _ROWS_PER_CHUNK, row_max),
+                c_mask,
+                c_value)
+        if failed:
+            raise MemoryError()
+
     def make_mask(self, int height, int width):
         """Create a mask array representing the filled polygon
 
@@ -110,69 +245,9 @@ cdef class Polygon(object):
         :param int width: Width of the mask array
         :return: 2D array (height, width)
         """
-        cdef unsigned char[:, :] mask = numpy.zeros((height, width),
-                                                    dtype=numpy.uint8)
-        cdef int row_min, row_max, col_min, col_max  # mask subpart to update
-        cdef int row, col, index  # Loop indixes
-        cdef float pt1x, pt1y, pt2x, pt2y  # segment end points
-        cdef int xinters, is_inside, current
-
-        row_min = max(int(min(self.vertices[:, 0])), 0)
-        row_max = min(int(max(self.vertices[:, 0])) + 1, height)
-
-        # Can be replaced by prange(row_min, row_max, nogil=True)
-        with nogil:
-            for row in range(row_min, row_max):
-                # For each line of the image, mark intersection of all segments
-                # in the line and then run a xor scan to fill inner parts
-                # Adapted from http://alienryderflex.com/polygon_fill/
-                pt1x = self.vertices[self.nvert-1, 1]
-                pt1y = self.vertices[self.nvert-1, 0]
-                col_min = width - 1
-                col_max = 0
-                is_inside = 0  # Init with whether first col is inside or not
-
-                for index in range(self.nvert):
-                    pt2x = self.vertices[index, 1]
-                    pt2y = self.vertices[index, 0]
-
-                    if ((pt1y <= row and row < pt2y) or
-                            (pt2y <= row and row < pt1y)):
-                        # Intersection casted to int so that ]x, x+1] => x
-                        xinters = (<int>ceil(pt1x + (row - pt1y) *
-                                   (pt2x - pt1x) / (pt2y - pt1y))) - 1
-
-                        # Update column range to patch
-                        if xinters < col_min:
-                            col_min = xinters
-                        if xinters > col_max:
-                            col_max = xinters
-
-                        if xinters < 0:
-                            # Add an intersection to init value of xor scan
-                            is_inside ^= 1
-                        elif xinters < width:
-                            # Mark intersection in mask
-                            mask[row, xinters] ^= 1
-                        # else: do not consider intersection on the right
-
-                    pt1x, pt1y = pt2x, pt2y
-
-                if col_min < col_max:
-                    # Clip column range to mask
-                    if col_min < 0:
-                        col_min = 0
-                    if col_max > width - 1:
-                        col_max = width - 1
-
-                    # xor exclusive scan
-                    for col in range(col_min, col_max + 1):
-                        current = mask[row, col]
-                        mask[row, col] = is_inside
-                        is_inside = current ^ is_inside
-
-        # Ensures the result is exported as numpy array and not memory view.
-        return numpy.asarray(mask)
+        mask = numpy.zeros((height, width), dtype=numpy.uint8)
+        self.fill_mask(mask, 1)
+        return mask
 
 
 def polygon_fill_mask(vertices, shape):
@@ -188,6 +263,18 @@ def polygon_fill_mask(vertices, shape):
     return Polygon(vertices).make_mask(shape[0], shape[1])
 
 
+def fill_polygon(mask, vertices, value=1):
+    """Set the pixels of a mask inside a polygon to a value.
+
+    :param mask: The mask to update in-place
+    :type mask: 2D C-contiguous numpy.ndarray of uint8
+    :param vertices: Strip of segments end points (row, column) or (y, x)
+    :type vertices: numpy.ndarray like container of dimension Nx2
+    :param int value: The value to set in the mask
+    """
+    Polygon(vertices).fill_mask(mask, value)
+
+
 @cython.wraparound(False)
 @cython.boundscheck(False)
 def draw_line(int row0, int col0, int row1, int col1, int width=1):
@@ -293,3 +380,125 @@ def circle_fill(int crow, int ccol, float radius):
     rows, cols = numpy.where(coords.reshape(1, len_coords) +
                              coords.reshape(len_coords, 1) < radius ** 2)
     return rows + crow - i_radius, cols + ccol - i_radius
+
+
+@cython.cdivision(True)
+@cython.wraparound(False)
+@cython.boundscheck(False)
+def fill_disk(mask, int crow, int ccol, float radius, value=1):
+    """Set the pixels of a mask inside a disk to a value.
+
+    Pixels are the same as the ones returned by :func:`circle_fill`.
+
+    :param mask: The mask to update in-place
+    :type mask: 2D C-contiguous numpy.ndarray of uint8
+    :param int crow: Row of the center of the disk
+    :param int ccol: Column of the center of the disk
+    :param float radius: Radius of the disk
+    :param int value: The value to set in the mask
+    """
+    cdef unsigned char[:, ::1] c_mask = mask
+    cdef unsigned char c_value = value
+    cdef int height = c_mask.shape[0]
+    cdef int width = c_mask.shape[1]
+    cdef int i_radius, row_min, row_max, row, col, drow, dcol
+    cdef float radius2
+
+    radius = fabs(radius)
+    radius2 = radius * radius
+    i_radius = <int>radius
+
+    row_min = max(crow - i_radius, 0)
+    row_max = min(crow + i_radius + 1, height)
+    for row in prange(row_min, row_max, nogil=True, schedule='static'):
+        drow = row - crow
+        if <float>(drow * drow) >= radius2:
+            continue
+        # Largest column offset inside the disk
+        dcol = <int>sqrt(radius2 - drow * drow)
+        while dcol > 0 and <float>(drow * drow + dcol * dcol) >= radius2:
+            dcol = dcol - 1
+        while <float>(drow * drow + (dcol + 1) * (dcol + 1)) < radius2:
+            dcol = dcol + 1
+
+        for col in range(max(ccol - dcol, 0), min(ccol + dcol + 1, width)):
+            c_mask[row, col] = c_value
+
+
+@cython.cdivision(True)
+@cython.wraparound(False)
+@cython.boundscheck(False)
+def fill_line(mask, int row0, int col0, int row1, int col1, int width=1,
+              value=1):
+    """Set the pixels of a mask on a line to a value.
+
+    Pixels are the same as the ones returned by :func:`draw_line`.
+    Points of the line are computed independently, in parallel.
+
+    :param mask: The mask to update in-place
+    :type mask: 2D C-contiguous numpy.ndarray of uint8
+    :param int row0: Start point row
+    :param int col0: Start point col
+    :param int row1: End point row
+    :param int col1: End point col
+    :param int width: Thickness of the line in pixels (default 1)
+                      Width must be at least 1.
+    :param int value: The value to set in the mask
+    """
+    cdef unsigned char[:, ::1] c_mask = mask
+    cdef unsigned char c_value = value
+    cdef int drow, dcol, invert_coords
+    cdef int da, db, a0, b0, step_a, step_b, a_size, b_size
+    cdef int index, index_min, index_max, a, b, offset
+
+    dcol = abs(col1 - col0)
+    drow = abs(row1 - row0)
+    invert_coords = dcol < drow
+
+    if dcol == 0 and drow == 0:
+        if 0 <= row0 < c_mask.shape[0] and 0 <= col0 < c_mask.shape[1]:
+            c_mask[row0, col0] = c_value
+        return
+
+    if width < 1:
+        width = 1
+
+    # Set a and b according to segment octant
+    if not invert_coords:
+        da = dcol
+        db = drow
+        step_a = 1 if col1 > col0 else -1
+        step_b = 1 if row1 > row0 else -1
+        a0 = col0
+        b0 = row0
+        a_size = c_mask.shape[1]
+        b_size = c_mask.shape[0]
+    else:
+        da = drow
+        db = dcol
+        step_a = 1 if row1 > row0 else -1
+        step_b = 1 if col1 > col0 else -1
+        a0 = row0
+        b0 = col0
+        a_size = c_mask.shape[0]
+        b_size = c_mask.shape[1]
+    b0 -= (width - 1) // 2
+
+    # Clip the line to the mask along a
+    if step_a > 0:
+        index_min = max(0, -a0)
+        index_max = min(da, a_size - 1 - a0)
+    else:
+        index_min = max(0, a0 - (a_size - 1))
+        index_max = min(da, a0)
+
+    for index in prange(index_min, index_max + 1,
+                        nogil=True, schedule='static'):
+        a = a0 + step_a * index
+        # Number of Bresenham moves along b after index moves along a
+        b = b0 + step_b * ((2 * index * db + da) // (2 * da))
+        for offset in range(max(b, 0), min(b + width, b_size)):
+            if invert_coords:
+                c_mask[a, offset] = c_value
+            else:
+                c_mask[offset, a] = c_value
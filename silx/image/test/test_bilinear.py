@@ -131,6 +131,41 @@ class TestBilinear(unittest.TestCase):
         self.assertLess(abs(res_ver - expected_profile).max(), 1e-5,
                         "correct vertical profile")
 
+    def test_profile_lines(self):
+        N = 100
+        x = numpy.arange(N) - N // 2.0
+        g = numpy.exp(-x * x / (N * N))
+        img = numpy.outer(g, g)
+        b = BilinearImage(img)
+
+        src = [(N // 2, 0), (0, N // 2), (0, 0), (10, 20), (5.5, 7.2)]
+        dst = [(N // 2, N - 1), (N - 1, N // 2), (N - 1, N - 1), (10, 20),
+               (80.3, 60.1)]
+        linewidths = [1, 3, 2, 1, 4]
+        for method in ('mean', 'sum'):
+            values, offsets = b.profile_lines(src, dst, linewidths, method)
+            self.assertEqual(len(offsets), len(src) + 1)
+            self.assertEqual(offsets[0], 0)
+            self.assertEqual(offsets[-1], len(values))
+            for index in range(len(src)):
+                expected = b.profile_line(src[index], dst[index],
+                                          linewidths[index], method)
+                profile = values[offsets[index]:offsets[index + 1]]
+                self.assertTrue(numpy.array_equal(profile, expected),
+                                "Same profile as profile_line")
+
+        # Single linewidth for all lines
+        values, offsets = b.profile_lines(src[:2], dst[:2], linewidth=3)
+        self.assertTrue(numpy.array_equal(
+            values[offsets[1]:offsets[2]],
+            b.profile_line(src[1], dst[1], linewidth=3)))
+
+        # No lines
+        values, offsets = b.profile_lines(numpy.zeros((0, 2)),
+                                          numpy.zeros((0, 2)))
+        self.assertEqual(len(values), 0)
+        self.assertEqual(list(offsets), [0])
+
 
 def suite():
     testsuite = unittest.TestSuite()
@@ -139,4 +174,5 @@ def suite():
     testsuite.addTest(TestBilinear("test_map"))
     testsuite.addTest(TestBilinear("test_profile_grad"))
     testsuite.addTest(TestBilinear("test_profile_gaus"))
+    testsuite.addTest(TestBilinear("test_profile_lines"))
     return testsuite
@@ -320,9 +320,104 @@ class TestCircleFill(ParametricTestCase):
                 self.assertTrue(is_equal)
 
 
+class TestFillMask(ParametricTestCase):
+    """Tests for filling shapes directly into a mask"""
+
+    @staticmethod
+    def _coordsToMask(coords, shape, value):
+        """Returns a mask with value set at coordinates inside the mask"""
+        rows, cols = coords
+        inside = numpy.logical_and(
+            numpy.logical_and(rows >= 0, rows < shape[0]),
+            numpy.logical_and(cols >= 0, cols < shape[1]))
+        mask = numpy.zeros(shape, dtype=numpy.uint8)
+        mask[rows[inside], cols[inside]] = value
+        return mask
+
+    @staticmethod
+    def _polygonToMask(vertices, shape, value):
+        """Returns a mask of a polygon computed pixel by pixel.
+
+        This uses :meth:`Polygon.is_inside` which does not share code with
+        the scanline filling of the mask.
+        """
+        polygon = shapes.Polygon(vertices)
+        mask = numpy.zeros(shape, dtype=numpy.uint8)
+        for row in range(shape[0]):
+            for col in range(shape[1]):
+                if polygon.is_inside(row, col):
+                    mask[row, col] = value
+        return mask
+
+    def test_fill_polygon(self):
+        """Test fill_polygon against a pixel by pixel inside check"""
+        angles = numpy.linspace(0., 2 * numpy.pi, 2000, endpoint=False)
+        radius = 40. + 10. * numpy.sin(17 * angles)
+        star = numpy.transpose((50. + radius * numpy.sin(angles),
+                                60. + radius * numpy.cos(angles)))
+
+        tests = {
+            'eight': [(0, 0), (5, 5), (5, 0), (0, 5)],
+            'concave polygon partly outside mask': [
+                (-1, -1), (40, 30), (10, 150), (20, 30)],
+            'float vertices': [
+                (2.5, 3.2), (80.7, 10.1), (60.3, 90.9), (10.1, 70.5)],
+            'polygon with many vertices': star,
+            'polygon outside mask': [(-10, -10), (-5, 10), (-10, 10)],
+            }
+
+        shape = 100, 120
+        for test_name, vertices in tests.items():
+            with self.subTest(msg=test_name):
+                ref_mask = self._polygonToMask(vertices, shape, 5)
+                mask = numpy.zeros(shape, dtype=numpy.uint8)
+                shapes.fill_polygon(mask, vertices, 5)
+                self.assertTrue(numpy.array_equal(mask, ref_mask))
+
+    def test_fill_polygon_keep_mask(self):
+        """Test that fill_polygon only updates pixels inside the polygon"""
+        mask = numpy.ones((10, 10), dtype=numpy.uint8)
+        shapes.fill_polygon(mask, [(2, 2), (2, 5), (5, 5), (5, 2)], 3)
+        ref_mask = numpy.ones((10, 10), dtype=numpy.uint8)
+        ref_mask[2:5, 2:5] = 3
+        self.assertTrue(numpy.array_equal(mask, ref_mask))
+
+    def test_fill_disk(self):
+        """Test fill_disk against circle_fill"""
+        shape = 20, 30
+        for crow, ccol, radius in ((0, 0, 1), (10, 15, 1), (5, 10, 2),
+                                   (10, 20, 3.5), (-2, 28, 5.2),
+                                   (10, 15, 40), (50, 50, 3), (4, 4, 0)):
+            with self.subTest(crow=crow, ccol=ccol, radius=radius):
+                ref_mask = self._coordsToMask(
+                    shapes.circle_fill(crow, ccol, radius), shape, 2)
+                mask = numpy.zeros(shape, dtype=numpy.uint8)
+                shapes.fill_disk(mask, crow, ccol, radius, 2)
+                self.assertTrue(numpy.array_equal(mask, ref_mask))
+
+    def test_fill_line(self):
+        """Test fill_line against draw_line"""
+        shape = 20, 30
+        for row0, col0, row1, col1 in ((1, 2, 1, 2), (0, 0, 0, 29),
+                                       (0, 0, 19, 0), (1, 1, 4, 6),
+                                       (1, 1, 6, 4), (18, 25, 2, 3),
+                                       (-5, -6, 30, 40), (25, 10, -3, 12),
+                                       (-5, 2, -1, 20)):
+            for width in range(5):
+                with self.subTest(pt0=(row0, col0), pt1=(row1, col1),
+                                  width=width):
+                    ref_mask = self._coordsToMask(
+                        shapes.draw_line(row0, col0, row1, col1, width),
+                        shape, 4)
+                    mask = numpy.zeros(shape, dtype=numpy.uint8)
+                    shapes.fill_line(mask, row0, col0, row1, col1, width, 4)
+                    self.assertTrue(numpy.array_equal(mask, ref_mask))
+
+
 def suite():
     test_suite = unittest.TestSuite()
-    for testClass in (TestPolygonFill, TestDrawLine, TestCircleFill):
+    for testClass in (TestPolygonFill, TestDrawLine, TestCircleFill,
+                      TestFillMask):
         test_suite.addTest(
             unittest.defaultTestLoader.loadTestsFromTestCase(testClass))
     return test_suite
@@ -82,20 +82,32 @@ class _MappingProxyType(collections.MutableMapping):
         raise RuntimeError("Cannot modify read-only dictionary")
 
 
+_EMPTY_ATTRS = {}
+"""Attributes of the nodes without attributes. It must not be modified."""
+
+
 class Node(object):
     """This is the base class for all :mod:`spech5` and :mod:`fabioh5`
     classes. It represents a tree node, and knows its parent node
     (:attr:`parent`).
     The API mimics a *h5py* node, with following attributes: :attr:`file`,
     :attr:`attrs`, :attr:`name`, and :attr:`basename`.
+
+    Nodes use ``__slots__`` to reduce the memory used by large trees.
+    Subclasses which do not define ``__slots__`` can still use any
+    attribute.
     """
 
+    __slots__ = ("__parent", "__basename", "__attrs", "__weakref__")
+
     def __init__(self, name, parent=None, attrs=None):
         self._set_parent(parent)
         self.__basename = name
-        self.__attrs = {}
-        if attrs is not None:
-            self.__attrs.update(attrs)
+        if attrs:
+            self.__attrs = dict(attrs)
+        else:
+            # allocated when attributes are written
+            self.__attrs = None
 
     def _set_basename(self, name):
         self.__basename = name
@@ -175,7 +187,11 @@ class Node(object):
         :rtype: dict
         """
         if self._is_editable():
+            if self.__attrs is None:
+                self.__attrs = {}
             return self.__attrs
+        elif self.__attrs is None:
+            return _MappingProxyType(_EMPTY_ATTRS)
         else:
             return _MappingProxyType(self.__attrs)
 
@@ -211,6 +227,8 @@ class Dataset(Node):
     *h5py.Dataset*.
     """
 
+    __slots__ = ("__data",)
+
     def __init__(self, name, data, parent=None, attrs=None):
         Node.__init__(self, name, parent, attrs=attrs)
         if data is not None:
@@ -485,6 +503,8 @@ class Dataset(Node):
 class DatasetProxy(Dataset):
     """Virtual dataset providing content of another dataset"""
 
+    __slots__ = ("__target",)
+
     def __init__(self, name, target, parent=None):
         Dataset.__init__(self, name, data=None, parent=parent)
         if not utils.is_dataset(target):
@@ -514,6 +534,8 @@ class DatasetProxy(Dataset):
 class _LinkToDataset(Dataset):
     """Virtual dataset providing link to another dataset"""
 
+    __slots__ = ("__target",)
+
     def __init__(self, name, target, parent=None):
         Dataset.__init__(self, name, data=None, parent=parent)
         self.__target = target
@@ -534,6 +556,8 @@ class LazyLoadableDataset(Dataset):
     method is only called once, when the data is needed.
     """
 
+    __slots__ = ("_is_initialized",)
+
     def __init__(self, name, parent=None, attrs=None):
         super(LazyLoadableDataset, self).__init__(name, None, parent, attrs=attrs)
         self._is_initialized = False
@@ -570,6 +594,9 @@ class SoftLink(Node):
 
     In this implementation, the path to the target must be absolute.
     """
+
+    __slots__ = ("target",)
+
     def __init__(self, name, path, parent=None):
         assert str(path).startswith("/")  # TODO: h5py also allows a relative path
 
@@ -595,6 +622,8 @@ class SoftLink(Node):
 class Group(Node):
     """This class mimics a `h5py.Group`."""
 
+    __slots__ = ("__items",)
+
     def __init__(self, name, parent=None, attrs=None):
         Node.__init__(self, name, parent, attrs=attrs)
         self.__items = collections.OrderedDict()
@@ -611,9 +640,40 @@ class Group(Node):
 
         :param Node node: Child to add to this group
         """
-        self._get_items()[node.basename] = node
+        items = self._get_items()
+        if node.basename in items:
+            # indexed paths may refer to the replaced node
+            self._clear_path_index()
+        items[node.basename] = node
         node._set_parent(self)
 
+    def _remove_node(self, name):
+        """Remove a child from this group.
+
+        :param str name: Name of the child
+        :return: The removed node
+        :raises KeyError: If there is no child with this name
+        """
+        node = self._get_items().pop(name)
+        self._clear_path_index()
+        return node
+
+    def _get_path_index(self):
+        """Returns the path-node cache used to resolve the paths relative to
+        this group, or None if paths are not cached.
+
+        :rtype: Union[dict,None]
+        """
+        return None
+
+    def _clear_path_index(self):
+        """Clear the path-node cache of the file containing this group."""
+        root = self.file
+        if root is not None:
+            index = root._get_path_index()
+            if index is not None:
+                index.clear()
+
     @property
     def h5_class(self):
         """Returns the HDF5 class which is mimicked by this class.
@@ -622,6 +682,35 @@ class Group(Node):
         """
         return utils.H5Type.GROUP
 
+    def _walk(self, name):
+        """Resolve a relative path by walking through the groups.
+
+        SoftLinks are traversed, except the last one.
+
+        :param str name: Path relative to this group, using '/' separator
+        :rtype: Node
+        :raises KeyError: If the path does not exist
+        """
+        path = name.split("/")
+        result = self
+        for item_name in path:
+            if isinstance(result, SoftLink):
+                # traverse links
+                l_name, l_target = result.name, result.path
+                result = result.file.get(l_target)
+                if result is None:
+                    raise KeyError(
+                        "Unable to open object (broken SoftLink %s -> %s)" %
+                        (l_name, l_target))
+            if not item_name:
+                # trailing "/" in name (legal for accessing Groups only)
+                if isinstance(result, Group):
+                    continue
+            if not isinstance(result, Group):
+                raise KeyError("Unable to open object (Component not found)")
+            result = result._get_items()[item_name]
+        return result
+
     def _get(self, name, getlink):
         """If getlink is True and name points to an existing SoftLink, this
         SoftLink is returned. In all other situations, we try to return a
@@ -634,24 +723,12 @@ class Group(Node):
                 return root
             result = root._get(name[1:], getlink)
         else:
-            path = name.split("/")
-            result = self
-            for item_name in path:
-                if isinstance(result, SoftLink):
-                    # traverse links
-                    l_name, l_target = result.name, result.path
-                    result = result.file.get(l_target)
-                    if result is None:
-                        raise KeyError(
-                            "Unable to open object (broken SoftLink %s -> %s)" %
-                            (l_name, l_target))
-                if not item_name:
-                    # trailing "/" in name (legal for accessing Groups only)
-                    if isinstance(result, Group):
-                        continue
-                if not isinstance(result, Group):
-                    raise KeyError("Unable to open object (Component not found)")
-                result = result._get_items()[item_name]
+            index = self._get_path_index()
+            result = None if index is None else index.get(name)
+            if result is None:
+                result = self._walk(name)
+                if index is not None:
+                    index[name] = result
 
         if isinstance(result, SoftLink) and not getlink:
             link = result
@@ -862,8 +939,7 @@ class Group(Node):
         :param func: Callable (function, method or callable object)
         :type func: callable
         """
-        origin_name = self.name
-        return self._visit(func, origin_name, visit_links)
+        return self._visit(func, "", visit_links)
 
     def visititems(self, func, visit_links=False):
         """Recursively visit names and objects in this group.
@@ -874,24 +950,21 @@ class Group(Node):
         :param bool visit_links: If *False*, ignore links. If *True*,
             call `func(name)` for links and recurse into target groups.
         """
-        origin_name = self.name
-        return self._visit(func, origin_name, visit_links,
-                           visititems=True)
+        return self._visit(func, "", visit_links, visititems=True)
 
-    def _visit(self, func, origin_name,
+    def _visit(self, func, prefix,
                visit_links=False, visititems=False):
         """
 
-        :param origin_name: name of first group that initiated the recursion
-            This is used to compute the relative path from each item's
-            absolute path.
+        :param str prefix: Path of this group relative to the group which
+            initiated the recursion, followed by a '/' if not empty.
+            The relative path of each item is built from it, which avoids
+            computing the absolute name of each node.
         """
-        for member in self.values():
+        for basename, member in self.items():
             ret = None
+            relative_name = prefix + basename
             if not isinstance(member, SoftLink) or visit_links:
-                relative_name = member.name[len(origin_name):]
-                # remove leading slash and unnecessary trailing slash
-                relative_name = relative_name.strip("/")
                 if visititems:
                     ret = func(relative_name, member)
                 else:
@@ -899,7 +972,8 @@ class Group(Node):
             if ret is not None:
                 return ret
             if isinstance(member, Group):
-                member._visit(func, origin_name, visit_links, visititems)
+                member._visit(func, relative_name + "/",
+                              visit_links, visititems)
 
     def create_group(self, name):
         """Create and return a new subgroup.
@@ -965,6 +1039,8 @@ class Group(Node):
 class _LinkToGroup(Group):
     """Virtual group providing link to another group"""
 
+    __slots__ = ("__target",)
+
     def __init__(self, name, target, parent=None):
         Group.__init__(self, name, parent=parent)
         self.__target = target
@@ -985,9 +1061,11 @@ class LazyLoadableGroup(Group):
     is only called once, when children are needed.
     """
 
+    __slots__ = ("_is_initialized",)
+
     def __init__(self, name, parent=None, attrs=None):
         Group.__init__(self, name, parent, attrs)
-        self.__is_initialized = False
+        self._is_initialized = False
 
     def _get_items(self):
         """Returns the internal structure which contains the children.
@@ -997,8 +1075,8 @@ class LazyLoadableGroup(Group):
 
         :rtype: dict
         """
-        if not self.__is_initialized:
-            self.__is_initialized = True
+        if not self._is_initialized:
+            self._is_initialized = True
             self._create_child()
         return Group._get_items(self)
 
@@ -1013,7 +1091,13 @@ class LazyLoadableGroup(Group):
 
 class File(Group):
     """This class is the special :class:`Group` that is the root node
-    of the tree structure. It mimics `h5py.File`."""
+    of the tree structure. It mimics `h5py.File`.
+
+    It caches the nodes resolved from their path, to speed up the access to
+    deep nodes.
+    """
+
+    __slots__ = ("_file_name", "_mode", "__path_index")
 
     def __init__(self, name=None, mode=None, attrs=None):
         """
@@ -1033,6 +1117,17 @@ class File(Group):
             mode = "r"
         assert(mode in ["r", "w"])
         self._mode = mode
+        self.__path_index = {}
+
+    def _get_path_index(self):
+        """Returns the path-node cache of this file.
+
+        Paths are relative to the root, and nodes are not converted from
+        SoftLinks.
+
+        :rtype: dict
+        """
+        return self.__path_index
 
     @property
     def filename(self):
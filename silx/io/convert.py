@@ -51,16 +51,24 @@ Text strings are written to the HDF5 datasets as variable-length utf-8.
     to install it if you don't already have it.
 """
 
+import collections
+import itertools
 import logging
 import numpy
+import zlib
 
 import silx.io
 from silx.io import is_dataset, is_group, is_softlink
 from silx.third_party import six
+from silx.third_party import concurrent_futures
 try:
     from silx.io import fabioh5
 except ImportError:
     fabioh5 = None
+try:
+    import fabio
+except ImportError:
+    fabio = None
 
 __authors__ = ["P. Knobel"]
 __license__ = "MIT"
@@ -108,6 +116,114 @@ def _create_link(h5f, link_name, target_name,
         raise ValueError("link_type  must be 'hard' or 'soft'")
 
 
+def _iter_chunk_aligned_blocks(shape, chunks, itemsize, buffer_size):
+    """Iterate over a dataset by blocks of a limited size, aligned on the
+    chunks.
+
+    Blocks are grown from the last axis to the first one, so they are as
+    contiguous as possible in C order.
+
+    :param tuple shape: Shape of the dataset
+    :param Union[tuple,None] chunks: Chunk shape of the dataset, or None if it
+        is contiguous
+    :param int itemsize: Size in bytes of an item of the dataset
+    :param int buffer_size: Maximum size in bytes of a block. A block is never
+        smaller than a chunk.
+    :returns: Iterator of tuple of slices
+    """
+    if chunks is None:
+        chunks = (1,) * len(shape)
+    block = list(chunks)
+    for axis in reversed(range(len(shape))):
+        block_size = itemsize * int(numpy.prod(block))
+        factor = max(1, buffer_size // block_size)
+        block[axis] = min(shape[axis], block[axis] * factor)
+        if block[axis] < shape[axis]:
+            break
+
+    ranges = [range(0, size, step) for size, step in zip(shape, block)]
+    for origin in itertools.product(*ranges):
+        yield tuple(slice(start, min(start + step, size))
+                    for start, step, size in zip(origin, block, shape))
+
+
+def _get_chunk_filters(ds):
+    """Returns the filters of a dataset if they can be applied by
+    :func:`_encode_chunk`, else None.
+
+    :param h5py.Dataset ds: A chunked dataset
+    :returns: A tuple (shuffle, gzip compression level or None)
+    """
+    if ds.chunks is None or ds.fletcher32 or ds.scaleoffset is not None:
+        return None
+    if ds.compression is None:
+        return ds.shuffle, None
+    if ds.compression == "gzip":
+        level = ds.compression_opts
+        return ds.shuffle, 4 if level is None else level
+    return None
+
+
+def _encode_chunk(chunk, shuffle, level):
+    """Apply HDF5 shuffle and deflate filters to a chunk.
+
+    :param numpy.ndarray chunk: Full chunk
+    :param bool shuffle: True to apply the byte shuffle filter
+    :param Union[int,None] level: Deflate compression level, or None
+    :rtype: bytes
+    """
+    chunk = numpy.ascontiguousarray(chunk)
+    if shuffle and chunk.dtype.itemsize > 1:
+        data = chunk.view(numpy.uint8).reshape(-1, chunk.dtype.itemsize)
+        data = data.T.tobytes()
+    else:
+        data = chunk.tobytes()
+    if level is not None:
+        data = zlib.compress(data, level)
+    return data
+
+
+def _decode_frames(filenames, frame_shape, dtype, chunks=None, filters=None):
+    """Read a block of frames from image files.
+
+    This function is executed in worker processes.
+
+    :param List[str] filenames: Files containing a single frame each
+    :param tuple frame_shape: Shape of the frames of the output dataset.
+        Smaller frames are padded with 0.
+    :param numpy.dtype dtype: Type of the output dataset
+    :param tuple chunks: Chunk shape of the output dataset, required to
+        encode the chunks
+    :param filters: Filters returned by :func:`_get_chunk_filters`, or None
+        to return the decoded block
+    :returns: The block of frames as a numpy array, or a list of encoded
+        chunks as (offset, bytes) tuples, offsets being relative to the block.
+    """
+    frame_count = len(filenames) if filters is None else chunks[0]
+    block = numpy.zeros((frame_count,) + tuple(frame_shape), dtype=dtype)
+    for index, filename in enumerate(filenames):
+        image = fabio.open(filename).data
+        location = [index] + [slice(0, i) for i in image.shape]
+        while len(location) < block.ndim:
+            location.append(0)
+        block[tuple(location)] = image
+    if filters is None:
+        return block
+
+    shuffle, level = filters
+    encoded = []
+    ranges = [range(0, size, step) for size, step in zip(frame_shape, chunks[1:])]
+    for origin in itertools.product(*ranges):
+        selection = tuple(slice(start, min(start + step, size))
+                          for start, step, size in zip(origin, chunks[1:], frame_shape))
+        chunk = numpy.zeros(chunks, dtype=dtype)
+        # edge chunks are padded
+        location = tuple(slice(0, s.stop - s.start) for s in selection)
+        chunk[(slice(None),) + location] = block[(slice(None),) + selection]
+        encoded.append(((0,) + origin, _encode_chunk(chunk, shuffle, level)))
+    return encoded
+
+
 def _attr_utf8(attr_value):
     """If attr_value is bytes, make sure we output utf-8
 
@@ -125,6 +241,11 @@ def _attr_utf8(attr_value):
     return out_attr_value
 
 
+DEFAULT_BUFFER_SIZE = 16 * 1024 * 1024
+"""Default size in bytes above which numerical datasets are copied block by
+block"""
+
+
 class Hdf5Writer(object):
     """Converter class to write the content of a data file to a HDF5 file.
     """
@@ -133,7 +254,9 @@ class Hdf5Writer(object):
                  overwrite_data=False,
                  link_type="soft",
                  create_dataset_args=None,
-                 min_size=500):
+                 min_size=500,
+                 buffer_size=DEFAULT_BUFFER_SIZE,
+                 workers=None):
         """
 
         :param h5path: Target path where the scan groups will be written
@@ -146,6 +269,10 @@ class Hdf5Writer(object):
             See documentation of :func:`write_to_h5`
         :param int min_size:
             See documentation of :func:`write_to_h5`
+        :param int buffer_size:
+            See documentation of :func:`write_to_h5`
+        :param int workers:
+            See documentation of :func:`write_to_h5`
         """
         self.h5path = h5path
         if not h5path.startswith("/"):
@@ -163,6 +290,10 @@ class Hdf5Writer(object):
 
         self.min_size = min_size
 
+        self.buffer_size = buffer_size
+
+        self.workers = workers
+
         self.overwrite_data = overwrite_data   # boolean
 
         self.link_type = link_type
@@ -225,8 +356,18 @@ class Hdf5Writer(object):
                                                   shape=obj.shape,
                                                   dtype=obj.dtype,
                                                   **self.create_dataset_args)
-                    for i, frame in enumerate(obj):
-                        ds[i] = frame
+                    if self._use_workers(obj):
+                        self._write_frames_in_parallel(obj, ds)
+                    else:
+                        for i, frame in enumerate(obj):
+                            ds[i] = frame
+                elif self._is_large_dataset(obj):
+                    # copy block by block to save memory usage low
+                    ds = self._h5f.create_dataset(h5_name,
+                                                  shape=obj.shape,
+                                                  dtype=obj.dtype,
+                                                  **self.create_dataset_args)
+                    self._copy_by_blocks(obj, ds)
                 else:
                     # fancy arguments don't apply to small dataset
                     if obj.size < self.min_size:
@@ -260,6 +401,84 @@ class Hdf5Writer(object):
                                      _attr_utf8(obj.attrs[key]))
 
 
+    def _is_large_dataset(self, obj):
+        """Returns True if the dataset have to be copied block by block.
+
+        Only numerical datasets bigger than :attr:`buffer_size` are concerned.
+        """
+        if len(obj.shape) == 0 or obj.dtype.kind not in "biufc":
+            return False
+        if obj.size < self.min_size:
+            return False
+        return obj.size * obj.dtype.itemsize > self.buffer_size
+
+    def _copy_by_blocks(self, obj, ds):
+        """Copy a dataset block by block, following the chunks of the target
+        dataset.
+
+        :param obj: h5py-like source dataset
+        :param h5py.Dataset ds: Target dataset
+        """
+        blocks = _iter_chunk_aligned_blocks(obj.shape,
+                                            ds.chunks,
+                                            obj.dtype.itemsize,
+                                            self.buffer_size)
+        for selection in blocks:
+            ds[selection] = obj[selection]
+
+
+    def _use_workers(self, obj):
+        """Returns True if frames of a `fabioh5.FrameData` can be read by
+        worker processes."""
+        if self.workers is None or self.workers <= 1:
+            return False
+        reader = obj.fabio_reader()
+        return isinstance(reader.fabio_file(), fabio.file_series.file_series)
+
+    def _write_frames_in_parallel(self, obj, ds):
+        """Write a file series using worker processes.
+
+        Frames are decoded by the workers. If the filters of the dataset
+        are supported, the chunks are also compressed by the workers and
+        written with direct chunk writes, else h5py compresses them.
+
+        :param fabioh5.FrameData obj: Stack of frames from a file series
+        :param h5py.Dataset ds: Target dataset
+        """
+        filenames = list(obj.fabio_reader().fabio_file())
+        filters = _get_chunk_filters(ds)
+        # a task decodes a row of chunks
+        step = 1 if ds.chunks is None else ds.chunks[0]
+        frame_shape = obj.shape[1:]
+
+        executor = concurrent_futures.ProcessPoolExecutor(max_workers=self.workers)
+        pending = collections.deque()
+        starts = iter(range(0, len(filenames), step))
+        try:
+            while True:
+                # keep a bounded number of blocks in memory
+                for start in itertools.islice(starts, 2 * self.workers - len(pending)):
+                    future = executor.submit(_decode_frames,
+                                             filenames[start:start + step],
+                                             frame_shape, ds.dtype,
+                                             ds.chunks, filters)
+                    pending.append((start, future))
+                if len(pending) == 0:
+                    break
+                start, future = pending.popleft()
+                result = future.result()
+                if filters is None:
+                    ds[start:start + len(result)] = result
+                else:
+                    for offset, data in result:
+                        offset = (start + offset[0],) + offset[1:]
+                        ds.id.write_direct_chunk(offset, data)
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+
 def _is_commonh5_group(grp):
     """Return True if grp is a commonh5 group.
     (h5py.Group objects are not commonh5 groups)"""
@@ -268,7 +487,8 @@ def _is_commonh5_group(grp):
 
 def write_to_h5(infile, h5file, h5path='/', mode="a",
                 overwrite_data=False, link_type="soft",
-                create_dataset_args=None, min_size=500):
+                create_dataset_args=None, min_size=500,
+                buffer_size=DEFAULT_BUFFER_SIZE, workers=None):
     """Write content of a h5py-like object into a HDF5 file.
 
     :param infile: Path of input file, or :class:`commonh5.File` object
@@ -291,6 +511,14 @@ def write_to_h5(infile, h5file, h5path='/', mode="a",
         These arguments are only applied to datasets larger than 1MB.
     :param int min_size: Minimum number of elements in a dataset to apply
         chunking and compression. Default is 500.
+    :param int buffer_size: Numerical datasets bigger than this size in bytes
+        are read and written block by block, with blocks aligned on the
+        chunks of the output dataset, to keep the memory usage low.
+        Default is 16 MB.
+    :param int workers: Number of processes used to decode and compress the
+        frames of a series of image files. Only gzip compression and the
+        shuffle filter can be applied by the worker processes, h5py applies
+        other filters. Default is None, frames are read by the main process.
 
     The structure of the spec data in an HDF5 file is described in the
     documentation of :mod:`silx.io.spech5`.
@@ -299,7 +527,9 @@ def write_to_h5(infile, h5file, h5path='/', mode="a",
                         overwrite_data=overwrite_data,
                         link_type=link_type,
                         create_dataset_args=create_dataset_args,
-                        min_size=min_size)
+                        min_size=min_size,
+                        buffer_size=buffer_size,
+                        workers=workers)
 
     # both infile and h5file can be either file handle or a file name: 4 cases
     if not isinstance(h5file, h5py.File) and not is_group(infile):
@@ -53,6 +53,10 @@ logger = logging.getLogger(__name__)
 
 string_types = (basestring,) if sys.version_info[0] == 2 else (str,)    # noqa
 
+_WRITE_BLOCK_SIZE = 16 * 1024 * 1024
+"""Maximum size in bytes of the blocks used by :func:`dicttoh5` to write
+large arrays"""
+
 
 def _prepare_hdf5_dataset(array_like):
     """Cast a python object into a numpy array in a HDF5 friendly format.
@@ -152,6 +156,102 @@ class _SafeH5FileRead(object):
             self.h5file.close()
 
 
+class LazyH5Dataset(object):
+    """Dataset of a HDF5 file whose data is only read when it is accessed.
+
+    Values of this type are returned by :func:`h5todict` in lazy mode.
+    The data is read by indexing the object (e.g. ``value[()]`` or
+    ``value[0:10]``), or by converting it with ``numpy.array``.
+    """
+
+    def __init__(self, h5file, name, shape, dtype):
+        """
+
+        :param h5file: File name, or h5py-like file object which must be
+            kept open while the data is accessed. A file name is opened
+            again each time data is read.
+        :param str name: Path of the dataset in the file
+        :param tuple shape: Shape of the dataset
+        :param numpy.dtype dtype: Data type of the dataset
+        """
+        self.__h5file = h5file
+        self.__name = name
+        self.shape = tuple(shape)
+        self.dtype = numpy.dtype(dtype)
+
+    @property
+    def name(self):
+        """Path of the dataset in the file"""
+        return self.__name
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(numpy.prod(self.shape, dtype=numpy.int64))
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    def __len__(self):
+        if self.shape == ():
+            raise TypeError("Attempt to take len() of scalar dataset")
+        return self.shape[0]
+
+    def __getitem__(self, item):
+        with _SafeH5FileRead(self.__h5file) as h5f:
+            return h5f[self.__name][item]
+
+    def __array__(self, dtype=None):
+        array = numpy.asarray(self[...])
+        if dtype is not None:
+            array = array.astype(dtype)
+        return array
+
+    def __repr__(self):
+        return "<LazyH5Dataset \"%s\": shape %s, type \"%s\">" % (
+            self.__name, self.shape, self.dtype.str)
+
+
+def _write_dataset(h5f, name, data, create_dataset_args):
+    """Write an array-like object as a new HDF5 dataset.
+
+    Numerical arrays bigger than :data:`_WRITE_BLOCK_SIZE` are written
+    by blocks along their first axis, so that the whole data is never copied
+    at once. :class:`LazyH5Dataset` values are read the same way.
+
+    :param h5py.File h5f: File in which the dataset is created
+    :param str name: Path of the dataset in the file
+    :param data: Array-like object
+    :param Union[dict,None] create_dataset_args: Arguments for
+        ``h5f.create_dataset``
+    """
+    if (isinstance(data, (numpy.ndarray, LazyH5Dataset)) and
+            data.ndim > 0 and data.dtype.kind in "biufc" and
+            data.nbytes > _WRITE_BLOCK_SIZE):
+        if create_dataset_args is None:
+            create_dataset_args = {}
+        ds = h5f.create_dataset(name, shape=data.shape, dtype=data.dtype,
+                                **create_dataset_args)
+        row_size = data.nbytes // data.shape[0]
+        step = max(1, _WRITE_BLOCK_SIZE // max(1, row_size))
+        for start in range(0, data.shape[0], step):
+            ds[start:start + step] = data[start:start + step]
+        return
+
+    if isinstance(data, LazyH5Dataset):
+        data = data[...]
+    ds = _prepare_hdf5_dataset(data)
+    # can't apply filters on scalars (datasets with shape == () )
+    if ds.shape == () or create_dataset_args is None:
+        h5f.create_dataset(name, data=ds)
+    else:
+        h5f.create_dataset(name, data=ds, **create_dataset_args)
+
+
 def dicttoh5(treedict, h5file, h5path='/',
              mode="w", overwrite_data=False,
              create_dataset_args=None):
@@ -185,6 +285,9 @@ def dicttoh5(treedict, h5file, h5path='/',
         ``h5f.create_dataset``. This allows you to specify filters and
         compression parameters. Don't specify ``name`` and ``data``.
 
+    Large numerical arrays and :class:`LazyH5Dataset` values are written by
+    blocks, so that they are not copied entirely in memory.
+
     Example::
 
         from silx.io.dictdump import dicttoh5
@@ -236,31 +339,16 @@ def dicttoh5(treedict, h5file, h5path='/',
                 h5f.create_group(h5path + key)
 
             else:
-                ds = _prepare_hdf5_dataset(treedict[key])
-                # can't apply filters on scalars (datasets with shape == () )
-                if ds.shape == () or create_dataset_args is None:
-                    if h5path + key in h5f:
-                        if overwrite_data is True:
-                            del h5f[h5path + key]
-                        else:
-                            logger.warning('key (%s) already exists. '
-                                           'Not overwriting.' % (h5path + key))
-                            continue
-
-                    h5f.create_dataset(h5path + key,
-                                       data=ds)
-                else:
-                    if h5path + key in h5f:
-                        if overwrite_data is True:
-                            del h5f[h5path + key]
-                        else:
-                            logger.warning('key (%s) already exists. '
-                                           'Not overwriting.' % (h5path + key))
-                            continue
-
-                    h5f.create_dataset(h5path + key,
-                                       data=ds,
-                                       **create_dataset_args)
+                if h5path + key in h5f:
+                    if overwrite_data is True:
+                        del h5f[h5path + key]
+                    else:
+                        logger.warning('key (%s) already exists. '
+                                       'Not overwriting.' % (h5path + key))
+                        continue
+
+                _write_dataset(h5f, h5path + key, treedict[key],
+                               create_dataset_args)
 
 
 def _name_contains_string_in_list(name, strlist):
@@ -272,7 +360,63 @@ def _name_contains_string_in_list(name, strlist):
     return False
 
 
-def h5todict(h5file, path="/", exclude_names=None):
+def _memmap_dataset(ds):
+    """Returns a read-only memory map of a HDF5 dataset, or None if the
+    data of the dataset is not stored uncompressed and contiguously in the
+    file.
+
+    :param ds: h5py-like dataset
+    :rtype: Union[numpy.memmap,None]
+    """
+    if not isinstance(ds, h5py.Dataset):
+        return None
+    if ds.dtype.kind not in "biufc" or ds.size == 0:
+        return None
+    if ds.file.driver not in ("sec2", "stdio", "windows"):
+        return None
+    dcpl = ds.id.get_create_plist()
+    if (dcpl.get_layout() != h5py.h5d.CONTIGUOUS or
+            dcpl.get_external_count() > 0):
+        return None
+    offset = ds.id.get_offset()
+    if offset is None:
+        # data not allocated
+        return None
+    return numpy.memmap(ds.file.filename, dtype=ds.dtype, mode="r",
+                        offset=offset, shape=ds.shape)
+
+
+def _h5todict(h5f, path, exclude_names, source, lazy, mmap):
+    """Recursive implementation of :func:`h5todict`.
+
+    :param h5f: Opened h5py-like file
+    :param source: File name or file object provided to :func:`h5todict`,
+        used by the :class:`LazyH5Dataset` values
+    """
+    ddict = {}
+    for key in h5f[path]:
+        if _name_contains_string_in_list(key, exclude_names):
+            continue
+        name = path + "/" + key
+        h5obj = h5f[name]
+        if is_group(h5obj):
+            ddict[key] = _h5todict(h5f, name, exclude_names,
+                                   source, lazy, mmap)
+            continue
+
+        value = _memmap_dataset(h5obj) if mmap else None
+        if value is not None:
+            ddict[key] = value
+        elif lazy:
+            ddict[key] = LazyH5Dataset(source, h5obj.name,
+                                       h5obj.shape, h5obj.dtype)
+        else:
+            # Convert HDF5 dataset to numpy array
+            ddict[key] = h5obj[...]
+    return ddict
+
+
+def h5todict(h5file, path="/", exclude_names=None, lazy=False, mmap=False):
     """Read a HDF5 file and return a nested dictionary with the complete file
     structure and all data.
 
@@ -291,11 +435,16 @@ def h5todict(h5file, path="/", exclude_names=None):
                                              "/94.1/measurement",
                                              exclude_names="mca_")
 
+    Large files can be read without loading their data::
+
+        results = h5todict("results.h5", lazy=True, mmap=True)
+        first_frame = results["frames"][0]
+
 
     .. note:: This function requires `h5py <http://www.h5py.org/>`_ to be
         installed.
 
-    .. note:: If you write a dictionary to a HDF5 file with
+    .. note:: If you write a dictionary to a HDF5 file with
         :func:`dicttoh5` and then read it back with :func:`h5todict`, data
         types are not preserved. All values are cast to numpy arrays before
         being written to file, and they are read back as numpy arrays (or
@@ -308,23 +457,21 @@ def h5todict(h5file, path="/", exclude_names=None):
         to read only a sub-group in the file
     :param List[str] exclude_names: Groups and datasets whose name contains
         a string in this list will be ignored. Default is None (ignore nothing)
+    :param bool lazy: If True, datasets are returned as
+        :class:`LazyH5Dataset` objects, which read the data when it is
+        accessed. If a file object is provided, it must be kept open while
+        the data is accessed.
+    :param bool mmap: If True, numerical datasets of HDF5 files which are
+        stored contiguously and uncompressed are returned as read-only
+        :class:`numpy.memmap`, whether ``lazy`` is used or not.
     :return: Nested dictionary
     """
     if h5py_missing:
         raise h5py_import_error
 
     with _SafeH5FileRead(h5file) as h5f:
-        ddict = {}
-        for key in h5f[path]:
-            if _name_contains_string_in_list(key, exclude_names):
-                continue
-            if is_group(h5f[path + "/" + key]):
-                ddict[key] = h5todict(h5f,
-                                      path + "/" + key,
-                                      exclude_names=exclude_names)
-            else:
-                # Convert HDF5 dataset to numpy array
-                ddict[key] = h5f[path + "/" + key][...]
+        ddict = _h5todict(h5f, path, exclude_names,
+                          source=h5file, lazy=lazy, mmap=mmap)
 
     return ddict
 
@@ -35,14 +35,17 @@
 import collections
 import datetime
 import logging
+import multiprocessing
 import numbers
 import os
+import threading
 
 import fabio.file_series
 import numpy
 
 from . import commonh5
 from silx.third_party import six
+from silx.third_party import concurrent_futures
 from silx import version as silx_version
 import silx.utils.number
 
@@ -58,6 +61,11 @@ _logger = logging.getLogger(__name__)
 _fabio_extensions = set([])
 
 
+DEFAULT_FRAME_CACHE_SIZE = 256 * 1024 * 1024
+"""Default size in bytes of the cache of decoded frames of a
+:class:`FabioReader`."""
+
+
 def supported_extensions():
     """Returns all extensions supported by fabio.
 
@@ -96,6 +104,63 @@ class _FileSeries(fabio.file_series.file_series):
         return self[self._current]
 
 
+class _FrameCache(object):
+    """Least recently used cache of decoded frames, bounded by a size in
+    bytes."""
+
+    def __init__(self, max_size):
+        """
+        Constructor
+
+        :param int max_size: Maximum size in bytes of the cached frames
+        """
+        self.__frames = collections.OrderedDict()
+        self.__size = 0
+        self.__max_size = max_size
+
+    def get(self, frame_id):
+        """Returns the cached frame, else None.
+
+        :param int frame_id: Index of the frame
+        :rtype: Union[numpy.ndarray,None]
+        """
+        data = self.__frames.pop(frame_id, None)
+        if data is not None:
+            # move it to the most recent place
+            self.__frames[frame_id] = data
+        return data
+
+    def put(self, frame_id, data):
+        """Store a frame, and drop the least recently used ones if the cache
+        is full.
+
+        :param int frame_id: Index of the frame
+        :param numpy.ndarray data: Data of the frame
+        """
+        if data.nbytes > self.__max_size:
+            return
+        previous = self.__frames.pop(frame_id, None)
+        if previous is not None:
+            self.__size -= previous.nbytes
+        while self.__size + data.nbytes > self.__max_size:
+            _, dropped = self.__frames.popitem(last=False)
+            self.__size -= dropped.nbytes
+        self.__frames[frame_id] = data
+        self.__size += data.nbytes
+
+    def clear(self):
+        """Remove all the cached frames"""
+        self.__frames.clear()
+        self.__size = 0
+
+    def size(self):
+        """Returns the size in bytes of the cached frames.
+
+        :rtype: int
+        """
+        return self.__size
+
+
 class FrameData(commonh5.LazyLoadableDataset):
     """Expose a cube of image from a Fabio file using `FabioReader` as
     cache."""
@@ -113,19 +178,18 @@ class FrameData(commonh5.LazyLoadableDataset):
     def _create_data(self):
         return self.__fabio_reader.get_data()
 
+    def fabio_reader(self):
+        """Returns the reader providing the frames.
+
+        :rtype: FabioReader
+        """
+        return self.__fabio_reader
+
     def _update_cache(self):
-        if isinstance(self.__fabio_reader.fabio_file(),
-                      fabio.file_series.file_series):
-            # Reading all the files is taking too much time
-            # Reach the information from the only first frame
-            first_image = self.__fabio_reader.fabio_file().first_image()
-            self._dtype = first_image.data.dtype
-            shape0 = self.__fabio_reader.frame_count()
-            shape1, shape2 = first_image.data.shape
-            self._shape = shape0, shape1, shape2
-        else:
-            self._dtype = super(commonh5.LazyLoadableDataset, self).dtype
-            self._shape = super(commonh5.LazyLoadableDataset, self).shape
+        # Reading all the data is taking too much time
+        # The geometry is collected by the reader with the metadata
+        self._dtype = self.__fabio_reader.get_data_dtype()
+        self._shape = self.__fabio_reader.get_data_shape()
 
     @property
     def dtype(self):
@@ -139,22 +203,100 @@ class FrameData(commonh5.LazyLoadableDataset):
             self._update_cache()
         return self._shape
 
+    @property
+    def size(self):
+        return int(numpy.prod(self.shape))
+
+    def __len__(self):
+        return self.shape[0]
+
     def __iter__(self):
         for frame in self.__fabio_reader.iter_frames():
             yield frame.data
 
     def __getitem__(self, item):
-        # optimization for fetching a single frame if data not already loaded
-        if not self._is_initialized:
-            if isinstance(item, six.integer_types) and \
-                    isinstance(self.__fabio_reader.fabio_file(),
-                               fabio.file_series.file_series):
-                if item < 0:
-                    # negative indexing
-                    item += len(self)
-                return self.__fabio_reader.fabio_file().jump_image(item).data
+        # only read the requested frames if the cube is not already loaded
+        if not self._is_initialized and self.__fabio_reader.frame_count() > 1:
+            selection = self._split_selection(item)
+            if selection is not None:
+                frames, frame_item = selection
+                return self._read_frames(frames, frame_item)
         return super(FrameData, self).__getitem__(item)
 
+    def _split_selection(self, item):
+        """Split a selection into the selected frames and the selection
+        applied to each of them.
+
+        :returns: A tuple containing an int or a list of frame indexes, and
+            the selection to apply to each frame. None is returned if the
+            selection can't be split.
+        """
+        if not isinstance(item, tuple):
+            item = (item,)
+        if len(item) == 0:
+            return None
+        frame_count = self.shape[0]
+        first, others = item[0], item[1:]
+        for index in others:
+            if index is not Ellipsis and \
+                    not isinstance(index, (slice, numpy.integer) + six.integer_types):
+                # newaxis and fancy indexing are not supported
+                return None
+
+        if first is Ellipsis:
+            if len(others) == 0:
+                return None
+            if len(others) >= len(self.shape):
+                # the ellipsis is empty
+                return self._split_selection(others)
+            return numpy.arange(frame_count), item
+        elif isinstance(first, (numpy.integer,) + six.integer_types):
+            frame_id = int(first)
+            if frame_id < 0:
+                frame_id += frame_count
+            if not 0 <= frame_id < frame_count:
+                raise IndexError("Index (%d) out of range (0-%d)" %
+                                 (first, frame_count - 1))
+            return frame_id, others
+        elif isinstance(first, slice):
+            return numpy.arange(frame_count)[first], others
+        else:
+            first = numpy.asarray(first)
+            if first.size == 0:
+                first = first.astype(numpy.intp)
+            frames = numpy.arange(frame_count)[first]
+            if frames.ndim != 1:
+                return None
+            return frames, others
+
+    def _read_frames(self, frames, frame_item):
+        """Returns a selection of the cube reading only the requested frames.
+
+        :param Union[int,List[int]] frames: Index of the frames
+        :param tuple frame_item: Selection applied to each frame
+        :rtype: numpy.ndarray
+        """
+        reader = self.__fabio_reader
+        if isinstance(frames, six.integer_types):
+            data = reader.get_frame_data(frames)[frame_item]
+            if isinstance(data, numpy.ndarray):
+                # Do not expose the read-only frame stored in the cache
+                data = data.copy()
+            return data
+
+        # shape of a selected frame, without reading it
+        frame_shape = self.shape[1:]
+        dummy = numpy.lib.stride_tricks.as_strided(
+            numpy.zeros(1, dtype=self.dtype),
+            shape=frame_shape,
+            strides=(0,) * len(frame_shape))
+        selected_shape = dummy[frame_item].shape
+
+        result = numpy.empty((len(frames),) + selected_shape, dtype=self.dtype)
+        for index, frame_id in enumerate(frames):
+            result[index] = reader.get_frame_data(frame_id)[frame_item]
+        return result
+
 
 class RawHeaderData(commonh5.LazyLoadableDataset):
     """Lazy loadable raw header"""
@@ -326,7 +468,8 @@ class FabioReader(object):
     COUNTER = 1
     POSITIONER = 2
 
-    def __init__(self, file_name=None, fabio_image=None, file_series=None):
+    def __init__(self, file_name=None, fabio_image=None, file_series=None,
+                 prefetch=0, frame_cache_size=None):
         """
         Constructor
 
@@ -336,11 +479,27 @@ class FabioReader(object):
         :param Union[list[str],fabio.file_series.file_series] file_series: An
             list of file name or a :class:`fabio.file_series.file_series`
             instance
+        :param int prefetch: Number of frames decoded in advance by a pool of
+            threads. 0 (default) disables the read-ahead.
+        :param int frame_cache_size: Size in bytes of the cache of decoded
+            frames used to access a selection of frames. Default is
+            :data:`DEFAULT_FRAME_CACHE_SIZE`. 0 disables the cache.
         """
         self.__at_least_32bits = False
         self.__signed_type = False
 
+        self.__frame_lock = threading.RLock()
+        self.__prefetch = 0
+        self.__executor = None
+        self.__pending_frames = collections.OrderedDict()
+        if frame_cache_size is None:
+            frame_cache_size = DEFAULT_FRAME_CACHE_SIZE
+        self.__frame_cache = _FrameCache(frame_cache_size)
+        self.__frame_shape = None
+        self.__frame_dtypes = set([])
+
         self.__load(file_name, fabio_image, file_series)
+        self.set_prefetch(prefetch)
         self.__counters = {}
         self.__positioners = {}
         self.__measurements = {}
@@ -386,11 +545,58 @@ class FabioReader(object):
             # It looks like there is no close on FabioImage
             # self.__fabio_image.close()
             pass
+        self.set_prefetch(0)
+        self.__frame_cache.clear()
         self.__fabio_image = None
 
     def fabio_file(self):
         return self.__fabio_file
 
+    def _is_file_series(self):
+        return isinstance(self.__fabio_file, fabio.file_series.file_series)
+
+    def prefetch(self):
+        """Returns the number of frames decoded in advance.
+
+        :rtype: int
+        """
+        return self.__prefetch
+
+    def set_prefetch(self, prefetch, max_workers=None):
+        """Enable or disable the read-ahead of frames.
+
+        When enabled, :meth:`iter_frames` and :meth:`get_frame_data` decode
+        the next frames with a pool of threads while the current one is
+        processed. Frames are still provided in order.
+
+        Frames of a file series are decoded concurrently. Frames of a
+        multi-frame file share a single file handle, they are decoded by a
+        single thread.
+
+        :param int prefetch: Number of frames decoded in advance. 0 disables
+            the read-ahead.
+        :param int max_workers: Number of threads used to decode the frames.
+            Default is the number of CPUs, limited by `prefetch`.
+        """
+        if prefetch < 0:
+            raise ValueError("A positive number of frames is expected")
+        if self.__executor is not None:
+            for future in self.__pending_frames.values():
+                future.cancel()
+            self.__pending_frames.clear()
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+        self.__prefetch = prefetch
+        if prefetch == 0:
+            return
+
+        if not self._is_file_series():
+            max_workers = 1
+        elif max_workers is None:
+            max_workers = min(prefetch, multiprocessing.cpu_count())
+        self.__executor = concurrent_futures.ThreadPoolExecutor(
+            max_workers=max(1, max_workers))
+
     def frame_count(self):
         """Returns the number of frames available."""
         if isinstance(self.__fabio_file, fabio.file_series.file_series):
@@ -400,11 +606,139 @@ class FabioReader(object):
         else:
             raise TypeError("Unsupported type %s", self.__fabio_file.__class__)
 
+    def _load_frame(self, frame_id):
+        """Returns the frame `frame_id` as a fabio image.
+
+        This method can be called from the prefetching threads.
+
+        :param int frame_id: Index of the frame
+        :rtype: fabio.fabioimage.FabioImage
+        """
+        if self._is_file_series():
+            fabio_image = fabio.open(self.__fabio_file[frame_id])
+            # return the first frame only
+            assert(fabio_image.nframes == 1)
+            return fabio_image
+        with self.__frame_lock:
+            if self.__fabio_file.nframes == 1:
+                return self.__fabio_file
+            return self.__fabio_file.getframe(frame_id)
+
+    def get_frame_data(self, frame_id):
+        """Returns the data of a single frame.
+
+        The frame is normalized to the shape and the type of the frames of
+        the cube returned by :meth:`get_data`. It is stored in a least
+        recently used cache and must not be modified.
+
+        If the read-ahead is enabled, the following frames are scheduled to
+        be decoded in the background, which speeds up sequential browsing.
+
+        :param int frame_id: Index of the frame
+        :rtype: numpy.ndarray
+        """
+        if not 0 <= frame_id < self.frame_count():
+            raise IndexError("Frame index %d out of range" % frame_id)
+        data = self.__frame_cache.get(frame_id)
+        if data is None:
+            data = self._normalize_frame(self.__fetch_frame(frame_id).data)
+            data.flags.writeable = False
+            self.__frame_cache.put(frame_id, data)
+        return data
+
+    def __fetch_frame(self, frame_id):
+        """Returns a frame, using and feeding the read-ahead if enabled."""
+        if self.__executor is None:
+            return self._load_frame(frame_id)
+
+        pending = self.__pending_frames
+        future = pending.pop(frame_id, None)
+        # forget frames which are not expected anymore
+        for index in list(pending.keys()):
+            if not frame_id < index <= frame_id + self.__prefetch:
+                pending.pop(index).cancel()
+        last = min(frame_id + self.__prefetch, self.frame_count() - 1)
+        for index in range(frame_id + 1, last + 1):
+            if index not in pending and self.__frame_cache.get(index) is None:
+                pending[index] = self.__executor.submit(self._load_frame, index)
+
+        if future is None or future.cancelled():
+            return self._load_frame(frame_id)
+        return future.result()
+
+    def _normalize_frame(self, data):
+        """Returns the frame with the shape and the type of the frames of the
+        cube. If some images are smaller than expected, the empty space is
+        set to 0.
+
+        :param numpy.ndarray data: Data of a frame
+        :rtype: numpy.ndarray
+        """
+        shape = self.__frame_shape
+        dtype = self.get_data_dtype()
+        if data.shape == shape:
+            if data.dtype == dtype:
+                return data
+            return data.astype(dtype)
+        location = [slice(0, i) for i in data.shape]
+        while len(location) < len(shape):
+            location.append(0)
+        normalized = numpy.zeros(shape, dtype=dtype)
+        normalized[tuple(location)] = data
+        return normalized
+
+    def get_data_shape(self):
+        """Returns the shape of the cube returned by :meth:`get_data`, without
+        reading the data.
+
+        :rtype: tuple
+        """
+        if self.__frame_count == 1:
+            return self.__frame_shape
+        return (self.__frame_count,) + self.__frame_shape
+
+    def get_data_dtype(self):
+        """Returns the type of the cube returned by :meth:`get_data`, without
+        reading the data.
+
+        :rtype: numpy.dtype
+        """
+        return numpy.result_type(*self.__frame_dtypes)
+
     def iter_frames(self):
         """Iter all the available frames.
 
         A frame provides at least `data` and `header` attributes.
         """
+        if self.__executor is not None:
+            return self.__iter_prefetched_frames()
+        return self.__iter_frames()
+
+    def __iter_prefetched_frames(self):
+        """Iter all the frames while the next ones are decoded in the
+        background.
+        """
+        frame_count = self.frame_count()
+        executor = self.__executor
+        file_series = self._is_file_series()
+        pending = collections.deque()
+        next_frame = 0
+        try:
+            while next_frame < frame_count or len(pending) > 0:
+                # keep the queue bounded
+                while next_frame < frame_count and len(pending) < self.__prefetch:
+                    pending.append(executor.submit(self._load_frame, next_frame))
+                    next_frame += 1
+                fabio_image = pending.popleft().result()
+                yield fabio_image
+                if file_series and hasattr(fabio_image, "close"):
+                    fabio_image.close()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def __iter_frames(self):
+        """Iter all the frames from the calling thread."""
         if isinstance(self.__fabio_file, fabio.file_series.file_series):
             for file_number in range(len(self.__fabio_file)):
                 with self.__fabio_file.jump_image(file_number) as fabio_image:
@@ -428,36 +762,21 @@ class FabioReader(object):
 
         The computation is cached into the class, and only done ones.
         """
-        images = []
-        for fabio_frame in self.iter_frames():
-            images.append(fabio_frame.data)
-
+        frames = self.iter_frames()
         # returns the data without extra dim in case of single frame
-        if len(images) == 1:
-            return images[0]
-
-        # get the max size
-        max_dim = max([i.ndim for i in images])
-        max_shape = [0] * max_dim
-        for image in images:
-            for dim in range(image.ndim):
-                if image.shape[dim] > max_shape[dim]:
-                    max_shape[dim] = image.shape[dim]
-        max_shape = tuple(max_shape)
-
-        # fix smallest images
-        for index, image in enumerate(images):
-            if image.shape == max_shape:
-                continue
-            location = [slice(0, i) for i in image.shape]
-            while len(location) < max_dim:
+        if self.__frame_count == 1:
+            return next(frames).data
+
+        # frames are copied one by one into a cube which is not yet
+        # allocated in memory
+        data = numpy.zeros(self.get_data_shape(), dtype=self.get_data_dtype())
+        for frame_id, fabio_frame in enumerate(frames):
+            image = fabio_frame.data
+            location = [frame_id] + [slice(0, i) for i in image.shape]
+            while len(location) < data.ndim:
                 location.append(0)
-            normalized_image = numpy.zeros(max_shape, dtype=image.dtype)
-            normalized_image[location] = image
-            images[index] = normalized_image
-
-        # create a cube
-        return numpy.array(images)
+            data[tuple(location)] = image
+        return data
 
     def __get_dict(self, kind):
         """Returns a dictionary from according to an expected kind"""
@@ -541,6 +860,27 @@ class FabioReader(object):
             if file_series:
                 self._enable_key_filters(fabio_frame)
             self._read_frame(frame_id, fabio_frame.header)
+            self.__read_frame_geometry(fabio_frame)
+
+    def __read_frame_geometry(self, fabio_frame):
+        """Update the shape and the type of the frames of the cube with a
+        frame."""
+        if hasattr(fabio_frame, "shape"):
+            # Can be provided by the header without decoding the data
+            shape, dtype = fabio_frame.shape, fabio_frame.dtype
+        else:
+            shape, dtype = fabio_frame.data.shape, fabio_frame.data.dtype
+        self.__frame_dtypes.add(numpy.dtype(dtype))
+        if self.__frame_shape is None:
+            self.__frame_shape = tuple(shape)
+            return
+        max_shape = list(self.__frame_shape)
+        for dim, size in enumerate(shape):
+            if dim >= len(max_shape):
+                max_shape.append(size)
+            elif size > max_shape[dim]:
+                max_shape[dim] = size
+        self.__frame_shape = tuple(max_shape)
 
     def _is_filtered_key(self, key):
         """
@@ -746,8 +1086,10 @@ class EdfFabioReader(FabioReader):
     motor_mne are parsed using a special way.
     """
 
-    def __init__(self, file_name=None, fabio_image=None, file_series=None):
-        FabioReader.__init__(self, file_name, fabio_image, file_series)
+    def __init__(self, file_name=None, fabio_image=None, file_series=None,
+                 prefetch=0, frame_cache_size=None):
+        FabioReader.__init__(self, file_name, fabio_image, file_series,
+                             prefetch, frame_cache_size)
         self.__unit_cell_abc = None
         self.__unit_cell_alphabetagamma = None
         self.__ub_matrix = None
@@ -903,7 +1245,8 @@ class File(commonh5.File):
     """Class which handle a fabio image as a mimick of a h5py.File.
     """
 
-    def __init__(self, file_name=None, fabio_image=None, file_series=None):
+    def __init__(self, file_name=None, fabio_image=None, file_series=None,
+                 prefetch=0, frame_cache_size=None):
         """
         Constructor
 
@@ -913,8 +1256,16 @@ class File(commonh5.File):
         :param Union[list[str],fabio.file_series.file_series] file_series: An
             list of file name or a :class:`fabio.file_series.file_series`
             instance
+        :param int prefetch: Number of frames decoded in advance by a pool of
+            threads when frames are read sequentially. 0 (default) disables
+            the read-ahead. See :meth:`FabioReader.set_prefetch`.
+        :param int frame_cache_size: Size in bytes of the cache of decoded
+            frames used to access a selection of frames without loading the
+            whole cube. Default is :data:`DEFAULT_FRAME_CACHE_SIZE`.
         """
-        self.__fabio_reader = self.create_fabio_reader(file_name, fabio_image, file_series)
+        self.__fabio_reader = self.create_fabio_reader(file_name, fabio_image,
+                                                       file_series, prefetch,
+                                                       frame_cache_size)
         if fabio_image is not None:
             file_name = fabio_image.filename
 
@@ -956,7 +1307,8 @@ class File(commonh5.File):
 
         return scan
 
-    def create_fabio_reader(self, file_name, fabio_image, file_series):
+    def create_fabio_reader(self, file_name, fabio_image, file_series,
+                            prefetch=0, frame_cache_size=None):
         """Factory to create fabio reader.
 
         :rtype: FabioReader"""
@@ -989,9 +1341,11 @@ class File(commonh5.File):
             assert(False)
 
         if use_edf_reader:
-            reader = EdfFabioReader(file_name, fabio_image, file_series)
+            reader = EdfFabioReader(file_name, fabio_image, file_series,
+                                    prefetch, frame_cache_size)
         else:
-            reader = FabioReader(file_name, fabio_image, file_series)
+            reader = FabioReader(file_name, fabio_image, file_series,
+                                 prefetch, frame_cache_size)
         return reader
 
     def close(self):
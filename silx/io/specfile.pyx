@@ -74,6 +74,17 @@ provided by :class:`Scan`::
     for mca_data in first_scan.mca:
         print(sum(mca_data))
 
+Opening a large file requires reading it entirely to build the index of its
+scans. This index can be stored in a file, which is used as a cache
+the next time the file is opened, possibly by another process::
+
+    sf = SpecFile("test.dat", index_file=True)
+
+A file which is still being written can be followed by reading only its
+new content::
+
+    new_scan_indices = sf.refresh()
+
 Classes
 =======
 
@@ -218,6 +229,7 @@ class MCA(object):
     """
     def __init__(self, scan):
         self._scan = scan
+        self._data = None
 
         # Header dict
         self._header = scan.mca_header_dict
@@ -269,6 +281,23 @@ class MCA(object):
         """
         return self._scan._specfile.number_of_mca(self._scan.index)
 
+    @cython.embedsignature(False)
+    @property
+    def data(self):
+        """All MCA spectra of the scan as a 2D numpy.ndarray, one spectrum
+        per row.
+
+        The spectra are read in a single pass over the scan, the first time
+        this attribute is accessed. The array is shared and read-only.
+
+        :raise ValueError: If the spectra do not have the same length
+        """
+        if self._data is None:
+            data = self._scan._specfile.get_all_mca(self._scan.index)
+            data.flags.writeable = False
+            self._data = data
+        return self._data
+
     def __getitem__(self, key):
         """Return a single MCA data line
 
@@ -294,6 +323,8 @@ class MCA(object):
             msg = "MCA index must be in range 0-%d" % (len(self) - 1)
             raise IndexError(msg)
 
+        if self._data is not None:
+            return self._data[mca_index]
         return self._scan._specfile.get_mca(self._scan.index,
                                             mca_index)
 
@@ -493,9 +524,13 @@ class Scan(object):
         (e.g. data.shape).
 
         The first index is the detector, the second index is the sample index.
+
+        The array is read only once, it is shared and read-only.
         """
         if self._data is None:
-            self._data = numpy.transpose(self._specfile.data(self._index))
+            data = numpy.transpose(self._specfile.data(self._index))
+            data.flags.writeable = False
+            self._data = data
 
         return self._data
 
@@ -573,10 +608,19 @@ class Scan(object):
             ``#L`` line of the scan header.
         :type label: str
 
-        :return: Line data as a 1D array of doubles
+        :return: Column data as a 1D array of doubles. It is a read-only view
+            on :attr:`data`.
         :rtype: numpy.ndarray
         """
         try:
+            if label in self._labels:
+                column_index = self._labels.index(label)
+                if column_index < self.data.shape[0]:
+                    # view on the data block, which is read only once
+                    return self.data[column_index]
+                if self.data.size == 0:
+                    # aborted scan, already logged while reading data
+                    return numpy.empty((0, ), numpy.double)
             ret = self._specfile.data_column_by_name(self._index, label)
         except SfErrLineNotFound:
             # Could be a "#C Scan aborted after 0 points"
@@ -598,6 +642,10 @@ class Scan(object):
         return self._specfile.motor_position_by_name(self._index, name)
 
 
+INDEX_FILE_EXTENSION = ".sfi"
+"""Extension of the default index file of a SpecFile"""
+
+
 def _string_to_char_star(string_):
     """Convert a string to ASCII encoded bytes when using python3"""
     if sys.version_info[0] >= 3 and not isinstance(string_, bytes):
@@ -630,6 +678,12 @@ cdef class SpecFile(object):
     """
 
     :param filename: Path of the SpecFile to read
+    :param index_file: Path of a file used as a persistent cache of the scan
+        index. If it is valid, the SpecFile is not read again. If data was
+        appended to the SpecFile, only the new part is read. The index file
+        is written if it is missing or outdated. If ``True``, the index file
+        is *filename* followed by the ``.sfi`` extension. Default is None, the
+        whole file is read and no index file is used.
 
     This class wraps the main data and header access functions of the C
     SpecFile library.
@@ -639,13 +693,22 @@ cdef class SpecFile(object):
         specfile_wrapper.SpecFileHandle *handle
         str filename
 
-    def __cinit__(self, filename):
+    def __cinit__(self, filename, index_file=None):
         cdef int error = 0
         self.handle = NULL
 
         if is_specfile(filename):
+            if index_file is True:
+                index_file = (_string_to_char_star(filename) +
+                              _string_to_char_star(INDEX_FILE_EXTENSION))
             filename = _string_to_char_star(filename)
-            self.handle = specfile_wrapper.SfOpen(filename, &error)
+            if index_file:
+                index_file = _string_to_char_star(index_file)
+                self.handle = specfile_wrapper.SfOpenIndexed(filename,
+                                                             index_file,
+                                                             &error)
+            else:
+                self.handle = specfile_wrapper.SfOpen(filename, &error)
             if error:
                 self._handle_error(error)
         else:
@@ -653,7 +716,7 @@ cdef class SpecFile(object):
             # this causes the destructor to be called
             self._handle_error(SF_ERR_FILE_OPEN)
 
-    def __init__(self, filename):
+    def __init__(self, filename, index_file=None):
         if not isinstance(filename, str):
             # encode unicode to str in python 2
             if sys.version_info[0] < 3:
@@ -681,6 +744,33 @@ cdef class SpecFile(object):
         """
         return specfile_wrapper.SfScanNo(self.handle)
 
+    def refresh(self):
+        """Read the data written to the file since it was opened or last
+        refreshed.
+
+        Only the end of the file is read, starting from the beginning of
+        its last scan. If the file was truncated, it is read again entirely.
+
+        :class:`Scan` objects created before the refresh are not updated,
+        and must be created again from this :class:`SpecFile`.
+
+        :return: Indices of the scans which were added or read again.
+            The first one is the previously last scan, which may be
+            unchanged if data was only appended as new scans.
+            The list is empty if the file was not modified.
+        :rtype: list of int
+        """
+        cdef int error = SF_ERR_NO_ERRORS
+        previous_len = len(self)
+        updated = specfile_wrapper.SfUpdate(self.handle, &error)
+        self._handle_error(error)
+        if not updated:
+            return []
+        if updated == 2:
+            # the file was read again from the start
+            return list(range(len(self)))
+        return list(range(max(previous_len - 1, 0), len(self)))
+
     def __iter__(self):
         """Return the next :class:`Scan` in a SpecFile each time this method
         is called.
@@ -1270,3 +1360,47 @@ cdef class SpecFile(object):
 
         free(mca_data)
         return numpy.asarray(ret_array)
+
+    def get_all_mca(self, scan_index):
+        """Return all MCA spectra of a scan
+
+        The data block of the scan is read only once, as the spectra are
+        read in the order of the file.
+
+        :param scan_index: Unique scan index between ``0`` and ``len(self)-1``.
+        :type scan_index: int
+
+        :return: MCA spectra, one per row
+        :rtype: 2D numpy array
+        :raise ValueError: If the spectra do not have the same length
+        """
+        cdef:
+            int error = SF_ERR_NO_ERRORS
+            double* mca_data
+            long num_mca, len_mca, i, j
+            double[:, :] ret_array
+
+        num_mca = self.number_of_mca(scan_index)
+        if num_mca == 0:
+            return numpy.empty((0, 0), dtype=numpy.double)
+
+        for i in range(num_mca):
+            len_mca = specfile_wrapper.SfGetMca(self.handle,
+                                                scan_index + 1,
+                                                i + 1,
+                                                &mca_data,
+                                                &error)
+            self._handle_error(error)
+            if i == 0:
+                ret_array = numpy.empty((num_mca, len_mca),
+                                        dtype=numpy.double)
+            elif len_mca != ret_array.shape[1]:
+                free(mca_data)
+                raise ValueError("MCA spectra of scan %d do not have the "
+                                 "same length" % scan_index)
+
+            for j in range(len_mca):
+                ret_array[i, j] = mca_data[j]
+            free(mca_data)
+
+        return numpy.asarray(ret_array)
@@ -138,6 +138,7 @@ typedef struct _SpecFile{
   long           *data_info;
   SfCursor        cursor;
   short           updating;
+  char           *idxname;
 } SpecFile;
 
 typedef struct _SpecFileOut{
@@ -171,6 +172,8 @@ typedef struct _SpecScan {
  * init
  */
 DllExport extern    SpecFile  *SfOpen        ( char *name, int *error );
+DllExport extern    SpecFile  *SfOpenIndexed ( char *name, char *idxname,
+                                                int *error );
 DllExport extern    short      SfUpdate      ( SpecFile *sf,int *error );
 DllExport extern    int        SfClose       ( SpecFile *sf );
 
@@ -135,17 +135,39 @@
 
 DllExport SpecFile * SfOpen   ( char *name,int *error);
 DllExport SpecFile * SfOpen2  ( int fd, char *name,int *error);
+DllExport SpecFile * SfOpenIndexed ( char *name, char *idxname, int *error);
 DllExport int        SfClose  ( SpecFile *sf);
 DllExport short      SfUpdate ( SpecFile *sf, int *error);
 DllExport char     * SfError  ( int error);
 
 
 #ifdef linux
-char SF_SIGNATURE[] =  "Linux 2ruru Sf2.0";
+char SF_SIGNATURE[] =  "Linux 2ruru Sf3.0";
 #else
-char SF_SIGNATURE[] =  "2ruru Sf2.0";
+char SF_SIGNATURE[] =  "2ruru Sf3.0";
 #endif
 
+/*
+ * Size of the blocks at the beginning and at the end of the indexed
+ * part of the file used to detect a modification of the file
+ */
+#define SF_HASH_SIZE 4096
+
+#ifdef _WINDOWS
+#define SF_INDEX_WRITEFLAG  O_CREAT | O_WRONLY | O_TRUNC | O_BINARY
+#else
+#define SF_INDEX_WRITEFLAG  O_CREAT | O_WRONLY | O_TRUNC
+#endif
+
+typedef struct _SfIndexHeader {
+    long          file_size;   /* size of the indexed part of the file */
+    long          m_time;      /* modification time of the file */
+    unsigned long head_hash;   /* hash of the first bytes of the file */
+    unsigned long tail_hash;   /* hash of the last bytes indexed */
+    long          no_scans;    /* number of SpecScan stored */
+    long          scan_size;   /* sizeof(SpecScan) */
+} SfIndexHeader;
+
 /*
  * Internal functions
  */
@@ -158,11 +180,12 @@ static void  sfSaveScan    ( SpecFile *sf, SfCursor *cursor, int *error);
 static void  sfAssignScanNumbers (SpecFile *sf);
 static void  sfReadFile    ( SpecFile *sf, SfCursor *cursor, int *error);
 static void  sfResumeRead  ( SpecFile *sf, SfCursor *cursor, int *error);
-#ifdef SPECFILE_USE_INDEX_FILE
+static SpecFile *sfOpenFile ( int fd, char *name, char *idxname, int *error);
+static void  sfFreeScans   ( SpecFile *sf );
+static unsigned long sfHashRange ( int fd, long offset, long size);
 static short sfOpenIndex   ( SpecFile *sf, SfCursor *cursor, int *error);
 static short sfReadIndex   ( int sfi, SpecFile *sf, SfCursor *cursor, int *error);
 static void  sfWriteIndex  ( SpecFile *sf, SfCursor *cursor, int *error);
-#endif
 
 /*
  * errors
@@ -252,6 +275,60 @@ SfOpen(char *name, int *error) {
 
 DllExport SpecFile *
 SfOpen2(int fd, char *name,int *error) {
+#ifdef SPECFILE_USE_INDEX_FILE
+   SpecFile   *sf;
+   char       *idxname;
+
+   idxname = (char *)malloc(sizeof(char) * (strlen(name) + strlen(SF_ISFX) + 1));
+   sprintf(idxname,"%s%s",name,SF_ISFX);
+   sf = sfOpenFile(fd, name, idxname, error);
+   free(idxname);
+   return(sf);
+#else
+   return(sfOpenFile(fd, name, (char *)NULL, error));
+#endif
+}
+
+
+/*********************************************************************
+ *
+ *   Function:          SpecFile *SfOpenIndexed( name, idxname, error )
+ *
+ *   Description:       Opens connection to Spec data file using an
+ *                      index file as a cache of the scan list.
+ *
+ *                      If the index file is valid, the file is not read.
+ *                      If data was appended to the file since the index
+ *                      was written, only the new part of the file is
+ *                      read. Else the whole file is read. The index file
+ *                      is written if it was not up to date.
+ *
+ *   Parameters:
+ *              Input :
+ *                      (1) name    (file name)
+ *                      (2) idxname (index file name)
+ *              Output:
+ *                      (3) error number
+ *   Returns:
+ *                      SpecFile pointer.
+ *                      NULL if not successful.
+ *
+ *   Possible errors:
+ *                      SF_ERR_FILE_OPEN
+ *                      SF_ERR_MEMORY_ALLOC
+ *
+ *********************************************************************/
+DllExport SpecFile *
+SfOpenIndexed(char *name, char *idxname, int *error) {
+
+   int         fd;
+   fd   = open(name,SF_OPENFLAG);
+   return (sfOpenFile(fd, name, idxname, error));
+}
+
+
+static SpecFile *
+sfOpenFile(int fd, char *name, char *idxname, int *error) {
    SpecFile   *sf;
    short       idxret;
    SfCursor      cursor;
@@ -277,6 +354,7 @@ SfOpen2(int fd, char *name,int *error) {
    sf->fd     = fd;
    sf->m_time = mystat.st_mtime;
    sf->sfname = (char *)strdup(name);
+   sf->idxname = (idxname == NULL) ? (char *)NULL : (char *)strdup(idxname);
 
    sf->list.first      = (ObjectList *)NULL;
    sf->list.last       = (ObjectList *)NULL;
@@ -310,16 +388,15 @@ SfOpen2(int fd, char *name,int *error) {
    cursor.data         = 0;
    cursor.file_header  = 0;
 
-
-#ifdef SPECFILE_USE_INDEX_FILE
   /*
    * Check if index file
    *   open it and continue from there
    */
-   idxret = sfOpenIndex(sf,&cursor,error);
-#else
-   idxret = SF_INIT;
-#endif
+   if (sf->idxname != NULL) {
+       idxret = sfOpenIndex(sf,&cursor,error);
+   } else {
+       idxret = SF_INIT;
+   }
 
    switch(idxret) {
       case SF_MODIFIED:
@@ -342,12 +419,12 @@ SfOpen2(int fd, char *name,int *error) {
 
   /*
    * Once is all done assign scan numbers and orders
+   * (they are stored in the index file)
    */
-   sfAssignScanNumbers(sf);
-
-#ifdef SPECFILE_USE_INDEX_FILE
-   if (idxret != SF_READY) sfWriteIndex(sf,&cursor,error);
-#endif
+   if (idxret != SF_READY) {
+       sfAssignScanNumbers(sf);
+       if (sf->idxname != NULL) sfWriteIndex(sf,&cursor,error);
+   }
    return(sf);
 }
 
@@ -383,6 +460,8 @@ SfClose( SpecFile *sf )
      }
 
      free ((char *)sf->sfname);
+     if (sf->idxname != NULL)
+        free ((char *)sf->idxname);
      if (sf->scanbuffer != NULL)
         free ((char *)sf->scanbuffer);
 
@@ -406,6 +485,9 @@ SfClose( SpecFile *sf )
  *
  *   Description:       Updates connection to Spec data file .
  *                      Appends to index list in memory.
+ *                      If data was appended to the file, it is read from
+ *                      the beginning of the last scan. If the file was
+ *                      truncated, it is read again from the start.
  *
  *   Parameters:
  *              Input :
@@ -415,6 +497,7 @@ SfClose( SpecFile *sf )
  *   Returns:
  *                      ( 0 ) => Nothing done.
  *                      ( 1 ) => File was updated
+ *                      ( 2 ) => File was read again from the start
  *
  *   Possible errors:
  *                      SF_ERR_FILE_OPEN
@@ -426,28 +509,51 @@ SfUpdate ( SpecFile *sf, int *error )
 {
     struct stat mystat;
     long   mtime;
+    short  ret = 1;
    /*printf("In SfUpdate\n");
    __asm("int3");*/
-    stat(sf->sfname,&mystat);
+    if (fstat(sf->fd,&mystat) != 0) {
+       *error = SF_ERR_FILE_OPEN;
+       return(0);
+    }
 
     mtime = mystat.st_mtime;
 
-    if (sf->m_time != mtime)  {
-       sfResumeRead (sf,&(sf->cursor),error);
-       sfReadFile   (sf,&(sf->cursor),error);
-
-       sf->m_time = mtime;
-       sfAssignScanNumbers(sf);
-#ifdef SPECFILE_USE_INDEX_FILE
-       sfWriteIndex (sf,&(sf->cursor),error);
-#endif
-       return(1);
-    }else{
+    if (sf->m_time == mtime && (long)mystat.st_size == sf->cursor.bytecnt)
        return(0);
+
+   /*
+    * Buffers of the current scan may be outdated
+    */
+    freeAllData(sf);
+    sf->current = (ObjectList *)NULL;
+
+    if ((long)mystat.st_size < sf->cursor.bytecnt ||
+            sf->cursor.what != SCAN || sf->list.last == (ObjectList *)NULL) {
+       sfFreeScans (sf);
+       sf->cursor.bytecnt      = 0;
+       sf->cursor.cursor       = 0;
+       sf->cursor.scanno       = 0;
+       sf->cursor.hdafoffset   = -1;
+       sf->cursor.dataoffset   = -1;
+       sf->cursor.mcaspectra   = 0;
+       sf->cursor.what         = 0;
+       sf->cursor.data         = 0;
+       sf->cursor.file_header  = 0;
+       lseek(sf->fd,0,SEEK_SET);
+       ret = 2;
+    } else {
+       sfResumeRead (sf,&(sf->cursor),error);
     }
+    sfReadFile   (sf,&(sf->cursor),error);
+
+    sf->m_time = mtime;
+    sfAssignScanNumbers(sf);
+    if (sf->idxname != NULL) sfWriteIndex (sf,&(sf->cursor),error);
+    return(ret);
 }
 
-
+
 /*********************************************************************
  *
  *   Function:		char *SfError( code )
@@ -546,104 +652,178 @@ sfResumeRead  ( SpecFile *sf, SfCursor *cursor, int *error) {
 }
 
 
-#ifdef SPECFILE_USE_INDEX_FILE
-static short
-sfOpenIndex ( SpecFile *sf, SfCursor *cursor, int *error) {
-    char *idxname;
-    short namelength;
-    int   sfi;
+static void
+sfFreeScans( SpecFile *sf ) {
+     register ObjectList  *ptr;
+     register ObjectList  *prevptr;
 
-    namelength = strlen(sf->sfname) + strlen(SF_ISFX) + 1;
+     for( ptr=sf->list.last ; ptr ; ptr=prevptr ) {
+          free( (SpecScan *)ptr->contents );
+          prevptr = ptr->prev;
+          free( (ObjectList *)ptr );
+     }
+     sf->list.first = (ObjectList *)NULL;
+     sf->list.last  = (ObjectList *)NULL;
+     sf->no_scans   = 0;
+}
 
-    idxname = (char *)malloc(sizeof(char) * namelength);
 
-    sprintf(idxname,"%s%s",sf->sfname,SF_ISFX);
+/*
+ * FNV-1a hash of a part of the file
+ */
+static unsigned long
+sfHashRange( int fd, long offset, long size ) {
+    unsigned long  hash = 2166136261UL;
+    unsigned char  buffer[SF_HASH_SIZE];
+    long           bytesread, i;
+
+    if (size > SF_HASH_SIZE) size = SF_HASH_SIZE;
+    lseek(fd,offset,SEEK_SET);
+    bytesread = read(fd,buffer,size);
+    for (i = 0; i < bytesread; i++) {
+        hash ^= buffer[i];
+        hash = (hash * 16777619UL) & 0xFFFFFFFFUL;
+    }
+    return(hash);
+}
+
+
+static short
+sfOpenIndex ( SpecFile *sf, SfCursor *cursor, int *error) {
+    int   sfi;
+    short ret;
 
-    if ((sfi = open(idxname,SF_OPENFLAG)) == -1) {
-        free(idxname);
+    if ((sfi = open(sf->idxname,SF_OPENFLAG)) == -1) {
         return(SF_INIT);
-    } else {
-        free(idxname);
-        return(sfReadIndex(sfi,sf,cursor,error));
     }
+    ret = sfReadIndex(sfi,sf,cursor,error);
+    close(sfi);
+
+    /*
+     * The file is read from the beginning
+     */
+    if (ret == SF_INIT) {
+        lseek(sf->fd,0,SEEK_SET);
+    }
+    return(ret);
 }
 
-
+
 static short
 sfReadIndex   ( int sfi, SpecFile *sf, SfCursor *cursor, int *error) {
-    SfCursor   filecurs;
-    char       buffer[200];
-    long       bytesread,i=0;
-    SpecScan   scan;
-    short      modif = 0;
-    long       mtime;
+    SfCursor      filecurs;
+    SfIndexHeader header;
+    char          buffer[sizeof(SF_SIGNATURE)];
+    long          bytesread,i=0;
+    long          hashsize;
+    SpecScan      scan;
+    struct stat   mystat;
 
    /*
     * read signature
     */
     bytesread = read(sfi,buffer,sizeof(SF_SIGNATURE));
-    if (strcmp(buffer,SF_SIGNATURE) || bytesread == 0 ) {
+    if (bytesread != sizeof(SF_SIGNATURE) || memcmp(buffer,SF_SIGNATURE,sizeof(SF_SIGNATURE))) {
         return(SF_INIT);
     }
 
    /*
-    * read cursor and specfile structure
+    * read header and cursor
     */
-    if ( read(sfi,&mtime,   sizeof(long)) == 0)   return(SF_INIT);
-    if ( read(sfi,&filecurs, sizeof(SfCursor)) == 0) return(SF_INIT);
+    if ( read(sfi,&header, sizeof(SfIndexHeader)) != sizeof(SfIndexHeader))
+        return(SF_INIT);
+    if ( header.scan_size != sizeof(SpecScan) )
+        return(SF_INIT);
+    if ( read(sfi,&filecurs, sizeof(SfCursor)) != sizeof(SfCursor))
+        return(SF_INIT);
 
-    if (sf->m_time != mtime)  modif = 1;
+   /*
+    * check that the indexed part of the file is unchanged
+    */
+    if (fstat(sf->fd,&mystat) != 0 || (long)mystat.st_size < header.file_size)
+        return(SF_INIT);
+    if (sfHashRange(sf->fd, 0, header.file_size) != header.head_hash)
+        return(SF_INIT);
+    hashsize = header.file_size < SF_HASH_SIZE ? header.file_size : SF_HASH_SIZE;
+    if (sfHashRange(sf->fd, header.file_size - hashsize, hashsize) != header.tail_hash)
+        return(SF_INIT);
+    if ((long)mystat.st_size == header.file_size && sf->m_time != header.m_time)
+        /* same size but modified */
+        return(SF_INIT);
+    if ((long)mystat.st_size > header.file_size &&
+            (filecurs.what != SCAN || header.no_scans == 0))
+        /* only appended scans can be read incrementally */
+        return(SF_INIT);
 
-    while(read(sfi,&scan, sizeof(SpecScan))) {
+    while(i < header.no_scans && read(sfi,&scan, sizeof(SpecScan)) == sizeof(SpecScan)) {
         addToList(&(sf->list), (void *)&scan, (long)sizeof(SpecScan));
         i++;
     }
+    if (i != header.no_scans) {
+        sfFreeScans(sf);
+        return(SF_INIT);
+    }
     sf->no_scans = i;
 
     memcpy(cursor,&filecurs,sizeof(SfCursor));
 
-    if (modif) return(SF_MODIFIED);
+    if ((long)mystat.st_size > header.file_size) return(SF_MODIFIED);
 
     return(SF_READY);
 }
 
-
+
 static void
 sfWriteIndex  ( SpecFile *sf, SfCursor *cursor, int *error) {
 
-    int         fdi;
-    char       *idxname;
-    short       namelength;
-    ObjectList *obj;
-    long        mtime;
+    int           fdi;
+    char         *tmpname;
+    ObjectList   *obj;
+    SfIndexHeader header;
+    long          hashsize;
+    short         failed = 0;
+
+    header.file_size = cursor->bytecnt;
+    header.m_time    = sf->m_time;
+    header.head_hash = sfHashRange(sf->fd, 0, header.file_size);
+    hashsize = header.file_size < SF_HASH_SIZE ? header.file_size : SF_HASH_SIZE;
+    header.tail_hash = sfHashRange(sf->fd, header.file_size - hashsize, hashsize);
+    header.no_scans  = 0;
+    for( obj = sf->list.first; obj ; obj = obj->next)
+        header.no_scans++;
+    header.scan_size = sizeof(SpecScan);
 
-    namelength = strlen(sf->sfname) + strlen(SF_ISFX) + 1;
-
-    idxname = (char *)malloc(sizeof(char) * namelength);
-
-    sprintf(idxname,"%s%s",sf->sfname,SF_ISFX);
+   /*
+    * Write a temporary file which is then renamed, so that other
+    * processes never read a partial index
+    */
+    tmpname = (char *)malloc(sizeof(char) * (strlen(sf->idxname) + 5));
+    sprintf(tmpname,"%s.tmp",sf->idxname);
 
-    /* if ((fdi = open(idxname,SF_WRITEFLAG,SF_UMASK)) == -1) { */
-    if ((fdi = open(idxname,O_CREAT | O_WRONLY,SF_UMASK)) == -1) {
-        printf("    - cannot open. Error: (%d)\n",errno);
-        free(idxname);
-        return;
-    } else {
-        mtime = sf->m_time;
-        write(fdi,SF_SIGNATURE,sizeof(SF_SIGNATURE));
- /*
-  * Swap bytes for linux
-  */
-        write(fdi, (void *) &mtime, sizeof(long));
-        write(fdi, (void *) cursor, sizeof(SfCursor));
-        for( obj = sf->list.first; obj ; obj = obj->next)
-           write(fdi,(void *) obj->contents, sizeof(SpecScan));
-        close(fdi);
-        free(idxname);
+    if ((fdi = open(tmpname,SF_INDEX_WRITEFLAG,SF_UMASK)) == -1) {
+        /* The index is a cache, it is not an error to miss it */
+        free(tmpname);
         return;
     }
+    if (write(fdi,SF_SIGNATURE,sizeof(SF_SIGNATURE)) != sizeof(SF_SIGNATURE))
+        failed = 1;
+    if (write(fdi, (void *) &header, sizeof(SfIndexHeader)) != sizeof(SfIndexHeader))
+        failed = 1;
+    if (write(fdi, (void *) cursor, sizeof(SfCursor)) != sizeof(SfCursor))
+        failed = 1;
+    for( obj = sf->list.first; obj && !failed ; obj = obj->next)
+        if (write(fdi,(void *) obj->contents, sizeof(SpecScan)) != sizeof(SpecScan))
+            failed = 1;
+    close(fdi);
+
+    if (!failed) {
+        remove(sf->idxname);
+        if (rename(tmpname, sf->idxname) != 0) failed = 1;
+    }
+    if (failed) remove(tmpname);
+    free(tmpname);
+    return;
 }
-#endif
 
 
 /*****************************************************************************
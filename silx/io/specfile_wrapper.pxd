@@ -37,6 +37,8 @@ ctypedef _SpecFile SpecFileHandle
 cdef extern from "SpecFileCython.h":
     # sfinit
     SpecFileHandle* SfOpen(char*, int*)
+    SpecFileHandle* SfOpenIndexed(char*, char*, int*)
+    short SfUpdate(SpecFileHandle*, int*)
     int SfClose(SpecFileHandle*)
     char* SfError(int)
     
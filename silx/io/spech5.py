@@ -157,6 +157,13 @@ You can test for existence of data or groups::
     >>> "spam" in sfh5["1.1"]
     False
 
+A file which is still being written can be followed. :meth:`SpecH5.refresh`
+reads only the new content of the file, and returns the names of the nodes
+which were added or modified::
+
+    >>> sfh5.refresh()
+    ['/3.1/measurement/Pslit HGap', '/4.1']
+
 .. note::
 
     Text used to be stored with a dtype ``numpy.string_`` in silx versions
@@ -432,11 +439,22 @@ def _demultiplex_mca(scan, analyser_index):
     :param scan: :class:`Scan` instance containing the MCA data
     :param analyser_index: 0-based index referencing the analyser
     :type analyser_index: int
-    :return: 2D numpy array containing all spectra for one analyser
+    :return: 2D numpy array containing all spectra for one analyser. It is
+        a view on the spectra of all analysers if they have the same length.
     """
     number_of_analysers = _get_number_of_mca_analysers(scan)
     number_of_spectra = len(scan.mca)
     number_of_spectra_per_analyser = number_of_spectra // number_of_analysers
+
+    try:
+        spectra = scan.mca.data
+    except ValueError:
+        # analysers with different spectrum lengths
+        pass
+    else:
+        stop = number_of_spectra_per_analyser * number_of_analysers
+        return spectra[analyser_index:stop:number_of_analysers]
+
     len_spectrum = len(scan.mca[analyser_index])
 
     mca_array = numpy.empty((number_of_spectra_per_analyser, len_spectrum))
@@ -459,7 +477,7 @@ class SpecH5Dataset(object):
     Datasets must also inherit :class:`SpecH5NodeDataset` or
     :class:`SpecH5LazyNodeDataset` which actually implement all the
     API."""
-    pass
+    __slots__ = ()
 
 
 class SpecH5NodeDataset(commonh5.Dataset, SpecH5Dataset):
@@ -468,6 +486,8 @@ class SpecH5NodeDataset(commonh5.Dataset, SpecH5Dataset):
     proxy behavior that allows to mimic the numpy array stored in this
     class.
     """
+    __slots__ = ()
+
     def __init__(self, name, data, parent=None, attrs=None):
         # get proper value types, to inherit from numpy
         # attributes (dtype, shape, size)
@@ -480,8 +500,8 @@ class SpecH5NodeDataset(commonh5.Dataset, SpecH5Dataset):
         elif isinstance(data, int):
             value = numpy.int_(data)
         else:
-            # Enforce numpy array
-            array = numpy.array(data)
+            # Enforce numpy array, without copying views on scan data
+            array = numpy.asarray(data)
             data_kind = array.dtype.kind
 
             if data_kind in ["S", "U"]:
@@ -511,6 +531,8 @@ class SpecH5LazyNodeDataset(commonh5.LazyLoadableDataset, SpecH5Dataset):
     implemented to return the numpy data exposed by the dataset. This factory
     method is only called once, when the data is needed.
     """
+    __slots__ = ()
+
     def __getattr__(self, item):
         """Proxy to underlying numpy array methods.
         """
@@ -540,7 +562,7 @@ class SpecH5Group(object):
 
     Groups must also inherit :class:`silx.io.commonh5.Group`, which
     actually implements all the methods and attributes."""
-    pass
+    __slots__ = ()
 
 
 class SpecH5(commonh5.File, SpecH5Group):
@@ -550,16 +572,18 @@ class SpecH5(commonh5.File, SpecH5Group):
     which implements most of its API.
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename, index_file=None):
         """
         :param filename: Path to SpecFile in filesystem
         :type filename: str
+        :param index_file: Path of a persistent cache of the scan index,
+            or True to use a default name. See :class:`SpecFile`.
         """
         if isinstance(filename, io.IOBase):
             # see https://github.com/silx-kit/silx/issues/858
             filename = filename.name
 
-        self._sf = SpecFile(filename)
+        self._sf = SpecFile(filename, index_file=index_file)
 
         attrs = {"NX_class": to_h5py_utf8("NXroot"),
                  "file_time": to_h5py_utf8(
@@ -568,26 +592,112 @@ class SpecH5(commonh5.File, SpecH5Group):
                  "creator": to_h5py_utf8("silx spech5 %s" % silx_version)}
         commonh5.File.__init__(self, filename, attrs=attrs)
 
+        # scan groups are only read when accessed
         for scan_key in self._sf.keys():
-            scan = self._sf[scan_key]
-            scan_group = ScanGroup(scan_key, parent=self, scan=scan)
-            self.add_node(scan_group)
+            self.add_node(ScanGroup(scan_key, parent=self))
+
+    def refresh(self):
+        """Read the data written to the SPEC file since it was opened or
+        last refreshed, and update the tree.
+
+        New scans are added as new groups. The nodes of a scan which was
+        extended (e.g. new data lines or MCA spectra) are updated in place,
+        so that references to existing nodes remain valid.
+
+        :return: Names of the nodes which were added, modified or removed.
+            Children of an added node are not listed.
+        :rtype: list of str
+        """
+        changed = []
+        scan_indices = self._sf.refresh()
+        if not scan_indices:
+            return changed
+
+        scan_keys = self._sf.keys()
+        items = self._get_items()
+        for scan_key in list(items.keys()):
+            if scan_key not in scan_keys:
+                changed.append(self._remove_node(scan_key).name)
+
+        for scan_index in scan_indices:
+            scan_key = scan_keys[scan_index]
+            scan_group = ScanGroup(scan_key, parent=self)
+            if scan_key in items:
+                if items[scan_key]._is_initialized:
+                    _update_node(items[scan_key], scan_group, changed)
+                else:
+                    # its content will be read from the updated file
+                    changed.append(items[scan_key].name)
+            else:
+                self.add_node(scan_group)
+                changed.append(scan_group.name)
+        return changed
 
     def close(self):
         self._sf.close()
         self._sf = None
 
 
-class ScanGroup(commonh5.Group, SpecH5Group):
-    def __init__(self, scan_key, parent, scan):
+def _update_node(node, new_node, changed):
+    """Update a node with the content of the same node created from a more
+    recent state of the file.
+
+    :param commonh5.Node node: Node to update
+    :param commonh5.Node new_node: Node with the updated content
+    :param list changed: List to which the names of updated nodes are
+        appended
+    """
+    if isinstance(node, commonh5.Group):
+        items = node._get_items()
+        new_items = new_node._get_items()
+        for name in list(items.keys()):
+            if name not in new_items:
+                changed.append(node._remove_node(name).name)
+        for name, new_child in list(new_items.items()):
+            child = items.get(name)
+            if child is None or child.h5_class != new_child.h5_class:
+                node.add_node(new_child)
+                changed.append(new_child.name)
+            else:
+                _update_node(child, new_child, changed)
+    elif isinstance(node, McaDataDataset):
+        modified = node.shape != new_node.shape
+        node._update(new_node)
+        if modified:
+            changed.append(node.name)
+    elif isinstance(node, commonh5.Dataset):
+        data = node[()]
+        new_data = new_node[()]
+        if (numpy.shape(data) != numpy.shape(new_data) or
+                not numpy.array_equal(data, new_data)):
+            node._set_data(new_data)
+            changed.append(node.name)
+
+
+class ScanGroup(commonh5.LazyLoadableGroup, SpecH5Group):
+    __slots__ = ("_scan",)
+
+    def __init__(self, scan_key, parent, scan=None):
         """
 
+        The content of the group is created the first time it is accessed.
+
         :param parent: parent Group
         :param str scan_key: Scan key (e.g. "1.1")
-        :param scan: specfile.Scan object
+        :param scan: specfile.Scan object. If None, the scan is read from
+            the :class:`SpecH5` parent when the content is created.
         """
-        commonh5.Group.__init__(self, scan_key, parent=parent,
-                                attrs={"NX_class": to_h5py_utf8("NXentry")})
+        commonh5.LazyLoadableGroup.__init__(
+            self, scan_key, parent=parent,
+            attrs={"NX_class": to_h5py_utf8("NXentry")})
+        self._scan = scan
+
+    def _create_child(self):
+        scan_key = self.basename
+        scan = self._scan
+        if scan is None:
+            scan = self.parent._sf[scan_key]
+        self._scan = None
 
         # take title in #S after stripping away scan number and spaces
         s_hdr_line = scan.scan_header_dict["S"]
@@ -630,6 +740,8 @@ class ScanGroup(commonh5.Group, SpecH5Group):
 
 
 class InstrumentGroup(commonh5.Group, SpecH5Group):
+    __slots__ = ()
+
     def __init__(self, parent, scan):
         """
 
@@ -650,6 +762,8 @@ class InstrumentGroup(commonh5.Group, SpecH5Group):
 
 
 class InstrumentSpecfileGroup(commonh5.Group, SpecH5Group):
+    __slots__ = ()
+
     def __init__(self, parent, scan):
         commonh5.Group.__init__(self, name="specfile", parent=parent,
                                 attrs={"NX_class": to_h5py_utf8("NXcollection")})
@@ -666,6 +780,8 @@ class InstrumentSpecfileGroup(commonh5.Group, SpecH5Group):
 
 
 class PositionersGroup(commonh5.Group, SpecH5Group):
+    __slots__ = ()
+
     def __init__(self, parent, scan):
         commonh5.Group.__init__(self, name="positioners", parent=parent,
                                 attrs={"NX_class": to_h5py_utf8("NXcollection")})
@@ -684,6 +800,8 @@ class PositionersGroup(commonh5.Group, SpecH5Group):
 
 
 class InstrumentMcaGroup(commonh5.Group, SpecH5Group):
+    __slots__ = ()
+
     def __init__(self, parent, analyser_index, scan):
         name = "mca_%d" % analyser_index
         commonh5.Group.__init__(self, name=name, parent=parent,
@@ -741,6 +859,8 @@ class InstrumentMcaGroup(commonh5.Group, SpecH5Group):
 
 class McaDataDataset(SpecH5LazyNodeDataset):
     """Lazy loadable dataset for MCA data"""
+    __slots__ = ("_scan", "_analyser_index", "_shape", "_num_analysers")
+
     def __init__(self, parent, analyser_index, scan):
         commonh5.LazyLoadableDataset.__init__(
             self, name="data", parent=parent,
@@ -753,6 +873,17 @@ class McaDataDataset(SpecH5LazyNodeDataset):
     def _create_data(self):
         return _demultiplex_mca(self._scan, self._analyser_index)
 
+    def _update(self, dataset):
+        """Expose the data of another dataset of the same MCA analyser,
+        created from a more recent state of the file.
+
+        :param McaDataDataset dataset: The updated dataset
+        """
+        self._scan = dataset._scan
+        self._shape = dataset._shape
+        self._num_analysers = dataset._num_analysers
+        self._is_initialized = False
+
     @property
     def shape(self):
         if self._shape is None:
@@ -800,6 +931,8 @@ class McaDataDataset(SpecH5LazyNodeDataset):
 
 
 class MeasurementGroup(commonh5.Group, SpecH5Group):
+    __slots__ = ()
+
     def __init__(self, parent, scan):
         """
 
@@ -808,10 +941,22 @@ class MeasurementGroup(commonh5.Group, SpecH5Group):
         """
         commonh5.Group.__init__(self, name="measurement", parent=parent,
                                 attrs={"NX_class": to_h5py_utf8("NXcollection"),})
-        for label in scan.labels:
+        # convert the data block only once, columns are views on it
+        data = None
+        if scan.labels and scan.data.dtype.kind == "f":
+            data = numpy.asarray(scan.data, dtype=numpy.float32)
+            # Columns share this block: do not allow to modify it
+            data.flags.writeable = False
+
+        for column_index, label in enumerate(scan.labels):
             safe_label = label.replace("/", "%")
+            if (data is not None and column_index < data.shape[0] and
+                    scan.labels.index(label) == column_index):
+                column = data[column_index]
+            else:
+                column = scan.data_column_by_name(label)
             self.add_node(SpecH5NodeDataset(name=safe_label,
-                                            data=scan.data_column_by_name(label),
+                                            data=column,
                                             parent=self))
 
         num_analysers = _get_number_of_mca_analysers(scan)
@@ -820,6 +965,8 @@ class MeasurementGroup(commonh5.Group, SpecH5Group):
 
 
 class MeasurementMcaGroup(commonh5.Group, SpecH5Group):
+    __slots__ = ()
+
     def __init__(self, parent, analyser_index):
         basename = "mca_%d" % analyser_index
         commonh5.Group.__init__(self, name=basename, parent=parent,
@@ -835,6 +982,8 @@ class MeasurementMcaGroup(commonh5.Group, SpecH5Group):
 
 
 class SampleGroup(commonh5.Group, SpecH5Group):
+    __slots__ = ()
+
     def __init__(self, parent, scan):
         """
 
@@ -292,6 +292,37 @@ class TestSpecificCommonH5(unittest.TestCase):
         group["b"] = commonh5.SoftLink(None, path="/" + self.id() + "/a")
         self.assertEqual(group["b"].dtype.kind, "i")
 
+    def test_node_slots(self):
+        node = commonh5.Dataset("foo", data=numpy.array([1]))
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(len(node.attrs), 0)
+
+    def test_path_index(self):
+        f = commonh5.File(name="Foo", mode="w")
+        f["a/b/c"] = 1
+        node = f["a/b/c"]
+        self.assertIs(f["/a/b/c"], node)
+        self.assertIn("a/b/c", f._get_path_index())
+
+        # replacing a group must not keep the previous children
+        f["a"].add_node(commonh5.Group("b"))
+        self.assertNotIn("a/b/c", f)
+        self.assertRaises(KeyError, f.__getitem__, "a/b/c")
+        f["a/b/c"] = 2
+        self.assertEqual(f["/a/b/c"][()], 2)
+
+        f["a/b"]._remove_node("c")
+        self.assertRaises(KeyError, f.__getitem__, "/a/b/c")
+
+    def test_visit_link_to_group(self):
+        f = commonh5.File(name="Foo", mode="w")
+        f["group/a"] = 1
+        f["group/sub/b"] = 2
+        f["link"] = commonh5.SoftLink(None, path="/group")
+        names = []
+        f["link"].visit(names.append)
+        self.assertEqual(names, ["a", "sub", "sub/b"])
+
 
 def suite():
     loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
@@ -0,0 +1,122 @@
+# coding: utf-8
+# /*##########################################################################
+# Copyright (C) 2016-2017 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# ############################################################################*/
+"""Tests for convert module"""
+
+__license__ = "MIT"
+__date__ = "18/10/2018"
+
+import numpy
+import os
+import shutil
+import tempfile
+import unittest
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+if h5py is not None:
+    from .. import commonh5
+    from ..convert import write_to_h5
+    from ..convert import _iter_chunk_aligned_blocks
+
+
+if h5py is not None:
+    class _CountingDataset(commonh5.Dataset):
+        """Dataset recording the size of the selections which are read"""
+
+        def __init__(self, name, data, parent=None):
+            commonh5.Dataset.__init__(self, name, data, parent)
+            self.read_sizes = []
+
+        def __getitem__(self, item):
+            data = commonh5.Dataset.__getitem__(self, item)
+            self.read_sizes.append(numpy.asarray(data).nbytes)
+            return data
+
+
+@unittest.skipIf(h5py is None, "Could not import h5py")
+class TestBlockCopy(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.h5_fname = os.path.join(self.tmp_dir, "output.h5")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def testBlocks(self):
+        blocks = list(_iter_chunk_aligned_blocks((10, 7), (4, 3), 1, 24))
+        # 2 chunks along the last axis are merged
+        self.assertEqual(blocks[0], (slice(0, 4), slice(0, 6)))
+        self.assertEqual(blocks[1], (slice(0, 4), slice(6, 7)))
+        self.assertEqual(len(blocks), 6)
+        covered = numpy.zeros((10, 7), dtype=int)
+        for block in blocks:
+            covered[block] += 1
+        self.assertTrue(numpy.all(covered == 1))
+
+    def testContiguousBlocks(self):
+        blocks = list(_iter_chunk_aligned_blocks((10, 7), None, 8, 8 * 20))
+        # full rows are merged
+        self.assertEqual(blocks[0], (slice(0, 2), slice(0, 7)))
+        self.assertEqual(len(blocks), 5)
+
+    def testWriteLargeDataset(self):
+        data = numpy.arange(100 * 30, dtype=numpy.float64).reshape(100, 30)
+        h5like = commonh5.File("input")
+        dataset = _CountingDataset("data", data)
+        h5like.add_node(dataset)
+
+        write_to_h5(h5like, self.h5_fname,
+                    create_dataset_args={"chunks": (10, 30)},
+                    buffer_size=5000)
+        # 2 chunks of 2400 bytes per block
+        self.assertEqual(dataset.read_sizes, [4800] * 5)
+        with h5py.File(self.h5_fname, "r") as h5f:
+            self.assertEqual(h5f["data"].chunks, (10, 30))
+            numpy.testing.assert_array_equal(h5f["data"][()], data)
+
+    def testWriteSmallDataset(self):
+        data = numpy.arange(100 * 30, dtype=numpy.float64).reshape(100, 30)
+        h5like = commonh5.File("input")
+        dataset = _CountingDataset("data", data)
+        h5like.add_node(dataset)
+
+        write_to_h5(h5like, self.h5_fname)
+        self.assertEqual(dataset.read_sizes, [])
+        with h5py.File(self.h5_fname, "r") as h5f:
+            numpy.testing.assert_array_equal(h5f["data"][()], data)
+
+
+def suite():
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestBlockCopy))
+    return test_suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest="suite")
@@ -45,7 +45,8 @@ from silx.utils.testutils import TestLogging
 
 from ..configdict import ConfigDict
 from ..dictdump import dicttoh5, dicttojson, dump
-from ..dictdump import h5todict, load
+from ..dictdump import h5todict, load, LazyH5Dataset
+from .. import dictdump
 from ..dictdump import logger as dictdump_logger
 
 
@@ -114,6 +115,23 @@ class TestDictToH5(unittest.TestCase):
         res = h5todict(self.h5_fname)
         assert(res['t'] == False)
 
+    def testH5BlockWrite(self):
+        block_size = dictdump._WRITE_BLOCK_SIZE
+        dictdump._WRITE_BLOCK_SIZE = 1000
+        try:
+            data = numpy.arange(10 * 33 * 7, dtype=numpy.float64)
+            data.shape = 10 * 33, 7
+            dicttoh5({"data": data, "small": numpy.arange(3)}, self.h5_fname,
+                     create_dataset_args={"chunks": True})
+        finally:
+            dictdump._WRITE_BLOCK_SIZE = block_size
+
+        with h5py.File(self.h5_fname, "r") as h5f:
+            self.assertIsNotNone(h5f["data"].chunks)
+            numpy.testing.assert_array_equal(h5f["data"][...], data)
+            numpy.testing.assert_array_equal(h5f["small"][...],
+                                             numpy.arange(3))
+
 
 @unittest.skipIf(h5py_missing, "Could not import h5py")
 class TestH5ToDict(unittest.TestCase):
@@ -136,6 +154,34 @@ class TestH5ToDict(unittest.TestCase):
         self.assertIn("coordinates", ddict["Grenoble"])
         self.assertIn("area", ddict["Grenoble"])
 
+    def testLazy(self):
+        ddict = h5todict(self.h5_fname, lazy=True)
+        coordinates = ddict["Europe"]["France"]["Grenoble"]["coordinates"]
+        self.assertIsInstance(coordinates, LazyH5Dataset)
+        self.assertEqual(coordinates.shape, (2,))
+        self.assertEqual(coordinates[1], 5.7196)
+        numpy.testing.assert_array_equal(numpy.array(coordinates),
+                                         [45.1830, 5.7196])
+
+        # lazy values can be written back to a file
+        tempname = os.path.join(self.tempdir, "copy.h5")
+        try:
+            dicttoh5(ddict, tempname)
+            copy = h5todict(tempname)
+        finally:
+            os.unlink(tempname)
+        self.assertEqual(
+            copy["Europe"]["France"]["Grenoble"]["inhabitants"], 160215)
+
+    def testMemoryMap(self):
+        ddict = h5todict(self.h5_fname, path="/Europe/France", mmap=True)
+        coordinates = ddict["Grenoble"]["coordinates"]
+        self.assertIsInstance(coordinates, numpy.memmap)
+        numpy.testing.assert_array_equal(coordinates, [45.1830, 5.7196])
+        # Scalar datasets are stored compact and read as usual
+        self.assertEqual(ddict["Grenoble"]["inhabitants"], 160215)
+        del ddict, coordinates
+
 
 class TestDictToJson(unittest.TestCase):
     def setUp(self):
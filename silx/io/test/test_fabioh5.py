@@ -465,6 +465,23 @@ class TestFabioH5MultiFrames(unittest.TestCase):
         self.assertGreaterEqual(dataset.dtype.itemsize, 4)
         self.assertEqual(dataset.dtype.kind, "i")
 
+    def test_prefetch(self):
+        h5 = fabioh5.File(fabio_image=self.fabio_file, prefetch=2)
+        dataset = h5["/scan_0/instrument/detector_0/data"]
+        self.assertEqual(dataset[4][0, 0], 4)
+        frames = [frame[0, 0] for frame in dataset]
+        self.assertEqual(frames, list(range(10)))
+        h5.close()
+
+    def test_frame_selection(self):
+        h5 = fabioh5.File(fabio_image=self.fabio_file)
+        dataset = h5["/scan_0/instrument/detector_0/data"]
+        self.assertEqual(dataset.shape, (10, 3, 2))
+        self.assertEqual(dataset[3:6, 0, 0].tolist(), [3, 4, 5])
+        self.assertFalse(dataset._is_initialized)
+        self.assertEqual(dataset[()][:, 0, 0].tolist(), list(range(10)))
+        self.assertTrue(dataset._is_initialized)
+
 
 class TestFabioH5WithEdf(unittest.TestCase):
 
@@ -580,6 +597,60 @@ class TestFabioH5WithFileSeries(unittest.TestCase):
         self.assertEqual(frameData.dtype.kind, "i")
         self.assertEqual(frameData.shape, (10, 3, 2))
 
+    def testPrefetch(self):
+        h5_image = fabioh5.File(file_series=self.edf_filenames, prefetch=3)
+        self._testH5Image(h5_image)
+        dataset = h5_image["/scan_0/instrument/detector_0/data"]
+        frames = [frame[0, 0] for frame in dataset]
+        self.assertEqual(frames, list(range(10)))
+        h5_image.close()
+
+    def testFrameSelection(self):
+        file_series = fabioh5._FileSeries(self.edf_filenames)
+        reader = fabioh5.FabioReader(file_series=file_series)
+        frameData = _TestableFrameData("foo", reader)
+        self.assertEqual(len(frameData), 10)
+        self.assertEqual(frameData.size, 60)
+        self.assertEqual(list(frameData[2:8:2, 0, 0]), [2, 4, 6])
+        self.assertEqual(list(frameData[[9, 1, 1], 0, 0]), [9, 1, 1])
+        self.assertEqual(frameData[::-1, 1:, 1].shape, (10, 2))
+        self.assertEqual(frameData[..., 0, 0].tolist(), list(range(10)))
+        self.assertEqual(frameData[-2, 0, 0], 8)
+        self.assertRaises(IndexError, lambda: frameData[10])
+
+    def testFrameSelectionIsWritable(self):
+        file_series = fabioh5._FileSeries(self.edf_filenames)
+        reader = fabioh5.FabioReader(file_series=file_series)
+        frameData = _TestableFrameData("foo", reader)
+        for item in (3, (3, slice(1, None))):
+            frame = frameData[item]
+            self.assertTrue(frame.flags.writeable)
+            frame += 1
+            # The cached frame is not modified
+            self.assertEqual(frameData[3][0, 0], 3)
+
+    def testFrameCache(self):
+        file_series = fabioh5._FileSeries(self.edf_filenames)
+        frame_size = 3 * 2 * numpy.dtype(numpy.int64).itemsize
+        reader = fabioh5.FabioReader(file_series=file_series,
+                                     frame_cache_size=3 * frame_size)
+        frame = reader.get_frame_data(5)
+        self.assertIs(reader.get_frame_data(5), frame)
+        self.assertFalse(frame.flags.writeable)
+        for i in range(4):
+            reader.get_frame_data(i)
+        # dropped by the least recently used policy
+        self.assertIsNot(reader.get_frame_data(5), frame)
+
+    def testPrefetchGetItem(self):
+        file_series = fabioh5._FileSeries(self.edf_filenames)
+        reader = fabioh5.FabioReader(file_series=file_series, prefetch=4)
+        frameData = _TestableFrameData("foo", reader)
+        for i in [0, 1, 2, 7, 3, -1]:
+            self.assertEqual(frameData[i][0, 0], i % 10)
+        reader.close()
+        self.assertEqual(reader.prefetch(), 0)
+
 
 def suite():
     loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
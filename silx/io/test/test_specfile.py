@@ -32,6 +32,7 @@ import locale
 import logging
 import numpy
 import os
+import shutil
 import sys
 import tempfile
 import unittest
@@ -301,6 +302,18 @@ class TestSpecFile(unittest.TestCase):
         with self.assertRaises(specfile.SfErrColNotFound):
             self.scan25.data_column_by_name("ygfxgfyxg")
 
+    def test_data_column_view(self):
+        column = self.scan25.data_column_by_name("col2")
+        self.assertTrue(numpy.shares_memory(column, self.scan25.data))
+        self.assertEqual(column.tolist(), [0.2, 1.2, 2.2, 3.2])
+        # the shared data block must not be modified through a view
+        with self.assertRaises(ValueError):
+            column[0] = 99.
+        with self.assertRaises(ValueError):
+            self.scan25.data[0, 0] = 99.
+        self.assertEqual(self.scan25.data_column_by_name("col2").tolist(),
+                         [0.2, 1.2, 2.2, 3.2])
+
     def test_motors(self):
         self.assertEqual(len(self.scan1.motor_names), 6)
         self.assertEqual(len(self.scan1.motor_positions), 6)
@@ -354,6 +367,18 @@ class TestSpecFile(unittest.TestCase):
         self.assertEqual(line_count, 3)
         self.assertAlmostEqual(total_sum, 36.8)
 
+    def test_mca_data(self):
+        mca_data = self.scan1_2.mca.data
+        self.assertEqual(mca_data.shape, (3, 3))
+        self.assertEqual(mca_data.tolist(),
+                         [[0, 1, 2], [3.1, 4, 5], [6, 7.7, 8]])
+        self.assertEqual(self.scan1_2.mca[1].tolist(), [3.1, 4, 5])
+        self.assertEqual(self.scan1.mca.data.shape, (0, 0))
+        with self.assertRaises(ValueError):
+            mca_data[0, 0] = 99.
+        with self.assertRaises(ValueError):
+            self.scan1_2.mca[1][0] = 99.
+
     def test_mca_header(self):
         self.assertEqual(self.scan1.mca_header_dict, {})
         self.assertEqual(len(self.scan1_2.mca_header_dict), 4)
@@ -378,6 +403,156 @@ class TestSpecFile(unittest.TestCase):
         self.assertEqual(col1.shape, (0, ))
 
 
+class TestSpecFileIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.fname = os.path.join(self.tmp_dir, "data.dat")
+        self.index_name = os.path.join(self.tmp_dir, "data.idx")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, text, mode="wb"):
+        with open(self.fname, mode) as f:
+            if sys.version_info < (3, ):
+                f.write(text)
+            else:
+                f.write(bytes(text, 'ascii'))
+
+    def _assertSameScans(self, sf):
+        reference = SpecFile(self.fname)
+        self.assertEqual(sf.keys(), reference.keys())
+        for scan, ref_scan in zip(sf, reference):
+            self.assertEqual(scan.header, ref_scan.header)
+            numpy.testing.assert_array_equal(scan.data, ref_scan.data)
+            self.assertEqual(len(scan.mca), len(ref_scan.mca))
+        reference.close()
+
+    def test_create_and_reuse(self):
+        self._write(sftext)
+        sf = SpecFile(self.fname, index_file=self.index_name)
+        self.assertTrue(os.path.isfile(self.index_name))
+        self._assertSameScans(sf)
+        sf.close()
+
+        inode = os.stat(self.index_name).st_ino
+        sf = SpecFile(self.fname, index_file=self.index_name)
+        self._assertSameScans(sf)
+        sf.close()
+        if inode != 0:
+            # the index was up to date, it was not written again
+            self.assertEqual(os.stat(self.index_name).st_ino, inode)
+
+    def test_default_name(self):
+        self._write(sftext)
+        sf = SpecFile(self.fname, index_file=True)
+        sf.close()
+        self.assertTrue(os.path.isfile(self.fname + ".sfi"))
+
+    def test_default_name_bytes(self):
+        self._write(sftext)
+        sf = SpecFile(self.fname.encode(), index_file=True)
+        self.assertEqual(len(sf), 4)
+        sf.close()
+        self.assertTrue(os.path.isfile(self.fname + ".sfi"))
+
+    def test_appended_scans(self):
+        split = sftext.index("#S 26")
+        self._write(sftext[:split])
+        sf = SpecFile(self.fname, index_file=self.index_name)
+        self.assertEqual(len(sf), 2)
+        sf.close()
+
+        self._write(sftext[split:], mode="ab")
+        sf = SpecFile(self.fname, index_file=self.index_name)
+        self.assertEqual(len(sf), 4)
+        self._assertSameScans(sf)
+        sf.close()
+
+    def test_modified_file(self):
+        self._write(sftext)
+        sf = SpecFile(self.fname, index_file=self.index_name)
+        sf.close()
+
+        self._write(sftext[sftext.index("#S 25"):])
+        sf = SpecFile(self.fname, index_file=self.index_name)
+        self.assertEqual(len(sf), 3)
+        self._assertSameScans(sf)
+        sf.close()
+
+    def test_corrupted_index(self):
+        self._write(sftext)
+        with open(self.index_name, "wb") as f:
+            f.write(b"not an index")
+        sf = SpecFile(self.fname, index_file=self.index_name)
+        self._assertSameScans(sf)
+        sf.close()
+
+
+class TestSpecFileRefresh(unittest.TestCase):
+    def setUp(self):
+        fd, self.fname = tempfile.mkstemp(text=False)
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.fname)
+
+    def _write(self, text, mode="wb"):
+        with open(self.fname, mode) as f:
+            if sys.version_info < (3, ):
+                f.write(text)
+            else:
+                f.write(bytes(text, 'ascii'))
+
+    def test_unchanged(self):
+        self._write(sftext)
+        sf = SpecFile(self.fname)
+        self.assertEqual(sf.refresh(), [])
+        self.assertEqual(len(sf), 4)
+        sf.close()
+
+    def test_new_scans(self):
+        split = sftext.index("#S 26")
+        self._write(sftext[:split])
+        sf = SpecFile(self.fname)
+        self.assertEqual(len(sf), 2)
+
+        self._write(sftext[split:], mode="ab")
+        self.assertEqual(sf.refresh(), [1, 2, 3])
+        self.assertEqual(sf.keys(), ["1.1", "25.1", "26.1", "1.2"])
+        self.assertEqual(sf[3].data.shape, (2, 3))
+        self.assertEqual(len(sf[3].mca), 3)
+        self.assertEqual(sf.refresh(), [])
+        sf.close()
+
+    def test_extended_scan(self):
+        split = sftext.index("5 6\n@A")
+        self._write(sftext[:split])
+        sf = SpecFile(self.fname)
+        self.assertEqual(sf[3].data.shape, (2, 2))
+        self.assertEqual(len(sf[3].mca), 2)
+
+        self._write(sftext[split:], mode="ab")
+        self.assertEqual(sf.refresh(), [3])
+        self.assertEqual(len(sf), 4)
+        self.assertEqual(sf[3].data.shape, (2, 3))
+        self.assertEqual(sf[3].data_line(2).tolist(), [5, 6])
+        self.assertEqual(len(sf[3].mca), 3)
+        self.assertEqual(sf[3].mca[2].tolist(), [6, 7.7, 8])
+        sf.close()
+
+    def test_truncated_file(self):
+        self._write(sftext)
+        sf = SpecFile(self.fname)
+        self.assertEqual(len(sf), 4)
+
+        self._write(sftext[sftext.index("#S 25"):sftext.index("#S 26")])
+        self.assertEqual(sf.refresh(), [0])
+        self.assertEqual(sf.keys(), ["25.1"])
+        self.assertEqual(sf[0].data.shape, (4, 4))
+        sf.close()
+
+
 class TestSFLocale(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -417,6 +592,10 @@ def suite():
     test_suite = unittest.TestSuite()
     test_suite.addTest(
         unittest.defaultTestLoader.loadTestsFromTestCase(TestSpecFile))
+    test_suite.addTest(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestSpecFileIndex))
+    test_suite.addTest(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestSpecFileRefresh))
     test_suite.addTest(
         unittest.defaultTestLoader.loadTestsFromTestCase(TestSFLocale))
     return test_suite
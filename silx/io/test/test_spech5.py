@@ -22,6 +22,7 @@
 #
 # ############################################################################*/
 """Tests for spech5"""
+import numpy
 from numpy import array_equal
 import os
 import io
@@ -248,6 +249,21 @@ class TestSpecH5(unittest.TestCase):
         # Link
         self.assertIn("/1.2/measurement/mca_0/info/calibration", self.sfh5)
 
+    def testLazyScanGroups(self):
+        sfh5 = SpecH5(self.fname)
+        self.assertEqual(len(sfh5), 5)
+        self.assertEqual(list(sfh5.keys()),
+                         ["1.1", "25.1", "1.2", "1000.1", "1001.1"])
+        scan_groups = [sfh5[key] for key in sfh5.keys()]
+        self.assertFalse(any(group._is_initialized for group in scan_groups))
+        self.assertEqual(sfh5["/25.1"].attrs["NX_class"], "NXentry")
+        self.assertFalse(sfh5["/25.1"]._is_initialized)
+
+        self.assertIn("measurement", sfh5["/25.1"])
+        self.assertTrue(sfh5["/25.1"]._is_initialized)
+        self.assertEqual(sum(group._is_initialized for group in scan_groups), 1)
+        sfh5.close()
+
     def testContainsGroup(self):
         self.assertIn("measurement", self.sfh5["/1.2/"])
         self.assertIn("measurement", self.sfh5["/1.2"])
@@ -268,6 +284,18 @@ class TestSpecH5(unittest.TestCase):
                 sum(self.sfh5["1.1"]["measurement"]["MRTSlit UP"]),
                 87.891, places=4)
 
+    def testDataColumnViews(self):
+        columns = self.sfh5["/1.1/measurement"]
+        column0 = columns["MRTSlit UP"][()]
+        column1 = columns["second column"][()]
+        self.assertEqual(column0.dtype, numpy.float32)
+        # columns share the data block of the scan
+        self.assertTrue(numpy.may_share_memory(column0, column1))
+        # so they must not be modified in place
+        with self.assertRaises(ValueError):
+            column0[0] = 99.
+        self.assertAlmostEqual(columns["MRTSlit UP"][0], -1.23, places=4)
+
     def testDate(self):
         # start time is in Iso8601 format
         self.assertEqual(self.sfh5["/1.1/start_time"],
@@ -581,6 +609,85 @@ class TestSpecH5(unittest.TestCase):
             sfh5.close()
 
 
+class TestSpecH5Refresh(unittest.TestCase):
+    def setUp(self):
+        fd, self.fname = tempfile.mkstemp(text=False)
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.fname)
+
+    def _write(self, text, mode="wb"):
+        with open(self.fname, mode) as f:
+            if sys.version_info < (3, ):
+                f.write(text)
+            else:
+                f.write(bytes(text, 'ascii'))
+
+    def testRefresh(self):
+        split = sftext.index("5 6\n@A")
+        self._write(sftext[:split])
+        sfh5 = SpecH5(self.fname)
+        self.assertEqual(list(sfh5.keys()), ["1.1", "25.1", "1.2"])
+        column = sfh5["/1.2/measurement/uno"]
+        mca_data = sfh5["/1.2/instrument/mca_0/data"]
+        self.assertEqual(column.shape, (2,))
+        self.assertEqual(mca_data.shape, (2, 3))
+        self.assertEqual(sfh5.refresh(), [])
+
+        self._write(sftext[split:], mode="ab")
+        changed = sfh5.refresh()
+        self.assertEqual(list(sfh5.keys()),
+                         ["1.1", "25.1", "1.2", "1000.1", "1001.1"])
+        self.assertIn("/1.2/measurement/uno", changed)
+        self.assertIn("/1.2/instrument/mca_0/data", changed)
+        self.assertIn("/1000.1", changed)
+        self.assertIn("/1001.1", changed)
+        self.assertNotIn("/1.2/title", changed)
+        self.assertNotIn("/1.1", changed)
+
+        # nodes are updated in place
+        self.assertIs(sfh5["/1.2/measurement/uno"], column)
+        self.assertEqual(column[()].tolist(), [1, 3, 5])
+        self.assertIs(sfh5["/1.2/instrument/mca_0/data"], mca_data)
+        self.assertEqual(mca_data.shape, (3, 3))
+        self.assertEqual(mca_data[2].tolist(), [6, 7.7, 8])
+        self.assertEqual(mca_data[()].shape, (3, 3))
+        sfh5.close()
+
+    def testRefreshRemovedColumns(self):
+        self._write(sftext_refresh_labels)
+        sfh5 = SpecH5(self.fname)
+        measurement = sfh5["/1.1/measurement"]
+        column = measurement["uno"]
+        self.assertEqual(set(measurement.keys()), {"uno", "duo", "tre"})
+
+        # rewrite the scan with other labels
+        self._write(sftext_refresh_labels.replace(
+            "#N 3\n#L uno  duo  tre\n1 2 3\n3 4 5",
+            "#N 2\n#L uno  quattro\n1 2\n3 4"))
+        changed = sfh5.refresh()
+        self.assertIn("/1.1/measurement/duo", changed)
+        self.assertIn("/1.1/measurement/tre", changed)
+        self.assertIn("/1.1/measurement/quattro", changed)
+        self.assertEqual(set(measurement.keys()), {"uno", "quattro"})
+        self.assertNotIn("duo", sfh5["/1.1/measurement"])
+        self.assertIs(sfh5["/1.1/measurement/uno"], column)
+        self.assertEqual(sfh5["/1.1/measurement/quattro"][()].tolist(),
+                         [2, 4])
+        sfh5.close()
+
+
+sftext_refresh_labels = """#F /tmp/refresh.dat
+
+#S 1 aaaaaa
+#N 3
+#L uno  duo  tre
+1 2 3
+3 4 5
+"""
+
+
 sftext_multi_mca_headers = """
 #S 1 aaaaaa
 #@MCA %16C
@@ -870,6 +977,8 @@ def suite():
         unittest.defaultTestLoader.loadTestsFromTestCase(TestSpecDate))
     test_suite.addTest(
         unittest.defaultTestLoader.loadTestsFromTestCase(TestSpecH5MultiMca))
+    test_suite.addTest(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestSpecH5Refresh))
     test_suite.addTest(
         unittest.defaultTestLoader.loadTestsFromTestCase(TestSpecH5NoDataCols))
     test_suite.addTest(
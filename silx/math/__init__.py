@@ -36,4 +36,5 @@ __date__ = "11/05/2017"
 
 from .histogram import Histogramnd  # noqa
 from .histogram import HistogramndLut  # noqa
+from .histogram import histogram1d  # noqa
 from .medianfilter import medfilt, medfilt1d, medfilt2d
@@ -28,6 +28,7 @@ __date__ = "02/10/2017"
 
 cimport numpy as cnumpy  # noqa
 cimport cython
+import multiprocessing
 import numpy as np
 
 cimport histogramnd_c
@@ -42,7 +43,8 @@ def chistogramnd(sample,
                  last_bin_closed=False,
                  histo=None,
                  weighted_histo=None,
-                 wh_dtype=None):
+                 wh_dtype=None,
+                 n_threads=None):
     """Computes the multidimensional histogram of some data.
 
     :param sample:
@@ -144,6 +146,17 @@ def chistogramnd(sample,
         *weights*. Allowed values are : `numpu.double` and `numpy.float32`.
     :type wh_dtype: *optional*, numpy data type
 
+    :param n_threads: Number of threads to use. Each thread fills its own
+        histograms which are then summed up, so using many threads is only
+        worth it when there are more samples than bins.
+        If not provided, the number of threads is chosen from the number of
+        CPUs, samples and bins.
+
+        .. note:: Weighted histograms computed with different numbers of
+            threads can differ slightly, since weights are summed in a
+            different order.
+    :type n_threads: *optional*, int
+
     :return: Histogram (bin counts, always returned), weighted histogram of
         the sample (or *None* if weights is *None*) and bin edges for each
         dimension.
@@ -290,6 +303,13 @@ def chistogramnd(sample,
 
     n_elem = sample.size // n_dims
 
+    if n_threads is None:
+        # At least as many samples as bins per thread
+        n_threads = min(multiprocessing.cpu_count(),
+                        max(1, n_elem // max(1, histo.size)))
+    elif n_threads < 1:
+        raise ValueError('<n_threads> must be strictly positive.')
+
     bin_edges = np.zeros(n_bins.sum() + n_bins.size, dtype=np.double)
 
     # wanted to store the functions in a dict (with the supported types
@@ -343,7 +363,8 @@ def chistogramnd(sample,
                                                        bin_edges_c,
                                                        option_flags,
                                                        weight_min=weight_min,
-                                                       weight_max=weight_max)
+                                                       weight_max=weight_max,
+                                                       n_threads=n_threads)
 
             elif weights_type == np.float32:
 
@@ -358,7 +379,8 @@ def chistogramnd(sample,
                                                       bin_edges_c,
                                                       option_flags,
                                                       weight_min=weight_min,
-                                                      weight_max=weight_max)
+                                                      weight_max=weight_max,
+                                                      n_threads=n_threads)
 
             elif weights_type == np.int32:
 
@@ -373,7 +395,8 @@ def chistogramnd(sample,
                                                         bin_edges_c,
                                                         option_flags,
                                                         weight_min=weight_min,
-                                                        weight_max=weight_max)
+                                                        weight_max=weight_max,
+                                                        n_threads=n_threads)
 
             else:
                 raise_unsupported_type()
@@ -394,7 +417,8 @@ def chistogramnd(sample,
                                                       bin_edges_c,
                                                       option_flags,
                                                       weight_min=weight_min,
-                                                      weight_max=weight_max)
+                                                      weight_max=weight_max,
+                                                      n_threads=n_threads)
 
             elif weights_type == np.float32:
 
@@ -409,7 +433,8 @@ def chistogramnd(sample,
                                                      bin_edges_c,
                                                      option_flags,
                                                      weight_min=weight_min,
-                                                     weight_max=weight_max)
+                                                     weight_max=weight_max,
+                                                     n_threads=n_threads)
 
             elif weights_type == np.int32:
 
@@ -424,7 +449,8 @@ def chistogramnd(sample,
                                                        bin_edges_c,
                                                        option_flags,
                                                        weight_min=weight_min,
-                                                       weight_max=weight_max)
+                                                       weight_max=weight_max,
+                                                       n_threads=n_threads)
 
             else:
                 raise_unsupported_type()
@@ -445,7 +471,8 @@ def chistogramnd(sample,
                                                         bin_edges_c,
                                                         option_flags,
                                                         weight_min=weight_min,
-                                                        weight_max=weight_max)
+                                                        weight_max=weight_max,
+                                                        n_threads=n_threads)
 
             elif weights_type == np.float32:
 
@@ -460,7 +487,8 @@ def chistogramnd(sample,
                                                        bin_edges_c,
                                                        option_flags,
                                                        weight_min=weight_min,
-                                                       weight_max=weight_max)
+                                                       weight_max=weight_max,
+                                                       n_threads=n_threads)
 
             elif weights_type == np.int32:
 
@@ -475,7 +503,8 @@ def chistogramnd(sample,
                                                          bin_edges_c,
                                                          option_flags,
                                                          weight_min=weight_min,
-                                                         weight_max=weight_max)
+                                                         weight_max=weight_max,
+                                                         n_threads=n_threads)
 
             else:
                 raise_unsupported_type()
@@ -502,7 +531,8 @@ def chistogramnd(sample,
                                                       bin_edges_c,
                                                       option_flags,
                                                       weight_min=weight_min,
-                                                      weight_max=weight_max)
+                                                      weight_max=weight_max,
+                                                      n_threads=n_threads)
 
             elif weights_type == np.float32:
 
@@ -517,7 +547,8 @@ def chistogramnd(sample,
                                                      bin_edges_c,
                                                      option_flags,
                                                      weight_min=weight_min,
-                                                     weight_max=weight_max)
+                                                     weight_max=weight_max,
+                                                     n_threads=n_threads)
 
             elif weights_type == np.int32:
 
@@ -532,7 +563,8 @@ def chistogramnd(sample,
                                                        bin_edges_c,
                                                        option_flags,
                                                        weight_min=weight_min,
-                                                       weight_max=weight_max)
+                                                       weight_max=weight_max,
+                                                       n_threads=n_threads)
 
             else:
                 raise_unsupported_type()
@@ -553,7 +585,8 @@ def chistogramnd(sample,
                                                      bin_edges_c,
                                                      option_flags,
                                                      weight_min=weight_min,
-                                                     weight_max=weight_max)
+                                                     weight_max=weight_max,
+                                                     n_threads=n_threads)
 
             elif weights_type == np.float32:
 
@@ -568,7 +601,8 @@ def chistogramnd(sample,
                                                     bin_edges_c,
                                                     option_flags,
                                                     weight_min=weight_min,
-                                                    weight_max=weight_max)
+                                                    weight_max=weight_max,
+                                                    n_threads=n_threads)
 
             elif weights_type == np.int32:
 
@@ -583,7 +617,8 @@ def chistogramnd(sample,
                                                       bin_edges_c,
                                                       option_flags,
                                                       weight_min=weight_min,
-                                                      weight_max=weight_max)
+                                                      weight_max=weight_max,
+                                                      n_threads=n_threads)
 
             else:
                 raise_unsupported_type()
@@ -604,7 +639,8 @@ def chistogramnd(sample,
                                                        bin_edges_c,
                                                        option_flags,
                                                        weight_min=weight_min,
-                                                       weight_max=weight_max)
+                                                       weight_max=weight_max,
+                                                       n_threads=n_threads)
 
             elif weights_type == np.float32:
 
@@ -619,7 +655,8 @@ def chistogramnd(sample,
                                                       bin_edges_c,
                                                       option_flags,
                                                       weight_min=weight_min,
-                                                      weight_max=weight_max)
+                                                      weight_max=weight_max,
+                                                      n_threads=n_threads)
 
             elif weights_type == np.int32:
 
@@ -634,7 +671,8 @@ def chistogramnd(sample,
                                                         bin_edges_c,
                                                         option_flags,
                                                         weight_min=weight_min,
-                                                        weight_max=weight_max)
+                                                        weight_max=weight_max,
+                                                        n_threads=n_threads)
 
             else:
                 raise_unsupported_type()
@@ -683,7 +721,8 @@ cdef int _histogramnd_double_double_double(double[:] sample,
                                            double[:] bin_edges,
                                            int option_flags,
                                            double weight_min,
-                                           double weight_max) nogil:
+                                           double weight_max,
+                                           int n_threads) nogil:
 
     return histogramnd_c.histogramnd_double_double_double(&sample[0],
                                                           &weights[0],
@@ -696,7 +735,8 @@ cdef int _histogramnd_double_double_double(double[:] sample,
                                                           &bin_edges[0],
                                                           option_flags,
                                                           weight_min,
-                                                          weight_max)
+                                                          weight_max,
+                                                          n_threads)
 
 
 @cython.wraparound(False)
@@ -714,7 +754,8 @@ cdef int _histogramnd_double_float_double(double[:] sample,
                                           double[:] bin_edges,
                                           int option_flags,
                                           float weight_min,
-                                          float weight_max) nogil:
+                                          float weight_max,
+                                          int n_threads) nogil:
 
     return histogramnd_c.histogramnd_double_float_double(&sample[0],
                                                          &weights[0],
@@ -727,7 +768,8 @@ cdef int _histogramnd_double_float_double(double[:] sample,
                                                          &bin_edges[0],
                                                          option_flags,
                                                          weight_min,
-                                                         weight_max)
+                                                         weight_max,
+                                                         n_threads)
 
 
 @cython.wraparound(False)
@@ -745,7 +787,8 @@ cdef int _histogramnd_double_int32_t_double(double[:] sample,
                                             double[:] bin_edges,
                                             int option_flags,
                                             cnumpy.int32_t weight_min,
-                                            cnumpy.int32_t weight_max) nogil:
+                                            cnumpy.int32_t weight_max,
+                                            int n_threads) nogil:
 
     return histogramnd_c.histogramnd_double_int32_t_double(&sample[0],
                                                            &weights[0],
@@ -758,7 +801,8 @@ cdef int _histogramnd_double_int32_t_double(double[:] sample,
                                                            &bin_edges[0],
                                                            option_flags,
                                                            weight_min,
-                                                           weight_max)
+                                                           weight_max,
+                                                           n_threads)
 
 
 # =====================
@@ -781,7 +825,8 @@ cdef int _histogramnd_float_double_double(float[:] sample,
                                           double[:] bin_edges,
                                           int option_flags,
                                           double weight_min,
-                                          double weight_max) nogil:
+                                          double weight_max,
+                                          int n_threads) nogil:
 
     return histogramnd_c.histogramnd_float_double_double(&sample[0],
                                                          &weights[0],
@@ -794,7 +839,8 @@ cdef int _histogramnd_float_double_double(float[:] sample,
                                                          &bin_edges[0],
                                                          option_flags,
                                                          weight_min,
-                                                         weight_max)
+                                                         weight_max,
+                                                         n_threads)
 
 
 @cython.wraparound(False)
@@ -812,7 +858,8 @@ cdef int _histogramnd_float_float_double(float[:] sample,
                                          double[:] bin_edges,
                                          int option_flags,
                                          float weight_min,
-                                         float weight_max) nogil:
+                                         float weight_max,
+                                         int n_threads) nogil:
 
     return histogramnd_c.histogramnd_float_float_double(&sample[0],
                                                         &weights[0],
@@ -825,7 +872,8 @@ cdef int _histogramnd_float_float_double(float[:] sample,
                                                         &bin_edges[0],
                                                         option_flags,
                                                         weight_min,
-                                                        weight_max)
+                                                        weight_max,
+                                                        n_threads)
 
 
 @cython.wraparound(False)
@@ -843,7 +891,8 @@ cdef int _histogramnd_float_int32_t_double(float[:] sample,
                                            double[:] bin_edges,
                                            int option_flags,
                                            cnumpy.int32_t weight_min,
-                                           cnumpy.int32_t weight_max) nogil:
+                                           cnumpy.int32_t weight_max,
+                                           int n_threads) nogil:
 
     return histogramnd_c.histogramnd_float_int32_t_double(&sample[0],
                                                           &weights[0],
@@ -856,7 +905,8 @@ cdef int _histogramnd_float_int32_t_double(float[:] sample,
                                                           &bin_edges[0],
                                                           option_flags,
                                                           weight_min,
-                                                          weight_max)
+                                                          weight_max,
+                                                          n_threads)
 
 
 # =====================
@@ -879,7 +929,8 @@ cdef int _histogramnd_int32_t_double_double(cnumpy.int32_t[:] sample,
                                             double[:] bin_edges,
                                             int option_flags,
                                             double weight_min,
-                                            double weight_max) nogil:
+                                            double weight_max,
+                                            int n_threads) nogil:
 
     return histogramnd_c.histogramnd_int32_t_double_double(&sample[0],
                                                            &weights[0],
@@ -892,7 +943,8 @@ cdef int _histogramnd_int32_t_double_double(cnumpy.int32_t[:] sample,
                                                            &bin_edges[0],
                                                            option_flags,
                                                            weight_min,
-                                                           weight_max)
+                                                           weight_max,
+                                                           n_threads)
 
 
 @cython.wraparound(False)
@@ -910,7 +962,8 @@ cdef int _histogramnd_int32_t_float_double(cnumpy.int32_t[:] sample,
                                            double[:] bin_edges,
                                            int option_flags,
                                            float weight_min,
-                                           float weight_max) nogil:
+                                           float weight_max,
+                                           int n_threads) nogil:
 
     return histogramnd_c.histogramnd_int32_t_float_double(&sample[0],
                                                           &weights[0],
@@ -923,7 +976,8 @@ cdef int _histogramnd_int32_t_float_double(cnumpy.int32_t[:] sample,
                                                           &bin_edges[0],
                                                           option_flags,
                                                           weight_min,
-                                                          weight_max)
+                                                          weight_max,
+                                                          n_threads)
 
 
 @cython.wraparound(False)
@@ -941,7 +995,8 @@ cdef int _histogramnd_int32_t_int32_t_double(cnumpy.int32_t[:] sample,
                                              double[:] bin_edges,
                                              int option_flags,
                                              cnumpy.int32_t weight_min,
-                                             cnumpy.int32_t weight_max) nogil:
+                                             cnumpy.int32_t weight_max,
+                                             int n_threads) nogil:
 
     return histogramnd_c.histogramnd_int32_t_int32_t_double(&sample[0],
                                                             &weights[0],
@@ -954,7 +1009,8 @@ cdef int _histogramnd_int32_t_int32_t_double(cnumpy.int32_t[:] sample,
                                                             &bin_edges[0],
                                                             option_flags,
                                                             weight_min,
-                                                            weight_max)
+                                                            weight_max,
+                                                            n_threads)
 
 
 # =====================
@@ -977,7 +1033,8 @@ cdef int _histogramnd_double_double_float(double[:] sample,
                                           double[:] bin_edges,
                                           int option_flags,
                                           double weight_min,
-                                          double weight_max) nogil:
+                                          double weight_max,
+                                          int n_threads) nogil:
 
     return histogramnd_c.histogramnd_double_double_float(&sample[0],
                                                          &weights[0],
@@ -990,7 +1047,8 @@ cdef int _histogramnd_double_double_float(double[:] sample,
                                                          &bin_edges[0],
                                                          option_flags,
                                                          weight_min,
-                                                         weight_max)
+                                                         weight_max,
+                                                         n_threads)
 
 
 @cython.wraparound(False)
@@ -1008,7 +1066,8 @@ cdef int _histogramnd_double_float_float(double[:] sample,
                                          double[:] bin_edges,
                                          int option_flags,
                                          float weight_min,
-                                         float weight_max) nogil:
+                                         float weight_max,
+                                         int n_threads) nogil:
 
     return histogramnd_c.histogramnd_double_float_float(&sample[0],
                                                         &weights[0],
@@ -1021,7 +1080,8 @@ cdef int _histogramnd_double_float_float(double[:] sample,
                                                         &bin_edges[0],
                                                         option_flags,
                                                         weight_min,
-                                                        weight_max)
+                                                        weight_max,
+                                                        n_threads)
 
 
 @cython.wraparound(False)
@@ -1039,7 +1099,8 @@ cdef int _histogramnd_double_int32_t_float(double[:] sample,
                                            double[:] bin_edges,
                                            int option_flags,
                                            cnumpy.int32_t weight_min,
-                                           cnumpy.int32_t weight_max) nogil:
+                                           cnumpy.int32_t weight_max,
+                                           int n_threads) nogil:
 
     return histogramnd_c.histogramnd_double_int32_t_float(&sample[0],
                                                           &weights[0],
@@ -1052,7 +1113,8 @@ cdef int _histogramnd_double_int32_t_float(double[:] sample,
                                                           &bin_edges[0],
                                                           option_flags,
                                                           weight_min,
-                                                          weight_max)
+                                                          weight_max,
+                                                          n_threads)
 
 
 # =====================
@@ -1075,7 +1137,8 @@ cdef int _histogramnd_float_double_float(float[:] sample,
                                          double[:] bin_edges,
                                          int option_flags,
                                          double weight_min,
-                                         double weight_max) nogil:
+                                         double weight_max,
+                                         int n_threads) nogil:
 
     return histogramnd_c.histogramnd_float_double_float(&sample[0],
                                                         &weights[0],
@@ -1088,7 +1151,8 @@ cdef int _histogramnd_float_double_float(float[:] sample,
                                                         &bin_edges[0],
                                                         option_flags,
                                                         weight_min,
-                                                        weight_max)
+                                                        weight_max,
+                                                        n_threads)
 
 
 @cython.wraparound(False)
@@ -1106,7 +1170,8 @@ cdef int _histogramnd_float_float_float(float[:] sample,
                                         double[:] bin_edges,
                                         int option_flags,
                                         float weight_min,
-                                        float weight_max) nogil:
+                                        float weight_max,
+                                        int n_threads) nogil:
 
     return histogramnd_c.histogramnd_float_float_float(&sample[0],
                                                        &weights[0],
@@ -1119,7 +1184,8 @@ cdef int _histogramnd_float_float_float(float[:] sample,
                                                        &bin_edges[0],
                                                        option_flags,
                                                        weight_min,
-                                                       weight_max)
+                                                       weight_max,
+                                                       n_threads)
 
 
 @cython.wraparound(False)
@@ -1137,7 +1203,8 @@ cdef int _histogramnd_float_int32_t_float(float[:] sample,
                                           double[:] bin_edges,
                                           int option_flags,
                                           cnumpy.int32_t weight_min,
-                                          cnumpy.int32_t weight_max) nogil:
+                                          cnumpy.int32_t weight_max,
+                                          int n_threads) nogil:
 
     return histogramnd_c.histogramnd_float_int32_t_float(&sample[0],
                                                          &weights[0],
@@ -1150,7 +1217,8 @@ cdef int _histogramnd_float_int32_t_float(float[:] sample,
                                                          &bin_edges[0],
                                                          option_flags,
                                                          weight_min,
-                                                         weight_max)
+                                                         weight_max,
+                                                         n_threads)
 
 
 # =====================
@@ -1173,7 +1241,8 @@ cdef int _histogramnd_int32_t_double_float(cnumpy.int32_t[:] sample,
                                            double[:] bin_edges,
                                            int option_flags,
                                            double weight_min,
-                                           double weight_max) nogil:
+                                           double weight_max,
+                                           int n_threads) nogil:
 
     return histogramnd_c.histogramnd_int32_t_double_float(&sample[0],
                                                           &weights[0],
@@ -1186,7 +1255,8 @@ cdef int _histogramnd_int32_t_double_float(cnumpy.int32_t[:] sample,
                                                           &bin_edges[0],
                                                           option_flags,
                                                           weight_min,
-                                                          weight_max)
+                                                          weight_max,
+                                                          n_threads)
 
 
 @cython.wraparound(False)
@@ -1204,7 +1274,8 @@ cdef int _histogramnd_int32_t_float_float(cnumpy.int32_t[:] sample,
                                           double[:] bin_edges,
                                           int option_flags,
                                           float weight_min,
-                                          float weight_max) nogil:
+                                          float weight_max,
+                                          int n_threads) nogil:
 
     return histogramnd_c.histogramnd_int32_t_float_float(&sample[0],
                                                          &weights[0],
@@ -1217,7 +1288,8 @@ cdef int _histogramnd_int32_t_float_float(cnumpy.int32_t[:] sample,
                                                          &bin_edges[0],
                                                          option_flags,
                                                          weight_min,
-                                                         weight_max)
+                                                         weight_max,
+                                                         n_threads)
 
 
 @cython.wraparound(False)
@@ -1235,7 +1307,8 @@ cdef int _histogramnd_int32_t_int32_t_float(cnumpy.int32_t[:] sample,
                                             double[:] bin_edges,
                                             int option_flags,
                                             cnumpy.int32_t weight_min,
-                                            cnumpy.int32_t weight_max) nogil:
+                                            cnumpy.int32_t weight_max,
+                                            int n_threads) nogil:
 
     return histogramnd_c.histogramnd_int32_t_int32_t_float(&sample[0],
                                                            &weights[0],
@@ -1248,4 +1321,5 @@ cdef int _histogramnd_int32_t_int32_t_float(cnumpy.int32_t[:] sample,
                                                            &bin_edges[0],
                                                            option_flags,
                                                            weight_min,
-                                                           weight_max)
+                                                           weight_max,
+                                                           n_threads)
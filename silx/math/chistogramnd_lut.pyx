@@ -29,6 +29,8 @@ __date__ = "15/05/2016"
 
 cimport numpy as cnumpy  # noqa
 cimport cython
+from cython.parallel import prange
+import multiprocessing
 import numpy as np
 
 ctypedef fused sample_t:
@@ -324,6 +326,244 @@ def histogramnd_from_lut(weights,
 # =====================
 
 
+def histogramnd_lut_to_csr(histo_lut, histo):
+    """Converts a per-sample LUT into a bin to sample structure.
+
+    The returned *indices* array contains the indices of the samples
+    sorted by bin (samples keep their original order within a bin),
+    the samples falling in bin ``b`` being
+    ``indices[offsets[b]:offsets[b + 1]]``. Samples outside of the
+    histogram range are discarded.
+    *indices* uses the smallest integer type able to index all the samples.
+
+    :param histo_lut: The LUT returned by :func:`histogramnd_get_lut`.
+    :type histo_lut: :class:`numpy.array`
+    :param histo: The bin counts returned by :func:`histogramnd_get_lut`.
+    :type histo: :class:`numpy.array`
+    :return: The sorted sample indices and the bin offsets.
+    :rtype: tuple : (:class:`numpy.array`, :class:`numpy.array`)
+    """
+    histo_lut = histo_lut.reshape(-1)
+
+    if histo_lut.size <= 2**15:
+        index_dtype = np.int16
+    elif histo_lut.size <= 2**31:
+        index_dtype = np.int32
+    else:
+        index_dtype = np.int64
+
+    offsets = np.zeros(histo.size + 1, dtype=np.int64)
+    np.cumsum(histo.reshape(-1), out=offsets[1:])
+
+    valid = np.nonzero(histo_lut >= 0)[0]
+    # Stable sort: the accumulation order within a bin is the sample order
+    order = np.argsort(histo_lut[valid], kind='mergesort')
+    indices = valid[order].astype(index_dtype)
+
+    return indices, offsets
+
+
+def histogramnd_from_csr(weights,
+                         indices,
+                         offsets,
+                         n_elem,
+                         histo=None,
+                         weighted_histo=None,
+                         shape=None,
+                         dtype=None,
+                         weight_min=None,
+                         weight_max=None,
+                         n_threads=None):
+    """Computes the histograms of one or several sets of weights from the
+    bin to sample structure returned by :func:`histogramnd_lut_to_csr`.
+
+    Bins are distributed among the threads so that each bin is only
+    updated by a single thread.
+
+    :param weights:
+        The weights of the samples, or a stack of weights
+        (its number of elements must be a multiple of *n_elem*).
+    :param indices: The sample indices sorted by bin.
+    :param offsets: The offsets of each bin in *indices*.
+    :param int n_elem: The number of samples.
+    :param histo: Histogram array to update (optional).
+    :param weighted_histo: Weighted histogram array to update (optional).
+    :param shape: Shape of the returned histograms, its number of elements
+        must be the number of sets of weights times the number of bins.
+    :param dtype: dtype of the weighted histogram
+        (default: same as *weights*, ignored if *weighted_histo* is provided).
+    :param weight_min: Samples with a lower weight are ignored (optional).
+    :param weight_max: Samples with a higher weight are ignored (optional).
+    :param int n_threads: Number of threads to use (default: number of CPUs).
+    :return: The histograms and the weighted histograms.
+    :rtype: tuple : (:class:`numpy.array`, :class:`numpy.array`)
+    """
+    if n_elem == 0 or weights.size % n_elem != 0:
+        raise ValueError('The number of elements in <weights> must be a '
+                         'multiple of the number of samples.')
+    n_frames = weights.size // n_elem
+    n_bins = offsets.size - 1
+
+    if shape is None:
+        if histo is not None:
+            shape = histo.shape
+        elif weighted_histo is not None:
+            shape = weighted_histo.shape
+        else:
+            raise ValueError('At least one of the following parameters has to '
+                             'be provided : <shape> or <histo> or '
+                             '<weighted_histo>')
+    shape = tuple(shape)
+
+    if int(np.prod(shape)) != n_frames * n_bins:
+        raise ValueError('The <shape> value does not match the number of '
+                         'bins and the number of sets of weights.')
+
+    if histo is None:
+        histo = np.zeros(shape, dtype=np.uint32)
+    elif histo.dtype != np.uint32:
+        raise ValueError('Provided <histo> array doesn\'t have '
+                         'the expected type '
+                         ': should be {0} instead of {1}.'
+                         ''.format(np.uint32, histo.dtype))
+    elif histo.shape != shape:
+        raise ValueError('The <shape> value does not match'
+                         'the <histo> shape.')
+
+    if weighted_histo is None:
+        if dtype is None:
+            dtype = weights.dtype
+        weighted_histo = np.zeros(shape, dtype=dtype)
+    elif weighted_histo.shape != shape:
+        raise ValueError('The <shape> value does not match'
+                         'the <weighted_histo> shape.')
+    elif dtype is not None and weighted_histo.dtype != dtype:
+        raise ValueError('Provided <dtype> and <weighted_histo>\'s dtype'
+                         ' do not match.')
+
+    if n_threads is None:
+        n_threads = multiprocessing.cpu_count()
+    elif n_threads < 1:
+        raise ValueError('<n_threads> must be strictly positive.')
+
+    w_dtype = weights.dtype.newbyteorder('N')
+    w_c = np.ascontiguousarray(weights.reshape((n_frames, n_elem)),
+                               dtype=w_dtype)
+
+    # Works on C-contiguous native buffers, copied back if needed
+    h_c = np.ascontiguousarray(histo.reshape((n_frames, n_bins)),
+                               dtype=histo.dtype.newbyteorder('N'))
+    w_h_c = np.ascontiguousarray(
+        weighted_histo.reshape((n_frames, n_bins)),
+        dtype=weighted_histo.dtype.newbyteorder('N'))
+
+    if weight_min is None:
+        weight_min = 0
+        filt_min_weights = False
+    else:
+        filt_min_weights = True
+
+    if weight_max is None:
+        weight_max = 0
+        filt_max_weights = False
+    else:
+        filt_max_weights = True
+
+    try:
+        _histogramnd_from_csr_fused(w_c,
+                                    indices,
+                                    offsets,
+                                    h_c,
+                                    w_h_c,
+                                    filt_min_weights,
+                                    w_dtype.type(weight_min),
+                                    filt_max_weights,
+                                    w_dtype.type(weight_max),
+                                    n_threads)
+    except TypeError:
+        raise TypeError('Case not supported - weights:{0} '
+                        'and histo:{1}.'
+                        ''.format(weights.dtype, weighted_histo.dtype))
+
+    if not np.may_share_memory(h_c, histo):
+        histo[...] = h_c.reshape(shape)
+    if not np.may_share_memory(w_h_c, weighted_histo):
+        weighted_histo[...] = w_h_c.reshape(shape)
+
+    return histo, weighted_histo
+
+
+# =====================
+# =====================
+
+
+cdef void _csr_bin_sum(weights_t* i_weights,
+                       lut_t* i_indices,
+                       cnumpy.int64_t start,
+                       cnumpy.int64_t stop,
+                       cnumpy.uint32_t* io_count,
+                       cumul_t* io_total,
+                       bint i_filt_min_weights,
+                       weights_t i_weight_min,
+                       bint i_filt_max_weights,
+                       weights_t i_weight_max) nogil:
+    """Accumulates the weights of the samples i_indices[start:stop]"""
+    cdef:
+        cnumpy.int64_t i
+        weights_t value
+
+    for i in range(start, stop):
+        value = i_weights[i_indices[i]]
+        if i_filt_min_weights and value < i_weight_min:
+            continue
+        if i_filt_max_weights and value > i_weight_max:
+            continue
+        io_count[0] += 1
+        io_total[0] += <cumul_t>value
+
+
+@cython.wraparound(False)
+@cython.boundscheck(False)
+@cython.initializedcheck(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+def _histogramnd_from_csr_fused(weights_t[:, ::1] i_weights,
+                                lut_t[::1] i_indices,
+                                cnumpy.int64_t[::1] i_offsets,
+                                cnumpy.uint32_t[:, ::1] o_histo,
+                                cumul_t[:, ::1] o_weighted_histo,
+                                bint i_filt_min_weights,
+                                weights_t i_weight_min,
+                                bint i_filt_max_weights,
+                                weights_t i_weight_max,
+                                int i_n_threads):
+    cdef:
+        Py_ssize_t n_bins = o_histo.shape[1]
+        Py_ssize_t task, frame, bin_idx
+
+    # Each (frame, bin) is processed by a single thread: no atomics needed
+    for task in prange(o_histo.shape[0] * n_bins,
+                       nogil=True,
+                       schedule='guided',
+                       num_threads=i_n_threads):
+        frame = task // n_bins
+        bin_idx = task % n_bins
+        _csr_bin_sum(&i_weights[frame, 0],
+                     &i_indices[0],
+                     i_offsets[bin_idx],
+                     i_offsets[bin_idx + 1],
+                     &o_histo[frame, bin_idx],
+                     &o_weighted_histo[frame, bin_idx],
+                     i_filt_min_weights,
+                     i_weight_min,
+                     i_filt_max_weights,
+                     i_weight_max)
+
+
+# =====================
+# =====================
+
+
 @cython.wraparound(False)
 @cython.boundscheck(False)
 @cython.initializedcheck(False)
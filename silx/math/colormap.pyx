@@ -81,6 +81,7 @@ ctypedef fused default_types:
 # Supported colors/output types
 ctypedef fused image_types:
     cnumpy.uint8_t
+    cnumpy.uint32_t  # For RGBA uint8 colors processed as a single word
     float
 
 
@@ -146,13 +147,14 @@ cdef double fast_log10(double value) nogil:
 @cython.boundscheck(False)
 @cython.nonecheck(False)
 @cython.cdivision(True)
-cdef image_types[:, ::1] compute_cmap(
+cdef void compute_cmap(
            default_types[:] data,
            image_types[:, ::1] colors,
            double normalized_vmin,
            double normalized_vmax,
            image_types[::1] nan_color,
-           scale_function scale_func):
+           scale_function scale_func,
+           image_types[:, ::1] output):
     """Apply colormap to data.
 
     :param data: Input data
@@ -161,9 +163,8 @@ cdef image_types[:, ::1] compute_cmap(
     :param normalized_vmax: Normalized upper bound of the colormap range
     :param nan_color: Color to use for NaN value
     :param scale_func: The function to use to scale data
-    :return: Data converted to colors
+    :param output: Where to store data converted to colors
     """
-    cdef image_types[:, ::1] output
     cdef double scale, value
     cdef int length, nb_channels, nb_colors
     cdef int channel, index, lut_index
@@ -172,9 +173,6 @@ cdef image_types[:, ::1] compute_cmap(
     nb_channels = <int> colors.shape[1]
     length = <int> data.size
 
-    output = numpy.empty((length, nb_channels),
-                         dtype=numpy.array(colors, copy=False).dtype)
-
     if normalized_vmin == normalized_vmax:
         scale = 0.
     else:
@@ -203,19 +201,134 @@ cdef image_types[:, ::1] compute_cmap(
             for channel in range(nb_channels):
                 output[index, channel] = colors[lut_index, channel]
 
-    return output
 
 @cython.wraparound(False)
 @cython.boundscheck(False)
 @cython.nonecheck(False)
 @cython.cdivision(True)
-cdef image_types[:, ::1] compute_cmap_with_lut(
+cdef void compute_cmap_with_thresholds(
+           default_types[:] data,
+           image_types[:, ::1] colors,
+           double vmin,
+           double vmax,
+           double[::1] thresholds,
+           int[::1] table,
+           bint negative_is_nan,
+           image_types[::1] nan_color,
+           image_types[:, ::1] output):
+    """Apply colormap to data using the data values where colors change.
+
+    This avoids evaluating the normalization function for each value.
+    The color index of a value is the number of thresholds lower than or
+    equal to it. The table gives this number at regularly spaced values
+    of the colormap range, so that only the few thresholds between two
+    entries of the table need to be checked.
+
+    :param data: Input data
+    :param colors: Colors look-up-table
+    :param vmin: Lower bound of the colormap range (vmin < vmax)
+    :param vmax: Upper bound of the colormap range
+    :param thresholds: Sorted data values where the color index is incremented
+    :param table: Number of thresholds <= vmin + i * (vmax - vmin) / size
+        for i in [-1, size + 1], with size = len(table) - 3.
+    :param negative_is_nan: True to use nan_color for negative values
+    :param nan_color: Color to use for NaN value
+    :param output: Where to store data converted to colors
+    """
+    cdef double scale, value
+    cdef int length, nb_channels, nb_colors, table_size
+    cdef int channel, index, lut_index, table_index, lower, upper, middle
+
+    nb_colors = <int> colors.shape[0]
+    nb_channels = <int> colors.shape[1]
+    length = <int> data.size
+    table_size = <int> table.shape[0] - 3
+    scale = table_size / (vmax - vmin)
+
+    with nogil:
+        for index in prange(length):
+            value = <double> data[index]
+
+            if isnan(value) or (negative_is_nan and value < 0.):
+                for channel in range(nb_channels):
+                    output[index, channel] = nan_color[channel]
+                continue
+
+            if value <= vmin:
+                lut_index = 0
+            elif value >= vmax:
+                lut_index = nb_colors - 1
+            else:
+                table_index = <int>((value - vmin) * scale)
+                if table_index >= table_size:
+                    table_index = table_size - 1
+                # Bounds widened by one entry against rounding errors
+                lower = table[table_index]
+                upper = table[table_index + 3]
+                while lower < upper:
+                    middle = (lower + upper) // 2
+                    if thresholds[middle] <= value:
+                        lower = middle + 1
+                    else:
+                        upper = middle
+                lut_index = lower
+
+            for channel in range(nb_channels):
+                output[index, channel] = colors[lut_index, channel]
+
+
+_THRESHOLDS_TABLE_SIZE = 32768
+"""Number of entries of the table used to look-up thresholds"""
+
+_NORMALIZATION_FUNCTIONS = {
+    'log': (numpy.log10, lambda value: 10. ** value),
+    'arcsinh': (numpy.arcsinh, numpy.sinh),
+    'sqrt': (numpy.sqrt, numpy.square),
+}
+"""Normalizations with their inverse, used to compute thresholds"""
+
+
+def _thresholds_table(nb_colors, normalization, double vmin, double vmax):
+    """Returns the data values where the color index changes and a table
+    to look them up.
+
+    See :func:`compute_cmap_with_thresholds`.
+
+    :param int nb_colors: Number of colors of the colormap
+    :param str normalization: Normalization: 'log', 'arcsinh' or 'sqrt'
+    :param vmin: Lower bound of the colormap range
+    :param vmax: Upper bound of the colormap range
+    :return: (thresholds, table)
+    """
+    function, inverse = _NORMALIZATION_FUNCTIONS[normalization]
+    normalized_vmin, normalized_vmax = function(vmin), function(vmax)
+    normalized = normalized_vmin + (
+        numpy.arange(1, nb_colors, dtype=numpy.float64) *
+        ((normalized_vmax - normalized_vmin) / nb_colors))
+    thresholds = inverse(normalized)
+    # Make sure thresholds are sorted and in range despite rounding
+    thresholds = numpy.clip(
+        numpy.maximum.accumulate(thresholds), vmin, vmax)
+
+    values = vmin + numpy.arange(-1, _THRESHOLDS_TABLE_SIZE + 2) * (
+        (vmax - vmin) / _THRESHOLDS_TABLE_SIZE)
+    table = numpy.searchsorted(thresholds, values, side='right')
+    return (numpy.ascontiguousarray(thresholds, dtype=numpy.float64),
+            numpy.ascontiguousarray(table, dtype=numpy.intc))
+
+
+@cython.wraparound(False)
+@cython.boundscheck(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef void compute_cmap_with_lut(
                lut_types[:] data,
                image_types[:, ::1] colors,
                double normalized_vmin,
                double normalized_vmax,
                image_types[::1] nan_color,
-               scale_function scale_func):
+               scale_function scale_func,
+               image_types[:, ::1] output):
     """Convert data to colors using look-up table to speed the process.
 
     Only supports data of types: uint8, uint16, int8, int16.
@@ -226,9 +339,8 @@ cdef image_types[:, ::1] compute_cmap_with_lut(
     :param normalized_vmax: Normalized upper bound of the colormap range
     :param nan_color: Color to use for NaN values
     :param scale_func: The function to use for scaling data
-    :return: The generated image
+    :param output: Where to store the generated image
     """
-    cdef image_types[:, ::1] output
     cdef double[:] values
     cdef image_types[:, ::1] lut
     cdef int type_min, type_max
@@ -254,11 +366,11 @@ cdef image_types[:, ::1] compute_cmap_with_lut(
     colors_dtype = numpy.array(colors).dtype
 
     values = numpy.arange(type_min, type_max + 1, dtype=numpy.float64)
-    lut = compute_cmap(
+    lut = numpy.empty((type_max - type_min + 1, nb_channels),
+                      dtype=colors_dtype)
+    compute_cmap(
         values, colors, normalized_vmin, normalized_vmax,
-        nan_color, scale_func)
-
-    output = numpy.empty((length, nb_channels), dtype=colors_dtype)
+        nan_color, scale_func, lut)
 
     with nogil:
         # Apply LUT
@@ -267,8 +379,6 @@ cdef image_types[:, ::1] compute_cmap_with_lut(
             for channel in range(nb_channels):
                 output[index, channel] = lut[lut_index, channel]
 
-    return output
-
 
 @cython.wraparound(False)
 @cython.boundscheck(False)
@@ -279,7 +389,8 @@ def _cmap(data_types[:] data,
           str normalization,
           double vmin,
           double vmax,
-          image_types[::1] nan_color):
+          image_types[::1] nan_color,
+          image_types[:, ::1] output):
     """Implementation of colormap.
 
     Use :func:`cmap`.
@@ -290,10 +401,12 @@ def _cmap(data_types[:] data,
     :param vmin: Lower bound of the colormap range
     :param vmax: Upper bound of the colormap range
     :param nan_color: Color to use for NaN value.
-    :return: The generated image
+    :param output: Where to store the generated image
     """
     cdef double normalized_vmin, normalized_vmax
     cdef scale_function scale_func
+    cdef double[::1] thresholds
+    cdef int[::1] table
 
     if normalization == 'linear':
         scale_func = linear_scale
@@ -314,29 +427,45 @@ def _cmap(data_types[:] data,
 
     # Proxy for calling the right implementation depending on data type
     if data_types in lut_types:  # Use LUT implementation
-        output = compute_cmap_with_lut(
-            data, colors, normalized_vmin, normalized_vmax,
-            nan_color, scale_func)
-
-    elif data_types in default_types:  # Use default implementation
-        output = compute_cmap(
+        compute_cmap_with_lut(
             data, colors, normalized_vmin, normalized_vmax,
-            nan_color, scale_func)
+            nan_color, scale_func, output)
+
+    elif data_types in default_types:
+        if normalization != 'linear' and vmin < vmax:
+            # Look-up data values where colors change rather than
+            # normalizing each value
+            thresholds, table = _thresholds_table(
+                colors.shape[0], normalization, vmin, vmax)
+            compute_cmap_with_thresholds(
+                data, colors, vmin, vmax, thresholds, table,
+                normalization in ('log', 'sqrt'), nan_color, output)
+        else:  # Use default implementation
+            compute_cmap(
+                data, colors, normalized_vmin, normalized_vmax,
+                nan_color, scale_func, output)
 
     else:
         raise ValueError('Unsupported data type')
 
-    return numpy.array(output, copy=False)
-
 
 def cmap(data,
          colors,
          double vmin,
          double vmax,
          str normalization='linear',
-         nan_color=None):
+         nan_color=None,
+         output=None):
     """Convert data to colors with provided colors look-up table.
 
+    For integer data of more than 16 bits and floating point data with
+    a non-linear normalization, the data values where colors change are
+    precomputed, so that the normalization is not evaluated for each value.
+
+    To avoid allocating a new array each time the colormap is applied
+    (e.g., while changing the colormap range interactively), the result
+    can be written to an existing *output* array.
+
     :param numpy.ndarray data: The input data
     :param numpy.ndarray colors: Color look-up table as a 2D array.
        It MUST be of type uint8 or float32
@@ -351,10 +480,14 @@ def cmap(data,
 
     :param nan_color: Color to use for NaN value.
         Default: A color with all channels set to 0
+    :param numpy.ndarray output: C-contiguous array where to store the
+        result, with the shape and dtype of the returned array.
+        Default: A new array is allocated.
     :return: Array of colors. The shape of the
         returned array is that of data array + the last dimension of colors.
         The dtype of the returned array is that of the colors array.
     :rtype: numpy.ndarray
+    :raises ValueError: If output shape, dtype or layout is not valid
     """
     cdef int nb_channels
 
@@ -379,11 +512,27 @@ def cmap(data,
             nan_color, dtype=colors.dtype).reshape(-1)
     assert nan_color.shape == (nb_channels,)
 
-    image = _cmap(
-        data.reshape(-1),
-        colors.reshape(-1, nb_channels),
-        normalization,
-        vmin, vmax, nan_color)
-    image.shape = data.shape + (nb_channels,)
+    shape = data.shape + (nb_channels,)
+    if output is None:
+        output = numpy.empty(shape, dtype=colors.dtype)
+    elif (not isinstance(output, numpy.ndarray) or
+            output.shape != shape or
+            output.dtype != colors.dtype or
+            not output.flags.c_contiguous or
+            not output.flags.writeable):
+        raise ValueError(
+            'output must be a writable C-contiguous array of shape %s '
+            'and dtype %s' % (str(shape), colors.dtype))
+
+    colors = colors.reshape(-1, nb_channels)
+    image = output.reshape(-1, nb_channels)
+    if colors.dtype == numpy.uint8 and nb_channels == 4:
+        # Copy RGBA colors as a single 32 bits word
+        colors = colors.view(numpy.uint32)
+        nan_color = nan_color.view(numpy.uint32)
+        image = image.view(numpy.uint32)
+
+    _cmap(data.reshape(-1), colors, normalization,
+          vmin, vmax, nan_color, image)
 
-    return image
+    return output
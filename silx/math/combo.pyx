@@ -24,8 +24,11 @@
 # ###########################################################################*/
 """This module provides combination of statistics as single operation.
 
-For now it provides min/max (and optionally positive min) and indices
-of first occurrences (i.e., argmin/argmax) in a single pass.
+It provides min/max (and optionally positive min) and indices
+of first occurrences (i.e., argmin/argmax) in a single pass with
+:func:`min_max`, and adds sum, mean and variance with :func:`statistics`.
+
+Data is processed by chunks in parallel, without copying strided arrays.
 """
 
 __authors__ = ["T. Vincent"]
@@ -33,9 +36,12 @@ __license__ = "MIT"
 __date__ = "24/04/2018"
 
 cimport cython
+from cython.parallel import prange
+from libc.math cimport sqrt
 from math_compatibility cimport isnan, isfinite, INFINITY
 
 
+import multiprocessing
 import numpy
 
 
@@ -112,158 +118,521 @@ class _MinMaxResult(object):
             raise IndexError("Index out of range")
 
 
+class _StatisticsResult(_MinMaxResult):
+    """Object storing result from :func:`statistics`"""
+
+    def __init__(self, minimum, min_pos, maximum,
+                 argmin, argmin_pos, argmax,
+                 count, sum_, mean, variance):
+        super(_StatisticsResult, self).__init__(
+            minimum, min_pos, maximum, argmin, argmin_pos, argmax)
+        self._count = count
+        self._sum = sum_
+        self._mean = mean
+        self._variance = variance
+
+    count = property(
+        lambda self: self._count,
+        doc="Number of values taken into account")
+    sum = property(
+        lambda self: self._sum,
+        doc="Sum of the values")
+    mean = property(
+        lambda self: self._mean,
+        doc="Mean of the values, NaN if there is no value")
+    variance = property(
+        lambda self: self._variance,
+        doc="Variance of the values, NaN if there is no value")
+    std = property(
+        lambda self: sqrt(self._variance),
+        doc="Standard deviation of the values, NaN if there is no value")
+
+
+DEF CHUNK_SIZE = 65536
+"""Number of values processed by a thread at a time"""
+
+# Indices of the per chunk results
+DEF ARGMIN = 0
+DEF ARGMIN_POS = 1
+DEF ARGMAX = 2
+
+DEF COUNT = 0
+DEF MEAN = 1
+DEF M2 = 2  # Sum of squared differences to the mean
+
+
 @cython.initializedcheck(False)
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def _min_max(_number[::1] data, bint min_positive=False):
-    """:func:`min_max` implementation including infinite values
-
-    See :func:`min_max` for documentation.
+@cython.cdivision(True)
+cdef void _chunk_min_max(_number[:, :] data,
+                         Py_ssize_t start,
+                         Py_ssize_t stop,
+                         bint min_positive,
+                         bint finite,
+                         bint moments,
+                         Py_ssize_t *indices,
+                         double *stats) nogil:
+    """Compute min/max and optionally moments of a chunk of the flattened
+    data.
+
+    NaNs are ignored, as well as infinite values if finite is True.
+
+    :param data: 2D view of the data
+    :param start: Index of the first value of the chunk in flattened data
+    :param stop: Index of the end of the chunk in flattened data (excluded)
+    :param min_positive: True to compute the strictly positive min
+    :param finite: True to only take finite values into account
+    :param moments: True to compute count, mean and M2
+    :param indices: Where to store argmin, argmin_pos and argmax.
+        -1 when not found.
+    :param stats: Where to store count, mean and M2 if moments is True
     """
     cdef:
         _number value, minimum, min_pos, maximum
-        unsigned int length
-        unsigned int index = 0
-        unsigned int min_index = 0
-        unsigned int min_pos_index = 0
-        unsigned int max_index = 0
+        Py_ssize_t row, column, column_start, column_stop, index
+        Py_ssize_t length = data.shape[1]
+        Py_ssize_t min_index = -1
+        Py_ssize_t min_pos_index = -1
+        Py_ssize_t max_index = -1
+        double count = 0.
+        double shift = 0.
+        double diff
+        double sum_diff = 0.
+        double sum_diff2 = 0.
+
+    for row in range(start // length, (stop - 1) // length + 1):
+        index = row * length
+        column_start = start - index if start > index else 0
+        column_stop = stop - index if stop - index < length else length
+
+        for column in range(column_start, column_stop):
+            value = data[row, column]
+
+            if _number in _floating:
+                if finite:
+                    if not isfinite(value):
+                        continue
+                elif isnan(value):
+                    continue
+
+            if max_index == -1:  # First value
+                minimum = value
+                maximum = value
+                min_index = index + column
+                max_index = index + column
+                shift = <double> value
+            elif value > maximum:
+                maximum = value
+                max_index = index + column
+            elif value < minimum:
+                minimum = value
+                min_index = index + column
+
+            if min_positive and value > 0:
+                if min_pos_index == -1 or value < min_pos:
+                    min_pos = value
+                    min_pos_index = index + column
+
+            if moments:
+                # Accumulate differences to the first value for stability
+                diff = <double> value - shift
+                sum_diff = sum_diff + diff
+                sum_diff2 = sum_diff2 + diff * diff
+                count = count + 1.
+
+    indices[ARGMIN] = min_index
+    indices[ARGMIN_POS] = min_pos_index
+    indices[ARGMAX] = max_index
+
+    if moments:
+        stats[COUNT] = count
+        if count > 0:
+            stats[MEAN] = shift + sum_diff / count
+            stats[M2] = sum_diff2 - sum_diff * sum_diff / count
+        else:
+            stats[MEAN] = 0.
+            stats[M2] = 0.
+
+
+@cython.initializedcheck(False)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _min_max(_number[:, :] data,
+             bint min_positive=False,
+             bint finite=False,
+             bint moments=False):
+    """:func:`min_max` and :func:`statistics` implementation
 
-    length = len(data)
+    Chunks of the flattened data are processed in parallel and their
+    results are then merged.
 
-    if length == 0:
+    See :func:`min_max` and :func:`statistics` for documentation.
+
+    :param data: 2D view of the data
+    :returns: Result of :func:`min_max` or :func:`statistics`
+    """
+    cdef:
+        Py_ssize_t size = data.shape[0] * data.shape[1]
+        Py_ssize_t chunk = 0
+        Py_ssize_t nb_chunks
+        Py_ssize_t[:, ::1] indices
+        double[:, ::1] stats
+        Py_ssize_t index, length
+        int field
+
+    if size == 0:
         raise ValueError('Zero-size array')
 
-    with nogil:
-        # Init starting values
-        value = data[0]
-        minimum = value
-        maximum = value
-        if min_positive and value > 0:
-            min_pos = value
-        else:
-            min_pos = 0
-
-        if _number in _floating:
-            # For floating, loop until first not NaN value
-            for index in range(length):
-                value = data[index]
-                if not isnan(value):
-                    minimum = value
-                    min_index = index
-                    maximum = value
-                    max_index = index
-                    break
-
-        if not min_positive:
-            for index in range(index, length):
-                value = data[index]
-                if value > maximum:
-                    maximum = value
-                    max_index = index
-                elif value < minimum:
-                    minimum = value
-                    min_index = index
+    nb_chunks = (size + CHUNK_SIZE - 1) // CHUNK_SIZE
+    indices = numpy.empty((nb_chunks, 3), dtype=numpy.intp)
+    stats = numpy.zeros((nb_chunks, 3), dtype=numpy.float64)
+
+    for chunk in prange(nb_chunks, nogil=True, schedule='static'):
+        _chunk_min_max(data,
+                       chunk * CHUNK_SIZE,
+                       min((chunk + 1) * CHUNK_SIZE, size),
+                       min_positive,
+                       finite,
+                       moments,
+                       &indices[chunk, 0],
+                       &stats[chunk, 0])
+
+    # Merge results of chunks
+    length = data.shape[1]
+    extrema = []
+    for chunk in range(nb_chunks):
+        for field in (ARGMIN, ARGMIN_POS, ARGMAX):
+            index = indices[chunk, field]
+            if index != -1:
+                extrema.append(
+                    (field, data[index // length, index % length], index))
+
+    if moments:
+        partial_stats = [tuple(stats[chunk]) for chunk in range(nb_chunks)]
+    else:
+        partial_stats = None
 
-        else:
-            # Loop until min_pos is defined
-            for index in range(index, length):
-                value = data[index]
-                if value > maximum:
-                    maximum = value
-                    max_index = index
-                elif value < minimum:
-                    minimum = value
-                    min_index = index
-
-                if value > 0:
-                    min_pos = value
-                    min_pos_index = index
-                    break
-
-            # Loop until the end
-            for index in range(index + 1, length):
-                value = data[index]
-                if value > maximum:
-                    maximum = value
-                    max_index = index
-                else:
-                    if value < minimum:
-                        minimum = value
-                        min_index = index
-
-                    if 0 < value < min_pos:
-                        min_pos = value
-                        min_pos_index = index
-
-    return _MinMaxResult(minimum,
-                         min_pos if min_pos > 0 else None,
-                         maximum,
-                         min_index,
-                         min_pos_index if min_pos > 0 else None,
-                         max_index)
+    return _merge_results(extrema, partial_stats, finite, data[0, 0])
+
+
+@cython.initializedcheck(False)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef void _part_histogram(_number[:, :] data,
+                          Py_ssize_t start,
+                          Py_ssize_t stop,
+                          double vmin,
+                          double vmax,
+                          Py_ssize_t n_bins,
+                          bint direct,
+                          Py_ssize_t offset,
+                          long long *histo) nogil:
+    """Accumulate the histogram of a part of the flattened data.
+
+    Values outside [vmin, vmax] and NaNs are ignored.
+    The last bin is closed.
+
+    :param data: 2D view of the data
+    :param start: Index of the first value of the part in flattened data
+    :param stop: Index of the end of the part in flattened data (excluded)
+    :param vmin: Left edge of the first bin
+    :param vmax: Right edge of the last bin
+    :param n_bins: Number of bins
+    :param direct: True to count each value in bin (value - offset).
+        Only for 8 and 16 bits integers, vmin and vmax are then ignored.
+    :param offset: Value of the first bin for direct counting
+    :param histo: Where to accumulate the n_bins counts
+    """
+    cdef:
+        _number value
+        Py_ssize_t row, column, column_start, column_stop, index, bin_index
+        Py_ssize_t length = data.shape[1]
+        double scale = 0.
+        double step = 0.
+
+    if not direct:
+        scale = n_bins / (vmax - vmin)
+        step = (vmax - vmin) / n_bins
+
+    for row in range(start // length, (stop - 1) // length + 1):
+        index = row * length
+        column_start = start - index if start > index else 0
+        column_stop = stop - index if stop - index < length else length
+
+        for column in range(column_start, column_stop):
+            value = data[row, column]
+
+            if direct:
+                histo[<Py_ssize_t> value - offset] += 1
+                continue
+
+            if not (value >= vmin and value <= vmax):  # Also skips NaNs
+                continue
+
+            bin_index = <Py_ssize_t> ((<double> value - vmin) * scale)
+            if bin_index >= n_bins:  # Last bin is closed
+                bin_index = n_bins - 1
+
+            # Fix rounding errors with respect to bin edges
+            if bin_index > 0 and value < vmin + bin_index * step:
+                bin_index -= 1
+            elif (bin_index < n_bins - 1 and
+                    value >= vmin + (bin_index + 1) * step):
+                bin_index += 1
+            histo[bin_index] += 1
 
 
 @cython.initializedcheck(False)
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def _finite_min_max(_floating[::1] data, bint min_positive=False):
-    """:func:`min_max` implementation for floats skipping infinite values
+def _histogram(_number[:, :] data,
+               Py_ssize_t n_bins,
+               double vmin,
+               double vmax,
+               bint direct=False,
+               Py_ssize_t offset=0):
+    """Histogram of data with uniform bins computed in a single pass.
+
+    Contiguous parts of the flattened data are processed in parallel,
+    each in its own histogram, and the histograms are then summed.
+
+    See :func:`_part_histogram` for the parameters.
 
-    See :func:`min_max` for documentation.
+    :param data: 2D view of the data
+    :rtype: numpy.ndarray of int64
     """
     cdef:
-        _floating value, minimum, min_pos, maximum
-        unsigned int length
-        unsigned int index = 0
-        unsigned int min_index = 0
-        unsigned int min_pos_index = 0
-        unsigned int max_index = 0
+        Py_ssize_t size = data.shape[0] * data.shape[1]
+        Py_ssize_t n_parts, part
+        long long[:, ::1] histos
+
+    if size == 0:
+        return numpy.zeros((n_bins,), dtype=numpy.int64)
+
+    n_parts = max(1, min(multiprocessing.cpu_count(), size // CHUNK_SIZE))
+    histos = numpy.zeros((n_parts, n_bins), dtype=numpy.int64)
+
+    for part in prange(n_parts, nogil=True, schedule='static'):
+        _part_histogram(data,
+                        part * size // n_parts,
+                        (part + 1) * size // n_parts,
+                        vmin,
+                        vmax,
+                        n_bins,
+                        direct,
+                        offset,
+                        &histos[part, 0])
+
+    return numpy.sum(histos, axis=0)
+
+
+def _merge_results(extrema, partial_stats, finite, first_value):
+    """Merge results computed on parts of the data.
+
+    :param extrema: List of (field, value, index) with field one of
+        ARGMIN, ARGMIN_POS and ARGMAX, ordered by increasing index.
+        Index is the index in the whole flattened data.
+    :param partial_stats: List of (count, mean, M2) or None to return a
+        min_max result
+    :param bool finite: True if only finite values were taken into account
+    :param first_value: First value of the data
+    :rtype: Union[_MinMaxResult,_StatisticsResult]
+    """
+    # Keep first occurrences
+    values = [None, None, None]
+    argindices = [None, None, None]
+    for field, value, index in extrema:
+        if value != value:  # Ignore NaNs
+            continue
+        if (argindices[field] is None or
+                (field == ARGMAX and value > values[field]) or
+                (field != ARGMAX and value < values[field])):
+            values[field] = value
+            argindices[field] = index
+
+    minimum, min_pos, maximum = values
+    argmin, argmin_pos, argmax = argindices
+    if argmax is None and not finite:
+        # All values are NaNs
+        minimum = maximum = first_value
+        argmin = argmax = 0
+
+    if partial_stats is None:
+        return _MinMaxResult(minimum, min_pos, maximum,
+                             argmin, argmin_pos, argmax)
+
+    # Merge moments (Chan et al. parallel algorithm)
+    count, mean, m2 = 0., 0., 0.
+    for partial_count, partial_mean, partial_m2 in partial_stats:
+        if partial_count == 0:
+            continue
+        delta = partial_mean - mean
+        mean += delta * partial_count / (count + partial_count)
+        m2 += (partial_m2 +
+               delta * delta * count * partial_count /
+               (count + partial_count))
+        count += partial_count
+
+    if count == 0:
+        return _StatisticsResult(minimum, min_pos, maximum,
+                                 argmin, argmin_pos, argmax,
+                                 0, 0., float('nan'), float('nan'))
+    else:
+        return _StatisticsResult(minimum, min_pos, maximum,
+                                 argmin, argmin_pos, argmax,
+                                 int(count), mean * count, mean,
+                                 max(m2 / count, 0.))
 
-    length = len(data)
 
-    if length == 0:
-        raise ValueError('Zero-size array')
+def _as_2d(data):
+    """Returns a 2D view of the data preserving the order of the flattened
+    data and supported by :func:`_min_max`.
 
-    with nogil:
-        minimum = INFINITY
-        maximum = -INFINITY
-        min_pos = INFINITY
-
-        if not min_positive:
-            for index in range(length):
-                value = data[index]
-                if isfinite(value):
-                    if value > maximum:
-                        maximum = value
-                        max_index = index
-                    if value < minimum:
-                        minimum = value
-                        min_index = index
+    The data is copied only if its type is not supported, if it is not
+    possible to get such a view or if it is read-only, as Cython memoryviews
+    require writable buffers.
 
-        else:
-            for index in range(index, length):
-                value = data[index]
-                if isfinite(value):
-                    if value > maximum:
-                        maximum = value
-                        max_index = index
-                    if value < minimum:
-                        minimum = value
-                        min_index = index
-
-                    if 0. < value < min_pos:
-                        min_pos = value
-                        min_pos_index = index
-
-    return _MinMaxResult(minimum if isfinite(minimum) else None,
-                         min_pos if isfinite(min_pos) else None,
-                         maximum if isfinite(maximum) else None,
-                         min_index if isfinite(minimum) else None,
-                         min_pos_index if isfinite(min_pos) else None,
-                         max_index if isfinite(maximum) else None)
-
-
-def min_max(data not None, bint min_positive=False, bint finite=False):
+    :param data: Array-like dataset
+    :rtype: numpy.ndarray
+    """
+    data = numpy.array(data, copy=False)
+    native_endian_dtype = data.dtype.newbyteorder('N')
+    if native_endian_dtype.kind == 'f' and native_endian_dtype.itemsize == 2:
+        # Use native float32 instead of float16
+        native_endian_dtype = "=f4"
+    data = numpy.array(data, copy=False, dtype=native_endian_dtype)
+
+    if not data.flags.writeable:
+        data = numpy.array(data, copy=True, order='C')
+
+    if data.ndim == 0:
+        return data.reshape(1, 1)
+    elif data.ndim == 1:
+        return data[numpy.newaxis, :]
+    elif data.ndim > 2:
+        view = data.view()
+        try:
+            # Raises an AttributeError if data cannot be reshaped without copy
+            view.shape = -1, data.shape[-1]
+        except AttributeError:
+            view = numpy.ascontiguousarray(data).reshape(-1, data.shape[-1])
+        return view
+    else:
+        return data
+
+
+_DATASET_BLOCK_SIZE = 64 * 1024 ** 2
+"""Maximum size in bytes of the blocks read from datasets"""
+
+
+def _is_dataset(data):
+    """Returns True if data is a h5py-like dataset rather than an array.
+
+    :rtype: bool
+    """
+    return (not isinstance(data, numpy.ndarray) and
+            hasattr(data, 'shape') and
+            hasattr(data, 'dtype') and
+            hasattr(data, '__getitem__'))
+
+
+def _iter_blocks(data, subsampling):
+    """Iterate over data by blocks of its first axis.
+
+    For datasets, blocks are made of full chunks and their size is bounded
+    by :data:`_DATASET_BLOCK_SIZE`, so the whole dataset is never loaded.
+    An array is returned as a single block.
+
+    :param data: numpy.ndarray or h5py-like dataset
+    :param int subsampling: Step to use along each axis
+    :returns: Iterator of (offset of the block along the first axis, block)
+    """
+    shape = data.shape
+    if len(shape) == 0:
+        yield 0, numpy.array(data[()])
+        return
+
+    if not _is_dataset(data):
+        yield 0, data[(slice(None, None, subsampling),) * len(shape)]
+        return
+
+    # Size of a row of the block once subsampled
+    row_size = numpy.dtype(data.dtype).itemsize
+    for length in shape[1:]:
+        row_size *= (length + subsampling - 1) // subsampling
+
+    chunks = getattr(data, 'chunks', None)
+    chunk_height = chunks[0] if chunks else 1
+    # Number of rows in a block, aligned on chunks and subsampling
+    block_height = max(1, _DATASET_BLOCK_SIZE // max(1, row_size * chunk_height))
+    block_height *= chunk_height * subsampling
+
+    others = (slice(None, None, subsampling),) * (len(shape) - 1)
+    for offset in range(0, shape[0], block_height):
+        yield offset, data[(slice(offset, offset + block_height, subsampling),) + others]
+
+
+def _compute_min_max(data, bint min_positive, bint finite, bint moments,
+                     int subsampling):
+    """Common implementation of :func:`min_max` and :func:`statistics`.
+
+    Datasets and sub-sampled data are processed by blocks whose results
+    are merged.
+
+    :param data: Array-like or h5py-like dataset
+    :param int subsampling: Step to use along each axis
+    """
+    if subsampling < 1:
+        raise ValueError('subsampling must be strictly positive')
+
+    if not _is_dataset(data) and subsampling == 1:  # Process at once
+        data = _as_2d(data)
+        return _min_max(data, min_positive,
+                        finite and data.dtype.kind == 'f', moments)
+
+    if not _is_dataset(data):
+        data = numpy.array(data, copy=False)
+
+    shape = tuple(data.shape)
+    if numpy.prod(shape) == 0:
+        raise ValueError('Zero-size array')
+
+    extrema = []
+    partial_stats = [] if moments else None
+    first_value = None
+    for offset, block in _iter_blocks(data, subsampling):
+        block_shape = block.shape
+        block = _as_2d(block)
+        result = _min_max(block, min_positive,
+                          finite and block.dtype.kind == 'f', moments)
+        if first_value is None:
+            first_value = block[0, 0]
+
+        for field, value, index in (
+                (ARGMIN, result.minimum, result.argmin),
+                (ARGMIN_POS, result.min_positive, result.argmin_positive),
+                (ARGMAX, result.maximum, result.argmax)):
+            if index is None:
+                continue  # No positive or finite value in this block
+            if len(shape) > 0:
+                # Convert index in block to index in data
+                position = numpy.unravel_index(index, block_shape)
+                position = [coord * subsampling for coord in position]
+                position[0] += offset
+                index = int(numpy.ravel_multi_index(position, shape))
+            extrema.append((field, value, index))
+
+        if moments and result.count > 0:
+            partial_stats.append(
+                (result.count, result.mean, result.variance * result.count))
+
+    return _merge_results(extrema, partial_stats, finite, first_value)
+
+
+def min_max(data not None, bint min_positive=False, bint finite=False,
+            int subsampling=1):
     """Returns min, max and optionally strictly positive min of data.
 
     It also computes the indices of first occurrence of min/max.
@@ -305,11 +674,20 @@ def min_max(data not None, bint min_positive=False, bint finite=False):
     Then, all result fields (include minimum and maximum) can be None
     when all data is infinity or NaN.
 
-    :param data: Array-like dataset
+    Datasets of HDF5 files (e.g., :class:`h5py.Dataset`) are read by blocks
+    following their chunks, rather than being loaded at once.
+
+    For fast approximate results on big data, *subsampling* allows to only
+    take into account one value every *subsampling* values along each axis.
+    Indices are still those of the whole flattened data.
+
+    :param data: Array-like dataset or h5py-like dataset
     :param bool min_positive: True to compute the positive min and argmin
                               Default: False.
     :param bool finite: True to compute min/max from finite data only
                         Default: False.
+    :param int subsampling: Step between values taken into account along
+                            each axis. Default: 1 (all values).
     :returns: An object with minimum, maximum and min_positive attributes
               and the indices of first occurrence in the flattened data:
               argmin, argmax and argmin_positive attributes.
@@ -317,13 +695,112 @@ def min_max(data not None, bint min_positive=False, bint finite=False):
               min_positive and argmin_positive are None.
     :raises: ValueError if data is empty
     """
-    data = numpy.array(data, copy=False)
-    native_endian_dtype = data.dtype.newbyteorder('N')
-    if native_endian_dtype.kind == 'f' and native_endian_dtype.itemsize == 2:
-        # Use native float32 instead of float16
-        native_endian_dtype = "=f4"
-    data = numpy.ascontiguousarray(data, dtype=native_endian_dtype).ravel()
-    if finite and data.dtype.kind == 'f':
-        return _finite_min_max(data, min_positive)
+    return _compute_min_max(data, min_positive, finite, False, subsampling)
+
+
+def statistics(data not None, bint finite=False, int subsampling=1):
+    """Returns min, max, strictly positive min, sum, mean and variance of
+    data in a single pass.
+
+    NaNs are ignored. If all data is NaNs, the returned min/max are NaNs
+    and the mean and variance are NaNs.
+
+    Sum, mean and variance are computed with double precision floats.
+    The variance is the population variance (i.e., ``numpy.var`` with
+    ``ddof=0``).
+
+    Example:
+
+    >>> import numpy
+    >>> result = statistics(numpy.arange(10))
+    >>> result.minimum, result.maximum, result.min_positive
+    0, 9, 1
+    >>> result.mean, result.std
+    4.5, 2.8722813232690143
+
+    Datasets and sub-sampling are handled as in :func:`min_max`.
+
+    :param data: Array-like dataset or h5py-like dataset
+    :param bool finite: True to compute statistics from finite data only
+                        Default: False.
+    :param int subsampling: Step between values taken into account along
+                            each axis. Default: 1 (all values).
+    :returns: An object with the attributes of the :func:`min_max` result
+              (with min_positive computed), and count, sum, mean, variance
+              and std attributes.
+    :raises: ValueError if data is empty
+    """
+    return _compute_min_max(data, True, finite, True, subsampling)
+
+
+def _compute_histogram(data, int n_bins, histo_range, int subsampling):
+    """Implementation of :func:`silx.math.histogram.histogram1d`.
+
+    8 and 16 bits integers are counted per value in a single pass,
+    whatever the range. For other types, the range, if not provided,
+    is computed with :func:`min_max` before binning.
+
+    :param data: Array-like or h5py-like dataset
+    :param int n_bins: Number of bins
+    :param histo_range: (min, max) or None for the finite data range
+    :param int subsampling: Step to use along each axis
+    :returns: (histogram, bin edges)
+    """
+    if subsampling < 1:
+        raise ValueError('subsampling must be strictly positive')
+    if n_bins < 1:
+        raise ValueError('n_bins must be strictly positive')
+
+    if not _is_dataset(data):
+        data = numpy.array(data, copy=False)
+    if numpy.prod(data.shape) == 0:
+        raise ValueError('Zero-size array')
+
+    dtype = numpy.dtype(data.dtype)
+    if dtype.kind in 'iu' and dtype.itemsize <= 2:
+        offset = int(numpy.iinfo(dtype).min)
+        counts = numpy.zeros((2 ** (8 * dtype.itemsize),), dtype=numpy.int64)
+        for _, block in _iter_blocks(data, subsampling):
+            counts += _histogram(_as_2d(block), counts.size, 0., 0.,
+                                 True, offset)
+        values = numpy.nonzero(counts)[0]
+        extrema = (values[0] + offset, values[-1] + offset)
+    elif histo_range is None:
+        result = min_max(data, finite=True, subsampling=subsampling)
+        if result.minimum is None:
+            raise ValueError('Data contains no finite value')
+        extrema = result.minimum, result.maximum
     else:
-        return _min_max(data, min_positive)
+        extrema = None
+
+    if histo_range is not None:
+        vmin, vmax = float(histo_range[0]), float(histo_range[1])
+        if not vmin < vmax:
+            raise ValueError('histo_range max must be larger than min')
+    elif dtype.kind in 'iu' and extrema[1] - extrema[0] < n_bins:
+        # One bin per integer value
+        n_bins = int(extrema[1] - extrema[0]) + 1
+        vmin, vmax = extrema[0] - 0.5, extrema[1] + 0.5
+    elif extrema[0] == extrema[1]:
+        vmin, vmax = float(extrema[0]) - 0.5, float(extrema[1]) + 0.5
+    else:
+        vmin, vmax = float(extrema[0]), float(extrema[1])
+
+    if dtype.kind in 'iu' and dtype.itemsize <= 2:
+        # Rebin the per value counts
+        values = numpy.arange(counts.size, dtype=numpy.float64) + offset
+        mask = numpy.logical_and(
+            counts != 0, numpy.logical_and(values >= vmin, values <= vmax))
+        indices = ((values[mask] - vmin) * (n_bins / (vmax - vmin))).astype(
+            numpy.intp)
+        numpy.clip(indices, 0, n_bins - 1, out=indices)
+        histo = numpy.bincount(indices, weights=counts[mask],
+                               minlength=n_bins).astype(numpy.int64)
+    else:
+        histo = numpy.zeros((n_bins,), dtype=numpy.int64)
+        for _, block in _iter_blocks(data, subsampling):
+            histo += _histogram(_as_2d(block), n_bins, vmin, vmax)
+
+    edges = vmin + numpy.arange(n_bins + 1) * ((vmax - vmin) / n_bins)
+    edges[-1] = vmax
+    return histo, edges
@@ -27,7 +27,7 @@ __license__ = "MIT"
 __date__ = "22/06/2016"
 
 
-from .leastsq import leastsq, chisq_alpha_beta
+from .leastsq import leastsq, leastsq_multiple, chisq_alpha_beta
 from .leastsq import \
     CFREE, CPOSITIVE, CQUOTED, CFIXED, \
     CFACTOR, CDELTA, CSUM
@@ -32,6 +32,11 @@ Index of background extraction functions:
     - :func:`snip2d`
     - :func:`snip3d`
 
+Background extraction of many spectra at once, in parallel:
+
+    - :func:`strip_multiple`
+    - :func:`snip1d_multiple`
+
 Smoothing functions:
 --------------------
 
@@ -55,6 +60,7 @@ import numpy
 _logger = logging.getLogger(__name__)
 
 cimport cython
+from cython.parallel import prange
 cimport filters_wrapper
 
 
@@ -262,6 +268,173 @@ def snip3d(data, snip_width):
     return numpy.asarray(data_c).reshape(data_shape)
 
 
+_BLOCK_SIZE = 64 * 1024 ** 2
+"""Maximum size in bytes of the blocks of spectra read from datasets"""
+
+
+def _iter_spectra_blocks(data):
+    """Iterate over blocks of the first axis of an array or dataset.
+
+    Blocks of h5py-like datasets are aligned on chunks and their size is
+    bounded by :data:`_BLOCK_SIZE` once converted to float64, so that the
+    whole dataset is never loaded.
+
+    :param data: numpy.ndarray or h5py-like dataset with at least 2 dimensions
+    :returns: Iterator of slices of the first axis
+    """
+    shape = data.shape
+    if isinstance(data, numpy.ndarray):
+        yield slice(None)
+        return
+
+    row_size = 8 * int(numpy.prod(shape[1:]))
+    chunks = getattr(data, 'chunks', None)
+    chunk_height = chunks[0] if chunks else 1
+    block_height = max(1, _BLOCK_SIZE // max(1, row_size * chunk_height))
+    block_height *= chunk_height
+    for start in range(0, shape[0], block_height):
+        yield slice(start, min(start + block_height, shape[0]))
+
+
+def _process_spectra(data, output, function):
+    """Apply an in-place filter to each spectrum of data.
+
+    :param data: Array or h5py-like dataset of spectra, the last axis being
+        the channels
+    :param output: Array or h5py-like dataset where to store the result
+        or None to allocate a new array
+    :param function: Callable processing in place a C-contiguous float64
+        2D array of spectra
+    :return: output
+    """
+    if not hasattr(data, 'shape') or not hasattr(data, '__getitem__'):
+        data = numpy.array(data, copy=False)
+    shape = tuple(data.shape)
+    if len(shape) == 0:
+        raise TypeError("data must have at least one dimension")
+
+    if output is None and isinstance(data, numpy.ndarray):
+        # Process a copy at once
+        output = numpy.array(data, copy=True, dtype=numpy.float64, order='C')
+        function(output.reshape(-1, shape[-1]))
+        return output
+
+    if output is None:
+        output = numpy.empty(shape, dtype=numpy.float64)
+    elif tuple(output.shape) != shape:
+        raise ValueError("output shape does not match data shape")
+
+    if len(shape) == 1:  # Process a single spectrum
+        spectra = numpy.array(data[()], copy=True, dtype=numpy.float64)
+        function(spectra.reshape(1, -1))
+        output[()] = spectra
+        return output
+
+    for block_slice in _iter_spectra_blocks(data):
+        block = numpy.array(data[block_slice], copy=True,
+                            dtype=numpy.float64, order='C')
+        function(block.reshape(-1, shape[-1]))
+        output[block_slice] = block
+    return output
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _strip_spectra(double[:, ::1] spectra, int w, long niterations,
+                   double factor, long[::1] anchors, long len_anchors):
+    """Apply :func:`strip` in place to each row of spectra in parallel"""
+    cdef:
+        Py_ssize_t index
+        long n_channels = spectra.shape[1]
+        int errors = 0
+
+    for index in prange(spectra.shape[0], nogil=True, schedule='dynamic'):
+        errors += filters_wrapper.strip_inplace(
+            &spectra[index, 0], n_channels, factor, niterations, w,
+            &anchors[0], len_anchors) == -2
+
+    if errors:
+        raise MemoryError("Cannot allocate strip buffers")
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _snip1d_spectra(double[:, ::1] spectra, int snip_width):
+    """Apply :func:`snip1d` in place to each row of spectra in parallel"""
+    cdef:
+        Py_ssize_t index
+        int n_channels = spectra.shape[1]
+
+    for index in prange(spectra.shape[0], nogil=True, schedule='dynamic'):
+        filters_wrapper.snip1d(&spectra[index, 0], n_channels, snip_width)
+
+
+def strip_multiple(data, w=1, niterations=1000, factor=1.0, anchors=None,
+                   output=None):
+    """Extract the background of many spectra using the strip algorithm.
+
+    This applies :func:`strip` to each spectrum along the last axis of
+    data. Spectra are processed in parallel, each one in place in a single
+    buffer, so that all iterations on a spectrum are done while it is in
+    cache.
+
+    Data and output can be h5py-like datasets (e.g., a XRF map stored in a
+    HDF5 file), which are then processed by blocks of their first axis.
+
+    :param data: Array or h5py-like dataset of spectra, for instance
+        of shape (n_spectra, n_channels) or (rows, columns, n_channels)
+    :param w: Strip width
+    :param niterations: number of iterations
+    :param factor: scaling factor applied to the average of ``y(i-w)`` and
+        ``y(i+w)`` before comparing to ``y(i)``
+    :param anchors: Array of anchors, indices of channels that will not be
+          modified during the stripping procedure.
+    :param output: Array or h5py-like dataset with the same shape as data
+        where to store the background. Default: a new float64 array.
+    :return: Background of each spectrum, as output
+    """
+    cdef long[::1] anchors_c
+
+    if anchors is not None and len(anchors):
+        anchors_c = numpy.array(anchors,
+                                copy=False,
+                                dtype=numpy.int_,
+                                order='C').reshape(-1)
+        len_anchors = anchors_c.size
+    else:
+        # Dummy length-1 array to get a valid pointer
+        anchors_c = numpy.empty(shape=(1,), dtype=numpy.int_)
+        len_anchors = 0
+
+    def function(spectra):
+        _strip_spectra(spectra, w, niterations, factor,
+                       anchors_c, len_anchors)
+
+    return _process_spectra(data, output, function)
+
+
+def snip1d_multiple(data, snip_width, output=None):
+    """Estimate the baseline (background) of many spectra by clipping peaks.
+
+    This applies :func:`snip1d` to each spectrum along the last axis of
+    data. Spectra are processed in parallel, each one in place.
+
+    Data and output can be h5py-like datasets (e.g., a XRF map stored in a
+    HDF5 file), which are then processed by blocks of their first axis.
+
+    :param data: Array or h5py-like dataset of spectra, for instance
+        of shape (n_spectra, n_channels) or (rows, columns, n_channels)
+    :param int snip_width: Width of the snip operator, in number of samples.
+    :param output: Array or h5py-like dataset with the same shape as data
+        where to store the baseline. Default: a new float64 array.
+    :return: Baseline of each spectrum, as output
+    """
+    def function(spectra):
+        _snip1d_spectra(spectra, snip_width)
+
+    return _process_spectra(data, output, function)
+
+
 def savitsky_golay(data, npoints=5):
     """Smooth a curve using a Savitsky-Golay filter.
 
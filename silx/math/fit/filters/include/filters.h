@@ -26,12 +26,14 @@
 
 /* Background functions */
 void snip1d(double *data, int size, int width);
-//void snip1d_multiple(double *data, int n_channels, int snip_width, int n_spectra);
+void snip1d_multiple(double *data, int n_channels, int snip_width, int n_spectra);
 void snip2d(double *data, int nrows, int ncolumns, int width);
 void snip3d(double *data, int nx, int ny, int nz, int width);
 
 int strip(double* input, long len_input, double c, long niter, int deltai,
           long* anchors, long len_anchors, double* output);
+int strip_inplace(double* data, long len_data, double c, long niter,
+                  int deltai, long* anchors, long len_anchors);
 
 /* Smoothing functions */
 
@@ -122,28 +122,39 @@ void snip1d_multiple(double *data, int n_channels, int snip_width, int n_spectra
 	int i;
 	int j;
 	int p;
-	int offset;
-	double *w;
+	int k;
+	double *ring;
+	double *spectrum;
+	double previous;
+	double current;
 
-	i = (int) (0.5 * snip_width);
 	/* lsdf(data, size, i, 1.5, 75., 10., 1.3); */
 
-	w = (double *) malloc(n_channels * sizeof(double));
+	if (snip_width <= 0) return;
+
+	/* Values of the previous pass at i - p, updated in place */
+	ring = (double *) malloc(snip_width * sizeof(double));
+	if (ring == NULL) return;
 
 	for (j=0; j < n_spectra; j++)
 	{
-		offset = j * n_channels;
+		spectrum = data + (long) j * n_channels;
 		for (p = snip_width; p > 0; p--)
 		{
+			if (n_channels <= 2 * p) continue;
+
+			memcpy(ring, spectrum, p * sizeof(double));
+			k = 0;
 			for (i=p; i<(n_channels - p); i++)
 			{
-				w[i] = MIN(data[i + offset], 0.5*(data[i + offset - p] + data[ i + offset + p]));
-			}
-			for (i=p; i<(n_channels - p); i++)
-			{
-				data[i+offset] = w[i];
+				previous = ring[k];
+				current = spectrum[i];
+				ring[k] = current;
+				k++;
+				if (k == p) k = 0;
+				spectrum[i] = MIN(current, 0.5*(previous + spectrum[i + p]));
 			}
 		}
 	}
-	free(w);
+	free(ring);
 }
@@ -34,10 +34,15 @@
     Last modified: 17/06/2016
 */
 
+#include <stdlib.h>
 #include <string.h>
 
 #include <stdio.h>
 
+int strip_inplace(double* data, long len_data,
+                  double c, long niter, int deltai,
+                  long* anchors, long len_anchors);
+
 /*  strip(double* input, double c, long niter, double* output)
 
     The strip background is probably PyMca's  most popular background model.
@@ -67,52 +72,102 @@ int strip(double* input, long len_input,
           long* anchors, long len_anchors,
           double* output)
 {
-    long iter_index, array_index, anchor_index, anchor;
-    int anchor_nearby_flag;
-    double  t_mean;
-
     memcpy(output, input, len_input * sizeof(double));
 
     if (deltai <=0) deltai = 1;
 
-    if (len_input < (2*deltai+1)) return(-1);
+    return strip_inplace(output, len_input, c, niter, deltai,
+                         anchors, len_anchors);
+}
+
+/*  strip_inplace(double* data, long len_data, double c, long niter,
+                  int deltai, long* anchors, long len_anchors)
+
+    Same as strip, but the data array is modified in place.
+
+    Iterations alternate between data and a single work buffer instead of
+    copying the whole array back at each iteration, and anchors are
+    converted once to ranges of channels restored after each iteration.
+    Both buffers of a spectrum remain in cache during all the iterations.
+
+    Returns -1 if the data is too short for the operator width,
+    -2 on memory allocation error and 0 otherwise.
+*/
+int strip_inplace(double* data, long len_data,
+                  double c, long niter, int deltai,
+                  long* anchors, long len_anchors)
+{
+    long iter_index, array_index, anchor_index, anchor;
+    long range_index, nb_ranges = 0;
+    double t_mean, current;
+    double *input, *output, *swap, *work;
+    char* frozen;
+    long* ranges = NULL;
+
+    if (deltai <= 0) deltai = 1;
+
+    if (len_data < (2*deltai+1)) return(-1);
+
+    work = (double*) malloc(len_data * sizeof(double));
+    if (work == NULL) return(-2);
+    memcpy(work, data, len_data * sizeof(double));
 
     if (len_anchors > 0) {
-        for (iter_index = 0; iter_index < niter; iter_index++) {
-            for (array_index = deltai; array_index < len_input - deltai; array_index++) {
-                /* if index is within +- deltai of an anchor, don't do anything */
-                anchor_nearby_flag = 0;
-                for (anchor_index=0; anchor_index<len_anchors; anchor_index++)
-                {
-                    anchor = anchors[anchor_index];
-                    if (array_index > (anchor - deltai) && array_index < (anchor + deltai))
-                    {
-                        anchor_nearby_flag = 1;
-                        break;
-                    }
+        /* Flag channels within +- deltai of an anchor once for all */
+        frozen = (char*) calloc(len_data, sizeof(char));
+        /* [start, stop) of ranges of flagged channels */
+        ranges = (long*) malloc(2 * len_data * sizeof(long));
+        if (frozen == NULL || ranges == NULL) {
+            free(frozen);
+            free(ranges);
+            free(work);
+            return(-2);
+        }
+        for (anchor_index=0; anchor_index<len_anchors; anchor_index++) {
+            anchor = anchors[anchor_index];
+            for (array_index = anchor - deltai + 1;
+                    array_index < anchor + deltai; array_index++) {
+                if (array_index >= 0 && array_index < len_data) {
+                    frozen[array_index] = 1;
                 }
-                /* skip this array_index index */
-                if (anchor_nearby_flag) {
-                    continue;
+            }
+        }
+        for (array_index = 0; array_index < len_data; array_index++) {
+            if (frozen[array_index]) {
+                if (array_index == 0 || !frozen[array_index - 1]) {
+                    ranges[2 * nb_ranges] = array_index;
+                    nb_ranges++;
                 }
-
-                t_mean = 0.5 * (input[array_index-deltai] + input[array_index+deltai]);
-                if (input[array_index] > (t_mean * c))
-                    output[array_index] = t_mean;
+                ranges[2 * nb_ranges - 1] = array_index + 1;
             }
-            memcpy(input, output, len_input * sizeof(double));
         }
+        free(frozen);
     }
-    else {
-        for (iter_index = 0; iter_index < niter; iter_index++) {
-            for (array_index=deltai; array_index < len_input - deltai; array_index++) {
-                t_mean = 0.5 * (input[array_index-deltai] + input[array_index+deltai]);
 
-                if (input[array_index] > (t_mean * c))
-                    output[array_index] = t_mean;
-            }
-            memcpy(input, output, len_input * sizeof(double));
+    input = data;
+    output = work;
+    for (iter_index = 0; iter_index < niter; iter_index++) {
+        for (array_index = deltai; array_index < len_data - deltai; array_index++) {
+            current = input[array_index];
+            t_mean = 0.5 * (input[array_index-deltai] + input[array_index+deltai]);
+            output[array_index] = (current > (t_mean * c)) ? t_mean : current;
+        }
+        /* Restore channels close to anchors */
+        for (range_index = 0; range_index < nb_ranges; range_index++) {
+            memcpy(output + ranges[2 * range_index],
+                   input + ranges[2 * range_index],
+                   (ranges[2 * range_index + 1] - ranges[2 * range_index]) * sizeof(double));
         }
+        swap = input;
+        input = output;
+        output = swap;
     }
+
+    if (input != data) {
+        memcpy(data, input, len_data * sizeof(double));
+    }
+
+    free(work);
+    free(ranges);
     return(0);
 }
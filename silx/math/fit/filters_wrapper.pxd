@@ -31,7 +31,7 @@ cimport cython
 cdef extern from "filters.h":
     void snip1d(double *data,
                 int size,
-                int width)
+                int width) nogil
 
     void snip2d(double *data,
                 int nrows,
@@ -53,6 +53,14 @@ cdef extern from "filters.h":
               long len_anchors,
               double* output)
 
+    int strip_inplace(double* data,
+                      long len_data,
+                      double c,
+                      long niter,
+                      int deltai,
+                      long* anchors,
+                      long len_anchors) nogil
+
     int SavitskyGolay(double* input,
                       long len_input,
                       int npoints,
@@ -293,42 +293,8 @@ def leastsq(model, xdata, ydata, p0, sigma=None,
     else:
         epsfcn = max(epsfcn, numpy.finfo(numpy.float).eps)
 
-    # check if constraints have been passed as text
-    constrained_fit = False
-    if constraints is not None:
-        # make sure we work with a list of lists
-        input_constraints = constraints
-        tmp_constraints = [None] * len(input_constraints)
-        for i in range(nparameters):
-            tmp_constraints[i] = list(input_constraints[i])
-        constraints = tmp_constraints
-        for i in range(nparameters):
-            if hasattr(constraints[i][0], "upper"):
-                txt = constraints[i][0].upper()
-                if txt == "FREE":
-                    constraints[i][0] = CFREE
-                elif txt == "POSITIVE":
-                    constraints[i][0] = CPOSITIVE
-                elif txt == "QUOTED":
-                    constraints[i][0] = CQUOTED
-                elif txt == "FIXED":
-                    constraints[i][0] = CFIXED
-                elif txt == "FACTOR":
-                    constraints[i][0] = CFACTOR
-                    constraints[i][1] = int(constraints[i][1])
-                elif txt == "DELTA":
-                    constraints[i][0] = CDELTA
-                    constraints[i][1] = int(constraints[i][1])
-                elif txt == "SUM":
-                    constraints[i][0] = CSUM
-                    constraints[i][1] = int(constraints[i][1])
-                elif txt in ["IGNORED", "IGNORE"]:
-                    constraints[i][0] = CIGNORED
-                else:
-                    #I should raise an exception
-                    raise ValueError("Unknown constraint %s" % constraints[i][0])
-            if constraints[i][0] > 0:
-                constrained_fit = True
+    constraints, constrained_fit = _normalize_constraints(constraints,
+                                                          nparameters)
     if constrained_fit:
         if full_output is None:
             _logger.info("Recommended to set full_output to True when using constraints")
@@ -739,6 +705,223 @@ def chisq_alpha_beta(model, parameters, x, y, weight, constraints=None,
         return chisq, alpha, beta
 
 
+_BLOCK_SIZE = 2**26
+"""Memory budget in bytes for the stacked Jacobian of the datasets fitted
+together by :func:`leastsq_multiple`"""
+
+
+def leastsq_multiple(model, xdata, ydata, p0, sigma=None,
+                     constraints=None, epsfcn=None, deltachi=None,
+                     full_output=False, check_finite=True,
+                     max_iter=100, vectorized=False):
+    """
+    Use the Levenberg-Marquardt algorithm of :func:`leastsq` to fit the same
+    model function to many independent datasets.
+
+    The datasets share the independent variable, the model function and the
+    constraints. They are fitted together: at each iteration, the Jacobians
+    of all the datasets still being fitted are stacked in a 3D array and the
+    normal equations of all those datasets are solved at once.
+    Each dataset has its own damping factor and stops iterating as soon as
+    it has converged.
+    Derivatives are always computed numerically with right derivatives.
+
+    :param model: callable
+        The model function, f(x, ...).  It must take the independent
+        variable as the first argument and the parameters to fit as
+        separate remaining arguments.
+        If vectorized is False, it is called once per dataset and returns
+        a one dimensional array of M floats.
+        If vectorized is True, it is called once for several datasets with
+        each parameter provided as a (n, 1) array and it must return a
+        (n, M) array of floats.
+
+    :param xdata: The independent variable where the data is measured.
+        It is the same for all the datasets.
+
+    :param ydata: (N, M) array of the N datasets of M points to fit.
+
+    :param p0: Initial guess for the parameters, either a sequence of
+        n_parameters values used for all the datasets or an
+        (N, n_parameters) array.
+
+    :param sigma: None, M-length sequence or (N, M) array, optional
+        If not None, the uncertainties in the ydata array.
+        If None, the uncertainties are assumed to be 1.
+
+    :param constraints: Constraints on the fitted parameters, see
+        :func:`leastsq`. The same constraints apply to all the datasets.
+        Initial values of QUOTED parameters are clipped to their limits.
+    :type constraints: *optional*, None or 2D sequence
+
+    :param epsfcn: float, see :func:`leastsq`.
+    :type epsfcn: *optional*, float
+
+    :param deltachi: float, see :func:`leastsq`.
+    :type deltachi: *optional*, float
+
+    :param bool full_output: True to return all optional outputs.
+
+    :param bool check_finite: If True (default), check that the input arrays
+        do not contain nans of infs, and raise a ValueError if they do.
+        If False, the points of ydata or sigma which are not finite are
+        ignored.
+
+    :param int max_iter: Maximum number of iterations per dataset
+        (default is 100)
+
+    :param bool vectorized: True if the model function can evaluate several
+        datasets at once (see model).
+
+    :return: Returns a tuple of length 2 (or 3 if full_ouput is True) with
+        the content:
+
+         ``popt``: (N, n_parameters) array
+           Optimal values for the parameters of each dataset
+         ``pcov``: (N, n_parameters, n_parameters) array
+           The covariance of popt for each dataset, with the same meaning as
+           for :func:`leastsq`.
+         ``infodict``: dict
+           The optional outputs of :func:`leastsq` (``uncertainties``,
+           ``covariance``, ``nfev``, ``fvec``, ``niter``, ``chisq`` and
+           ``reduced_chisq``), each of them providing one entry per dataset,
+           and ``converged``, a boolean array telling for each dataset if
+           the fit has converged. It is False for datasets which reached
+           max_iter or whose curvature matrix is singular.
+    """
+    if check_finite:
+        asarray = numpy.asarray_chkfinite
+    else:
+        asarray = numpy.asarray
+    xdata = asarray(xdata)
+    ydata = asarray(ydata, dtype=numpy.float64)
+    if ydata.ndim != 2:
+        raise ValueError("ydata must be a 2D array of shape (n_datasets, n_points)")
+    n_datasets, npoints = ydata.shape
+
+    parameters = numpy.array(p0, dtype=numpy.float64, ndmin=1)
+    if parameters.ndim == 1:
+        parameters = numpy.tile(parameters, (n_datasets, 1))
+    if parameters.ndim != 2 or parameters.shape[0] != n_datasets:
+        raise ValueError("p0 must provide the parameters of each dataset")
+    nparameters = parameters.shape[1]
+
+    if sigma is None:
+        weight = numpy.ones((1, npoints), dtype=numpy.float64)
+    else:
+        sigma = asarray(sigma, dtype=numpy.float64).reshape(-1, npoints)
+        if sigma.shape[0] not in (1, n_datasets):
+            raise ValueError("sigma must be a M-length sequence or a (N, M) array")
+        weight = 1.0 / (sigma + numpy.equal(sigma, 0))
+        weight = weight * weight
+    if not check_finite:
+        # get rid of NaN in input data by giving them a null weight
+        finite = numpy.isfinite(ydata) & numpy.isfinite(weight)
+        if not finite.all():
+            weight = numpy.where(finite, weight, 0.)
+            ydata = numpy.where(finite, ydata, 0.)
+    weight = numpy.broadcast_to(weight, ydata.shape)
+
+    if deltachi is None:
+        deltachi = 0.001
+    if epsfcn is None:
+        epsfcn = numpy.finfo(numpy.float64).eps
+    else:
+        epsfcn = max(epsfcn, numpy.finfo(numpy.float64).eps)
+
+    constraints, _ = _normalize_constraints(constraints, nparameters)
+    if constraints is not None:
+        for i, constraint in enumerate(constraints):
+            if constraint[0] == CQUOTED:
+                pmin = min(constraint[1], constraint[2])
+                pmax = max(constraint[1], constraint[2])
+                outside = (parameters[:, i] < pmin) | (parameters[:, i] > pmax)
+                if outside.any():
+                    _logger.warning(
+                        "Quoted parameter %d outside boundaries, "
+                        "clipping its initial values to [%g, %g]",
+                        i, pmin, pmax)
+                    parameters[:, i] = numpy.clip(parameters[:, i], pmin, pmax)
+
+    # Datasets are fitted by blocks to bound the memory used by the Jacobian
+    block_size = max(1, _BLOCK_SIZE // (8 * npoints * nparameters))
+    popt = numpy.empty_like(parameters)
+    pcov = numpy.empty((n_datasets, nparameters, nparameters))
+    ddict = None
+    for start in range(0, n_datasets, block_size):
+        block = slice(start, start + block_size)
+        block_popt, block_pcov, block_ddict = _leastsq_block(
+            model, xdata, ydata[block], weight[block], parameters[block],
+            constraints=constraints, epsfcn=epsfcn, deltachi=deltachi,
+            max_iter=max_iter, vectorized=vectorized)
+        popt[block] = block_popt
+        pcov[block] = block_pcov
+        if ddict is None:
+            ddict = {}
+            for key, value in block_ddict.items():
+                ddict[key] = numpy.empty((n_datasets,) + value.shape[1:],
+                                         dtype=value.dtype)
+        for key, value in block_ddict.items():
+            ddict[key][block] = value
+
+    if not full_output:
+        return popt, pcov
+    else:
+        n_free = ddict["covariance"].shape[-1]
+        valid_points = numpy.sum(weight != 0, axis=1)
+        ddict["reduced_chisq"] = ddict["chisq"] / (valid_points - n_free)
+        return popt, pcov, ddict
+
+
+def _normalize_constraints(constraints, nparameters):
+    """
+    Convert constraints possibly given as text into a list of lists of
+    numerical codes.
+
+    :param constraints: None or 2D sequence of dimension (n_parameters, 3)
+    :param int nparameters: Number of parameters
+    :return: The list of constraints (or None) and a flag telling if any
+        parameter is actually constrained
+    """
+    constrained_fit = False
+    if constraints is None:
+        return None, constrained_fit
+    # make sure we work with a list of lists
+    input_constraints = constraints
+    tmp_constraints = [None] * len(input_constraints)
+    for i in range(nparameters):
+        tmp_constraints[i] = list(input_constraints[i])
+    constraints = tmp_constraints
+    for i in range(nparameters):
+        if hasattr(constraints[i][0], "upper"):
+            txt = constraints[i][0].upper()
+            if txt == "FREE":
+                constraints[i][0] = CFREE
+            elif txt == "POSITIVE":
+                constraints[i][0] = CPOSITIVE
+            elif txt == "QUOTED":
+                constraints[i][0] = CQUOTED
+            elif txt == "FIXED":
+                constraints[i][0] = CFIXED
+            elif txt == "FACTOR":
+                constraints[i][0] = CFACTOR
+                constraints[i][1] = int(constraints[i][1])
+            elif txt == "DELTA":
+                constraints[i][0] = CDELTA
+                constraints[i][1] = int(constraints[i][1])
+            elif txt == "SUM":
+                constraints[i][0] = CSUM
+                constraints[i][1] = int(constraints[i][1])
+            elif txt in ["IGNORED", "IGNORE"]:
+                constraints[i][0] = CIGNORED
+            else:
+                #I should raise an exception
+                raise ValueError("Unknown constraint %s" % constraints[i][0])
+        if constraints[i][0] > 0:
+            constrained_fit = True
+    return constraints, constrained_fit
+
+
 def _get_parameters(parameters, constraints):
     """
     Apply constraints to input parameters.
@@ -834,6 +1017,334 @@ def _get_sigma_parameters(parameters, sigma0, constraints):
     return sigma_par
 
 
+def _free_parameters(constraints, nparameters):
+    """
+    Internal function returning the layout of the fitted parameters.
+
+    :return: The indices of the free parameters, the indices of the
+        parameters passed to the model function and a list of
+        (free parameter position, min, max) for the quoted parameters.
+    """
+    if constraints is None:
+        indices = list(range(nparameters))
+        return indices, list(indices), []
+    free_index = []
+    noigno = []
+    quoted = []
+    for i in range(nparameters):
+        if constraints[i][0] != CIGNORED:
+            noigno.append(i)
+        if constraints[i][0] in [CFREE, CPOSITIVE]:
+            free_index.append(i)
+        elif constraints[i][0] == CQUOTED:
+            pmax = max(constraints[i][1], constraints[i][2])
+            pmin = min(constraints[i][1], constraints[i][2])
+            if (pmax - pmin) > 0:
+                quoted.append((len(free_index), pmin, pmax))
+                free_index.append(i)
+    return free_index, noigno, quoted
+
+
+def _quoted_angles(fitparam, pmin, pmax):
+    """Internal function returning the angles of quoted parameters"""
+    A = 0.5 * (pmax + pmin)
+    B = 0.5 * (pmax - pmin)
+    return A, B, numpy.arcsin(numpy.clip((fitparam - A) / B, -1., 1.))
+
+
+def _get_parameters_multiple(parameters, constraints):
+    """
+    Apply constraints to the (n_datasets, n_parameters) array of parameters.
+
+    Same as :func:`_get_parameters` for many datasets.
+    """
+    newparam = parameters.copy()
+    if constraints is None:
+        return newparam
+    for i in range(len(constraints)):
+        if constraints[i][0] == CPOSITIVE:
+            newparam[:, i] = abs(parameters[:, i])
+    for i in range(len(constraints)):
+        if constraints[i][0] == CFACTOR:
+            newparam[:, i] = constraints[i][2] * newparam[:, int(constraints[i][1])]
+        elif constraints[i][0] == CDELTA:
+            newparam[:, i] = constraints[i][2] + newparam[:, int(constraints[i][1])]
+        elif constraints[i][0] == CIGNORED:
+            newparam[:, i] = 0
+        elif constraints[i][0] == CSUM:
+            newparam[:, i] = constraints[i][2] - newparam[:, int(constraints[i][1])]
+    return newparam
+
+
+def _get_sigma_parameters_multiple(parameters, sigma0, constraints):
+    """
+    Propagate the uncertainties of the fitted parameters of many datasets.
+
+    Same as :func:`_get_sigma_parameters` for many datasets.
+    """
+    if constraints is None:
+        return sigma0
+    n_free = 0
+    sigma_par = numpy.zeros(parameters.shape, numpy.float64)
+    for i in range(len(constraints)):
+        if constraints[i][0] in [CFREE, CPOSITIVE]:
+            sigma_par[:, i] = sigma0[:, n_free]
+            n_free += 1
+        elif constraints[i][0] == CQUOTED:
+            pmax = max(constraints[i][1], constraints[i][2])
+            pmin = min(constraints[i][1], constraints[i][2])
+            B = 0.5 * (pmax - pmin)
+            if B > 0:
+                inside = (parameters[:, i] < pmax) & (parameters[:, i] > pmin)
+                sigma_par[:, i] = numpy.where(
+                    inside,
+                    abs(B * numpy.cos(parameters[:, i]) * sigma0[:, n_free]),
+                    parameters[:, i])
+                n_free += 1
+            else:
+                sigma_par[:, i] = parameters[:, i]
+        elif abs(constraints[i][0]) == CFIXED:
+            sigma_par[:, i] = parameters[:, i]
+    for i in range(len(constraints)):
+        if constraints[i][0] == CFACTOR:
+            sigma_par[:, i] = constraints[i][2] * sigma_par[:, int(constraints[i][1])]
+        elif constraints[i][0] in [CDELTA, CSUM]:
+            sigma_par[:, i] = sigma_par[:, int(constraints[i][1])]
+    return sigma_par
+
+
+def _evaluate_multiple(model, x, parameters, npoints, vectorized):
+    """
+    Internal function evaluating the model for each row of parameters.
+
+    :return: A (n_datasets, npoints) array
+    """
+    result = numpy.empty((len(parameters), npoints), dtype=numpy.float64)
+    if vectorized:
+        columns = [parameters[:, i:i + 1] for i in range(parameters.shape[1])]
+        result[:] = model(x, *columns)
+        return result
+    for i, row in enumerate(parameters):
+        result[i] = numpy.asarray(model(x, *row)).reshape(-1)
+    return result
+
+
+def _jacobian_multiple(model, x, parameters, fitparam, free_index,
+                       derivfactor, noigno, constraints, fvec, epsfcn,
+                       vectorized):
+    """
+    Internal function computing the stacked Jacobian of many datasets
+    with respect to their free parameters.
+
+    :return: A (n_datasets, npoints, n_free) array
+    """
+    n_datasets, npoints = fvec.shape
+    delta = (fitparam + numpy.equal(fitparam, 0.0)) * numpy.sqrt(epsfcn)
+    deriv = numpy.empty((n_datasets, npoints, len(free_index)))
+    pwork = parameters.copy()
+    pwork[:, free_index] = fitparam
+    for i, index in enumerate(free_index):
+        pwork[:, index] = fitparam[:, i] + delta[:, i]
+        newpar = _get_parameters_multiple(pwork, constraints)[:, noigno]
+        f1 = _evaluate_multiple(model, x, newpar, npoints, vectorized)
+        deriv[:, :, i] = (f1 - fvec) * (derivfactor[:, i] / delta[:, i])[:, None]
+        pwork[:, index] = fitparam[:, i]
+    return deriv
+
+
+def _alpha_beta_multiple(deriv, weight, deltay):
+    """Internal function returning the stacked alpha and beta matrices"""
+    wderiv = deriv * weight[:, :, None]
+    alpha = numpy.einsum('nki,nkj->nij', wderiv, deriv)
+    beta = numpy.einsum('nki,nk->ni', wderiv, deltay)
+    return alpha, beta
+
+
+def _solve_multiple(a, b):
+    """
+    Internal function solving a stack of linear systems.
+
+    :return: The solutions and a mask of the systems actually solved
+    """
+    solved = numpy.ones(len(a), dtype=bool)
+    try:
+        return numpy.linalg.solve(a, b[:, :, None])[:, :, 0], solved
+    except LinAlgError:
+        result = numpy.zeros(b.shape, dtype=numpy.float64)
+        for i in range(len(a)):
+            try:
+                result[i] = numpy.linalg.solve(a[i], b[i])
+            except LinAlgError:
+                solved[i] = False
+        return result, solved
+
+
+def _inv_multiple(a):
+    """
+    Internal function inverting a stack of matrices.
+
+    Singular matrices are replaced by NaNs.
+    """
+    try:
+        return inv(a)
+    except LinAlgError:
+        result = numpy.empty(a.shape, dtype=numpy.float64)
+        for i in range(len(a)):
+            try:
+                result[i] = inv(a[i])
+            except LinAlgError:
+                result[i] = numpy.nan
+        return result
+
+
+def _leastsq_block(model, x, y, weight, parameters, constraints, epsfcn,
+                   deltachi, max_iter, vectorized):
+    """
+    Internal function fitting a block of datasets with the
+    Levenberg-Marquardt algorithm.
+
+    See :func:`leastsq_multiple`.
+    """
+    n_datasets, npoints = y.shape
+    free_index, noigno, quoted = _free_parameters(constraints,
+                                                  parameters.shape[1])
+    n_free = len(free_index)
+    if n_free == 0:
+        raise ValueError("No free parameters to fit")
+
+    fittedpar = _get_parameters_multiple(parameters, constraints)
+    fvec = _evaluate_multiple(model, x, fittedpar[:, noigno], npoints,
+                              vectorized)
+    nfev = numpy.ones(n_datasets, dtype=numpy.int64)
+    niter = numpy.zeros(n_datasets, dtype=numpy.int64)
+    chisq0 = (weight * pow(y - fvec, 2)).sum(axis=1)
+    alpha0 = numpy.zeros((n_datasets, n_free, n_free))
+    flambda = numpy.full(n_datasets, 0.001)
+    remaining = numpy.full(n_datasets, max_iter, dtype=numpy.int64)
+    active = numpy.ones(n_datasets, dtype=bool)
+    converged = numpy.zeros(n_datasets, dtype=bool)
+    identity = numpy.identity(n_free)
+
+    while True:
+        active &= remaining > 0
+        current = numpy.nonzero(active)[0]
+        if len(current) == 0:
+            break
+        niter[current] += 1
+        fitparam = fittedpar[current][:, free_index]
+        derivfactor = numpy.ones(fitparam.shape)
+        for i, pmin, pmax in quoted:
+            A, B, angle = _quoted_angles(fitparam[:, i], pmin, pmax)
+            derivfactor[:, i] = B * numpy.cos(angle)
+        deriv = _jacobian_multiple(model, x, fittedpar[current], fitparam,
+                                   free_index, derivfactor, noigno,
+                                   constraints, fvec[current], epsfcn,
+                                   vectorized)
+        nfev[current] += n_free
+        alpha, beta = _alpha_beta_multiple(deriv, weight[current],
+                                           y[current] - fvec[current])
+        deriv = None
+        alpha0[current] = alpha
+
+        pending = numpy.ones(len(current), dtype=bool)
+        while pending.any():
+            trial = numpy.nonzero(pending)[0]
+            indices = current[trial]
+            damped = alpha[trial] * \
+                (1.0 + flambda[indices][:, None, None] * identity)
+            deltapar, solved = _solve_multiple(damped, beta[trial])
+            if not solved.all():
+                # singular curvature matrix, nothing more can be done
+                pending[trial[~solved]] = False
+                active[indices[~solved]] = False
+                trial = trial[solved]
+                indices = indices[solved]
+                deltapar = deltapar[solved]
+                if len(trial) == 0:
+                    continue
+            newfree = fitparam[trial] + deltapar
+            for i, pmin, pmax in quoted:
+                A, B, angle = _quoted_angles(fitparam[trial, i], pmin, pmax)
+                newfree[:, i] = A + B * numpy.sin(angle + deltapar[:, i])
+            newpar = fittedpar[indices]
+            newpar[:, free_index] = newfree
+            newpar = _get_parameters_multiple(newpar, constraints)
+            yfit = _evaluate_multiple(model, x, newpar[:, noigno], npoints,
+                                      vectorized)
+            nfev[indices] += 1
+            remaining[indices] -= 1
+            chisq = (weight[indices] * pow(y[indices] - yfit, 2)).sum(axis=1)
+            absdeltachi = chisq0[indices] - chisq
+
+            # no improvement: increase damping and try again
+            worse = absdeltachi < 0
+            flambda[indices[worse]] *= 10.0
+            stalled = worse & (flambda[indices] > 1000)
+            active[indices[stalled]] = False
+            converged[indices[stalled]] = True
+            pending[trial[stalled]] = False
+
+            # improvement: accept the new parameters
+            better = ~worse
+            accepted = indices[better]
+            pending[trial[better]] = False
+            fittedpar[accepted] = newpar[better]
+            fvec[accepted] = yfit[better]
+            chisq = chisq[better]
+            absdeltachi = absdeltachi[better]
+            lastdeltachi = 100 * (absdeltachi / (chisq + (chisq == 0)))
+            # the first iteration *has* to improve the fit
+            done = (niter[accepted] >= 2) & \
+                ((lastdeltachi < deltachi) |
+                 (absdeltachi < numpy.sqrt(epsfcn)))
+            active[accepted[done]] = False
+            converged[accepted[done]] = True
+            chisq0[accepted] = chisq
+            flambda[accepted] /= 10.0
+
+    # this is the covariance matrix of the actually fitted parameters
+    cov0 = _inv_multiple(alpha0)
+    if constraints is None:
+        cov = cov0
+    else:
+        # all the parameters free except those that are FIXED and that
+        # will be assigned a 100 % uncertainty.
+        new_constraints = copy.deepcopy(constraints)
+        special = []
+        for idx, constraint in enumerate(constraints):
+            if constraint[0] in [CFIXED, CIGNORED]:
+                special.append(idx)
+            else:
+                new_constraints[idx] = [CFREE, 0, 0]
+        all_free = [idx for idx in range(len(constraints))
+                    if idx not in special]
+        cov = numpy.zeros((n_datasets,) + (len(constraints),) * 2)
+        if all_free:
+            fitparam = fittedpar[:, all_free]
+            deriv = _jacobian_multiple(model, x, fittedpar, fitparam,
+                                       all_free, numpy.ones(fitparam.shape),
+                                       noigno, new_constraints, fvec, epsfcn,
+                                       vectorized)
+            nfev += len(all_free)
+            alpha, beta = _alpha_beta_multiple(deriv, weight, y - fvec)
+            cov[:, numpy.array(all_free)[:, None], all_free] = \
+                _inv_multiple(alpha)
+        for idx in special:
+            cov[:, idx, idx] = fittedpar[:, idx] * fittedpar[:, idx]
+
+    sigma0 = numpy.sqrt(abs(numpy.diagonal(cov0, axis1=1, axis2=2)))
+    ddict = {}
+    ddict["chisq"] = chisq0
+    ddict["covariance"] = cov0
+    ddict["uncertainties"] = _get_sigma_parameters_multiple(
+        fittedpar, sigma0, constraints)
+    ddict["fvec"] = fvec
+    ddict["nfev"] = nfev
+    ddict["niter"] = niter
+    ddict["converged"] = converged
+    return fittedpar, cov, ddict
+
+
 def main(argv=None):
     if argv is None:
         npoints = 10000
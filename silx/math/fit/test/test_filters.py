@@ -22,11 +22,19 @@
 #
 # ############################################################################*/
 import numpy
+import os
+import shutil
+import tempfile
 import unittest
 from silx.math.fit import filters
 from silx.math.fit import functions
 from silx.test.utils import add_relative_noise
 
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
 
 class TestSmooth(unittest.TestCase):
     """
@@ -122,7 +130,119 @@ class TestSmooth(unittest.TestCase):
                                        expected_smooth[i, j])
 
 
-test_cases = (TestSmooth,)
+def _strip_reference(y, w, niterations, factor=1., anchors=()):
+    """Straightforward implementation of the strip algorithm"""
+    y = numpy.array(y, dtype=numpy.float64)
+    frozen = numpy.zeros(len(y), dtype=bool)
+    for anchor in anchors:
+        frozen[max(0, anchor - w + 1):anchor + w] = True
+    for _ in range(niterations):
+        mean = 0.5 * (y[:-2 * w] + y[2 * w:])
+        center = y[w:-w]
+        mask = numpy.logical_and(center > mean * factor,
+                                 numpy.logical_not(frozen[w:-w]))
+        y[w:-w] = numpy.where(mask, mean, center)
+    return y
+
+
+def _snip1d_reference(y, snip_width):
+    """Straightforward implementation of the SNIP algorithm"""
+    y = numpy.array(y, dtype=numpy.float64)
+    for p in range(snip_width, 0, -1):
+        if len(y) > 2 * p:
+            y[p:-p] = numpy.minimum(y[p:-p], 0.5 * (y[:-2 * p] + y[2 * p:]))
+    return y
+
+
+class TestBackground(unittest.TestCase):
+    """Tests of strip and snip background functions, including batches"""
+
+    def setUp(self):
+        x = numpy.arange(500)
+        spectra = []
+        for index in range(12):
+            y = functions.sum_gauss(x,
+                                    50 + index, 100 + 10 * index, 15,
+                                    80, 350 - index, 5 + index)
+            spectra.append(add_relative_noise(y + 10. + 0.01 * x, 5.))
+        self.spectra = numpy.array(spectra).reshape(3, 4, len(x))
+
+    def testStrip(self):
+        y = self.spectra[0, 0]
+        for w, anchors in ((1, None), (4, [50, 51, 300]), (3, [0, 499])):
+            background = filters.strip(y, w=w, niterations=200,
+                                       factor=1.01, anchors=anchors)
+            expected = _strip_reference(y, w, 200, 1.01, anchors or ())
+            self.assertTrue(numpy.array_equal(background, expected))
+
+    def testSnip1d(self):
+        y = self.spectra[0, 0]
+        for width in (1, 20, 300):
+            self.assertTrue(numpy.array_equal(
+                filters.snip1d(y, width), _snip1d_reference(y, width)))
+
+    def testStripMultiple(self):
+        background = filters.strip_multiple(self.spectra, w=2,
+                                            niterations=100,
+                                            anchors=[250])
+        self.assertEqual(background.shape, self.spectra.shape)
+        for index, y in enumerate(self.spectra.reshape(-1, 500)):
+            self.assertTrue(numpy.array_equal(
+                background.reshape(-1, 500)[index],
+                filters.strip(y, w=2, niterations=100, anchors=[250])))
+
+        output = numpy.zeros(self.spectra.shape)
+        result = filters.strip_multiple(self.spectra, w=2, niterations=100,
+                                        anchors=[250], output=output)
+        self.assertIs(result, output)
+        self.assertTrue(numpy.array_equal(output, background))
+
+        # Single spectrum
+        self.assertTrue(numpy.array_equal(
+            filters.strip_multiple(self.spectra[1, 2], w=2, niterations=100),
+            filters.strip(self.spectra[1, 2], w=2, niterations=100)))
+
+    def testSnip1dMultiple(self):
+        background = filters.snip1d_multiple(self.spectra, 30)
+        self.assertEqual(background.shape, self.spectra.shape)
+        for index, y in enumerate(self.spectra.reshape(-1, 500)):
+            self.assertTrue(numpy.array_equal(
+                background.reshape(-1, 500)[index], filters.snip1d(y, 30)))
+
+        with self.assertRaises(ValueError):
+            filters.snip1d_multiple(self.spectra, 30,
+                                    output=numpy.zeros((3, 4)))
+
+    def testDataset(self):
+        if h5py is None:
+            self.skipTest("h5py is not available")
+        tmpdir = tempfile.mkdtemp()
+        block_size = filters._BLOCK_SIZE
+        try:
+            filename = os.path.join(tmpdir, "spectra.h5")
+            with h5py.File(filename, "w") as h5file:
+                data = h5file.create_dataset(
+                    "data", data=self.spectra, chunks=(1, 2, 500))
+                output = h5file.create_dataset(
+                    "background", shape=self.spectra.shape, dtype="f8")
+
+                # Force several blocks
+                filters._BLOCK_SIZE = 4000 * 8
+                filters.snip1d_multiple(data, 30, output=output)
+                self.assertTrue(numpy.array_equal(
+                    output[()], filters.snip1d_multiple(self.spectra, 30)))
+
+                background = filters.strip_multiple(data, niterations=100)
+                self.assertTrue(numpy.array_equal(
+                    background,
+                    filters.strip_multiple(self.spectra, niterations=100)))
+        finally:
+            filters._BLOCK_SIZE = block_size
+            shutil.rmtree(tmpdir)
+
+
+test_cases = (TestSmooth,
+              TestBackground,)
 
 
 def suite():
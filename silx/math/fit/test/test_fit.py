@@ -32,6 +32,7 @@ import sys
 
 from silx.utils import testutils
 from silx.math.fit.leastsq import _logger as fitlogger
+from silx.math.fit.leastsq import CFREE, CPOSITIVE, CQUOTED
 
 
 class Test_leastsq(unittest.TestCase):
@@ -372,7 +373,97 @@ class Test_leastsq(unittest.TestCase):
                                        parameters_estimate[i])
 
 
-test_cases = (Test_leastsq,)
+class Test_leastsq_multiple(unittest.TestCase):
+    """
+    Unit tests of the leastsq_multiple function.
+    """
+
+    @staticmethod
+    def gauss(x, *params):
+        dummy = 2.3548200450309493 * (x - params[3]) / params[4]
+        return params[0] + params[1] * x + \
+            params[2] * numpy.exp(-0.5 * dummy * dummy)
+
+    def setUp(self):
+        self.x = numpy.arange(100.)
+        self.parameters_actual = numpy.array(
+            [[10.5, 0.2, 1000.0, 40., 15.],
+             [5., -0.1, 500.0, 50., 10.],
+             [2., 0.1, 2000.0, 60., 20.],
+             [1., 0.05, 100.0, 45., 30.]])
+        self.y = numpy.array([self.gauss(self.x, *p)
+                              for p in self.parameters_actual])
+        self.parameters_estimate = [0.0, 0.0, 900.0, 48., 18.]
+
+    def testCompareLeastsq(self):
+        from silx.math.fit import leastsq, leastsq_multiple
+        sigma = numpy.sqrt(abs(self.y) + 1)
+        constraints_list = [
+            None,
+            [[CFREE, 0, 0], [CFREE, 0, 0], [CPOSITIVE, 0, 0],
+             [CQUOTED, 30, 70], [CPOSITIVE, 0, 0]],
+            [["FREE", 0, 0], ["FIXED", 0, 0], ["FREE", 0, 0],
+             ["FREE", 0, 0], ["FREE", 0, 0]],
+        ]
+        for constraints in constraints_list:
+            popt, pcov, infodict = leastsq_multiple(
+                self.gauss, self.x, self.y, self.parameters_estimate,
+                sigma=sigma, constraints=constraints, full_output=True)
+            self.assertEqual(popt.shape, self.parameters_actual.shape)
+            self.assertEqual(pcov.shape, (4, 5, 5))
+            for i in range(len(self.y)):
+                ref_popt, ref_pcov, ref_infodict = leastsq(
+                    self.gauss, self.x, self.y[i], self.parameters_estimate,
+                    sigma=sigma[i], constraints=constraints, full_output=True)
+                self.assertTrue(numpy.allclose(popt[i], ref_popt, atol=1e-4))
+                self.assertTrue(numpy.allclose(pcov[i], ref_pcov, rtol=1e-3))
+                self.assertTrue(numpy.allclose(infodict["uncertainties"][i],
+                                               ref_infodict["uncertainties"],
+                                               rtol=1e-3))
+                self.assertEqual(infodict["niter"][i], ref_infodict["niter"])
+                self.assertAlmostEqual(infodict["reduced_chisq"][i],
+                                       ref_infodict["reduced_chisq"])
+            self.assertTrue(numpy.all(infodict["converged"]))
+
+    def testVectorized(self):
+        from silx.math.fit import leastsq_multiple
+        popt, pcov = leastsq_multiple(self.gauss, self.x, self.y,
+                                      self.parameters_estimate)
+        self.assertTrue(numpy.allclose(popt, self.parameters_actual,
+                                       atol=1e-4))
+
+        def vectorized_gauss(x, *params):
+            return self.gauss(x[None, :], *params)
+
+        vect_popt, vect_pcov = leastsq_multiple(
+            vectorized_gauss, self.x, self.y, self.parameters_estimate,
+            vectorized=True)
+        self.assertTrue(numpy.array_equal(vect_popt, popt))
+        self.assertTrue(numpy.array_equal(vect_pcov, pcov))
+
+    def testNonFinite(self):
+        from silx.math.fit import leastsq_multiple
+        y = self.y.copy()
+        y[1, 10] = numpy.nan
+        with self.assertRaises(ValueError):
+            leastsq_multiple(self.gauss, self.x, y, self.parameters_estimate)
+        popt, pcov, infodict = leastsq_multiple(
+            self.gauss, self.x, y, self.parameters_estimate,
+            check_finite=False, full_output=True)
+        self.assertTrue(numpy.allclose(popt, self.parameters_actual,
+                                       atol=1e-4))
+        self.assertFalse(numpy.isnan(infodict["chisq"]).any())
+
+    def testMaxIter(self):
+        from silx.math.fit import leastsq_multiple
+        popt, pcov, infodict = leastsq_multiple(
+            self.gauss, self.x, self.y, self.parameters_estimate,
+            max_iter=2, full_output=True)
+        self.assertFalse(numpy.any(infodict["converged"]))
+        self.assertTrue(numpy.all(infodict["niter"] <= 2))
+
+
+test_cases = (Test_leastsq, Test_leastsq_multiple)
 
 def suite():
     loader = unittest.defaultTestLoader
@@ -34,6 +34,11 @@ Classes
 - :class:`Histogramnd` : multi dimensional histogram.
 - :class:`HistogramndLut` : optimized to compute several histograms from data sharing the same coordinates.
 
+Functions
+=========
+
+- :func:`histogram1d` : fast histogram of the values of an array with uniform bins.
+
 Examples
 ========
 
@@ -145,7 +150,9 @@ __date__ = "02/10/2017"
 import numpy as np
 from .chistogramnd import chistogramnd as _chistogramnd  # noqa
 from .chistogramnd_lut import histogramnd_get_lut as _histo_get_lut
-from .chistogramnd_lut import histogramnd_from_lut as _histo_from_lut
+from .chistogramnd_lut import histogramnd_lut_to_csr as _histo_lut_to_csr
+from .chistogramnd_lut import histogramnd_from_csr as _histo_from_csr
+from .combo import _compute_histogram
 
 
 class Histogramnd(object):
@@ -161,7 +168,8 @@ class Histogramnd(object):
                  weight_min=None,
                  weight_max=None,
                  last_bin_closed=False,
-                 wh_dtype=None):
+                 wh_dtype=None,
+                 n_threads=None):
         """
         :param sample:
             The data to be histogrammed.
@@ -231,12 +239,19 @@ class Histogramnd(object):
             of type numpy.double. Allowed values are : `numpy.double` and
             `numpy.float32`
         :type wh_dtype: *optional*, numpy data type
+
+        :param n_threads: Number of threads used to compute the histograms,
+            here and in :meth:`accumulate`.
+            If not provided, it is chosen from the number of CPUs, samples and
+            bins. See :func:`silx.math.chistogramnd.chistogramnd`.
+        :type n_threads: *optional*, int
         """
 
         self.__histo_range = histo_range
         self.__n_bins = n_bins
         self.__last_bin_closed = last_bin_closed
         self.__wh_dtype = wh_dtype
+        self.__n_threads = n_threads
 
         if sample is None:
             self.__data = [None, None, None]
@@ -248,7 +263,8 @@ class Histogramnd(object):
                                         weight_min=weight_min,
                                         weight_max=weight_max,
                                         last_bin_closed=self.__last_bin_closed,
-                                        wh_dtype=self.__wh_dtype)
+                                        wh_dtype=self.__wh_dtype,
+                                        n_threads=self.__n_threads)
 
     def __getitem__(self, key):
         """
@@ -325,7 +341,8 @@ class Histogramnd(object):
                                last_bin_closed=self.__last_bin_closed,
                                histo=self.__data[0],
                                weighted_histo=self.__data[1],
-                               wh_dtype=self.__wh_dtype)
+                               wh_dtype=self.__wh_dtype,
+                               n_threads=self.__n_threads)
         if self.__data[0] is None:
             self.__data = result
         elif self.__data[1] is None and result[1] is not None:
@@ -356,6 +373,11 @@ class HistogramndLut(object):
     The HistogramndLut class allows you to bin data onto a regular grid.
     The use of HistogramndLut is interesting when several sets of data that
     share the same coordinates (*sample*) have to be mapped onto the same grid.
+
+    The LUT is stored as the list of the sample indices sorted by bin
+    (using the smallest integer type able to index all samples) and the
+    offsets of each bin in this list. This allows to compute the
+    histograms in parallel, each bin being handled by a single thread.
     """
 
     def __init__(self,
@@ -363,7 +385,8 @@ class HistogramndLut(object):
                  histo_range,
                  n_bins,
                  last_bin_closed=False,
-                 dtype=None):
+                 dtype=None,
+                 n_threads=None):
         """
         :param sample:
             The coordinates of the data to be histogrammed.
@@ -397,15 +420,25 @@ class HistogramndLut(object):
             Set this parameter to true if you want
             the LAST bin to be closed.
         :type last_bin_closed: *optional*, :class:`python.boolean`
+
+        :param n_threads: Number of threads used to compute the histograms
+            (default: number of CPUs).
+        :type n_threads: *optional*, int
         """
         lut, histo, edges = _histo_get_lut(sample,
                                            histo_range,
                                            n_bins,
                                            last_bin_closed=last_bin_closed)
 
+        if n_threads is not None and n_threads < 1:
+            raise ValueError('<n_threads> must be strictly positive.')
+
         self.__n_bins = np.array(histo.shape)
         self.__histo_range = histo_range
-        self.__lut = lut
+        self.__indices, self.__offsets = _histo_lut_to_csr(lut, histo)
+        self.__n_elem = lut.size
+        self.__lut_dtype = lut.dtype
+        self.__n_threads = n_threads
         self.__histo = None
         self.__weighted_histo = None
         self.__edges = edges
@@ -424,9 +457,13 @@ class HistogramndLut(object):
     @property
     def lut(self):
         """
-        Copy of the Lut
+        Copy of the Lut: the bin index of each sample (-1 for samples
+        outside the histogram range).
         """
-        return self.__lut.copy()
+        lut = np.full(self.__n_elem, -1, dtype=self.__lut_dtype)
+        lut[self.__indices] = np.repeat(np.arange(self.__offsets.size - 1),
+                                        np.diff(self.__offsets))
+        return lut
 
     def histo(self, copy=True):
         """
@@ -514,14 +551,21 @@ class HistogramndLut(object):
         if self.__dtype is None:
             self.__dtype = weights.dtype
 
-        histo, w_histo = _histo_from_lut(weights,
-                                         self.__lut,
+        if weights.size != self.__n_elem:
+            raise ValueError('The LUT and weights arrays must have the same '
+                             'number of elements.')
+
+        histo, w_histo = _histo_from_csr(weights,
+                                         self.__indices,
+                                         self.__offsets,
+                                         self.__n_elem,
                                          histo=self.__histo,
                                          weighted_histo=self.__weighted_histo,
                                          shape=self.__shape,
                                          dtype=self.__dtype,
                                          weight_min=weight_min,
-                                         weight_max=weight_max)
+                                         weight_max=weight_max,
+                                         n_threads=self.__n_threads)
 
         if self.__histo is None:
             self.__histo = histo
@@ -540,10 +584,16 @@ class HistogramndLut(object):
         result (it is NOT added to the current histogram stored by this
         instance).
 
+        A stack of weights arrays (e.g., detector frames) can be processed
+        in a single call, in which case the returned histograms have an
+        additional first dimension indexing the sets of weights.
+
         :param weights:
             A numpy array of values associated with each sample. The number of
             elements in the array must be the same as the number of samples
-            provided at instantiation time.
+            provided at instantiation time, or for a stack, the first
+            dimension indexes the sets of weights and the other dimensions
+            must contain as many elements as there are samples.
         :type histo_range: array_like
 
         :param histo:
@@ -578,16 +628,70 @@ class HistogramndLut(object):
                 as *weights*.
         :type weight_max: *optional*, scalar
         """
-        histo, w_histo = _histo_from_lut(weights,
-                                         self.__lut,
+        if weights.size == self.__n_elem:
+            shape = self.__shape
+        else:
+            shape = (weights.shape[0],) + self.__shape
+
+        histo, w_histo = _histo_from_csr(weights,
+                                         self.__indices,
+                                         self.__offsets,
+                                         self.__n_elem,
                                          histo=histo,
                                          weighted_histo=weighted_histo,
-                                         shape=self.__shape,
+                                         shape=shape,
                                          dtype=self.__dtype,
                                          weight_min=weight_min,
-                                         weight_max=weight_max)
+                                         weight_max=weight_max,
+                                         n_threads=self.__n_threads)
         self.__dtype = w_histo.dtype
         return histo, w_histo
 
+
+_FAST_HISTOGRAM_SIZE = 2 ** 20
+"""Approximate number of values used by :func:`histogram1d` when not accurate
+"""
+
+
+def histogram1d(data, n_bins=256, histo_range=None, subsampling=1,
+                accurate=True):
+    """Computes the histogram of the values of data with uniform bins.
+
+    NaNs and values outside of the histogram range are ignored.
+    Binning is done in parallel and in a single pass over the data, without
+    copying it. If *histo_range* is not provided, the range of finite values
+    is computed in an extra pass, except for 8 and 16 bits integers which
+    are counted per value in a single pass.
+
+    For integer data with an automatic range narrower than *n_bins*,
+    there is one bin per integer value.
+
+    >>> import numpy
+    >>> from silx.math.histogram import histogram1d
+    >>> histo, edges = histogram1d(numpy.random.random((1000, 1000)), 100)
+
+    :param data: Array-like or h5py-like dataset of any dimension
+    :param int n_bins: Number of bins
+    :param histo_range: (min, max) edges of the histogram (the last bin is
+        closed). Default: range of the finite values of data.
+    :param int subsampling: Step between values taken into account along
+        each axis. Default: 1 (all values).
+    :param bool accurate: False to trade accuracy for speed by only taking
+        into account about 1 million values, evenly spread over the data
+        (ignored if *subsampling* is not 1).
+    :returns: The counts of each bin (counts of sub-sampled values if any)
+        and the n_bins + 1 bin edges
+    :rtype: tuple : (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+    :raises ValueError: If data is empty or has no finite value to compute
+        the range from
+    """
+    shape = np.shape(data)
+    if not accurate and subsampling == 1 and len(shape) > 0:
+        size = np.prod(shape, dtype=np.float64)
+        if size > _FAST_HISTOGRAM_SIZE:
+            subsampling = int(np.ceil(
+                (size / _FAST_HISTOGRAM_SIZE) ** (1. / len(shape))))
+    return _compute_histogram(data, n_bins, histo_range, subsampling)
+
 if __name__ == '__main__':
     pass
@@ -28,26 +28,37 @@
 #include <math.h>
 #include <stdarg.h>
 
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
 #ifdef HISTO_SAMPLE_T
 #ifdef HISTO_WEIGHT_T
 #ifdef HISTO_CUMUL_T
 
-int TEMPLATE(histogramnd, HISTO_SAMPLE_T, HISTO_WEIGHT_T, HISTO_CUMUL_T)
+/* Fills the histograms with the elements [i_elem_start, i_elem_stop[
+ * of the sample.
+ */
+static void TEMPLATE(histogramnd_fill, HISTO_SAMPLE_T, HISTO_WEIGHT_T, HISTO_CUMUL_T)
                         (HISTO_SAMPLE_T *i_sample,
                          HISTO_WEIGHT_T *i_weights,
                          int i_n_dim,
-                         int i_n_elem,
-                         double *i_bin_ranges,
+                         long i_elem_start,
+                         long i_elem_stop,
+                         double *g_min,
+                         double *g_max,
+                         double *range,
                          int *i_n_bins,
                          uint32_t *o_histo,
                          HISTO_CUMUL_T *o_cumul,
-                         double *o_bin_edges,
-                         int i_opt_flags,
+                         int i_filt_min_weight,
+                         int i_filt_max_weight,
+                         int i_last_bin_closed,
                          HISTO_WEIGHT_T i_weight_min,
                          HISTO_WEIGHT_T i_weight_max)
 {
     /* some counters */
-    int i = 0, j = 0;
+    int i = 0;
     long elem_idx = 0;
     
     HISTO_WEIGHT_T * weight_ptr = 0;
@@ -56,104 +67,26 @@ int TEMPLATE(histogramnd, HISTO_SAMPLE_T, HISTO_WEIGHT_T, HISTO_CUMUL_T)
     /* computed bin index (i_sample -> grid) */
     long bin_idx = 0;
     
-    double * g_min = 0;
-    double * g_max = 0;
-    double * range = 0;
-    
-    /* ================================
-     * Parsing options, if any.
-     * ================================
-     */
-    
-    int filt_min_weight = 0;
-    int filt_max_weight = 0;
-    int last_bin_closed = 0;
-    
-    /* Testing the option flags */
-    if(i_opt_flags & HISTO_WEIGHT_MIN)
-    {
-        filt_min_weight = 1;
-    }
-        
-    if(i_opt_flags & HISTO_WEIGHT_MAX)
-    {
-        filt_max_weight = 1;
-    }
-        
-    if(i_opt_flags & HISTO_LAST_BIN_CLOSED)
-    {
-        last_bin_closed = 1;
-    }
-    
-    /* storing the min & max bin coordinates in their own arrays because
-     * i_bin_ranges = [[min0, max0], [min1, max1], ...]
-     * (mostly for the sake of clarity)
-     * (maybe faster access too?)
-     */
-    g_min = (double *) malloc(i_n_dim *sizeof(double));
-    g_max = (double *) malloc(i_n_dim * sizeof(double));
-    /* range used to convert from i_coords to bin indices in the grid */
-    range = (double *) malloc(i_n_dim * sizeof(double));
-            
-    if(!g_min || !g_max || !range)
-    {
-        free(g_min);
-        free(g_max);
-        free(range);
-        return HISTO_ERR_ALLOC;
-    }
-    
-    j = 0;
-    for(i=0; i<i_n_dim; i++)
-    {
-        g_min[i] = i_bin_ranges[i*2];
-        g_max[i] = i_bin_ranges[i*2+1];
-        range[i] = g_max[i]-g_min[i];
-        
-        for(bin_idx=0; bin_idx<i_n_bins[i]; j++, bin_idx++)
-        {
-            o_bin_edges[j] = g_min[i] +
-                            bin_idx * (range[i] / i_n_bins[i]);
-        }
-        o_bin_edges[j++] = g_max[i];
-    }
-    
-    weight_ptr = i_weights;
-    
-    if(!i_weights)
-    {
-        /* if weights are not provided there no point in trying to filter them
-         * (!! careful if you change this, some code below relies on it !!)
-         */
-        filt_min_weight = 0;
-        filt_max_weight = 0;
-        
-        /* If the weights array is not provided then there is no point
-         * updating the weighted histogram, only the bin counts (o_histo)
-         * will be filled.
-         * (!! careful if you change this, some code below relies on it !!)
-         */
-        o_cumul = 0;
-    }
+    weight_ptr = i_weights ? i_weights + i_elem_start : 0;
     
     /* tried to use pointers instead of indices here, but it didn't
      * seem any faster (probably because the compiler 
      * optimizes stuff anyway),
      * so i'm keeping the "indices" version, for the sake of clarity
     */
-    for(elem_idx=0;
-        elem_idx<i_n_elem*i_n_dim;
+    for(elem_idx=i_elem_start*i_n_dim;
+        elem_idx<i_elem_stop*i_n_dim;
         elem_idx+=i_n_dim, weight_ptr++)
     {
         /* no testing the validity of weight_ptr here, because if it is NULL
-         * then filt_min_weight/filt_max_weight will be 0.
+         * then i_filt_min_weight/i_filt_max_weight will be 0.
          * (see code above)
          */
-        if(filt_min_weight && *weight_ptr<i_weight_min)
+        if(i_filt_min_weight && *weight_ptr<i_weight_min)
         {
             continue;
         }
-        if(filt_max_weight && *weight_ptr>i_weight_max)
+        if(i_filt_max_weight && *weight_ptr>i_weight_max)
         {
             continue;
         }
@@ -211,7 +144,7 @@ int TEMPLATE(histogramnd, HISTO_SAMPLE_T, HISTO_WEIGHT_T, HISTO_CUMUL_T)
                  *  put it in the last bin
                  * else : discard
                  */
-                if(last_bin_closed && elem_coord==g_max[i])
+                if(i_last_bin_closed && elem_coord==g_max[i])
                 {
                     bin_idx = (bin_idx + 1) * i_n_bins[i] - 1;
                 }
@@ -242,7 +175,203 @@ int TEMPLATE(histogramnd, HISTO_SAMPLE_T, HISTO_WEIGHT_T, HISTO_CUMUL_T)
             o_cumul[bin_idx] += (HISTO_CUMUL_T) *weight_ptr;
         }
         
-    } /* for(elem_idx=0; elem_idx<i_n_elem*i_n_dim; elem_idx+=i_n_dim) */
+    } /* for(elem_idx=i_elem_start*i_n_dim; elem_idx<i_elem_stop*i_n_dim; ...) */
+    
+}
+
+int TEMPLATE(histogramnd, HISTO_SAMPLE_T, HISTO_WEIGHT_T, HISTO_CUMUL_T)
+                        (HISTO_SAMPLE_T *i_sample,
+                         HISTO_WEIGHT_T *i_weights,
+                         int i_n_dim,
+                         int i_n_elem,
+                         double *i_bin_ranges,
+                         int *i_n_bins,
+                         uint32_t *o_histo,
+                         HISTO_CUMUL_T *o_cumul,
+                         double *o_bin_edges,
+                         int i_opt_flags,
+                         HISTO_WEIGHT_T i_weight_min,
+                         HISTO_WEIGHT_T i_weight_max,
+                         int i_n_threads)
+{
+    /* some counters */
+    int i = 0, j = 0;
+    
+    /* computed bin index (i_sample -> grid) */
+    long bin_idx = 0;
+    
+    /* total number of bins */
+    long n_bins_total = 1;
+    
+    /* per thread private histograms (all threads but the first one) */
+    uint32_t * thread_histo = 0;
+    HISTO_CUMUL_T * thread_cumul = 0;
+    
+    double * g_min = 0;
+    double * g_max = 0;
+    double * range = 0;
+    
+    /* ================================
+     * Parsing options, if any.
+     * ================================
+     */
+    
+    int filt_min_weight = 0;
+    int filt_max_weight = 0;
+    int last_bin_closed = 0;
+    
+    /* Testing the option flags */
+    if(i_opt_flags & HISTO_WEIGHT_MIN)
+    {
+        filt_min_weight = 1;
+    }
+        
+    if(i_opt_flags & HISTO_WEIGHT_MAX)
+    {
+        filt_max_weight = 1;
+    }
+        
+    if(i_opt_flags & HISTO_LAST_BIN_CLOSED)
+    {
+        last_bin_closed = 1;
+    }
+    
+    /* storing the min & max bin coordinates in their own arrays because
+     * i_bin_ranges = [[min0, max0], [min1, max1], ...]
+     * (mostly for the sake of clarity)
+     * (maybe faster access too?)
+     */
+    g_min = (double *) malloc(i_n_dim *sizeof(double));
+    g_max = (double *) malloc(i_n_dim * sizeof(double));
+    /* range used to convert from i_coords to bin indices in the grid */
+    range = (double *) malloc(i_n_dim * sizeof(double));
+            
+    if(!g_min || !g_max || !range)
+    {
+        free(g_min);
+        free(g_max);
+        free(range);
+        return HISTO_ERR_ALLOC;
+    }
+    
+    j = 0;
+    for(i=0; i<i_n_dim; i++)
+    {
+        g_min[i] = i_bin_ranges[i*2];
+        g_max[i] = i_bin_ranges[i*2+1];
+        range[i] = g_max[i]-g_min[i];
+        
+        for(bin_idx=0; bin_idx<i_n_bins[i]; j++, bin_idx++)
+        {
+            o_bin_edges[j] = g_min[i] +
+                            bin_idx * (range[i] / i_n_bins[i]);
+        }
+        o_bin_edges[j++] = g_max[i];
+        n_bins_total *= i_n_bins[i];
+    }
+    
+    if(!i_weights)
+    {
+        /* if weights are not provided there no point in trying to filter them
+         * (!! careful if you change this, some code below relies on it !!)
+         */
+        filt_min_weight = 0;
+        filt_max_weight = 0;
+        
+        /* If the weights array is not provided then there is no point
+         * updating the weighted histogram, only the bin counts (o_histo)
+         * will be filled.
+         * (!! careful if you change this, some code below relies on it !!)
+         */
+        o_cumul = 0;
+    }
+    
+#ifndef _OPENMP
+    i_n_threads = 1;
+#endif
+    
+    if(i_n_threads > i_n_elem)
+    {
+        i_n_threads = i_n_elem;
+    }
+    
+    if(i_n_threads <= 1)
+    {
+        TEMPLATE(histogramnd_fill, HISTO_SAMPLE_T, HISTO_WEIGHT_T, HISTO_CUMUL_T)
+                        (i_sample, i_weights, i_n_dim, 0, i_n_elem,
+                         g_min, g_max, range, i_n_bins,
+                         o_histo, o_cumul,
+                         filt_min_weight, filt_max_weight, last_bin_closed,
+                         i_weight_min, i_weight_max);
+    }
+    else
+    {
+        /* Each thread fills its own histograms, which are then summed up.
+         * The first thread directly fills the output histograms.
+         */
+        if(o_histo)
+        {
+            thread_histo = (uint32_t *) calloc(
+                    (i_n_threads - 1) * n_bins_total, sizeof(uint32_t));
+        }
+        if(o_cumul)
+        {
+            thread_cumul = (HISTO_CUMUL_T *) calloc(
+                    (i_n_threads - 1) * n_bins_total, sizeof(HISTO_CUMUL_T));
+        }
+        if((o_histo && !thread_histo) || (o_cumul && !thread_cumul))
+        {
+            free(thread_histo);
+            free(thread_cumul);
+            free(g_min);
+            free(g_max);
+            free(range);
+            return HISTO_ERR_ALLOC;
+        }
+        
+#ifdef _OPENMP
+        #pragma omp parallel num_threads(i_n_threads) private(i, bin_idx)
+        {
+            int thread_idx = omp_get_thread_num();
+            int n_threads = omp_get_num_threads();
+            long elem_start = (i_n_elem * (long) thread_idx) / n_threads;
+            long elem_stop = (i_n_elem * (long) (thread_idx + 1)) / n_threads;
+            long offset = (thread_idx - 1) * n_bins_total;
+            
+            TEMPLATE(histogramnd_fill, HISTO_SAMPLE_T, HISTO_WEIGHT_T, HISTO_CUMUL_T)
+                        (i_sample, i_weights, i_n_dim, elem_start, elem_stop,
+                         g_min, g_max, range, i_n_bins,
+                         (!o_histo) ? 0 :
+                            (thread_idx == 0 ? o_histo : thread_histo + offset),
+                         (!o_cumul) ? 0 :
+                            (thread_idx == 0 ? o_cumul : thread_cumul + offset),
+                         filt_min_weight, filt_max_weight, last_bin_closed,
+                         i_weight_min, i_weight_max);
+            
+            #pragma omp barrier
+            
+            /* Merging private histograms, bins are shared among threads */
+            #pragma omp for schedule(static)
+            for(bin_idx=0; bin_idx<n_bins_total; bin_idx++)
+            {
+                for(i=0; i<n_threads-1; i++)
+                {
+                    if(o_histo)
+                    {
+                        o_histo[bin_idx] += thread_histo[i * n_bins_total + bin_idx];
+                    }
+                    if(o_cumul)
+                    {
+                        o_cumul[bin_idx] += thread_cumul[i * n_bins_total + bin_idx];
+                    }
+                }
+            }
+        }
+#endif
+        
+        free(thread_histo);
+        free(thread_cumul);
+    }
     
     free(g_min);
     free(g_max);
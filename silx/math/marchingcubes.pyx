@@ -26,6 +26,8 @@
 
 It provides a :class:`MarchingCubes` class allowing to build an isosurface
 from data provided as a 3D data set or slice by slice.
+Large data sets (e.g., h5py datasets) can be processed by slabs using
+worker threads.
 """
 
 __authors__ = ["T. Vincent"]
@@ -33,9 +35,17 @@ __license__ = "MIT"
 __date__ = "16/08/2017"
 
 
+import collections
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
 import numpy
 cimport numpy as cnumpy
 cimport cython
+from cython.operator cimport dereference
+from cython.operator cimport preincrement
+from libcpp.map cimport map as std_map
+from libcpp.vector cimport vector as std_vector
 
 cimport mc
 
@@ -53,6 +63,11 @@ if FALSE:
     import_umath()
 
 
+_SLAB_SIZE = 2**26
+"""Default memory size in bytes of a slab of data processed by a thread in
+:meth:`MarchingCubes.process_slabs`"""
+
+
 cdef class MarchingCubes:
     """Compute isosurface using marching cubes algorithm.
 
@@ -103,6 +118,13 @@ cdef class MarchingCubes:
     >>> normals = mc.get_normals()  # Array of normals
     >>> triangle_indices = mc.get_indices()  # Array of indices of vertices
 
+    Example of code for processing a large HDF5 dataset with worker threads:
+
+    >>> mc = MarchingCubes(isolevel=1.)
+    >>> with h5py.File('volume.h5', 'r') as h5file:
+    ...     mc.process_slabs(h5file['/data'])
+    >>> vertices, normals, indices = mc
+
     :param data: 3D dataset of float32 or None
     :type data: numpy.ndarray of float32 of dimension 3
     :param float isolevel: The value for which to generate the isosurface
@@ -111,6 +133,7 @@ cdef class MarchingCubes:
     :param sampling: Sampling along each dimension (depth, height, width)
     """
     cdef mc.MarchingCubes[float, float] * c_mc  # Pointer to the C++ instance
+    cdef unsigned int _slab_offset  # Offset of vertex indices of last slab
 
     def __cinit__(self, data=None, isolevel=None,
                   invert_normals=True, sampling=(1, 1, 1)):
@@ -159,7 +182,8 @@ cdef class MarchingCubes:
         height = data.shape[1]
         width = data.shape[2]
 
-        self.c_mc.process(&c_data[0], depth, height, width)
+        with nogil:
+            self.c_mc.process(&c_data[0], depth, height, width)
 
     def process_slice(self, slice0, slice1):
         """Process a new slice to build the isosurface.
@@ -188,6 +212,142 @@ cdef class MarchingCubes:
 
         self.c_mc.process_slice(&c_slice0[0], &c_slice1[0])
 
+    def process_slabs(self, data, slab_size=None, n_threads=None):
+        """Compute an isosurface from a 3D scalar field processed by slabs.
+
+        The scalar field is split along dim 0 into slabs, which are read and
+        processed concurrently by worker threads. The isosurfaces of the slabs
+        are then welded together at their borders.
+        The result is the same as the one of :meth:`process`.
+
+        At most one slab per thread is loaded in memory at once, so the
+        scalar field can be a dataset larger than the memory.
+
+        :param data: 3D scalar field, either a numpy.ndarray or an
+            array-like object supporting slicing along dim 0
+            (e.g., h5py.Dataset)
+        :param int slab_size: Number of cubes along dim 0 in each slab.
+            Default: Chosen from the size of the slices.
+        :param int n_threads: Number of worker threads.
+            Default: The number of CPUs.
+        """
+        assert len(data.shape) == 3
+        depth, height, width = data.shape
+        step = self.c_mc.sampling[0]
+        nb_cubes = max(0, (depth - 1) // step)
+
+        if n_threads is None:
+            n_threads = multiprocessing.cpu_count()
+        if slab_size is None:
+            slab_size = max(1, _SLAB_SIZE // (height * width * 4 * step))
+            # Provide at least one slab per thread
+            slab_size = min(slab_size, max(1, -(-nb_cubes // n_threads)))
+
+        self.c_mc.set_slice_size(height, width)
+
+        def process_slab(start):
+            stop = min(start + slab_size, nb_cubes)
+            slab = numpy.ascontiguousarray(
+                data[start * step:stop * step + 1:step], dtype='=f4')
+            slab_mc = MarchingCubes(isolevel=self.isolevel,
+                                    invert_normals=self.invert_normals,
+                                    sampling=self.sampling)
+            slab_mc._process_slab(slab, start * step)
+            return slab_mc
+
+        pool = ThreadPool(n_threads)
+        try:
+            pending = collections.deque()
+            previous = None
+            for start in range(0, nb_cubes, slab_size):
+                pending.append(pool.apply_async(process_slab, (start,)))
+                if len(pending) >= n_threads:
+                    slab_mc = pending.popleft().get()
+                    self._weld_slab(slab_mc, previous)
+                    previous = slab_mc
+            while pending:
+                slab_mc = pending.popleft().get()
+                self._weld_slab(slab_mc, previous)
+                previous = slab_mc
+        finally:
+            pool.terminate()
+            pool.join()
+
+        self.c_mc.depth = depth
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def _process_slab(self, slab, depth_offset):
+        """Compute the isosurface of a slab of a 3D scalar field.
+
+        Edge to vertex index maps of the first and last slices are kept to
+        allow welding of consecutive slabs.
+
+        :param numpy.ndarray slab: 3D contiguous array of native float32
+        :param int depth_offset: Index along dim 0 of the first slice
+        """
+        cdef float[:, :, ::1] c_slab = slab
+        cdef unsigned int index, nb_slices
+        nb_slices = c_slab.shape[0]
+
+        self.c_mc.set_slice_size(c_slab.shape[1], c_slab.shape[2])
+        self.c_mc.depth = depth_offset
+        self.c_mc.keep_edge_indices = True
+        with nogil:
+            for index in range(nb_slices - 1):
+                self.c_mc.process_slice(&c_slab[index, 0, 0],
+                                        &c_slab[index + 1, 0, 0])
+            self.c_mc.finish_process()
+
+    cdef _weld_slab(self, MarchingCubes slab, MarchingCubes previous):
+        """Append the isosurface of a slab to this isosurface.
+
+        Vertices of the first slice of the slab are replaced by those of the
+        last slice of the previous slab.
+
+        :param slab: The slab to append
+        :param previous: The previously appended slab or None
+        """
+        cdef:
+            std_vector[unsigned int] remap
+            std_map[unsigned int, unsigned int].iterator it, found
+            unsigned int nb_first, offset, previous_offset
+            unsigned int i, nb_vertices
+            bint missing = False
+
+        nb_vertices = slab.c_mc.vertices.size() // 3
+        offset = self.c_mc.vertices.size() // 3
+        remap.resize(nb_vertices)
+
+        nb_first = 0
+        if previous is not None:
+            nb_first = slab.c_mc.first_edge_indices.size()
+            # Vertex indices of the previous slab are shifted by this offset
+            previous_offset = self._slab_offset
+            with nogil:
+                it = slab.c_mc.first_edge_indices.begin()
+                while it != slab.c_mc.first_edge_indices.end():
+                    found = previous.c_mc.last_edge_indices.find(dereference(it).first)
+                    if found == previous.c_mc.last_edge_indices.end():
+                        missing = True
+                        break
+                    remap[dereference(it).second] = previous_offset + dereference(found).second
+                    preincrement(it)
+            if missing:
+                raise RuntimeError("Internal error: cannot weld slabs.")
+            previous.c_mc.last_edge_indices.clear()
+
+        with nogil:
+            for i in range(nb_first, nb_vertices):
+                remap[i] = offset + i - nb_first
+            for i in range(3 * nb_first, 3 * nb_vertices):
+                self.c_mc.vertices.push_back(slab.c_mc.vertices[i])
+                self.c_mc.normals.push_back(slab.c_mc.normals[i])
+            for i in range(slab.c_mc.indices.size()):
+                self.c_mc.indices.push_back(remap[slab.c_mc.indices[i]])
+
+        self._slab_offset = offset - nb_first
+
     def finish_process(self):
         """Clear internal cache after processing slice by slice."""
         self.c_mc.finish_process()
@@ -157,6 +157,27 @@ public:
     FloatIn isolevel; /**< Iso level to use */
     bool invert_normals; /**< True to inverse gradient as normals */
 
+    /** True to keep the edge to vertex index caches of the first slice
+     * and of the last slice.
+     *
+     * This allows to weld together isosurfaces processed independently
+     * on consecutive parts of a data set.
+     * Default: false
+     */
+    bool keep_edge_indices;
+
+    /** Edge index to vertex index map of the first slice plane
+     *
+     * Only filled if keep_edge_indices is true.
+     */
+    std::map<unsigned int, unsigned int> first_edge_indices;
+
+    /** Edge index to vertex index map of the last processed slice
+     *
+     * Only filled by finish_process if keep_edge_indices is true.
+     */
+    std::map<unsigned int, unsigned int> last_edge_indices;
+
 private:
 
     /** Start to build isosurface starting with first slice
@@ -240,6 +261,7 @@ MarchingCubes<FloatIn, FloatOut>::MarchingCubes(const FloatIn level)
     this->width = 0;
     this->isolevel = level;
     this->invert_normals = true;
+    this->keep_edge_indices = false;
     this->sampling[0] = 1;
     this->sampling[1] = 1;
     this->sampling[2] = 1;
@@ -258,6 +280,8 @@ MarchingCubes<FloatIn, FloatOut>::reset()
     this->vertices.clear();
     this->normals.clear();
     this->indices.clear();
+    this->first_edge_indices.clear();
+    this->last_edge_indices.clear();
     if (this->edge_indices != 0) {
         delete this->edge_indices;
         this->edge_indices = 0;
@@ -269,6 +293,9 @@ void
 MarchingCubes<FloatIn, FloatOut>::finish_process()
 {
     if (this->edge_indices != 0) {
+        if (this->keep_edge_indices) {
+            this->last_edge_indices.swap(*this->edge_indices);
+        }
         delete this->edge_indices;
         this->edge_indices = 0;
     }
@@ -462,6 +489,10 @@ MarchingCubes<FloatIn, FloatOut>::first_slice(const FloatIn * slice,
         }
     }
 
+    if (this->keep_edge_indices) {
+        this->first_edge_indices = *this->edge_indices;
+    }
+
     this->depth += this->sampling[DEPTH_IDX];
 }
 
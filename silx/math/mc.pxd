@@ -24,9 +24,10 @@
 # ###########################################################################*/
 
 from libcpp.vector cimport vector as std_vector
+from libcpp.map cimport map as std_map
 from libcpp cimport bool
 
-cdef extern from "mc.hpp":
+cdef extern from "mc.hpp" nogil:
     cdef cppclass MarchingCubes[FloatIn, FloatOut]:
         MarchingCubes(FloatIn level) except +
         void process(FloatIn * data,
@@ -46,6 +47,9 @@ cdef extern from "mc.hpp":
         unsigned int sampling[3]
         FloatIn isolevel
         bool invert_normals
+        bool keep_edge_indices
+        std_map[unsigned int, unsigned int] first_edge_indices
+        std_map[unsigned int, unsigned int] last_edge_indices
         std_vector[FloatOut] vertices
         std_vector[FloatOut] normals
         std_vector[unsigned int] indices
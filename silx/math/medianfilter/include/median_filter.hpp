@@ -35,6 +35,7 @@
 #include <iostream>
 #include <cmath>
 #include <cfloat>
+#include <limits>
 
 /* Needed for pytohn2.7 on Windows... */
 #ifndef INFINITY
@@ -262,4 +263,309 @@ void median_filter(
     }
 }
 
+// Get the value at (win_z, win_y, win_x) which can be outside of the volume,
+// according to the border mode.
+// Returns false if the value has to be ignored: outside of the volume in
+// shrink mode, or NaN.
+template<typename T>
+inline bool get_window_value(
+    const T* input,
+    const int* volume_dim,  // three values : 0:depth, 1:height, 2:width
+    int win_z,
+    int win_y,
+    int win_x,
+    MODE mode,
+    T cval,
+    T& value) {
+
+    int index[3] = {win_z, win_y, win_x};
+    bool outside = false;
+    for (int dim=0; dim < 3; dim++) {
+        outside |= (index[dim] < 0) || (index[dim] > volume_dim[dim] - 1);
+    }
+    if (outside) {
+        switch(mode){
+            case NEAREST:
+                for (int dim=0; dim < 3; dim++) {
+                    index[dim] = std::min(std::max(index[dim], 0), volume_dim[dim] - 1);
+                }
+                break;
+            case REFLECT:
+                for (int dim=0; dim < 3; dim++) {
+                    index[dim] = reflect(index[dim], volume_dim[dim]);
+                }
+                break;
+            case MIRROR:
+                for (int dim=0; dim < 3; dim++) {
+                    if ((index[dim] < 0) || (index[dim] > volume_dim[dim] - 1)) {
+                        index[dim] = mirror(index[dim], volume_dim[dim]);
+                    }
+                }
+                break;
+            case SHRINK:
+                return false;
+            case CONSTANT:
+                value = cval;
+                return value == value;  // Ignore NaNs
+        }
+    }
+    // Offset computed with size_t to handle volumes larger than 2^31 voxels
+    value = input[(static_cast<size_t>(index[0]) * volume_dim[1] + index[1]) *
+                  volume_dim[2] + index[2]];
+    return value == value;  // Ignore NaNs
+}
+
+
+// Window storing its values sorted.
+// Adding or removing a value costs a binary search and a memory move of
+// the values stored after it.
+template<typename T>
+class SortedWindow {
+public:
+    SortedWindow(int capacity) {
+        this->values.reserve(capacity);
+    }
+
+    // Add a value without keeping the window sorted, sort() must be called
+    // before using the window
+    inline void push(T value) {
+        this->values.push_back(value);
+    }
+
+    inline void sort() {
+        std::sort(this->values.begin(), this->values.end());
+    }
+
+    inline void add(T value) {
+        this->values.insert(
+            std::upper_bound(this->values.begin(), this->values.end(), value),
+            value);
+    }
+
+    inline void remove(T value) {
+        this->values.erase(
+            std::lower_bound(this->values.begin(), this->values.end(), value));
+    }
+
+    inline void clear() {
+        this->values.clear();
+    }
+
+    inline int size() const {
+        return static_cast<int>(this->values.size());
+    }
+
+    // Returns the k-th smallest value of the window
+    inline T kth(int k) const {
+        return this->values[k];
+    }
+
+private:
+    std::vector<T> values;
+};
+
+
+// Window storing the histogram of its values, for 8 and 16 bits integers.
+// Adding or removing a value is constant time, and the k-th value is found
+// by browsing a coarse histogram and then one bin of the fine histogram.
+template<typename T>
+class HistogramWindow {
+public:
+    HistogramWindow(int /* capacity */) :
+        shift(4 * sizeof(T)),
+        fine(1 << (8 * sizeof(T)), 0),
+        coarse(1 << (8 * sizeof(T) - 4 * sizeof(T)), 0),
+        count(0) {
+        assert(sizeof(T) <= 2);
+    }
+
+    inline void push(T value) {
+        this->add(value);
+    }
+
+    inline void sort() {}
+
+    inline void add(T value) {
+        int bin = this->bin(value);
+        this->fine[bin]++;
+        this->coarse[bin >> this->shift]++;
+        this->count++;
+    }
+
+    inline void remove(T value) {
+        int bin = this->bin(value);
+        this->fine[bin]--;
+        this->coarse[bin >> this->shift]--;
+        this->count--;
+    }
+
+    inline void clear() {
+        if (this->count != 0) {
+            std::fill(this->fine.begin(), this->fine.end(), 0);
+            std::fill(this->coarse.begin(), this->coarse.end(), 0);
+            this->count = 0;
+        }
+    }
+
+    inline int size() const {
+        return this->count;
+    }
+
+    inline T kth(int k) const {
+        int accumulated = 0;
+        int coarse_bin = 0;
+        while (accumulated + this->coarse[coarse_bin] <= k) {
+            accumulated += this->coarse[coarse_bin];
+            coarse_bin++;
+        }
+        int bin = coarse_bin << this->shift;
+        while (accumulated + this->fine[bin] <= k) {
+            accumulated += this->fine[bin];
+            bin++;
+        }
+        return static_cast<T>(bin + std::numeric_limits<T>::min());
+    }
+
+private:
+    inline int bin(T value) const {
+        return static_cast<int>(value) - std::numeric_limits<T>::min();
+    }
+
+    const int shift;
+    std::vector<int> fine;
+    std::vector<int> coarse;
+    int count;
+};
+
+
+// Apply the median filter on the rows [y_pixel_range_min, y_pixel_range_max]
+// of the frame z_pixel of a volume, with a window sliding along the rows:
+// only the values of the columns entering and leaving the kernel are updated
+// from one pixel to the next.
+// Window is either SortedWindow or HistogramWindow.
+// The result is the same as median_filter.
+template<typename T, typename Window>
+void median_filter_volume_sliding(
+    const T* input,
+    T* output,
+    int* kernel_dim,        // three values : 0:depth, 1:height, 2:width
+    int* volume_dim,        // three values : 0:depth, 1:height, 2:width
+    int z_pixel,
+    int y_pixel_range_min,
+    int y_pixel_range_max,
+    bool conditional,
+    int pMode,
+    T cval) {
+
+    assert(kernel_dim[0] > 0);
+    assert(kernel_dim[1] > 0);
+    assert(kernel_dim[2] > 0);
+    assert(volume_dim[0] > 0);
+    assert(volume_dim[1] > 0);
+    assert(z_pixel >= 0);
+    assert(z_pixel < volume_dim[0]);
+    assert(y_pixel_range_min >= 0);
+    assert(y_pixel_range_max < volume_dim[1]);
+    // kernel odd assertion
+    assert((kernel_dim[0] - 1)%2 == 0);
+    assert((kernel_dim[1] - 1)%2 == 0);
+    assert((kernel_dim[2] - 1)%2 == 0);
+
+    int halfKernel_x = (kernel_dim[2] - 1) / 2;
+    int halfKernel_y = (kernel_dim[1] - 1) / 2;
+    int halfKernel_z = (kernel_dim[0] - 1) / 2;
+
+    if (volume_dim[2] == 0) {
+        return;  // Nothing to filter
+    }
+
+    MODE mode = static_cast<MODE>(pMode);
+
+    Window window(kernel_dim[0] * kernel_dim[1] * kernel_dim[2]);
+
+    for(int y_pixel=y_pixel_range_min; y_pixel <= y_pixel_range_max; y_pixel++) {
+        T value = 0;
+
+        // fill the window of the first pixel of the row
+        window.clear();
+        for(int win_z=z_pixel-halfKernel_z; win_z<= z_pixel+halfKernel_z; win_z++) {
+            for(int win_y=y_pixel-halfKernel_y; win_y<= y_pixel+halfKernel_y; win_y++) {
+                for(int win_x = -halfKernel_x; win_x <= halfKernel_x; win_x++) {
+                    if (get_window_value(input, volume_dim, win_z, win_y, win_x, mode, cval, value)) {
+                        window.push(value);
+                    }
+                }
+            }
+        }
+        window.sort();
+
+        size_t row_offset = (static_cast<size_t>(z_pixel) * volume_dim[1] +
+                             y_pixel) * volume_dim[2];
+
+        for(int x_pixel=0; x_pixel < volume_dim[2]; x_pixel++) {
+            if (x_pixel > 0) {
+                // slide the window: update the leaving and entering columns
+                int x_out = x_pixel - halfKernel_x - 1;
+                int x_in = x_pixel + halfKernel_x;
+                for(int win_z=z_pixel-halfKernel_z; win_z<= z_pixel+halfKernel_z; win_z++) {
+                    for(int win_y=y_pixel-halfKernel_y; win_y<= y_pixel+halfKernel_y; win_y++) {
+                        if (get_window_value(input, volume_dim, win_z, win_y, x_out, mode, cval, value)) {
+                            window.remove(value);
+                        }
+                        if (get_window_value(input, volume_dim, win_z, win_y, x_in, mode, cval, value)) {
+                            window.add(value);
+                        }
+                    }
+                }
+            }
+
+            int window_size = window.size();
+            T* result = &output[row_offset + x_pixel];
+
+            if (window_size == 0) {
+                // Window is empty, this is the case when all values are NaNs
+                *result = NAN;
+
+            } else {
+                // apply the median value if needed for this pixel
+                const T currentPixelValue = input[row_offset + x_pixel];
+                if (conditional == true){
+                    // NaNs are propagated through unchanged
+                    if ((currentPixelValue == window.kth(window_size - 1)) ||
+                        (currentPixelValue == window.kth(0))){
+                        *result = window.kth(window_size / 2);
+                    }else{
+                        *result = currentPixelValue;
+                    }
+                }else{
+                    *result = window.kth(window_size / 2);
+                }
+            }
+        }
+    }
+}
+
+
+// Apply the median filter on the rows [y_pixel_range_min, y_pixel_range_max]
+// of an image with a window sliding along the rows.
+// See median_filter_volume_sliding.
+template<typename T, typename Window>
+void median_filter_sliding(
+    const T* input,
+    T* output,
+    int* kernel_dim,        // two values : 0:width, 1:height
+    int* image_dim,         // two values : 0:width, 1:height
+    int y_pixel_range_min,
+    int y_pixel_range_max,
+    bool conditional,
+    int pMode,
+    T cval) {
+
+    int volume_kernel_dim[3] = {1, kernel_dim[0], kernel_dim[1]};
+    int volume_dim[3] = {1, image_dim[0], image_dim[1]};
+    median_filter_volume_sliding<T, Window>(
+        input, output, volume_kernel_dim, volume_dim,
+        0, y_pixel_range_min, y_pixel_range_max, conditional, pMode, cval);
+}
+
 #endif // MEDIAN_FILTER
@@ -27,16 +27,43 @@ from libcpp cimport bool
 
 # pyx
 cdef extern from "median_filter.hpp":
-    cdef extern void median_filter[T](const T* image, 
+    cdef extern void median_filter[T](const T* image,
                                       T* output,
                                       int* kernel_dim,
                                       int* image_dim,
+                                      int y_pixel,
                                       int x_pixel_range_min,
                                       int x_pixel_range_max,
-                                      int y_pixel_range_min,
-                                      int y_pixel_range_max,
                                       bool conditional,
+                                      int mode,
                                       T cval) nogil;
 
+    cdef cppclass SortedWindow[T]:
+        pass
+
+    cdef cppclass HistogramWindow[T]:
+        pass
+
+    cdef extern void median_filter_sliding[T, W](const T* image,
+                                                 T* output,
+                                                 int* kernel_dim,
+                                                 int* image_dim,
+                                                 int y_pixel_range_min,
+                                                 int y_pixel_range_max,
+                                                 bool conditional,
+                                                 int mode,
+                                                 T cval) nogil;
+
+    cdef extern void median_filter_volume_sliding[T, W](const T* volume,
+                                                        T* output,
+                                                        int* kernel_dim,
+                                                        int* volume_dim,
+                                                        int z_pixel,
+                                                        int y_pixel_range_min,
+                                                        int y_pixel_range_max,
+                                                        bool conditional,
+                                                        int mode,
+                                                        T cval) nogil;
+
     cdef extern int reflect(int index, int length_max);
     cdef extern int mirror(int index, int length_max);
@@ -22,7 +22,7 @@
 # THE SOFTWARE.
 #
 # ###########################################################################*/
-"""This module provides median filter function for 1D and 2D arrays.
+"""This module provides median filter function for 1D, 2D and 3D arrays.
 """
 
 __authors__ = ["H. Payno", "J. Kieffer"]
@@ -42,10 +42,46 @@ import numbers
 ctypedef unsigned long uint64
 ctypedef unsigned int uint32
 ctypedef unsigned short uint16
+ctypedef unsigned char uint8
 
 
 MODES = {'nearest': 0, 'reflect': 1, 'mirror': 2, 'shrink': 3, 'constant': 4}
 
+cdef int _BLOCK_HEIGHT = 16
+"""Number of rows processed by a thread with the sliding window
+implementation"""
+
+_HISTOGRAM_TYPES = numpy.uint8, numpy.int16, numpy.uint16
+"""Types filtered with a histogram of the window values"""
+
+
+def _use_sliding_window(dtype, kernel_size):
+    """Returns True if the median filter is faster using a sliding window
+    than sorting the window of each pixel.
+
+    The sliding window is updated with the values of the columns entering and
+    leaving the kernel, i.e., 2 * kernel_height values per pixel.
+    It is stored as a histogram for 8 and 16 bits integers (Huang's
+    algorithm), where each update is constant time and the median lookup
+    does not depend on the kernel size, and as a sorted array for other
+    types.
+
+    :param numpy.dtype dtype: Type of the data
+    :param kernel_size: (kernel_height, kernel_width)
+    :rtype: bool
+    """
+    kernel_height, kernel_width = kernel_size
+    if kernel_width == 1:
+        return False
+    elif dtype == numpy.uint8:
+        return True
+    elif dtype in _HISTOGRAM_TYPES:
+        # Browsing the 16 bits histogram is slower for small kernels
+        return kernel_height * kernel_width >= 25
+    else:
+        # The sorted window is updated with 2 * kernel_height values
+        return kernel_width >= 7 and kernel_width >= kernel_height
+
 
 def medfilt1d(data,
               kernel_size=3,
@@ -183,6 +219,8 @@ def medfilt(data,
         medfilterfc = _median_filter_int16
     elif data.dtype == numpy.uint16:
         medfilterfc = _median_filter_uint16
+    elif data.dtype == numpy.uint8:
+        medfilterfc = _median_filter_uint8
     else:
         raise ValueError("%s type is not managed by the median filter" % data.dtype)
 
@@ -191,7 +229,8 @@ def medfilt(data,
                 kernel_size=ker_dim,
                 conditional=conditional,
                 mode=MODES[mode],
-                cval=cval)
+                cval=cval,
+                sliding=_use_sliding_window(data.dtype, kernel_size))
 
     if reshaped:
         output_buffer.shape = -1  # Convert to 1D array
@@ -199,6 +238,116 @@ def medfilt(data,
     return output_buffer
 
 
+def medfilt3d(data,
+              kernel_size=3,
+              bool conditional=False,
+              mode='nearest',
+              cval=0,
+              output=None):
+    """Function computing the median filter of a stack of images or a volume.
+
+    All the frames are filtered in a single call, in parallel.
+    With a kernel depth of 1, each frame is filtered independently with a
+    2D kernel, as with :func:`medfilt2d`.
+
+    Not-a-Number (NaN) float values are ignored.
+    If the window only contains NaNs, it evaluates to NaN.
+
+    In event of an even number of valid values in the window (either
+    because of NaN values or on volume border in shrink mode),
+    the highest of the 2 central sorted values is taken.
+
+    :param numpy.ndarray data: the array for which we want to apply
+        the median filter. Should be 3d: (frames, height, width).
+    :param kernel_size: the dimension of the kernel.
+        Kernel size must be odd.
+    :type kernel_size: An int or a tuple or a list of
+        (kernel_depth, kernel_height, kernel_width)
+    :param bool conditional: True if we want to apply a conditional median
+        filtering.
+    :param str mode: the algorithm used to determine how values at borders
+        are determined: 'nearest', 'reflect', 'mirror', 'shrink', 'constant'
+    :param cval: Value used outside borders in 'constant' mode
+    :param numpy.ndarray output: C-contiguous array with the same shape and
+        type as data, where to store the result (e.g., a
+        :class:`numpy.memmap`). Default: a new array is created.
+
+    :returns: the array with the median value for each pixel.
+    """
+    if mode not in MODES:
+        err = 'Requested mode %s is unknown.' % mode
+        raise ValueError(err)
+
+    if data.ndim != 3:
+        raise ValueError(
+            "Invalid data shape. Dimension of the array should be 3")
+
+    # Handle case of scalar kernel size
+    if isinstance(kernel_size, numbers.Integral):
+        kernel_size = [kernel_size] * 3
+
+    if len(kernel_size) != 3:
+        raise ValueError("kernel_size must be an int or a sequence of 3 ints")
+
+    for size in kernel_size:
+        if size < 1 or size % 2 != 1:
+            raise ValueError("kernel_size must be odd, got %s" %
+                             str(tuple(kernel_size)))
+
+    if output is None:
+        output = numpy.zeros_like(data)
+
+    if (data.flags['C_CONTIGUOUS'] is False):
+        raise ValueError('<data> must be a C_CONTIGUOUS numpy array.')
+
+    if (output.flags['C_CONTIGUOUS'] is False):
+        raise ValueError('<output> must be a C_CONTIGUOUS numpy array.')
+
+    if not (data.dtype == output.dtype):
+        raise ValueError('data and output must be of the same type')
+
+    if not (data.shape == output.shape):
+        raise ValueError('data and output must have the same shape')
+
+    ker_dim = numpy.array(kernel_size, dtype=numpy.int32)
+
+    if data.dtype == numpy.float32:
+        medfilterfc = _median_filter_volume_float32
+    elif data.dtype == numpy.float64:
+        medfilterfc = _median_filter_volume_float64
+    elif data.dtype == numpy.int64:
+        medfilterfc = _median_filter_volume_int64
+    elif data.dtype == numpy.uint64:
+        medfilterfc = _median_filter_volume_uint64
+    elif data.dtype == numpy.int32:
+        medfilterfc = _median_filter_volume_int32
+    elif data.dtype == numpy.uint32:
+        medfilterfc = _median_filter_volume_uint32
+    elif data.dtype == numpy.int16:
+        medfilterfc = _median_filter_volume_int16
+    elif data.dtype == numpy.uint16:
+        medfilterfc = _median_filter_volume_uint16
+    elif data.dtype == numpy.uint8:
+        medfilterfc = _median_filter_volume_uint8
+    else:
+        raise ValueError("%s type is not managed by the median filter" % data.dtype)
+
+    if kernel_size[0] == 1:
+        sliding = _use_sliding_window(data.dtype, kernel_size[1:])
+    else:
+        sliding = True
+
+    medfilterfc(input_buffer=data,
+                output_buffer=output,
+                kernel_size=ker_dim,
+                conditional=conditional,
+                mode=MODES[mode],
+                cval=cval,
+                sliding=sliding)
+
+    return output
+
+
 def check(input_buffer, output_buffer):
     """Simple check on the two buffers to make sure we can apply the median filter
     """
@@ -257,19 +406,24 @@ def _median_filter_float32(float[:, ::1] input_buffer not None,
                            cnumpy.int32_t[::1] kernel_size not None,
                            bool conditional,
                            int mode,
-                           float cval):
+                           float cval,
+                           bool sliding=False):
 
     cdef:
         int y = 0
+        int block = 0
+        int y_max = 0
+        int n_blocks
         int image_dim = input_buffer.shape[1] - 1
         int[2] buffer_shape
     buffer_shape[0] = input_buffer.shape[0]
     buffer_shape[1] = input_buffer.shape[1]
 
-    for y in prange(input_buffer.shape[0], nogil=True):
-            median_filter.median_filter[float](<float*> & input_buffer[0,0], 
-                                               <float*> & output_buffer[0,0], 
-                                               <int*>& kernel_size[0],
+    if not sliding:
+        for y in prange(input_buffer.shape[0], nogil=True):
+            median_filter.median_filter[float](<float*> & input_buffer[0, 0],
+                                               <float*> & output_buffer[0, 0],
+                                               <int*>&kernel_size[0],
                                                <int*>buffer_shape,
                                                y,
                                                0,
@@ -277,6 +431,21 @@ def _median_filter_float32(float[:, ::1] input_buffer not None,
                                                conditional,
                                                mode,
                                                cval)
+    else:
+        n_blocks = (buffer_shape[0] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for block in prange(n_blocks, nogil=True):
+            y = block * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[0]) - 1
+            median_filter.median_filter_sliding[float, median_filter.SortedWindow[float]](
+                <float*> & input_buffer[0, 0],
+                <float*> & output_buffer[0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
 
 
 @cython.cdivision(True)
@@ -288,18 +457,23 @@ def _median_filter_float64(double[:, ::1] input_buffer not None,
                            cnumpy.int32_t[::1] kernel_size not None,
                            bool conditional,
                            int mode,
-                           double cval):
+                           double cval,
+                           bool sliding=False):
 
     cdef:
         int y = 0
+        int block = 0
+        int y_max = 0
+        int n_blocks
         int image_dim = input_buffer.shape[1] - 1
         int[2] buffer_shape
     buffer_shape[0] = input_buffer.shape[0]
     buffer_shape[1] = input_buffer.shape[1]
 
-    for y in prange(input_buffer.shape[0], nogil=True):
-            median_filter.median_filter[double](<double*> & input_buffer[0, 0], 
-                                                <double*> & output_buffer[0, 0], 
+    if not sliding:
+        for y in prange(input_buffer.shape[0], nogil=True):
+            median_filter.median_filter[double](<double*> & input_buffer[0, 0],
+                                                <double*> & output_buffer[0, 0],
                                                 <int*>&kernel_size[0],
                                                 <int*>buffer_shape,
                                                 y,
@@ -308,6 +482,21 @@ def _median_filter_float64(double[:, ::1] input_buffer not None,
                                                 conditional,
                                                 mode,
                                                 cval)
+    else:
+        n_blocks = (buffer_shape[0] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for block in prange(n_blocks, nogil=True):
+            y = block * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[0]) - 1
+            median_filter.median_filter_sliding[double, median_filter.SortedWindow[double]](
+                <double*> & input_buffer[0, 0],
+                <double*> & output_buffer[0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
 
 
 @cython.cdivision(True)
@@ -319,18 +508,23 @@ def _median_filter_int64(cnumpy.int64_t[:, ::1] input_buffer not None,
                          cnumpy.int32_t[::1] kernel_size not None,
                          bool conditional,
                          int mode,
-                         cnumpy.int64_t cval):
+                         cnumpy.int64_t cval,
+                         bool sliding=False):
 
     cdef:
         int y = 0
+        int block = 0
+        int y_max = 0
+        int n_blocks
         int image_dim = input_buffer.shape[1] - 1
         int[2] buffer_shape
     buffer_shape[0] = input_buffer.shape[0]
     buffer_shape[1] = input_buffer.shape[1]
 
-    for y in prange(input_buffer.shape[0], nogil=True):
-            median_filter.median_filter[long](<long*> & input_buffer[0,0], 
-                                              <long*>  & output_buffer[0, 0], 
+    if not sliding:
+        for y in prange(input_buffer.shape[0], nogil=True):
+            median_filter.median_filter[long](<long*> & input_buffer[0, 0],
+                                              <long*> & output_buffer[0, 0],
                                               <int*>&kernel_size[0],
                                               <int*>buffer_shape,
                                               y,
@@ -339,6 +533,22 @@ def _median_filter_int64(cnumpy.int64_t[:, ::1] input_buffer not None,
                                               conditional,
                                               mode,
                                               cval)
+    else:
+        n_blocks = (buffer_shape[0] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for block in prange(n_blocks, nogil=True):
+            y = block * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[0]) - 1
+            median_filter.median_filter_sliding[long, median_filter.SortedWindow[long]](
+                <long*> & input_buffer[0, 0],
+                <long*> & output_buffer[0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
+
 
 @cython.cdivision(True)
 @cython.boundscheck(False)
@@ -349,17 +559,22 @@ def _median_filter_uint64(cnumpy.uint64_t[:, ::1] input_buffer not None,
                           cnumpy.int32_t[::1] kernel_size not None,
                           bool conditional,
                           int mode,
-                          cnumpy.uint64_t cval):
+                          cnumpy.uint64_t cval,
+                          bool sliding=False):
 
-    cdef: 
+    cdef:
         int y = 0
+        int block = 0
+        int y_max = 0
+        int n_blocks
         int image_dim = input_buffer.shape[1] - 1
         int[2] buffer_shape
     buffer_shape[0] = input_buffer.shape[0]
     buffer_shape[1] = input_buffer.shape[1]
 
-    for y in prange(input_buffer.shape[0], nogil=True):
-            median_filter.median_filter[uint64](<uint64*> & input_buffer[0,0], 
+    if not sliding:
+        for y in prange(input_buffer.shape[0], nogil=True):
+            median_filter.median_filter[uint64](<uint64*> & input_buffer[0, 0],
                                                 <uint64*> & output_buffer[0, 0],
                                                 <int*>&kernel_size[0],
                                                 <int*>buffer_shape,
@@ -369,6 +584,21 @@ def _median_filter_uint64(cnumpy.uint64_t[:, ::1] input_buffer not None,
                                                 conditional,
                                                 mode,
                                                 cval)
+    else:
+        n_blocks = (buffer_shape[0] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for block in prange(n_blocks, nogil=True):
+            y = block * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[0]) - 1
+            median_filter.median_filter_sliding[uint64, median_filter.SortedWindow[uint64]](
+                <uint64*> & input_buffer[0, 0],
+                <uint64*> & output_buffer[0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
 
 
 @cython.cdivision(True)
@@ -380,18 +610,23 @@ def _median_filter_int32(cnumpy.int32_t[:, ::1] input_buffer not None,
                          cnumpy.int32_t[::1] kernel_size not None,
                          bool conditional,
                          int mode,
-                         cnumpy.int32_t cval):
+                         cnumpy.int32_t cval,
+                         bool sliding=False):
 
     cdef:
         int y = 0
+        int block = 0
+        int y_max = 0
+        int n_blocks
         int image_dim = input_buffer.shape[1] - 1
         int[2] buffer_shape
     buffer_shape[0] = input_buffer.shape[0]
     buffer_shape[1] = input_buffer.shape[1]
 
-    for y in prange(input_buffer.shape[0], nogil=True):
-            median_filter.median_filter[int](<int*> & input_buffer[0,0], 
-                                             <int*>  & output_buffer[0, 0],
+    if not sliding:
+        for y in prange(input_buffer.shape[0], nogil=True):
+            median_filter.median_filter[int](<int*> & input_buffer[0, 0],
+                                             <int*> & output_buffer[0, 0],
                                              <int*>&kernel_size[0],
                                              <int*>buffer_shape,
                                              y,
@@ -400,6 +635,21 @@ def _median_filter_int32(cnumpy.int32_t[:, ::1] input_buffer not None,
                                              conditional,
                                              mode,
                                              cval)
+    else:
+        n_blocks = (buffer_shape[0] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for block in prange(n_blocks, nogil=True):
+            y = block * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[0]) - 1
+            median_filter.median_filter_sliding[int, median_filter.SortedWindow[int]](
+                <int*> & input_buffer[0, 0],
+                <int*> & output_buffer[0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
 
 
 @cython.cdivision(True)
@@ -411,18 +661,23 @@ def _median_filter_uint32(cnumpy.uint32_t[:, ::1] input_buffer not None,
                           cnumpy.int32_t[::1] kernel_size not None,
                           bool conditional,
                           int mode,
-                          cnumpy.uint32_t cval):
+                          cnumpy.uint32_t cval,
+                          bool sliding=False):
 
     cdef:
         int y = 0
+        int block = 0
+        int y_max = 0
+        int n_blocks
         int image_dim = input_buffer.shape[1] - 1
         int[2] buffer_shape
     buffer_shape[0] = input_buffer.shape[0]
     buffer_shape[1] = input_buffer.shape[1]
 
-    for y in prange(input_buffer.shape[0], nogil=True):
-            median_filter.median_filter[uint32](<uint32*> & input_buffer[0,0], 
-                                                <uint32*>  & output_buffer[0, 0],
+    if not sliding:
+        for y in prange(input_buffer.shape[0], nogil=True):
+            median_filter.median_filter[uint32](<uint32*> & input_buffer[0, 0],
+                                                <uint32*> & output_buffer[0, 0],
                                                 <int*>&kernel_size[0],
                                                 <int*>buffer_shape,
                                                 y,
@@ -431,6 +686,21 @@ def _median_filter_uint32(cnumpy.uint32_t[:, ::1] input_buffer not None,
                                                 conditional,
                                                 mode,
                                                 cval)
+    else:
+        n_blocks = (buffer_shape[0] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for block in prange(n_blocks, nogil=True):
+            y = block * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[0]) - 1
+            median_filter.median_filter_sliding[uint32, median_filter.SortedWindow[uint32]](
+                <uint32*> & input_buffer[0, 0],
+                <uint32*> & output_buffer[0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
 
 
 @cython.cdivision(True)
@@ -442,18 +712,23 @@ def _median_filter_int16(cnumpy.int16_t[:, ::1] input_buffer not None,
                          cnumpy.int32_t[::1] kernel_size not None,
                          bool conditional,
                          int mode,
-                         cnumpy.int16_t cval):
+                         cnumpy.int16_t cval,
+                         bool sliding=False):
 
     cdef:
         int y = 0
+        int block = 0
+        int y_max = 0
+        int n_blocks
         int image_dim = input_buffer.shape[1] - 1
         int[2] buffer_shape
     buffer_shape[0] = input_buffer.shape[0]
     buffer_shape[1] = input_buffer.shape[1]
 
-    for y in prange(input_buffer.shape[0], nogil=True):
-            median_filter.median_filter[short](<short*> & input_buffer[0,0], 
-                                               <short*>  & output_buffer[0, 0],
+    if not sliding:
+        for y in prange(input_buffer.shape[0], nogil=True):
+            median_filter.median_filter[short](<short*> & input_buffer[0, 0],
+                                               <short*> & output_buffer[0, 0],
                                                <int*>&kernel_size[0],
                                                <int*>buffer_shape,
                                                y,
@@ -462,28 +737,47 @@ def _median_filter_int16(cnumpy.int16_t[:, ::1] input_buffer not None,
                                                conditional,
                                                mode,
                                                cval)
+    else:
+        n_blocks = (buffer_shape[0] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for block in prange(n_blocks, nogil=True):
+            y = block * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[0]) - 1
+            median_filter.median_filter_sliding[short, median_filter.HistogramWindow[short]](
+                <short*> & input_buffer[0, 0],
+                <short*> & output_buffer[0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
 
 
 @cython.cdivision(True)
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.initializedcheck(False)
-def _median_filter_uint16(
-      cnumpy.uint16_t[:, ::1] input_buffer not None,
-      cnumpy.uint16_t[:, ::1] output_buffer not None,
-      cnumpy.int32_t[::1] kernel_size not None,
-      bool conditional,
-      int mode,
-      cnumpy.uint16_t cval):
+def _median_filter_uint16(cnumpy.uint16_t[:, ::1] input_buffer not None,
+                          cnumpy.uint16_t[:, ::1] output_buffer not None,
+                          cnumpy.int32_t[::1] kernel_size not None,
+                          bool conditional,
+                          int mode,
+                          cnumpy.uint16_t cval,
+                          bool sliding=False):
 
     cdef:
         int y = 0
+        int block = 0
+        int y_max = 0
+        int n_blocks
         int image_dim = input_buffer.shape[1] - 1
-        int[2] buffer_shape, 
+        int[2] buffer_shape
     buffer_shape[0] = input_buffer.shape[0]
     buffer_shape[1] = input_buffer.shape[1]
 
-    for y in prange(input_buffer.shape[0], nogil=True):
+    if not sliding:
+        for y in prange(input_buffer.shape[0], nogil=True):
             median_filter.median_filter[uint16](<uint16*> & input_buffer[0, 0],
                                                 <uint16*> & output_buffer[0, 0],
                                                 <int*>&kernel_size[0],
@@ -494,3 +788,591 @@ def _median_filter_uint16(
                                                 conditional,
                                                 mode,
                                                 cval)
+    else:
+        n_blocks = (buffer_shape[0] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for block in prange(n_blocks, nogil=True):
+            y = block * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[0]) - 1
+            median_filter.median_filter_sliding[uint16, median_filter.HistogramWindow[uint16]](
+                <uint16*> & input_buffer[0, 0],
+                <uint16*> & output_buffer[0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_uint8(cnumpy.uint8_t[:, ::1] input_buffer not None,
+                         cnumpy.uint8_t[:, ::1] output_buffer not None,
+                         cnumpy.int32_t[::1] kernel_size not None,
+                         bool conditional,
+                         int mode,
+                         cnumpy.uint8_t cval,
+                         bool sliding=False):
+
+    cdef:
+        int y = 0
+        int block = 0
+        int y_max = 0
+        int n_blocks
+        int image_dim = input_buffer.shape[1] - 1
+        int[2] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+
+    if not sliding:
+        for y in prange(input_buffer.shape[0], nogil=True):
+            median_filter.median_filter[uint8](<uint8*> & input_buffer[0, 0],
+                                               <uint8*> & output_buffer[0, 0],
+                                               <int*>&kernel_size[0],
+                                               <int*>buffer_shape,
+                                               y,
+                                               0,
+                                               image_dim,
+                                               conditional,
+                                               mode,
+                                               cval)
+    else:
+        n_blocks = (buffer_shape[0] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for block in prange(n_blocks, nogil=True):
+            y = block * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[0]) - 1
+            median_filter.median_filter_sliding[uint8, median_filter.HistogramWindow[uint8]](
+                <uint8*> & input_buffer[0, 0],
+                <uint8*> & output_buffer[0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_volume_float32(float[:, :, ::1] input_buffer not None,
+                                  float[:, :, ::1] output_buffer not None,
+                                  cnumpy.int32_t[::1] kernel_size not None,
+                                  bool conditional,
+                                  int mode,
+                                  float cval,
+                                  bool sliding=True):
+
+    cdef:
+        int index = 0
+        int z = 0
+        int y = 0
+        int y_max = 0
+        int n_blocks
+        int image_dim = input_buffer.shape[2] - 1
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    if kernel_size[0] == 1 and not sliding:
+        # Filter each row of each frame with a 2D kernel
+        for index in prange(buffer_shape[0] * buffer_shape[1], nogil=True):
+            z = index // buffer_shape[1]
+            y = index % buffer_shape[1]
+            median_filter.median_filter[float](<float*> & input_buffer[z, 0, 0],
+                                               <float*> & output_buffer[z, 0, 0],
+                                               <int*>&kernel_size[1],
+                                               <int*>&buffer_shape[1],
+                                               y,
+                                               0,
+                                               image_dim,
+                                               conditional,
+                                               mode,
+                                               cval)
+    else:
+        n_blocks = (buffer_shape[1] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for index in prange(buffer_shape[0] * n_blocks, nogil=True):
+            z = index // n_blocks
+            y = (index % n_blocks) * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[1]) - 1
+            median_filter.median_filter_volume_sliding[float, median_filter.SortedWindow[float]](
+                <float*> & input_buffer[0, 0, 0],
+                <float*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                z,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_volume_float64(double[:, :, ::1] input_buffer not None,
+                                  double[:, :, ::1] output_buffer not None,
+                                  cnumpy.int32_t[::1] kernel_size not None,
+                                  bool conditional,
+                                  int mode,
+                                  double cval,
+                                  bool sliding=True):
+
+    cdef:
+        int index = 0
+        int z = 0
+        int y = 0
+        int y_max = 0
+        int n_blocks
+        int image_dim = input_buffer.shape[2] - 1
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    if kernel_size[0] == 1 and not sliding:
+        # Filter each row of each frame with a 2D kernel
+        for index in prange(buffer_shape[0] * buffer_shape[1], nogil=True):
+            z = index // buffer_shape[1]
+            y = index % buffer_shape[1]
+            median_filter.median_filter[double](<double*> & input_buffer[z, 0, 0],
+                                                <double*> & output_buffer[z, 0, 0],
+                                                <int*>&kernel_size[1],
+                                                <int*>&buffer_shape[1],
+                                                y,
+                                                0,
+                                                image_dim,
+                                                conditional,
+                                                mode,
+                                                cval)
+    else:
+        n_blocks = (buffer_shape[1] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for index in prange(buffer_shape[0] * n_blocks, nogil=True):
+            z = index // n_blocks
+            y = (index % n_blocks) * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[1]) - 1
+            median_filter.median_filter_volume_sliding[double, median_filter.SortedWindow[double]](
+                <double*> & input_buffer[0, 0, 0],
+                <double*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                z,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_volume_int64(cnumpy.int64_t[:, :, ::1] input_buffer not None,
+                                cnumpy.int64_t[:, :, ::1] output_buffer not None,
+                                cnumpy.int32_t[::1] kernel_size not None,
+                                bool conditional,
+                                int mode,
+                                cnumpy.int64_t cval,
+                                bool sliding=True):
+
+    cdef:
+        int index = 0
+        int z = 0
+        int y = 0
+        int y_max = 0
+        int n_blocks
+        int image_dim = input_buffer.shape[2] - 1
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    if kernel_size[0] == 1 and not sliding:
+        # Filter each row of each frame with a 2D kernel
+        for index in prange(buffer_shape[0] * buffer_shape[1], nogil=True):
+            z = index // buffer_shape[1]
+            y = index % buffer_shape[1]
+            median_filter.median_filter[long](<long*> & input_buffer[z, 0, 0],
+                                              <long*> & output_buffer[z, 0, 0],
+                                              <int*>&kernel_size[1],
+                                              <int*>&buffer_shape[1],
+                                              y,
+                                              0,
+                                              image_dim,
+                                              conditional,
+                                              mode,
+                                              cval)
+    else:
+        n_blocks = (buffer_shape[1] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for index in prange(buffer_shape[0] * n_blocks, nogil=True):
+            z = index // n_blocks
+            y = (index % n_blocks) * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[1]) - 1
+            median_filter.median_filter_volume_sliding[long, median_filter.SortedWindow[long]](
+                <long*> & input_buffer[0, 0, 0],
+                <long*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                z,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_volume_uint64(cnumpy.uint64_t[:, :, ::1] input_buffer not None,
+                                 cnumpy.uint64_t[:, :, ::1] output_buffer not None,
+                                 cnumpy.int32_t[::1] kernel_size not None,
+                                 bool conditional,
+                                 int mode,
+                                 cnumpy.uint64_t cval,
+                                 bool sliding=True):
+
+    cdef:
+        int index = 0
+        int z = 0
+        int y = 0
+        int y_max = 0
+        int n_blocks
+        int image_dim = input_buffer.shape[2] - 1
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    if kernel_size[0] == 1 and not sliding:
+        # Filter each row of each frame with a 2D kernel
+        for index in prange(buffer_shape[0] * buffer_shape[1], nogil=True):
+            z = index // buffer_shape[1]
+            y = index % buffer_shape[1]
+            median_filter.median_filter[uint64](<uint64*> & input_buffer[z, 0, 0],
+                                                <uint64*> & output_buffer[z, 0, 0],
+                                                <int*>&kernel_size[1],
+                                                <int*>&buffer_shape[1],
+                                                y,
+                                                0,
+                                                image_dim,
+                                                conditional,
+                                                mode,
+                                                cval)
+    else:
+        n_blocks = (buffer_shape[1] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for index in prange(buffer_shape[0] * n_blocks, nogil=True):
+            z = index // n_blocks
+            y = (index % n_blocks) * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[1]) - 1
+            median_filter.median_filter_volume_sliding[uint64, median_filter.SortedWindow[uint64]](
+                <uint64*> & input_buffer[0, 0, 0],
+                <uint64*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                z,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_volume_int32(cnumpy.int32_t[:, :, ::1] input_buffer not None,
+                                cnumpy.int32_t[:, :, ::1] output_buffer not None,
+                                cnumpy.int32_t[::1] kernel_size not None,
+                                bool conditional,
+                                int mode,
+                                cnumpy.int32_t cval,
+                                bool sliding=True):
+
+    cdef:
+        int index = 0
+        int z = 0
+        int y = 0
+        int y_max = 0
+        int n_blocks
+        int image_dim = input_buffer.shape[2] - 1
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    if kernel_size[0] == 1 and not sliding:
+        # Filter each row of each frame with a 2D kernel
+        for index in prange(buffer_shape[0] * buffer_shape[1], nogil=True):
+            z = index // buffer_shape[1]
+            y = index % buffer_shape[1]
+            median_filter.median_filter[int](<int*> & input_buffer[z, 0, 0],
+                                             <int*> & output_buffer[z, 0, 0],
+                                             <int*>&kernel_size[1],
+                                             <int*>&buffer_shape[1],
+                                             y,
+                                             0,
+                                             image_dim,
+                                             conditional,
+                                             mode,
+                                             cval)
+    else:
+        n_blocks = (buffer_shape[1] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for index in prange(buffer_shape[0] * n_blocks, nogil=True):
+            z = index // n_blocks
+            y = (index % n_blocks) * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[1]) - 1
+            median_filter.median_filter_volume_sliding[int, median_filter.SortedWindow[int]](
+                <int*> & input_buffer[0, 0, 0],
+                <int*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                z,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_volume_uint32(cnumpy.uint32_t[:, :, ::1] input_buffer not None,
+                                 cnumpy.uint32_t[:, :, ::1] output_buffer not None,
+                                 cnumpy.int32_t[::1] kernel_size not None,
+                                 bool conditional,
+                                 int mode,
+                                 cnumpy.uint32_t cval,
+                                 bool sliding=True):
+
+    cdef:
+        int index = 0
+        int z = 0
+        int y = 0
+        int y_max = 0
+        int n_blocks
+        int image_dim = input_buffer.shape[2] - 1
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    if kernel_size[0] == 1 and not sliding:
+        # Filter each row of each frame with a 2D kernel
+        for index in prange(buffer_shape[0] * buffer_shape[1], nogil=True):
+            z = index // buffer_shape[1]
+            y = index % buffer_shape[1]
+            median_filter.median_filter[uint32](<uint32*> & input_buffer[z, 0, 0],
+                                                <uint32*> & output_buffer[z, 0, 0],
+                                                <int*>&kernel_size[1],
+                                                <int*>&buffer_shape[1],
+                                                y,
+                                                0,
+                                                image_dim,
+                                                conditional,
+                                                mode,
+                                                cval)
+    else:
+        n_blocks = (buffer_shape[1] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for index in prange(buffer_shape[0] * n_blocks, nogil=True):
+            z = index // n_blocks
+            y = (index % n_blocks) * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[1]) - 1
+            median_filter.median_filter_volume_sliding[uint32, median_filter.SortedWindow[uint32]](
+                <uint32*> & input_buffer[0, 0, 0],
+                <uint32*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                z,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_volume_int16(cnumpy.int16_t[:, :, ::1] input_buffer not None,
+                                cnumpy.int16_t[:, :, ::1] output_buffer not None,
+                                cnumpy.int32_t[::1] kernel_size not None,
+                                bool conditional,
+                                int mode,
+                                cnumpy.int16_t cval,
+                                bool sliding=True):
+
+    cdef:
+        int index = 0
+        int z = 0
+        int y = 0
+        int y_max = 0
+        int n_blocks
+        int image_dim = input_buffer.shape[2] - 1
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    if kernel_size[0] == 1 and not sliding:
+        # Filter each row of each frame with a 2D kernel
+        for index in prange(buffer_shape[0] * buffer_shape[1], nogil=True):
+            z = index // buffer_shape[1]
+            y = index % buffer_shape[1]
+            median_filter.median_filter[short](<short*> & input_buffer[z, 0, 0],
+                                               <short*> & output_buffer[z, 0, 0],
+                                               <int*>&kernel_size[1],
+                                               <int*>&buffer_shape[1],
+                                               y,
+                                               0,
+                                               image_dim,
+                                               conditional,
+                                               mode,
+                                               cval)
+    else:
+        n_blocks = (buffer_shape[1] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for index in prange(buffer_shape[0] * n_blocks, nogil=True):
+            z = index // n_blocks
+            y = (index % n_blocks) * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[1]) - 1
+            median_filter.median_filter_volume_sliding[short, median_filter.HistogramWindow[short]](
+                <short*> & input_buffer[0, 0, 0],
+                <short*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                z,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_volume_uint16(cnumpy.uint16_t[:, :, ::1] input_buffer not None,
+                                 cnumpy.uint16_t[:, :, ::1] output_buffer not None,
+                                 cnumpy.int32_t[::1] kernel_size not None,
+                                 bool conditional,
+                                 int mode,
+                                 cnumpy.uint16_t cval,
+                                 bool sliding=True):
+
+    cdef:
+        int index = 0
+        int z = 0
+        int y = 0
+        int y_max = 0
+        int n_blocks
+        int image_dim = input_buffer.shape[2] - 1
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    if kernel_size[0] == 1 and not sliding:
+        # Filter each row of each frame with a 2D kernel
+        for index in prange(buffer_shape[0] * buffer_shape[1], nogil=True):
+            z = index // buffer_shape[1]
+            y = index % buffer_shape[1]
+            median_filter.median_filter[uint16](<uint16*> & input_buffer[z, 0, 0],
+                                                <uint16*> & output_buffer[z, 0, 0],
+                                                <int*>&kernel_size[1],
+                                                <int*>&buffer_shape[1],
+                                                y,
+                                                0,
+                                                image_dim,
+                                                conditional,
+                                                mode,
+                                                cval)
+    else:
+        n_blocks = (buffer_shape[1] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for index in prange(buffer_shape[0] * n_blocks, nogil=True):
+            z = index // n_blocks
+            y = (index % n_blocks) * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[1]) - 1
+            median_filter.median_filter_volume_sliding[uint16, median_filter.HistogramWindow[uint16]](
+                <uint16*> & input_buffer[0, 0, 0],
+                <uint16*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                z,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def _median_filter_volume_uint8(cnumpy.uint8_t[:, :, ::1] input_buffer not None,
+                                cnumpy.uint8_t[:, :, ::1] output_buffer not None,
+                                cnumpy.int32_t[::1] kernel_size not None,
+                                bool conditional,
+                                int mode,
+                                cnumpy.uint8_t cval,
+                                bool sliding=True):
+
+    cdef:
+        int index = 0
+        int z = 0
+        int y = 0
+        int y_max = 0
+        int n_blocks
+        int image_dim = input_buffer.shape[2] - 1
+        int[3] buffer_shape
+    buffer_shape[0] = input_buffer.shape[0]
+    buffer_shape[1] = input_buffer.shape[1]
+    buffer_shape[2] = input_buffer.shape[2]
+
+    if kernel_size[0] == 1 and not sliding:
+        # Filter each row of each frame with a 2D kernel
+        for index in prange(buffer_shape[0] * buffer_shape[1], nogil=True):
+            z = index // buffer_shape[1]
+            y = index % buffer_shape[1]
+            median_filter.median_filter[uint8](<uint8*> & input_buffer[z, 0, 0],
+                                               <uint8*> & output_buffer[z, 0, 0],
+                                               <int*>&kernel_size[1],
+                                               <int*>&buffer_shape[1],
+                                               y,
+                                               0,
+                                               image_dim,
+                                               conditional,
+                                               mode,
+                                               cval)
+    else:
+        n_blocks = (buffer_shape[1] + _BLOCK_HEIGHT - 1) // _BLOCK_HEIGHT
+        for index in prange(buffer_shape[0] * n_blocks, nogil=True):
+            z = index // n_blocks
+            y = (index % n_blocks) * _BLOCK_HEIGHT
+            y_max = min(y + _BLOCK_HEIGHT, buffer_shape[1]) - 1
+            median_filter.median_filter_volume_sliding[uint8, median_filter.HistogramWindow[uint8]](
+                <uint8*> & input_buffer[0, 0, 0],
+                <uint8*> & output_buffer[0, 0, 0],
+                <int*>&kernel_size[0],
+                <int*>buffer_shape,
+                z,
+                y,
+                y_max,
+                conditional,
+                mode,
+                cval)
@@ -27,11 +27,15 @@ __authors__ = ["H. Payno"]
 __license__ = "MIT"
 __date__ = "17/01/2018"
 
+import os
+import shutil
+import tempfile
 import unittest
 import numpy
-from silx.math.medianfilter import medfilt2d
+from silx.math.medianfilter import medfilt2d, medfilt3d
 from silx.math.medianfilter.medianfilter import reflect, mirror
 from silx.math.medianfilter.medianfilter import MODES as silx_mf_modes
+from silx.math.medianfilter import medianfilter as medianfilter_cpp
 from silx.utils.testutils import ParametricTestCase
 try:
     import scipy
@@ -550,7 +554,7 @@ class TestGeneralExecution(ParametricTestCase):
         for mode in silx_mf_modes:
             for testType in [numpy.float32, numpy.float64, numpy.int16,
                              numpy.uint16, numpy.int32, numpy.int64,
-                             numpy.uint64]:
+                             numpy.uint64, numpy.uint8]:
                 with self.subTest(mode=mode, type=testType):
                     data = (numpy.random.rand(10, 10) * 65000).astype(testType)
                     out = medfilt2d(image=data,
@@ -610,6 +614,139 @@ class TestGeneralExecution(ParametricTestCase):
                     numpy.any(out_isnan[numpy.logical_not(nan_mask)]))
 
 
+class TestSlidingWindow(ParametricTestCase):
+    """Compare the sliding window implementations with the per pixel one"""
+
+    def _filter(self, data, kernel_size, conditional, mode, sliding):
+        output = numpy.zeros_like(data)
+        filterfc = getattr(medianfilter_cpp,
+                           "_median_filter_" + data.dtype.name)
+        filterfc(input_buffer=data,
+                 output_buffer=output,
+                 kernel_size=numpy.array(kernel_size, dtype=numpy.int32),
+                 conditional=conditional,
+                 mode=silx_mf_modes[mode],
+                 cval=data.dtype.type(3),
+                 sliding=sliding)
+        return output
+
+    def testTypes(self):
+        """Test sorted and histogram windows on all types and modes"""
+        for dtype in (numpy.float32, numpy.float64, numpy.int64, numpy.uint64,
+                      numpy.int32, numpy.uint32, numpy.int16, numpy.uint16,
+                      numpy.uint8):
+            info = numpy.iinfo(dtype) if dtype().dtype.kind in 'iu' else None
+            low, high = (-1000., 1000.) if info is None else (info.min, info.max)
+            data = numpy.random.uniform(low, high, (37, 41)).astype(dtype)
+            for mode in silx_mf_modes:
+                for kernel_size in ((1, 3), (3, 3), (5, 9), (7, 1), (9, 5)):
+                    for conditional in (False, True):
+                        with self.subTest(dtype=dtype, mode=mode,
+                                          kernel_size=kernel_size,
+                                          conditional=conditional):
+                            expected = self._filter(data, kernel_size,
+                                                    conditional, mode, False)
+                            result = self._filter(data, kernel_size,
+                                                  conditional, mode, True)
+                            numpy.testing.assert_array_equal(result, expected)
+
+    def testNaNs(self):
+        """Test sorted window ignores NaNs as the per pixel implementation"""
+        data = numpy.random.random((20, 30))
+        data[numpy.random.random(data.shape) < 0.3] = numpy.nan
+        data[5:12, 5:15] = numpy.nan
+        for mode in silx_mf_modes:
+            for conditional in (False, True):
+                with self.subTest(mode=mode, conditional=conditional):
+                    expected = self._filter(data, (5, 7), conditional, mode,
+                                            False)
+                    result = self._filter(data, (5, 7), conditional, mode,
+                                          True)
+                    numpy.testing.assert_array_equal(result, expected)
+
+    def testBigKernel(self):
+        """Test automatic selection with a kernel bigger than the image"""
+        data = numpy.arange(12 * 10, dtype=numpy.uint16).reshape(12, 10)
+        for mode in silx_mf_modes:
+            with self.subTest(mode=mode):
+                expected = self._filter(data, (15, 15), False, mode, False)
+                result = medfilt2d(data, kernel_size=15, mode=mode, cval=3)
+                numpy.testing.assert_array_equal(result, expected)
+
+
+class TestMedianFilter3D(ParametricTestCase):
+    """Test median filter on stacks of images and volumes"""
+
+    def testStackOfImages(self):
+        """Test that a kernel of depth 1 filters each frame"""
+        for dtype in (numpy.float32, numpy.uint16, numpy.int32):
+            stack = (numpy.random.rand(4, 17, 13) * 1000).astype(dtype)
+            for mode in silx_mf_modes:
+                for kernel_size in ((1, 3, 3), (1, 5, 9)):
+                    with self.subTest(dtype=dtype, mode=mode,
+                                      kernel_size=kernel_size):
+                        result = medfilt3d(stack, kernel_size, mode=mode)
+                        for frame, filtered in zip(stack, result):
+                            expected = medfilt2d(frame, kernel_size[1:],
+                                                 mode=mode)
+                            numpy.testing.assert_array_equal(filtered,
+                                                             expected)
+
+    def testVolume(self):
+        """Test 3D kernels against a reference implementation"""
+        pad_modes = {'nearest': 'edge',
+                     'reflect': 'symmetric',
+                     'mirror': 'reflect',
+                     'constant': 'constant'}
+        volume = numpy.random.rand(6, 8, 7)
+        for mode, pad_mode in pad_modes.items():
+            for kernel_size in ((3, 3, 3), (5, 1, 3)):
+                with self.subTest(mode=mode, kernel_size=kernel_size):
+                    result = medfilt3d(volume, kernel_size, mode=mode)
+                    half = [size // 2 for size in kernel_size]
+                    padded = numpy.pad(volume, [(h, h) for h in half],
+                                       mode=pad_mode)
+                    expected = numpy.empty_like(volume)
+                    for index in numpy.ndindex(*volume.shape):
+                        window = padded[tuple(
+                            slice(i, i + size)
+                            for i, size in zip(index, kernel_size))]
+                        expected[index] = numpy.median(window)
+                    numpy.testing.assert_array_equal(result, expected)
+
+    def testOutput(self):
+        """Test writing the result in a memory-mapped array"""
+        tempdir = tempfile.mkdtemp()
+        try:
+            volume = numpy.arange(5 * 6 * 7, dtype=numpy.uint8)
+            volume.shape = 5, 6, 7
+            output = numpy.memmap(os.path.join(tempdir, "output.dat"),
+                                  dtype=numpy.uint8, mode="w+",
+                                  shape=volume.shape)
+            result = medfilt3d(volume, 3, output=output)
+            self.assertIs(result, output)
+            numpy.testing.assert_array_equal(output, medfilt3d(volume, 3))
+            del result, output
+        finally:
+            shutil.rmtree(tempdir)
+
+    def testErrors(self):
+        """Test invalid arguments"""
+        volume = numpy.zeros((3, 4, 5), dtype=numpy.float32)
+        with self.assertRaises(ValueError):
+            medfilt3d(volume[0], 3)
+        with self.assertRaises(ValueError):
+            medfilt3d(volume, (3, 3))
+        with self.assertRaises(ValueError):
+            medfilt3d(volume, 3, output=numpy.zeros((3, 4, 4), numpy.float32))
+        with self.assertRaises(ValueError):
+            medfilt3d(volume, 3, output=numpy.zeros((3, 4, 5), numpy.float64))
+        with self.assertRaises(ValueError):
+            medfilt3d(volume, 2)
+        with self.assertRaises(ValueError):
+            medfilt3d(volume, (1, 3, 4))
+
+
 def _getScipyAndSilxCommonModes():
     """return the mode which are comparable between silx and scipy"""
     modes = silx_mf_modes.copy()
@@ -688,6 +825,8 @@ class TestVsScipy(ParametricTestCase):
 def suite():
     test_suite = unittest.TestSuite()
     for test in [TestGeneralExecution,
+                 TestSlidingWindow,
+                 TestMedianFilter3D,
                  TestVsScipy,
                  TestMedianFilterNearest,
                  TestMedianFilterReflect,
@@ -50,7 +50,9 @@ def configuration(parent_package='', top_path=None):
     config.add_extension('chistogramnd',
                          sources=histo_src,
                          include_dirs=histo_inc,
-                         language='c')
+                         language='c',
+                         extra_link_args=['-fopenmp'],
+                         extra_compile_args=['-fopenmp'])
 
     # =====================================
     # histogramnd_lut
@@ -58,7 +60,9 @@ def configuration(parent_package='', top_path=None):
     config.add_extension('chistogramnd_lut',
                          sources=['chistogramnd_lut.pyx'],
                          include_dirs=histo_inc,
-                         language='c')
+                         language='c',
+                         extra_link_args=['-fopenmp'],
+                         extra_compile_args=['-fopenmp'])
     # =====================================
     # marching cubes
     # =====================================
@@ -73,7 +77,9 @@ def configuration(parent_package='', top_path=None):
     config.add_extension('combo',
                          sources=['combo.pyx'],
                          include_dirs=['include'],
-                         language='c')
+                         language='c',
+                         extra_link_args=['-fopenmp'],
+                         extra_compile_args=['-fopenmp'])
 
     config.add_extension('colormap',
                          sources=["colormap.pyx"],
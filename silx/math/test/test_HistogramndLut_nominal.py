@@ -564,6 +564,120 @@ class TestHistogramndLut_nominal_3d(_TestHistogramndLut_nominal):
     ndims = 3
 
 
+class TestHistogramndLut_stack(unittest.TestCase):
+    """
+    Tests HistogramndLut with stacks of weights and several threads.
+    """
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.sample = rng.uniform(-1., 11., (5000, 2))
+        self.histo_range = [[0., 10.], [0., 10.]]
+        self.n_bins = (7, 9)
+        self.weights = rng.uniform(-10., 10., (4, 50, 100))
+
+    def _histogram(self, weights, weight_min=None, weight_max=None):
+        mask = np.ones(weights.size, dtype=bool)
+        if weight_min is not None:
+            mask &= weights.reshape(-1) >= weight_min
+        if weight_max is not None:
+            mask &= weights.reshape(-1) <= weight_max
+        histo = np.histogramdd(self.sample[mask],
+                               bins=self.n_bins,
+                               range=self.histo_range)[0]
+        w_histo = np.histogramdd(self.sample[mask],
+                                 bins=self.n_bins,
+                                 range=self.histo_range,
+                                 weights=weights.reshape(-1)[mask])[0]
+        return histo, w_histo
+
+    def test_lut(self):
+        instance = HistogramndLut(self.sample,
+                                  self.histo_range,
+                                  self.n_bins)
+        lut = instance.lut
+        self.assertEqual(lut.shape, (len(self.sample),))
+        self.assertEqual(lut.dtype, np.int16)
+
+        histo = np.histogramdd(self.sample,
+                               bins=self.n_bins,
+                               range=self.histo_range)[0]
+        self.assertEqual(np.count_nonzero(lut >= 0), histo.sum())
+        self.assertTrue(np.array_equal(
+            np.bincount(lut[lut >= 0], minlength=histo.size),
+            histo.reshape(-1)))
+
+    def test_apply_lut_stack(self):
+        for n_threads in (None, 1, 3):
+            instance = HistogramndLut(self.sample,
+                                      self.histo_range,
+                                      self.n_bins,
+                                      n_threads=n_threads)
+            histo, w_histo = instance.apply_lut(self.weights)
+
+            self.assertEqual(histo.shape, (4,) + self.n_bins)
+            self.assertEqual(w_histo.shape, (4,) + self.n_bins)
+            self.assertEqual(histo.dtype, np.uint32)
+            self.assertEqual(w_histo.dtype, np.float64)
+
+            for index, weights in enumerate(self.weights):
+                expected_h, expected_c = self._histogram(weights)
+                self.assertTrue(np.array_equal(histo[index], expected_h))
+                self.assertTrue(np.allclose(w_histo[index], expected_c))
+
+                single_h, single_c = instance.apply_lut(weights)
+                self.assertTrue(np.array_equal(single_h, histo[index]))
+                self.assertTrue(np.array_equal(single_c, w_histo[index]))
+
+    def test_apply_lut_stack_weight_min_max(self):
+        instance = HistogramndLut(self.sample,
+                                  self.histo_range,
+                                  self.n_bins)
+        histo, w_histo = instance.apply_lut(self.weights,
+                                            weight_min=-5.,
+                                            weight_max=2.5)
+        for index, weights in enumerate(self.weights):
+            expected_h, expected_c = self._histogram(weights, -5., 2.5)
+            self.assertTrue(np.array_equal(histo[index], expected_h))
+            self.assertTrue(np.allclose(w_histo[index], expected_c))
+
+    def test_apply_lut_stack_out(self):
+        instance = HistogramndLut(self.sample,
+                                  self.histo_range,
+                                  self.n_bins,
+                                  dtype=np.float32)
+        histo = np.zeros((4,) + self.n_bins, dtype=np.uint32)
+        w_histo = np.zeros((4,) + self.n_bins, dtype=np.float32)
+
+        for _ in range(2):
+            histo_2, w_histo_2 = instance.apply_lut(self.weights,
+                                                    histo=histo,
+                                                    weighted_histo=w_histo)
+            self.assertIs(histo, histo_2)
+            self.assertIs(w_histo, w_histo_2)
+
+        for index, weights in enumerate(self.weights):
+            expected_h, expected_c = self._histogram(weights)
+            self.assertTrue(np.array_equal(histo[index], 2 * expected_h))
+            self.assertTrue(np.allclose(w_histo[index], 2 * expected_c,
+                                        atol=1e-3))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            HistogramndLut(self.sample,
+                           self.histo_range,
+                           self.n_bins,
+                           n_threads=0)
+
+        instance = HistogramndLut(self.sample,
+                                  self.histo_range,
+                                  self.n_bins)
+        with self.assertRaises(ValueError):
+            instance.apply_lut(self.weights[:, :-1])
+        with self.assertRaises(ValueError):
+            instance.accumulate(self.weights)
+
+
 # ==============================================================
 # ==============================================================
 # ==============================================================
@@ -571,7 +685,8 @@ class TestHistogramndLut_nominal_3d(_TestHistogramndLut_nominal):
 
 test_cases = (TestHistogramndLut_nominal_1d,
               TestHistogramndLut_nominal_2d,
-              TestHistogramndLut_nominal_3d,)
+              TestHistogramndLut_nominal_3d,
+              TestHistogramndLut_stack,)
 
 
 def suite():
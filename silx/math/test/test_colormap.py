@@ -153,6 +153,58 @@ class TestColormap(ParametricTestCase):
                     data = numpy.array(data, dtype=numpy.float64)
                     self._test(data, colors, 1, 10, normalization, (0, 0, 0, 0))
 
+    def test_random_float(self):
+        """Test float data with many different values"""
+        colors = numpy.zeros((256, 4), dtype=numpy.uint8)
+        colors[:, 0] = numpy.arange(len(colors))
+        colors[:, 3] = 255
+
+        state = numpy.random.get_state()
+        numpy.random.seed(0)
+        data = numpy.random.random((100, 200)) * 2000. - 100.
+        numpy.random.set_state(state)
+        data[0, :4] = float('inf'), float('-inf'), float('nan'), 0.
+
+        for normalization in self.NORMALIZATIONS:
+            for vmin, vmax in ((1., 1000.), (0.5, 1.5)):
+                with self.subTest(normalization=normalization,
+                                  vmin=vmin, vmax=vmax):
+                    self._test(data, colors, vmin, vmax, normalization,
+                               (1, 2, 3, 4))
+
+    def test_output(self):
+        """Test writing the result to a provided array"""
+        colors = numpy.zeros((256, 4), dtype=numpy.uint8)
+        colors[:, 0] = numpy.arange(len(colors))
+        colors[:, 3] = 255
+
+        data = numpy.arange(-5, 15, dtype=numpy.float32).reshape(4, 5)
+        output = numpy.empty((4, 5, 4), dtype=numpy.uint8)
+
+        for normalization in self.NORMALIZATIONS:
+            with self.subTest(normalization=normalization):
+                image = colormap.cmap(data, colors, 1, 10, normalization,
+                                      output=output)
+                self.assertIs(image, output)
+                ref_image = self.ref_colormap(
+                    data, colors, 1, 10, normalization, None)
+                self.assertTrue(numpy.array_equal(ref_image, output))
+
+        # Float colors with 3 channels
+        colors = numpy.array(colors[:, :3], dtype=numpy.float32)
+        output = numpy.empty((4, 5, 3), dtype=numpy.float32)
+        image = colormap.cmap(data, colors, 1, 10, 'log', output=output)
+        self.assertIs(image, output)
+        self.assertTrue(numpy.array_equal(
+            self.ref_colormap(data, colors, 1, 10, 'log', None), output))
+
+        for output in (numpy.empty((4, 5, 4), dtype=numpy.float32),
+                       numpy.empty((4, 5, 3), dtype=numpy.uint8),
+                       numpy.empty((5, 4, 3), dtype=numpy.float32),
+                       numpy.empty((4, 5, 6), dtype=numpy.float32)[:, :, :3]):
+            with self.assertRaises(ValueError):
+                colormap.cmap(data, colors, 1, 10, 'log', output=output)
+
     def test_errors(self):
         """Test raising exception for bad vmin, vmax, normalization parameters
         """
@@ -30,13 +30,23 @@ __license__ = "MIT"
 __date__ = "17/01/2018"
 
 
+import os
+import shutil
+import tempfile
 import unittest
 
 import numpy
 
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
 from silx.utils.testutils import ParametricTestCase
 
-from silx.math.combo import min_max
+from silx.io import commonh5
+from silx.math import combo
+from silx.math.combo import min_max, statistics
 
 
 class TestMinMax(ParametricTestCase):
@@ -205,11 +215,234 @@ class TestMinMax(ParametricTestCase):
                     data = numpy.array(data, dtype=dtype)
                     self._test_min_max(data, min_positive=True, finite=True)
 
+    def test_strided(self):
+        """Test min_max on non-contiguous arrays"""
+        data = numpy.random.random((7, 100, 120)) - 0.5
+        tests = {
+            'transposed': data.T,
+            'sliced': data[:, 10:90, 20:100],
+            'strided': data[::2, ::3, ::-2],
+            'column': data[3, :, 5],
+        }
+        for name, view in tests.items():
+            for min_positive in (True, False):
+                with self.subTest(data=name, min_positive=min_positive):
+                    self._test_min_max(view.ravel(), min_positive)
+                    expected = min_max(numpy.ascontiguousarray(view),
+                                       min_positive)
+                    result = min_max(view, min_positive)
+                    for key in ('minimum', 'maximum', 'min_positive',
+                                'argmin', 'argmax', 'argmin_positive'):
+                        self.assertEqual(getattr(result, key),
+                                         getattr(expected, key))
+
+    def test_readonly(self):
+        """Test min_max on read-only arrays"""
+        data = numpy.random.random((7, 100, 120)) - 0.5
+        data.flags.writeable = False
+        for name, view in (('contiguous', data),
+                           ('strided', data[::2, ::3, ::-2])):
+            with self.subTest(data=name):
+                expected = min_max(numpy.array(view), min_positive=True)
+                result = min_max(view, min_positive=True)
+                for key in ('minimum', 'maximum', 'min_positive',
+                            'argmin', 'argmax', 'argmin_positive'):
+                    self.assertEqual(getattr(result, key),
+                                     getattr(expected, key))
+
+    def test_chunks(self):
+        """Test first occurrences in data bigger than processed chunks"""
+        data = numpy.ones(300000, dtype=numpy.int32)
+        data[[100000, 150000, 250000]] = 0
+        data[[200000, 280000]] = 2
+        result = min_max(data, min_positive=True)
+        self.assertEqual((result.minimum, result.argmin), (0, 100000))
+        self.assertEqual((result.maximum, result.argmax), (2, 200000))
+        self.assertEqual((result.min_positive, result.argmin_positive),
+                         (1, 0))
+
+
+class TestStatistics(ParametricTestCase):
+    """Tests of statistics combo"""
+
+    def test_dtypes(self):
+        """Test statistics with different types"""
+        for dtype in TestMinMax.DTYPES:
+            with self.subTest(dtype=dtype):
+                data = numpy.arange(300000 % 120, 300000,
+                                    dtype=dtype)
+                result = statistics(data)
+                self.assertEqual(result.minimum, data.min())
+                self.assertEqual(result.maximum, data.max())
+                self.assertEqual(result.count, data.size)
+                self.assertAlmostEqual(
+                    result.sum / data.sum(dtype=numpy.float64), 1.)
+                self.assertAlmostEqual(
+                    result.mean, data.mean(dtype=numpy.float64),
+                    delta=1e-6)
+                self.assertAlmostEqual(
+                    result.variance / data.var(dtype=numpy.float64), 1.)
+
+    def test_values(self):
+        """Test statistics against numpy on random strided data"""
+        data = 1000. + numpy.random.random((300, 400))
+        view = data[::-1, 10:350:3]
+        result = statistics(view)
+        self.assertEqual(result.argmin, numpy.argmin(view))
+        self.assertEqual(result.argmax, numpy.argmax(view))
+        self.assertAlmostEqual(result.mean, numpy.mean(view))
+        self.assertAlmostEqual(result.std, numpy.std(view))
+
+    def test_nan_and_inf(self):
+        """Test statistics ignores NaNs and optionally infinite values"""
+        data = numpy.array((float('nan'), 1., float('inf'), 3.))
+        result = statistics(data)
+        self.assertEqual(result.count, 3)
+        self.assertEqual(result.maximum, float('inf'))
+        self.assertEqual(result.mean, float('inf'))
+
+        result = statistics(data, finite=True)
+        self.assertEqual(result.count, 2)
+        self.assertEqual(result.sum, 4.)
+        self.assertEqual(result.mean, 2.)
+        self.assertEqual(result.variance, 1.)
+        self.assertEqual(result.min_positive, 1.)
+
+        result = statistics(numpy.array((float('nan'), float('nan'))))
+        self.assertEqual(result.count, 0)
+        self.assertEqual(result.sum, 0.)
+        self.assertTrue(numpy.isnan(result.minimum))
+        self.assertTrue(numpy.isnan(result.mean))
+        self.assertTrue(numpy.isnan(result.std))
+
+    def test_nodata(self):
+        """Test statistics with empty array"""
+        with self.assertRaises(ValueError):
+            statistics(numpy.array(()))
+
+
+class TestDatasets(ParametricTestCase):
+    """Tests of min_max and statistics with datasets and sub-sampling"""
+
+    def setUp(self):
+        self.data = numpy.random.random((23, 17, 11)) - 0.5
+        self.data[5, 3, 2] = float('nan')
+        self.data[0] = float('nan')
+        self._block_size = combo._DATASET_BLOCK_SIZE
+        combo._DATASET_BLOCK_SIZE = 1024  # Read many blocks
+
+    def tearDown(self):
+        combo._DATASET_BLOCK_SIZE = self._block_size
+
+    def _test_dataset(self, dataset):
+        """Compare results with those of the numpy array"""
+        for subsampling in (1, 2, 5):
+            with self.subTest(subsampling=subsampling):
+                data = self.data[::subsampling, ::subsampling, ::subsampling]
+                expected = statistics(data)
+                result = statistics(dataset, subsampling=subsampling)
+                for key in ('minimum', 'maximum', 'min_positive', 'count'):
+                    self.assertEqual(getattr(result, key),
+                                     getattr(expected, key))
+                self.assertAlmostEqual(result.mean, expected.mean)
+                self.assertAlmostEqual(result.variance, expected.variance)
+
+                # Indices in the whole data
+                flat_data = self.data.ravel()
+                self.assertEqual(flat_data[result.argmin], result.minimum)
+                self.assertEqual(flat_data[result.argmax], result.maximum)
+                self.assertEqual(flat_data[result.argmin_positive],
+                                 result.min_positive)
+
+                result = min_max(dataset, min_positive=True,
+                                 subsampling=subsampling)
+                self.assertEqual(result.minimum, expected.minimum)
+                self.assertEqual(result.maximum, expected.maximum)
+
+    def test_array(self):
+        """Test sub-sampling of numpy arrays"""
+        self._test_dataset(self.data)
+
+    def test_commonh5(self):
+        """Test with commonh5 dataset"""
+        self._test_dataset(commonh5.Dataset("data", self.data))
+
+    @unittest.skipIf(h5py is None, "h5py is not available")
+    def test_h5py(self):
+        """Test with chunked and contiguous HDF5 datasets"""
+        tempdir = tempfile.mkdtemp()
+        try:
+            with h5py.File(os.path.join(tempdir, "data.h5"), "w") as h5file:
+                for chunks in ((3, 4, 5), None):
+                    with self.subTest(chunks=chunks):
+                        dataset = h5file.create_dataset(
+                            "data%s" % bool(chunks), data=self.data,
+                            chunks=chunks)
+                        self._test_dataset(dataset)
+        finally:
+            shutil.rmtree(tempdir)
+
+    def _test_blocks_without_values(self, dataset_factory):
+        """Test blocks without positive or finite values"""
+        data = numpy.random.random((40, 17, 11)) + 0.5
+        data[20:] = - data[20:]
+        data[30:] = float('nan')
+        for name, array in (('first rows', data), ('last rows', data[::-1])):
+            with self.subTest(data=name):
+                array = numpy.ascontiguousarray(array)
+                dataset = dataset_factory(name, array)
+
+                result = min_max(dataset, min_positive=True, finite=True)
+                expected = min_max(array, min_positive=True, finite=True)
+                for key in ('minimum', 'maximum', 'min_positive',
+                            'argmin', 'argmax', 'argmin_positive'):
+                    self.assertEqual(getattr(result, key),
+                                     getattr(expected, key))
+
+                result = statistics(dataset, finite=True)
+                expected = statistics(array, finite=True)
+                for key in ('minimum', 'maximum', 'argmin', 'argmax',
+                            'count'):
+                    self.assertEqual(getattr(result, key),
+                                     getattr(expected, key))
+                self.assertAlmostEqual(result.mean, expected.mean)
+
+    def test_commonh5_blocks_without_values(self):
+        """Test commonh5 dataset with blocks without positive/finite values"""
+        self._test_blocks_without_values(commonh5.Dataset)
+
+    @unittest.skipIf(h5py is None, "h5py is not available")
+    def test_h5py_blocks_without_values(self):
+        """Test HDF5 dataset with blocks without positive/finite values"""
+        tempdir = tempfile.mkdtemp()
+        try:
+            with h5py.File(os.path.join(tempdir, "data.h5"), "w") as h5file:
+                self._test_blocks_without_values(
+                    lambda name, data: h5file.create_dataset(
+                        name.replace(' ', '_'), data=data))
+        finally:
+            shutil.rmtree(tempdir)
+
+    def test_scalar_and_empty(self):
+        """Test with scalar and empty datasets"""
+        result = statistics(commonh5.Dataset("scalar", numpy.float64(3.)))
+        self.assertEqual((result.minimum, result.argmin), (3., 0))
+        self.assertEqual(result.mean, 3.)
+
+        with self.assertRaises(ValueError):
+            min_max(commonh5.Dataset("empty", numpy.zeros((0, 3))))
+        with self.assertRaises(ValueError):
+            min_max(self.data, subsampling=0)
+
 
 def suite():
     test_suite = unittest.TestSuite()
     test_suite.addTests(
         unittest.defaultTestLoader.loadTestsFromTestCase(TestMinMax))
+    test_suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestStatistics))
+    test_suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestDatasets))
     return test_suite
 
 
@@ -922,6 +922,61 @@ class Test_Histogramnd_nominal_3d(_Test_Histogramnd_nominal):
     ndims = 3
 
 
+class Test_Histogramnd_threads(unittest.TestCase):
+    """Compare histograms computed with different numbers of threads"""
+
+    def setUp(self):
+        self.sample = np.random.random((10000, 3)) * 12. - 1.
+        self.sample[5] = [10., 10., 10.]  # Last bin closed
+        self.weights = np.random.random(10000).astype(np.float32)
+        self.histo_range = [[0., 10.], [0., 10.], [0., 10.]]
+        self.n_bins = [4, 5, 3]
+
+    def test_chistogramnd(self):
+        ref_histo, ref_cumul, ref_edges = histogramnd(
+            self.sample, self.histo_range, self.n_bins,
+            weights=self.weights, weight_min=0.1, last_bin_closed=True,
+            n_threads=1)
+
+        for n_threads in (2, 3, 7):
+            histo, cumul, edges = histogramnd(
+                self.sample, self.histo_range, self.n_bins,
+                weights=self.weights, weight_min=0.1, last_bin_closed=True,
+                n_threads=n_threads)
+            self.assertTrue(np.array_equal(histo, ref_histo))
+            self.assertTrue(np.allclose(cumul, ref_cumul))
+            for edge, ref_edge in zip(edges, ref_edges):
+                self.assertTrue(np.array_equal(edge, ref_edge))
+
+    def test_accumulate(self):
+        ref_histo, ref_cumul, _ = histogramnd(
+            np.concatenate((self.sample, self.sample)),
+            self.histo_range, self.n_bins,
+            weights=np.concatenate((self.weights, self.weights)),
+            n_threads=1)
+
+        histo = Histogramnd(self.sample, self.histo_range, self.n_bins,
+                            weights=self.weights, n_threads=4)
+        histo.accumulate(self.sample, weights=self.weights)
+        self.assertTrue(np.array_equal(histo.histo, ref_histo))
+        self.assertTrue(np.allclose(histo.weighted_histo, ref_cumul))
+
+    def test_more_threads_than_samples(self):
+        histo, cumul, _ = histogramnd(
+            self.sample[:3], self.histo_range, self.n_bins,
+            weights=self.weights[:3], n_threads=8)
+        ref_histo, ref_cumul, _ = histogramnd(
+            self.sample[:3], self.histo_range, self.n_bins,
+            weights=self.weights[:3], n_threads=1)
+        self.assertTrue(np.array_equal(histo, ref_histo))
+        self.assertTrue(np.array_equal(cumul, ref_cumul))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            histogramnd(self.sample, self.histo_range, self.n_bins,
+                        n_threads=0)
+
+
 # ==============================================================
 # ==============================================================
 # ==============================================================
@@ -933,6 +988,7 @@ test_cases = (Test_chistogram_nominal_1d,
               Test_Histogramnd_nominal_1d,
               # Test_Histogramnd_nominal_2d,
               # Test_Histogramnd_nominal_3d
+              Test_Histogramnd_threads,
               )
 
 
@@ -32,6 +32,7 @@ import operator
 import numpy as np
 
 from silx.math.chistogramnd import chistogramnd as histogramnd
+from silx.math.histogram import histogram1d
 
 # ==============================================================
 # ==============================================================
@@ -807,6 +808,94 @@ class TestHistogramnd_3d_int32_int32(_TestHistogramnd_3d):
 # ==============================================================
 
 
+class TestHistogram1d(unittest.TestCase):
+    """
+    Tests histogram1d against numpy.histogram.
+    """
+
+    def setUp(self):
+        self.state = np.random.get_state()
+        np.random.seed(0)
+
+    def tearDown(self):
+        np.random.set_state(self.state)
+
+    def _compare(self, data, n_bins, histo_range=None):
+        histo, edges = histogram1d(data, n_bins, histo_range=histo_range)
+        values = np.array(data, dtype=np.float64).reshape(-1)
+        values = values[np.isfinite(values)]
+        expected_h, expected_e = np.histogram(values, n_bins, histo_range)
+        self.assertTrue(np.array_equal(histo, expected_h))
+        self.assertTrue(np.allclose(edges, expected_e))
+
+    def test_types(self):
+        for dtype in (np.float64, np.float32, np.int64, np.int32):
+            for n_bins in (1, 7, 256):
+                data = np.random.random((300, 400)) * 1000 - 100
+                self._compare(data.astype(dtype), n_bins)
+                self._compare(data.astype(dtype), n_bins, (-50, 500))
+
+    def test_small_integers(self):
+        for dtype in (np.uint8, np.int8, np.uint16, np.int16):
+            info = np.iinfo(dtype)
+            data = np.random.randint(info.min, info.max, (200, 300))
+            data = data.astype(dtype)
+            self._compare(data, 100)
+            self._compare(data, 50, (info.min / 2, info.max / 2))
+
+            # Narrow range: one bin per value
+            narrow = data % 7 + 2
+            histo, edges = histogram1d(narrow, 256)
+            counts = np.bincount(narrow.ravel())[2:]
+            self.assertTrue(np.array_equal(histo, counts))
+            self.assertEqual((edges[0], edges[-1]), (1.5, 8.5))
+
+    def test_nan(self):
+        data = np.random.random((100, 50))
+        data[::3] = np.nan
+        data[1, ::2] = np.inf
+        self._compare(data, 10)
+        self._compare(data, 10, (0.25, 0.75))
+
+        with self.assertRaises(ValueError):
+            histogram1d(np.full((10,), np.nan), 10)
+
+    def test_strided(self):
+        data = np.random.random((200, 300, 4))[::-3, 1::2, 2]
+        self._compare(data, 64)
+
+    def test_readonly(self):
+        data = np.random.random((200, 300))
+        data.flags.writeable = False
+        self._compare(data, 64)
+        self._compare(data[::2, ::-3], 64)
+
+    def test_subsampling(self):
+        data = np.random.random((400, 300))
+        histo, edges = histogram1d(data, 32, subsampling=3)
+        self._compare(data[::3, ::3], 32, (edges[0], edges[-1]))
+
+        histo, edges = histogram1d(data, 32, accurate=False)
+        self.assertEqual(histo.sum(), data.size)
+
+        data = np.random.random((2000, 1000))
+        histo, edges = histogram1d(data, 32, accurate=False)
+        self.assertLess(histo.sum(), data.size)
+
+    def test_constant(self):
+        histo, edges = histogram1d(np.ones((10, 10)), 4)
+        self.assertEqual(histo.sum(), 100)
+        self.assertEqual((edges[0], edges[-1]), (0.5, 1.5))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            histogram1d(np.array([]), 10)
+        with self.assertRaises(ValueError):
+            histogram1d(np.arange(10), 0)
+        with self.assertRaises(ValueError):
+            histogram1d(np.arange(10), 10, histo_range=(1, 1))
+
+
 test_cases = (TestHistogramnd_1d_double_double,
               TestHistogramnd_1d_double_float,
               TestHistogramnd_1d_double_int32,
@@ -833,7 +922,8 @@ test_cases = (TestHistogramnd_1d_double_double,
               TestHistogramnd_3d_float_int32,
               TestHistogramnd_3d_int32_double,
               TestHistogramnd_3d_int32_float,
-              TestHistogramnd_3d_int32_int32,)
+              TestHistogramnd_3d_int32_int32,
+              TestHistogram1d,)
 
 
 def suite():
@@ -29,10 +29,18 @@ __authors__ = ["T. Vincent"]
 __license__ = "MIT"
 __date__ = "17/01/2018"
 
+import os
+import shutil
+import tempfile
 import unittest
 
 import numpy
 
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
 from silx.utils.testutils import ParametricTestCase
 
 from silx.math import marchingcubes
@@ -173,6 +181,53 @@ class TestMarchingCubes(ParametricTestCase):
                                     result.get_indices(),
                                     atol=0., rtol=0.)
 
+    def _create_volume(self):
+        """Returns a volume with a non trivial isosurface at 0.5"""
+        z, y, x = numpy.ogrid[-1:1:23j, -1:1:17j, -1:1:19j]
+        random = numpy.random.RandomState(0).random_sample((23, 17, 19))
+        return (x**2 + y**2 + z**2 + 0.05 * random).astype(numpy.float32)
+
+    def test_process_slabs(self):
+        """Test processing by slabs, comparing to process"""
+        data = self._create_volume()
+
+        for sampling in [(1, 1, 1), (2, 1, 1), (3, 2, 2)]:
+            ref_result = marchingcubes.MarchingCubes(
+                data, isolevel=0.5, sampling=sampling)
+            for slab_size in (None, 1, 4, 100):
+                for n_threads in (1, 3):
+                    with self.subTest(sampling=sampling,
+                                      slab_size=slab_size,
+                                      n_threads=n_threads):
+                        result = marchingcubes.MarchingCubes(
+                            isolevel=0.5, sampling=sampling)
+                        result.process_slabs(data,
+                                             slab_size=slab_size,
+                                             n_threads=n_threads)
+                        self.assertEqual(result.shape, ref_result.shape)
+                        for array, ref_array in zip(result, ref_result):
+                            self.assertTrue(numpy.array_equal(array, ref_array))
+
+    @unittest.skipIf(h5py is None, "h5py is not available")
+    def test_process_slabs_h5py(self):
+        """Test processing by slabs of a h5py dataset"""
+        data = self._create_volume()
+        ref_result = marchingcubes.MarchingCubes(data, isolevel=0.5)
+
+        tempdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tempdir, "data.h5")
+            with h5py.File(filename, "w") as h5file:
+                h5file["data"] = data
+            with h5py.File(filename, "r") as h5file:
+                result = marchingcubes.MarchingCubes(isolevel=0.5)
+                result.process_slabs(h5file["data"], slab_size=3, n_threads=2)
+        finally:
+            shutil.rmtree(tempdir)
+
+        for array, ref_array in zip(result, ref_result):
+            self.assertTrue(numpy.array_equal(array, ref_array))
+
 
 test_cases = (TestMarchingCubes,)
 